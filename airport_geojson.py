@@ -0,0 +1,243 @@
+# airport_geojson.py
+"""
+/api/airports için önbellekli GeoJSON yanıtları
+
+Tam havaalanı veritabanında FeatureCollection birkaç MB tutar; her istekte
+yeniden kurmak yerine:
+
+- Her havaalanının Feature JSON'u bir kez serileştirilir; yanıt seçilen
+  Feature byte'larının birleştirilmesidir (json.dumps yok)
+- bbox sorguları airport_index grid'inden yapılır. Kutu dışa doğru
+  AIRPORT_GEOJSON['bbox_snap_deg'] katlarına yuvarlanır; küçük kaydırmalar
+  aynı önbellek girdisine düşer (dönen küme görünür alanı her zaman kapsar)
+- Tam koleksiyonun gzip/br sürümleri kurulumda hazırlanır; filtreli
+  yanıtlar ilk istekte sıkıştırılıp LRU önbellekte tutulur
+- ETag = veri sürümü (Feature byte'larının özeti) + normalize sorgu;
+  gövde kurulmadan hesaplanır, If-None-Match eşleşirse 304 döner
+"""
+import gzip
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # brotli opsiyonel - yoksa sadece gzip sunulur
+    brotli = None
+
+import config
+from utils import debug_log
+
+_PREFIX = b'{"type":"FeatureCollection","features":['
+_SUFFIX = b']}'
+
+# Filtresiz sorgunun anahtarı
+FULL = (None, None)
+
+
+def feature_bytes(record):
+    """Havaalanı kaydı -> GeoJSON Feature (UTF-8, boşluksuz)"""
+    return json.dumps({
+        'type': 'Feature',
+        'properties': {
+            'icao': record['icao'],
+            'name': record['name'],
+            'city': record['city'],
+            'iata': record.get('iata'),
+            'elevation': record['elevation'],
+            'type': record['type']
+        },
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [record['lon'], record['lat']]
+        }
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class AirportGeoJSON:
+    """Serileştirilmiş, filtrelenebilir ve sıkıştırılmış havaalanı GeoJSON önbelleği"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.AIRPORT_GEOJSON
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # anahtar -> {kodlama: byte}
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0}
+        self._build()
+
+    def _build(self):
+        from airport_index import get_airport_index
+
+        index = get_airport_index()
+        if index is not None:
+            records = [index.record(i) for i in range(len(index))]
+        else:
+            from airports import MAJOR_AIRPORTS
+            records = [{'icao': icao, **airport} for icao, airport in MAJOR_AIRPORTS.items()]
+
+        self._index = index
+        self._coords = None if index is not None else [(r['lat'], r['lon']) for r in records]
+        self.kinds = [r['type'] for r in records]
+        self.types = sorted(set(self.kinds))
+        self.features = [feature_bytes(r) for r in records]
+
+        body = self._collection(range(len(self.features)))
+        self.version = hashlib.sha1(body).hexdigest()[:16]
+        self._full = {'identity': body}
+        for encoding in self.encodings:
+            self._full[encoding] = self._compress(body, encoding)
+
+        debug_log(
+            f"🗺️ Havaalanı GeoJSON önbelleği hazır: {len(self.features)} havaalanı, "
+            f"{len(body) / 1024:.0f} KB (" +
+            ", ".join(f"{e} {len(self._full[e]) / 1024:.0f} KB" for e in self.encodings) + ")"
+        )
+
+    # -------------------------
+    # Sorgu anahtarı ve ETag
+    # -------------------------
+    def key(self, bbox=None, types=None):
+        """Query parametrelerini normalize önbellek anahtarına çevir
+
+        Args:
+            bbox: "west,south,east,north" (west > east = antimeridyeni geçen kutu)
+            types: Virgülle ayrılmış havaalanı tipleri
+
+        Raises:
+            ValueError: Geçersiz bbox veya bilinmeyen tip
+        """
+        box = None
+        if bbox:
+            try:
+                west, south, east, north = (float(v) for v in bbox.split(','))
+            except ValueError as e:
+                raise ValueError(f"bbox 'west,south,east,north' olmalı: {bbox!r}") from e
+            if not all(math.isfinite(v) for v in (west, south, east, north)) or south > north:
+                raise ValueError(f"Geçersiz bbox: {bbox!r}")
+
+            # Dışa doğru yuvarla; east, west'ten büyük olacak şekilde açılmış tutulur
+            snap = self.settings['bbox_snap_deg']
+            span = east - west if east - west >= 360.0 else (east - west) % 360.0
+            south = max(-90.0, math.floor(south / snap) * snap)
+            north = min(90.0, math.ceil(north / snap) * snap)
+            east = math.ceil((west + span) / snap) * snap
+            west = math.floor(west / snap) * snap
+            if east - west >= 360.0:
+                west, east = -180.0, 180.0
+            else:
+                shift = ((west + 180.0) % 360.0 - 180.0) - west
+                west, east = west + shift, east + shift
+            if not (south == -90.0 and north == 90.0 and east - west >= 360.0):
+                box = (south, west, north, east)
+
+        kinds = None
+        if types:
+            kinds = tuple(sorted({t.strip() for t in types.split(',') if t.strip()}))
+            unknown = [t for t in kinds if t not in self.types]
+            if unknown:
+                raise ValueError(f"Bilinmeyen tip: {', '.join(unknown)} (geçerli: {', '.join(self.types)})")
+            if len(kinds) == len(self.types):
+                kinds = None
+        return box, kinds
+
+    def etag(self, key):
+        """Anahtarın ETag değeri (gövde kurulmadan)"""
+        if key == FULL:
+            return self.version
+        return f"{self.version}-{hashlib.sha1(repr(key).encode()).hexdigest()[:12]}"
+
+    def not_modified(self):
+        self._stats['not_modified'] += 1
+
+    # -------------------------
+    # Gövde
+    # -------------------------
+    def body(self, key, encoding=None):
+        """Anahtarın yanıt gövdesi
+
+        Args:
+            encoding: 'br', 'gzip' veya None (sıkıştırmasız)
+
+        Returns:
+            (byte, kullanılan kodlama veya None) - küçük gövdeler sıkıştırılmaz
+        """
+        if key == FULL:
+            entry = self._full
+        else:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+            if entry is None:
+                entry = {'identity': self._collection(self._select(key))}
+                with self._lock:
+                    self._stats['misses'] += 1
+                    self._entries[key] = entry
+                    while len(self._entries) > self.settings['cache_entries']:
+                        self._entries.popitem(last=False)
+
+        identity = entry['identity']
+        if encoding is None or encoding not in self.encodings or \
+                len(identity) < self.settings['min_compress_bytes']:
+            return identity, None
+        data = entry.get(encoding)
+        if data is None:
+            # Yarış zararsız: iki thread aynı sonucu yazar
+            data = entry[encoding] = self._compress(identity, encoding)
+        return data, encoding
+
+    def _select(self, key):
+        box, kinds = key
+        if box is None:
+            indices = range(len(self.features))
+        elif self._index is not None:
+            indices = self._index.within_bbox(*box).tolist()
+        else:
+            south, west, north, east = box
+            indices = [
+                i for i, (lat, lon) in enumerate(self._coords)
+                if south <= lat <= north and (west <= lon <= east or west <= lon + 360.0 <= east)
+            ]
+        if kinds is not None:
+            kinds = set(kinds)
+            indices = [i for i in indices if self.kinds[i] in kinds]
+        return indices
+
+    def _collection(self, indices):
+        features = self.features
+        return _PREFIX + b",".join([features[i] for i in indices]) + _SUFFIX
+
+    def _compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.settings['brotli_quality'])
+        return gzip.compress(data, compresslevel=self.settings['gzip_level'])
+
+    def get_statistics(self):
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            'airports': len(self.features),
+            'version': self.version,
+            'encodings': list(self.encodings),
+            'full_bytes': {encoding: len(data) for encoding, data in self._full.items()},
+            'cached_queries': entries,
+            **self._stats
+        }
+
+
+# Singleton instance
+_airport_geojson = None
+_build_lock = threading.Lock()
+
+
+def get_airport_geojson() -> AirportGeoJSON:
+    """Global GeoJSON önbelleği (ilk çağrıda indeks ve serileştirme yapılır)"""
+    global _airport_geojson
+    if _airport_geojson is None:
+        with _build_lock:
+            if _airport_geojson is None:
+                _airport_geojson = AirportGeoJSON()
+    return _airport_geojson
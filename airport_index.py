@@ -0,0 +1,528 @@
+# airport_index.py
+"""
+Havaalanı veritabanı ve mekansal indeks (en yakın / k en yakın / yarıçap)
+
+OurAirports formatındaki airports.csv (~70 bin kayıt) başlangıçta bir kez
+okunur ve enlem/boylam grid'ine dizilir: kayıtlar hücre numarasına göre
+sıralanır, her hücrenin başlangıcı cell_start dizisinde tutulur (CSR
+düzeni). Böylece bir satırdaki ardışık hücreler tek dilimdir.
+
+Sorgular noktanın hücresinden başlayıp halka halka genişler; taranan
+kutunun dışındaki en yakın noktaya olan alt sınır (enlem kenarları ve
+meridyen düzlemleri) bulunan k. mesafeyi geçince arama durur, sonuç kesindir.
+
+Kurulan indeks .npz olarak önbelleğe yazılır; CSV'nin boyutu/değişim zamanı
+veya ayarlar değişmediği sürece sonraki açılışlar CSV'yi ayrıştırmaz.
+Metin alanları tek bir UTF-8 blob'da tutulur, sadece sonuç kayıtları çözülür.
+
+CSV yoksa aynı indeks airports.MAJOR_AIRPORTS üzerinden kurulur. NumPy gerektirir.
+"""
+import csv
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opsiyonel - yoksa airports.py doğrusal taramaya döner
+    np = None
+
+import config
+from spatial_grid import normalize_lon
+from utils import EARTH_RADIUS_KM, debug_log
+
+CACHE_VERSION = 1
+
+# Kayıt başına metin alanları (blob'da sekme ile ayrılır)
+TEXT_FIELDS = ('icao', 'name', 'city', 'iata', 'type')
+
+# Tek noktalık sorgularda yarım dünyadan fazlası taranmaz
+_MAX_RING_DEG = 180.0
+
+
+def _haversine(lat1, lon1, lats, lons):
+    """utils.haversine_km ile aynı formül; lat1/lon1 skaler veya (m, 1) dizi olabilir"""
+    dlat = np.radians(lats - lat1)
+    dlon = np.radians(lons - lon1)
+    a = (np.sin(dlat / 2) ** 2 +
+         np.cos(np.radians(lat1)) * np.cos(np.radians(lats)) * np.sin(dlon / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+
+def _clean(value):
+    return (value or '').replace('\t', ' ').replace('\n', ' ').strip()
+
+
+def read_ourairports_csv(path, types=None):
+    """OurAirports airports.csv dosyasını oku
+
+    Args:
+        path: CSV yolu
+        types: Alınacak 'type' değerleri (None = 'closed' dışındaki hepsi)
+
+    Returns:
+        (lats, lons, elevations, records) - records: TEXT_FIELDS sırasında tuple listesi
+    """
+    lats, lons, elevations, records = [], [], [], []
+    types = set(types) if types else None
+
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            kind = row.get('type') or ''
+            if kind == 'closed' or (types is not None and kind not in types):
+                continue
+            try:
+                lat = float(row['latitude_deg'])
+                lon = float(row['longitude_deg'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+                continue
+            try:
+                elevation = float(row.get('elevation_ft') or 'nan')
+            except ValueError:
+                elevation = float('nan')
+
+            lats.append(lat)
+            lons.append(lon)
+            elevations.append(elevation)
+            records.append((
+                _clean(row.get('ident')),
+                _clean(row.get('name')),
+                _clean(row.get('municipality')),
+                _clean(row.get('iata_code')),
+                kind
+            ))
+
+    return lats, lons, elevations, records
+
+
+def _major_airports():
+    """airports.MAJOR_AIRPORTS -> read_ourairports_csv ile aynı şekil"""
+    from airports import MAJOR_AIRPORTS
+
+    lats, lons, elevations, records = [], [], [], []
+    for icao, airport in MAJOR_AIRPORTS.items():
+        lats.append(airport['lat'])
+        lons.append(airport['lon'])
+        elevations.append(float(airport['elevation']))
+        records.append((icao, airport['name'], airport['city'], airport.get('iata', ''), airport['type']))
+    return lats, lons, elevations, records
+
+
+class AirportIndex:
+    """Hücre sıralı (CSR) enlem/boylam grid'i üzerinde havaalanı indeksi"""
+
+    def __init__(self, lats, lons, elevations, records, cell_deg=1.0, source=None):
+        """Kayıtları hücreye göre sıralayarak indeksi kur
+
+        Args:
+            lats, lons, elevations: Kayıt sırasıyla listeler/diziler
+            records: TEXT_FIELDS sırasında tuple listesi
+            cell_deg: Hücre boyutu (derece, 180'i tam bölmeli)
+        """
+        self._init_grid(cell_deg, source)
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        cells = self._cells_of(lats, lons)
+        order = np.argsort(cells, kind='stable')
+
+        self.lats = lats[order]
+        self.lons = lons[order]
+        self.elevations = np.asarray(elevations, dtype=np.float64)[order]
+        self.cell_start = np.searchsorted(
+            cells[order], np.arange(self.rows * self.cols + 1)
+        ).astype(np.int32)
+
+        encoded = ["\t".join(records[i]).encode('utf-8') for i in order]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(e) for e in encoded], out=self.offsets[1:])
+        self.text = b"".join(encoded)
+
+    def _init_grid(self, cell_deg, source):
+        cell_deg = float(cell_deg)
+        rows = 180.0 / cell_deg
+        if cell_deg <= 0 or abs(rows - round(rows)) > 1e-9:
+            raise ValueError(f"cell_deg 180'i tam bölmeli: {cell_deg}")
+        self.cell_deg = cell_deg
+        self.rows = int(round(rows))
+        self.cols = 2 * self.rows
+        self.source = source
+
+    # -------------------------
+    # Önbellek
+    # -------------------------
+    def save(self, path, meta):
+        """İndeksi .npz olarak yaz (önce geçici dosya, sonra atomik yer değiştirme)"""
+        path = Path(path)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta)),
+                lats=self.lats, lons=self.lons, elevations=self.elevations,
+                cell_start=self.cell_start, offsets=self.offsets,
+                text=np.frombuffer(self.text, dtype=np.uint8)
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, meta):
+        """Önbellekten yükle; meta uyuşmazsa veya dosya okunamazsa None"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if json.loads(str(data['meta'])) != meta:
+                    return None
+                index = cls.__new__(cls)
+                index._init_grid(meta['cell_deg'], meta['source'])
+                index.lats = data['lats']
+                index.lons = data['lons']
+                index.elevations = data['elevations']
+                index.cell_start = data['cell_start']
+                index.offsets = data['offsets']
+                index.text = data['text'].tobytes()
+        except (OSError, KeyError, ValueError):
+            return None
+        if len(index.cell_start) != index.rows * index.cols + 1:
+            return None
+        return index
+
+    def __len__(self):
+        return len(self.lats)
+
+    # -------------------------
+    # Grid yardımcıları
+    # -------------------------
+    def _rows_cols_of(self, lats, lons):
+        rows = np.clip(np.floor((lats + 90.0) / self.cell_deg), 0, self.rows - 1).astype(np.int64)
+        cols = np.floor((((lons + 180.0) % 360.0)) / self.cell_deg).astype(np.int64) % self.cols
+        return rows, cols
+
+    def _cells_of(self, lats, lons):
+        rows, cols = self._rows_cols_of(lats, lons)
+        return rows * self.cols + cols
+
+    def _col_ranges(self, col, r):
+        """col ± r sütunları (mod cols) için kapsayıcı (c0, c1) aralıkları"""
+        if 2 * r + 1 >= self.cols:
+            return [(0, self.cols - 1)]
+        c0, c1 = col - r, col + r
+        if c0 < 0:
+            return [(c0 + self.cols, self.cols - 1), (0, c1)]
+        if c1 >= self.cols:
+            return [(c0, self.cols - 1), (0, c1 - self.cols)]
+        return [(c0, c1)]
+
+    def _new_col_ranges(self, col, r):
+        """col ± r aralığında olup col ± (r - 1) aralığında olmayan sütunlar"""
+        if 2 * (r - 1) + 1 >= self.cols:
+            return []
+        if 2 * r + 1 >= self.cols:
+            # Kalan tüm sütunlar: col + r .. col - r + cols
+            c0 = (col + r) % self.cols
+            c1 = (col - r) % self.cols
+            if c0 <= c1:
+                return [(c0, c1)]
+            return [(c0, self.cols - 1), (0, c1)]
+        return [((col - r) % self.cols,) * 2, ((col + r) % self.cols,) * 2]
+
+    def _slices(self, row_ranges):
+        """[(satır, [(c0, c1), ...]), ...] -> kayıt indeksleri"""
+        start = self.cell_start
+        parts = []
+        for row, ranges in row_ranges:
+            base = row * self.cols
+            for c0, c1 in ranges:
+                lo, hi = start[base + c0], start[base + c1 + 1]
+                if hi > lo:
+                    parts.append(np.arange(lo, hi))
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _box_indices(self, row, col, r):
+        """(row, col) merkezli (2r+1)² kutudaki kayıtlar"""
+        ranges = self._col_ranges(col, r)
+        return self._slices(
+            (rr, ranges) for rr in range(max(0, row - r), min(self.rows, row + r + 1))
+        )
+
+    def _ring_indices(self, row, col, r):
+        """Kutu r'de olup kutu r - 1'de olmayan hücrelerdeki kayıtlar"""
+        if r == 0:
+            return self._slices([(row, [(col, col)])])
+        full = self._col_ranges(col, r)
+        new_cols = self._new_col_ranges(col, r)
+        row_ranges = []
+        for rr in range(max(0, row - r), min(self.rows, row + r + 1)):
+            if rr == row - r or rr == row + r:
+                row_ranges.append((rr, full))
+            elif new_cols:
+                row_ranges.append((rr, new_cols))
+        return self._slices(row_ranges)
+
+    def _outside_bound(self, lat, lon, row, col, r):
+        """Kutu r dışındaki herhangi bir noktaya olan mesafenin alt sınırı (km)
+
+        Enlem kenarları için enlem farkı, boylam kenarları için kenar
+        meridyeninin büyük dairesine olan mesafe kullanılır. lat/lon/row/col
+        skaler veya dizi olabilir.
+        """
+        cell = self.cell_deg
+        south = (row - r) * cell - 90.0
+        north = (row + r + 1) * cell - 90.0
+        bound = np.minimum(
+            np.where(row - r <= 0, np.inf, lat - south),
+            np.where(row + r + 1 >= self.rows, np.inf, north - lat)
+        )
+        bound = np.radians(bound) * EARTH_RADIUS_KM
+
+        if 2 * r + 1 < self.cols:
+            lon = (lon + 180.0) % 360.0
+            dlon = np.minimum(lon - (col - r) * cell, (col + r + 1) * cell - lon)
+            # Meridyen düzlemine mesafe; 90°'den uzakta kutup üzerinden geçilebilir
+            cos_lat = np.cos(np.radians(lat))
+            lon_bound = np.where(
+                dlon >= 90.0,
+                np.radians(90.0 - np.abs(lat)),
+                np.arcsin(np.minimum(1.0, cos_lat * np.sin(np.radians(np.minimum(dlon, 90.0)))))
+            ) * EARTH_RADIUS_KM
+            bound = np.minimum(bound, lon_bound)
+        return bound
+
+    def _covers_all(self, row, r):
+        return 2 * r + 1 >= self.cols and row - r <= 0 and row + r + 1 >= self.rows
+
+    # -------------------------
+    # Sorgular
+    # -------------------------
+    def nearest(self, lat, lon, k=1, max_km=None):
+        """k en yakın havaalanı (yakından uzağa)
+
+        Args:
+            max_km: Verilirse bu mesafeden uzaktakiler döndürülmez
+
+        Returns:
+            [(kayıt indeksi, mesafe km), ...]
+        """
+        if len(self) == 0 or k < 1:
+            return []
+        row, col = (int(v[0]) for v in self._rows_cols_of(np.array([lat]), np.array([lon])))
+        best_idx = np.empty(0, dtype=np.int64)
+        best_dist = np.empty(0)
+        max_ring = int(math.ceil(_MAX_RING_DEG / self.cell_deg))
+
+        r = 0
+        while True:
+            idx = self._ring_indices(row, col, r)
+            if idx.size:
+                dist = _haversine(lat, lon, self.lats[idx], self.lons[idx])
+                best_idx = np.concatenate((best_idx, idx))
+                best_dist = np.concatenate((best_dist, dist))
+                if best_dist.size > k:
+                    keep = np.argpartition(best_dist, k - 1)[:k]
+                    best_idx, best_dist = best_idx[keep], best_dist[keep]
+
+            bound = float(self._outside_bound(lat, lon, row, col, r))
+            if best_dist.size >= k and best_dist.max() <= bound:
+                break
+            if max_km is not None and bound >= max_km:
+                break
+            if self._covers_all(row, r) or r >= max_ring:
+                break
+            r += 1
+
+        order = np.argsort(best_dist, kind='stable')
+        result = [(int(best_idx[i]), float(best_dist[i])) for i in order]
+        if max_km is not None:
+            result = [item for item in result if item[1] <= max_km]
+        return result
+
+    def within_radius(self, lat, lon, radius_km, limit=None):
+        """radius_km içindeki havaalanları (yakından uzağa)
+
+        Returns:
+            [(kayıt indeksi, mesafe km), ...]
+        """
+        if len(self) == 0 or radius_km < 0:
+            return []
+        row, col = (int(v[0]) for v in self._rows_cols_of(np.array([lat]), np.array([lon])))
+        found_idx, found_dist = [], []
+
+        r = 0
+        while True:
+            idx = self._ring_indices(row, col, r)
+            if idx.size:
+                dist = _haversine(lat, lon, self.lats[idx], self.lons[idx])
+                mask = dist <= radius_km
+                found_idx.append(idx[mask])
+                found_dist.append(dist[mask])
+            if float(self._outside_bound(lat, lon, row, col, r)) > radius_km or self._covers_all(row, r):
+                break
+            r += 1
+
+        if not found_idx:
+            return []  # Taranan halkaların hücreleri boş (açık deniz vb.)
+        found_idx = np.concatenate(found_idx)
+        found_dist = np.concatenate(found_dist)
+        order = np.argsort(found_dist, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return [(int(found_idx[i]), float(found_dist[i])) for i in order]
+
+    def within_bbox(self, south, west, north, east):
+        """Kutunun içindeki kayıtların indeksleri (artan sırada)
+
+        west > east ise kutu antimeridyeni geçiyor kabul edilir; boylam
+        aralığı 360°'yi kapsıyorsa boylam filtresi uygulanmaz.
+        """
+        if len(self) == 0 or south > north:
+            return np.empty(0, dtype=np.int64)
+        if east - west >= 360.0:
+            lon_ranges = [(-180.0, 180.0)]
+        else:
+            west, east = normalize_lon(west), normalize_lon(east)
+            lon_ranges = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+
+        rows, _ = self._rows_cols_of(np.array([south, north]), np.zeros(2))
+        row_lo, row_hi = int(rows[0]), int(rows[1])
+        parts = []
+        for lon_min, lon_max in lon_ranges:
+            col_lo = int(np.floor((lon_min + 180.0) / self.cell_deg))
+            col_hi = min(self.cols - 1, int(np.floor((lon_max + 180.0) / self.cell_deg)))
+            idx = self._slices((row, [(col_lo, col_hi)]) for row in range(row_lo, row_hi + 1))
+            lats, lons = self.lats[idx], self.lons[idx]
+            parts.append(idx[(lats >= south) & (lats <= north) & (lons >= lon_min) & (lons <= lon_max)])
+        idx = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return np.sort(idx)
+
+    def nearest_many(self, lats, lons):
+        """Çok sayıda nokta için en yakın havaalanı (vektörel)
+
+        Noktalar hücrelerine göre gruplanır; her grup için kutu adayları ile
+        (grup × aday) mesafe matrisi tek seferde hesaplanır. Kutu dışı alt
+        sınırı en yakın adayı kanıtlamayan noktalar için kutu bir halka büyütülür.
+
+        Returns:
+            (kayıt indeksleri, mesafeler km) - indeks -1 ise havaalanı yok
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        result_idx = np.full(lats.shape, -1, dtype=np.int64)
+        result_dist = np.full(lats.shape, np.inf)
+        if len(self) == 0 or lats.size == 0:
+            return result_idx, result_dist
+
+        rows, cols = self._rows_cols_of(lats, lons)
+        cells, inverse = np.unique(rows * self.cols + cols, return_inverse=True)
+        max_ring = int(math.ceil(_MAX_RING_DEG / self.cell_deg))
+
+        for group, cell in enumerate(cells):
+            pending = np.flatnonzero(inverse == group)
+            row, col = divmod(int(cell), self.cols)
+            r = 0
+            while pending.size:
+                idx = self._box_indices(row, col, r)
+                if idx.size:
+                    dist = _haversine(lats[pending, None], lons[pending, None],
+                                      self.lats[idx][None, :], self.lons[idx][None, :])
+                    best = np.argmin(dist, axis=1)
+                    best_dist = dist[np.arange(pending.size), best]
+                    result_idx[pending] = idx[best]
+                    result_dist[pending] = best_dist
+                    bound = self._outside_bound(lats[pending], lons[pending], row, col, r)
+                    pending = pending[best_dist > bound]
+                if self._covers_all(row, r) or r >= max_ring:
+                    break
+                r += 1
+
+        return result_idx, result_dist
+
+    # -------------------------
+    # Kayıtlar
+    # -------------------------
+    def record(self, i, distance_km=None):
+        """Kayıt sözlüğü (get_nearest_airport ile aynı alanlar)"""
+        icao, name, city, iata, kind = self.text[self.offsets[i]:self.offsets[i + 1]].decode('utf-8').split("\t")
+        elevation = float(self.elevations[i])
+        record = {
+            'icao': icao,
+            'name': name,
+            'city': city,
+            'iata': iata or None,
+            'lat': float(self.lats[i]),
+            'lon': float(self.lons[i]),
+            'elevation': None if math.isnan(elevation) else int(elevation),
+            'type': kind
+        }
+        if distance_km is not None:
+            record['distance_km'] = distance_km
+        return record
+
+
+def _source_meta(settings):
+    """Önbellek anahtarı: CSV boyutu/mtime + indeks ayarları"""
+    csv_path = Path(settings['csv_path'])
+    stat = csv_path.stat()
+    return {
+        'version': CACHE_VERSION,
+        'source': str(csv_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'types': sorted(settings['types']) if settings.get('types') else None,
+        'cell_deg': float(settings['cell_deg'])
+    }
+
+
+def build_index(settings=None):
+    """Ayarlara göre indeksi kur (önbellek geçerliyse oradan yükle)"""
+    settings = settings or config.AIRPORT_DATABASE
+    csv_path = Path(settings['csv_path'])
+    started = time.perf_counter()
+
+    if not csv_path.exists():
+        index = AirportIndex(*_major_airports(), cell_deg=settings['cell_deg'], source='MAJOR_AIRPORTS')
+        debug_log(f"🛫 {csv_path.name} bulunamadı, {len(index)} dahili havaalanı kullanılıyor", "WARNING")
+        return index
+
+    meta = _source_meta(settings)
+    cache_path = settings.get('cache_path')
+    if cache_path:
+        index = AirportIndex.load(cache_path, meta)
+        if index is not None:
+            debug_log(f"🛫 Havaalanı indeksi önbellekten yüklendi: {len(index)} kayıt "
+                      f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+            return index
+
+    index = AirportIndex(*read_ourairports_csv(csv_path, settings.get('types')),
+                         cell_deg=settings['cell_deg'], source=str(csv_path))
+    if cache_path:
+        try:
+            index.save(cache_path, meta)
+        except OSError as e:
+            debug_log(f"⚠️ Havaalanı indeks önbelleği yazılamadı: {e}", "WARNING")
+    debug_log(f"🛫 Havaalanı indeksi kuruldu: {len(index)} kayıt "
+              f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+    return index
+
+
+# Singleton instance
+_airport_index = None
+_index_lock = threading.Lock()
+
+
+def get_airport_index():
+    """Global havaalanı indeksi (ilk çağrıda kurulur); NumPy yoksa None"""
+    global _airport_index
+    if np is None:
+        return None
+    if _airport_index is None:
+        with _index_lock:
+            if _airport_index is None:
+                _airport_index = build_index()
+    return _airport_index
@@ -1,6 +1,10 @@
 # airports.py
 """
 Türkiye ve çevre bölge havaalanları
+
+En yakın havaalanı sorguları airport_index.py indeksini kullanır (tam
+OurAirports veritabanı varsa o, yoksa aşağıdaki liste); NumPy yoksa
+MAJOR_AIRPORTS doğrusal taranır.
 """
 
 MAJOR_AIRPORTS = {
@@ -148,6 +152,13 @@ def get_airports_geojson():
 
 def get_nearest_airport(lat, lon):
     """En yakın havaalanını bul"""
+    from airport_index import get_airport_index
+
+    index = get_airport_index()
+    if index is not None:
+        found = index.nearest(lat, lon, 1)
+        return index.record(*found[0]) if found else None
+
     from utils import haversine_km
 
     min_distance = float('inf')
@@ -163,4 +174,57 @@ def get_nearest_airport(lat, lon):
                 'distance_km': distance
             }
 
-    return nearest
\ No newline at end of file
+    return nearest
+
+
+def get_nearest_airports(lat, lon, k=5, radius_km=None):
+    """k en yakın havaalanı (radius_km verilirse o yarıçaptakiler, en fazla k)
+
+    Returns:
+        Yakından uzağa kayıt listesi; indeks yoksa None
+    """
+    from airport_index import get_airport_index
+
+    index = get_airport_index()
+    if index is None:
+        return None
+    if radius_km is not None:
+        found = index.within_radius(lat, lon, radius_km, limit=k)
+    else:
+        found = index.nearest(lat, lon, k)
+    return [index.record(i, distance) for i, distance in found]
+
+
+def annotate_nearest_airports(positions):
+    """Her pozisyon için en yakın havaalanı (tek vektörel sorgu)
+
+    Args:
+        positions: {hex_id: (lat, lon)}
+
+    Returns:
+        {hex_id: {'icao', 'name', 'iata', 'distance_km'}}; indeks yoksa None
+    """
+    from airport_index import get_airport_index
+
+    index = get_airport_index()
+    if index is None:
+        return None
+    if not positions:
+        return {}
+
+    hex_ids = list(positions)
+    coords = list(positions.values())
+    found, distances = index.nearest_many([c[0] for c in coords], [c[1] for c in coords])
+
+    # Aynı havaalanı çok uçak için tekrar çözülmez
+    records = {}
+    result = {}
+    for hex_id, i, distance in zip(hex_ids, found.tolist(), distances.tolist()):
+        if i < 0:
+            continue
+        record = records.get(i)
+        if record is None:
+            full = index.record(i)
+            records[i] = record = {'icao': full['icao'], 'name': full['name'], 'iata': full['iata']}
+        result[hex_id] = {**record, 'distance_km': round(distance, 2)}
+    return result
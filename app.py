@@ -9,14 +9,23 @@ import sys
 import time
 import threading
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify
-from flask_socketio import SocketIO
-import requests
+from flask import Flask, Response, render_template, request, jsonify
+from flask_socketio import SocketIO, join_room, leave_room
 
 import config
 from utils import debug_log
-from position_validator import PositionValidator
+import metrics
+import event_log
+from pipeline import process_snapshot
 from json_reader import get_json_reader
+from replay_control import get_replay_controller
+from sharded_validation import get_sharded_validator
+from kalman_tracker import get_kalman_tracker
+from profiler import get_profiler
+from dump1090_fetcher import get_dump1090_fetcher
+from update_stream import get_update_stream, get_viewport_router, Viewport
+from trail_stream import get_trail_subscriptions
+from wire_format import encode_frame, get_statistics as wire_format_statistics
 
 # UTF-8 desteği
 if hasattr(sys.stdout, 'reconfigure'):
@@ -29,8 +38,12 @@ app = Flask(__name__, static_folder="static", template_folder="templates")
 app.config['SECRET_KEY'] = 'adsb_tracker_pro_2025_secure_key'
 app.config['JSON_SORT_KEYS'] = False
 
+# Socket.IO paketlerini kodlarken boyutu ölçen json modülü (/metrics byte sayacı)
+_metered_json = metrics.MeteredJSON()
+
 socketio = SocketIO(
     app,
+    json=_metered_json,
     cors_allowed_origins="*",
     async_mode="threading",
     logger=False,
@@ -41,195 +54,116 @@ socketio = SocketIO(
 
 
 # =========================
-# Ana Veri İşleme Fonksiyonu
+# Client'lara Gönderim
 # =========================
-def sanitize_aircraft_positions(now_val, aircraft_list):
-    """
-    Uçak pozisyonlarını temizle, filtrele ve doğrula
+FULL_FLEET_ROOM = "full_fleet"  # Viewport göndermemiş client'lar (JSON)
+FULL_FLEET_BINARY_ROOM = "full_fleet_binary"  # Viewport göndermemiş client'lar (ikili çerçeve)
+
+_SERIALIZE_SECONDS = metrics.stage('serialize')
+_EMIT_SECONDS = metrics.stage('emit')
+_TRAIL_BUILD_SECONDS = metrics.stage('trail_build')
+
+# Son 'update' gönderiminin zamanı (time.monotonic, MOTION_VECTORS['emit_interval'])
+_last_emit = 0.0
+
 
-    Args:
-        now_val: Şu anki timestamp
-        aircraft_list: Ham uçak verisi listesi
+def full_fleet_room(client_id):
+    """Client'ın tüm filo akışında dahil olacağı oda"""
+    return FULL_FLEET_BINARY_ROOM if client_id in config._binary_clients else FULL_FLEET_ROOM
+
+
+def _emit(event, message, room, recipients=1):
+    """socketio.emit + gönderilen byte/mesaj sayaçları
 
     Returns:
-        Temizlenmiş ve doğrulanmış uçak listesi
+        emit süresi (saniye)
     """
-    from utils import smooth_angle, angle_difference
-
-    cleaned_aircraft = []
-    config._stats['total_updates'] = len(aircraft_list)
-    position_corrections = 0
-    heading_corrections = 0
-
-    # Bölge filtresi aktifse
-    if config.FOCUS_REGION['enabled']:
-        from utils import haversine_km
-
-        aircraft_with_distance = []
-        for ac in aircraft_list:
-            lat = ac.get("lat")
-            lon = ac.get("lon")
-            if lat is None or lon is None:
-                continue
-
-            distance = haversine_km(
-                config.FOCUS_REGION['center_lat'],
-                config.FOCUS_REGION['center_lon'],
-                lat, lon
-            )
-
-            if distance <= config.FOCUS_REGION['radius_km']:
-                aircraft_with_distance.append((distance, ac))
-
-        # Mesafeye göre sırala
-        aircraft_with_distance.sort(key=lambda x: x[0])
-        filtered_count = len(aircraft_with_distance)
-        aircraft_list = [ac for _, ac in aircraft_with_distance[:config.MAX_DISPLAYED_AIRCRAFT]]
-
-        debug_log(
-            f"🎯 Filtreleme: {len(aircraft_list)} uçak "
-            f"({filtered_count} bölge içi, {config._stats['total_updates']} toplam)"
-        )
-    else:
-        # Sadece limit uygula
-        aircraft_list = aircraft_list[:config.MAX_DISPLAYED_AIRCRAFT]
-        debug_log(f"🎯 Limit uygulandı: {len(aircraft_list)} uçak gösteriliyor")
+    started = time.perf_counter()
+    socketio.emit(event, message, room=room)
+    elapsed = time.perf_counter() - started
 
-    # Her uçak için
-    for ac in aircraft_list:
-        hex_id = (ac.get("hex") or "").lower()
-        lat = ac.get("lat")
-        lon = ac.get("lon")
+    encoded = _metered_json.take_size()
+    fmt = 'binary' if isinstance(message, bytes) else 'json'
+    size = len(message) if fmt == 'binary' else encoded
+    metrics.emitted_bytes[fmt].inc(size * recipients)
+    metrics.emitted_messages[fmt].inc(recipients)
+    return elapsed
 
-        if not hex_id or lat is None or lon is None:
-            continue
 
-        seen = ac.get("seen", 0.0) or 0.0
-        seen_pos = ac.get("seen_pos")
-        ts_pos = (now_val - float(seen_pos)) if (seen_pos is not None) else (now_val - seen)
+def emit_update(now_val, aircraft_clean, stats, force=False):
+    """
+    Tick sonucunu 'update' olayıyla client'lara gönder
 
-        # Validator al veya oluştur
-        if hex_id not in config._aircraft_state:
-            config._aircraft_state[hex_id] = PositionValidator(hex_id)
+    Delta protokolü aktifse (UPDATE_STREAM['delta']) periyodik keyframe'ler
+    ve arada sadece değişen alanlar gönderilir; değilse her tick tam liste.
+    Viewport gönderen client'lar sadece kendi görüş alanlarını alır; ikili
+    formatı seçen client'lar mesajı wire_format çerçevesi olarak alır.
 
-        validator = config._aircraft_state[hex_id]
+    Hareket vektörleri açıkken (MOTION_VECTORS) client ara kareleri kendisi
+    hesaplar; gönderim emit_interval saniyede bire seyreltilir (force=True
+    ile aralık beklenmez, örn. seek). Atlanan tick'lerin değişiklikleri
+    sonraki delta'da gelir.
 
-        # Pozisyon doğrula
-        corrected_pos, was_corrected, reason = validator.add_position(
-            lat, lon, ts_pos,
-            track=ac.get('track'),
-            speed=ac.get('speed')
+    Bağlı client yokken de encoder'lar ve viewport grid'i güncellenir (sadece
+    gönderim yapılmaz); yeni bağlanan client'a giden keyframe bayat filo içermez.
+    """
+    global _last_emit
+    motion = config.MOTION_VECTORS
+    if motion['enabled'] and not force:
+        # Tick zamanlamasındaki küçük sapmalar bir sonraki tick'e kaydırmasın
+        if time.monotonic() - _last_emit < motion['emit_interval'] * 0.95:
+            metrics.skipped_emits.inc()
+            return
+    _last_emit = time.monotonic()
+
+    # Serileştirme süresi = toplam süre - emit süresi (publish/collect üreteçtir)
+    started = time.perf_counter()
+    emit_seconds = 0.0
+
+    router = get_viewport_router()
+    for client_id, client_payload in router.publish(now_val, aircraft_clean, stats):
+        emit_seconds += _emit("update", client_payload, client_id)
+
+    binary_clients = sum(1 for sid in config._binary_clients if sid not in router)
+    json_clients = len(config._connected_clients) - len(router) - binary_clients
+
+    if config.UPDATE_STREAM['delta']:
+        payload, frame = get_update_stream().encode_frames(
+            now_val, aircraft_clean, stats, binary=binary_clients > 0
         )
+    elif aircraft_clean:
+        payload = {
+            "now": now_val,
+            "aircraft": aircraft_clean,
+            "stats": stats
+        }
+        frame = encode_frame(payload) if binary_clients > 0 else None
+    else:
+        _EMIT_SECONDS.observe(emit_seconds)
+        return
 
-        if was_corrected:
-            position_corrections += 1
-            config._stats['position_corrections'] += 1
-
-        # Heading belirleme
-        final_track = ac.get('track')
-
-        if config.USE_MOVEMENT_HEADING:
-            movement_heading = validator.get_movement_heading()
-
-            if movement_heading is not None:
-                if final_track is not None:
-                    heading_diff = abs(angle_difference(movement_heading, final_track))
-
-                    if heading_diff > 45:
-                        debug_log(f"🧭 {hex_id}: Heading uyuşmazlığı {heading_diff:.1f}°")
-                        final_track = movement_heading
-                        heading_corrections += 1
-                        config._stats['heading_corrections'] += 1
-                    else:
-                        final_track = smooth_angle(movement_heading, final_track, 0.7)
-                else:
-                    final_track = movement_heading
-
-        # Heading yumuşatma
-        if validator.last_valid_track is not None and final_track is not None:
-            final_track = smooth_angle(
-                validator.last_valid_track,
-                final_track,
-                config.TRACK_SMOOTH_ALPHA
-            )
-
-        # Uçak izi için pozisyon geçmişi (Akıllı downsampling)
-        trail = []
-        if config.AIRCRAFT_TRAIL['enabled'] and len(validator.position_history) > 1:
-            max_trail_points = config.AIRCRAFT_TRAIL['max_points']
-            all_points = list(validator.position_history)
-
-            if len(all_points) > max_trail_points:
-                # Akıllı downsampling: Her N noktadan 1'ini al
-                step = max(1, len(all_points) // max_trail_points)
-                sampled_points = all_points[::step][-max_trail_points:]
-            else:
-                sampled_points = all_points
-
-            trail = [
-                {'lat': p['lat'], 'lon': p['lon']}
-                for p in sampled_points
-            ]
-
-        # Database'e kaydet (aktifse)
-        if config.USE_SQLITE:
-            try:
-                from trail_manager import get_trail_manager
-                trail_manager = get_trail_manager()
-
-                if len(trail) > 0:
-                    trail_manager.save_trail_point(
-                        hex_id=hex_id,
-                        lat=corrected_pos['lat'],
-                        lon=corrected_pos['lon'],
-                        timestamp=ts_pos,
-                        altitude=ac.get('altitude') or ac.get('alt_baro') or ac.get('alt_geom'),
-                        speed=ac.get('speed') or ac.get('gs'),
-                        track=final_track,
-                        flight_code=ac.get('flight'),
-                        aircraft_type=ac.get('t'),
-                        registration=ac.get('r')
-                    )
-            except ImportError:
-                debug_log("⚠️ trail_manager.py bulunamadı, database desteği pasif", "WARNING")
-
-        # Temiz uçak verisi
-        cleaned_aircraft.append({
-            **ac,
-            "lat": corrected_pos['lat'],
-            "lon": corrected_pos['lon'],
-            "track": final_track,
-            "_corrected": was_corrected,
-            "_correction_reason": reason,
-            "_movement_heading": validator.get_movement_heading(),
-            "_trail": trail
-        })
+    if json_clients > 0:
+        emit_seconds += _emit("update", payload, FULL_FLEET_ROOM, json_clients)
+    if frame is not None:
+        emit_seconds += _emit("update", frame, FULL_FLEET_BINARY_ROOM, binary_clients)
 
-    # İstatistikler
-    config._stats['active_aircraft'] = len(config._aircraft_state)
-    config._stats['outliers_detected'] = sum(
-        v.outlier_count for v in config._aircraft_state.values()
-    )
-
-    if position_corrections > 0 or heading_corrections > 0:
-        debug_log(
-            f"📊 {len(cleaned_aircraft)} uçak işlendi, "
-            f"{position_corrections} pozisyon, "
-            f"{heading_corrections} heading düzeltmesi"
-        )
+    serialized = time.perf_counter()
+    _SERIALIZE_SECONDS.observe(serialized - started - emit_seconds)
 
-    # Eski uçakları temizle (10 dakikadan eski)
-    cutoff_time = now_val - 600  # 10 dakika
-    old_aircraft = [
-        hex_id for hex_id, validator in config._aircraft_state.items()
-        if validator.position_history and validator.position_history[-1]['ts'] < cutoff_time
-    ]
+    # Abone olunan izlerin yeni noktaları
+    trail_emit_seconds = 0.0
+    for client_id, trail_payload in get_trail_subscriptions().collect():
+        trail_emit_seconds += _emit("trail", trail_payload, client_id)
+    _TRAIL_BUILD_SECONDS.observe(time.perf_counter() - serialized - trail_emit_seconds)
+    _EMIT_SECONDS.observe(emit_seconds + trail_emit_seconds)
 
-    for hex_id in old_aircraft:
-        debug_log(f"🗑️ Eski uçak silindi: {hex_id}")
-        del config._aircraft_state[hex_id]
 
-    return cleaned_aircraft
+def emit_full_fleet_keyframe(client_id):
+    """Tüm filo akışının güncel keyframe'ini client'ın formatında gönder"""
+    message = get_update_stream().keyframe(config._stats)
+    if client_id in config._binary_clients:
+        message = encode_frame(message)
+    socketio.emit("update", message, room=client_id)
 
 
 # =========================
@@ -261,69 +195,51 @@ def live_feed():
         feed_from_dump1090()
 
 
+def _start_tick():
+    """Tick başlangıcı (yavaş tick watchdog'u bu noktadan itibaren örnekler)"""
+    get_profiler().tick_started()
+    return time.perf_counter()
+
+
+def _record_tick(started, aircraft_count):
+    metrics.tick_seconds.observe(time.perf_counter() - started)
+    metrics.ticks_total.inc()
+    get_profiler().tick_finished(aircraft_count)
+
+
 def feed_from_json():
     """JSON dosyalarından veri besle"""
     json_reader = get_json_reader()
+    replay = get_replay_controller()
 
     while True:
         try:
-            raw_data = json_reader.read_next_data()
-
-            if raw_data is None:
-                if not config.JSON_LOOP:
-                    debug_log("ℹ️ JSON dosyaları tamamlandı")
-                    break
-                time.sleep(1)
-                continue
-
-            now_val = raw_data.get("now", time.time())
-            planes = raw_data.get("aircraft", [])
-
-            # Temel veri temizleme ve normalizasyon
-            aircraft = []
-            for a in planes:
-                if a.get("lat") is None or a.get("lon") is None:
+            # Seek aynı anda state'i değiştirmesin
+            with replay.lock:
+                raw_data = json_reader.read_next_data()
+
+                if raw_data is None:
+                    if not config.JSON_LOOP:
+                        debug_log("ℹ️ JSON dosyaları tamamlandı")
+                        break
+                    time.sleep(1)
                     continue
 
+                started = _start_tick()
+                aircraft_count = 0
                 try:
-                    # Alan isimlerini normalize et
-                    altitude = a.get("altitude") or a.get("alt_baro") or a.get("alt_geom")
-                    speed = a.get("speed") or a.get("gs")
-
-                    aircraft.append({
-                        "hex": (a.get("hex") or "").lower(),
-                        "flight": (a.get("flight") or "").strip(),
-                        "altitude": altitude,
-                        "speed": speed,
-                        "track": a.get("track"),
-                        "lat": float(a.get("lat")),
-                        "lon": float(a.get("lon")),
-                        "seen": float(a.get("seen", 0.0)),
-                        "seen_pos": a.get("seen_pos"),
-                        "squawk": a.get("squawk"),
-                        "type": a.get("type"),
-                        "r": a.get("r"),  # Registration
-                        "t": a.get("t")  # Aircraft type
-                    })
-                except (ValueError, TypeError) as e:
-                    debug_log(f"⚠️ Uçak verisi parse hatası: {e}", "WARNING")
-                    continue
-
-            # Pozisyon filtreleme
-            aircraft_clean = sanitize_aircraft_positions(now_val, aircraft)
+                    now_val, aircraft_clean = process_snapshot(raw_data)
+                    aircraft_count = len(aircraft_clean)
+                    replay.after_tick(json_reader.current_index)
 
-            # Client'lara gönder
-            if config._connected_clients and aircraft_clean:
-                progress = json_reader.get_progress()
-                payload = {
-                    "now": now_val,
-                    "aircraft": aircraft_clean,
-                    "stats": {
+                    # Client'lara gönder
+                    emit_update(now_val, aircraft_clean, {
                         **config._stats,
-                        "progress": progress
-                    }
-                }
-                socketio.emit("update", payload)
+                        "progress": json_reader.get_progress()
+                    })
+                finally:
+                    # Hata veren tick de ölçülür (watchdog profili, _tick_started temizlenir)
+                    _record_tick(started, aircraft_count)
 
             # Hız kontrolü
             time.sleep(5.0 / config.JSON_PLAYBACK_SPEED)
@@ -336,74 +252,43 @@ def feed_from_json():
 
 
 def feed_from_dump1090():
-    """dump1090'dan canlı veri besle"""
-    consecutive_errors = 0
-    max_errors = 5
+    """dump1090'dan canlı veri besle
 
-    while True:
-        try:
-            r = requests.get(config.DUMP1090_URL, timeout=8)
-            r.raise_for_status()
-            raw = r.json()
-
-            consecutive_errors = 0  # Reset error counter
-
-            now_val = raw.get("now", time.time())
-            planes = raw.get("aircraft", [])
-
-            # Temel veri temizleme
-            aircraft = []
-            for a in planes:
-                if a.get("lat") is None or a.get("lon") is None:
-                    continue
-
-                try:
-                    altitude = a.get("altitude") or a.get("alt_baro") or a.get("alt_geom")
-                    speed = a.get("speed") or a.get("gs")
-
-                    aircraft.append({
-                        "hex": (a.get("hex") or "").lower(),
-                        "flight": (a.get("flight") or "").strip(),
-                        "altitude": altitude,
-                        "speed": speed,
-                        "track": a.get("track"),
-                        "lat": float(a.get("lat")),
-                        "lon": float(a.get("lon")),
-                        "seen": float(a.get("seen", 0.0)),
-                        "seen_pos": a.get("seen_pos"),
-                        "squawk": a.get("squawk"),
-                        "type": a.get("type"),
-                        "r": a.get("r"),
-                        "t": a.get("t")
-                    })
-                except (ValueError, TypeError):
-                    continue
+    HTTP istekleri Dump1090Fetcher thread'inde yapılır; bu döngü sadece
+    gelen en yeni snapshot'ı işler.
+    """
+    fetcher = get_dump1090_fetcher()
+    # Doğrulama isteğe bağlı olarak worker süreçlerine bölünür (sadece canlı mod).
+    # Kalman motoru önceliklidir: o yolda worker'lar hiç kullanılmaz, başlatılmaz.
+    pool = None
+    if config.SHARDED_VALIDATION['enabled']:
+        if config.VALIDATION_ENGINE == 'kalman' and get_kalman_tracker() is not None:
+            debug_log("⚠️ VALIDATION_ENGINE='kalman': SHARDED_VALIDATION yok sayılıyor, "
+                      "worker süreçleri başlatılmadı", "WARNING")
+        else:
+            pool = get_sharded_validator()
 
-            aircraft_clean = sanitize_aircraft_positions(now_val, aircraft)
+    while True:
+        raw = fetcher.get(timeout=max(config.POLL_INTERVAL * 5, 5.0))
+        if raw is None:
+            continue  # Yeni snapshot yok (değişmedi veya bağlantı hatası)
 
-            if config._connected_clients and aircraft_clean:
-                payload = {
-                    "now": now_val,
-                    "aircraft": aircraft_clean,
-                    "stats": config._stats
-                }
-                socketio.emit("update", payload)
+        try:
+            started = _start_tick()
+            aircraft_count = 0
+            try:
+                now_val, aircraft_clean = process_snapshot(raw, pool=pool)
+                aircraft_count = len(aircraft_clean)
 
-        except requests.exceptions.RequestException as e:
-            consecutive_errors += 1
-            debug_log(f"⚠️ Dump1090 bağlantı hatası ({consecutive_errors}/{max_errors}): {e}", "ERROR")
+                emit_update(now_val, aircraft_clean, config._stats)
+            finally:
+                _record_tick(started, aircraft_count)
 
-            if consecutive_errors >= max_errors:
-                debug_log("❌ Çok fazla hata, 30 saniye bekleniyor...", "ERROR")
-                time.sleep(30)
-                consecutive_errors = 0
         except Exception as e:
             debug_log(f"❌ Dump1090 feed hatası: {e}", "ERROR")
             import traceback
             traceback.print_exc()
 
-        time.sleep(config.POLL_INTERVAL)
-
 
 # =========================
 # Socket.IO Events
@@ -413,6 +298,7 @@ def on_connect():
     """Client bağlandı"""
     client_id = request.sid
     config._connected_clients.add(client_id)
+    join_room(FULL_FLEET_ROOM)
     debug_log(f"🔌 Client bağlandı: {client_id} (toplam: {len(config._connected_clients)})")
 
     # İlk bağlantıda mevcut uçakları gönder
@@ -421,15 +307,136 @@ def on_connect():
         "connected": True
     }, room=client_id)
 
+    if config.UPDATE_STREAM['delta']:
+        emit_full_fleet_keyframe(client_id)
+
 
 @socketio.on("disconnect")
 def on_disconnect():
     """Client ayrıldı"""
     client_id = request.sid
     config._connected_clients.discard(client_id)
+    config._binary_clients.discard(client_id)
+    get_viewport_router().remove(client_id)
+    get_trail_subscriptions().unsubscribe(client_id)
     debug_log(f"🔌 Client ayrıldı: {client_id} (toplam: {len(config._connected_clients)})")
 
 
+@socketio.on("resync")
+def on_resync():
+    """Client delta sırasını kaçırdı: güncel keyframe'i sadece ona gönder"""
+    payload = get_viewport_router().keyframe(request.sid, config._stats)
+    if payload is None:
+        emit_full_fleet_keyframe(request.sid)
+        return
+    socketio.emit("update", payload, room=request.sid)
+
+
+@socketio.on("trail_subscribe")
+def on_trail_subscribe(data):
+    """Client uçak izi istedi: tüm geçmişi bir kez gönder, sonra sadece yeni noktalar
+
+    data: {"hex": "abc123"} veya {"hex": ["abc123", ...]}
+    """
+    if not config.AIRCRAFT_TRAIL['enabled']:
+        return
+
+    hex_ids = (data or {}).get("hex")
+    if isinstance(hex_ids, str):
+        hex_ids = [hex_ids]
+    if not isinstance(hex_ids, list):
+        return
+
+    subscriptions = get_trail_subscriptions()
+    updates = []
+    for hex_id in hex_ids:
+        if not isinstance(hex_id, str):
+            continue
+        message = subscriptions.subscribe(request.sid, hex_id.lower())
+        if message is not None:
+            updates.append(message)
+
+    if updates:
+        socketio.emit("trail", {"updates": updates}, room=request.sid)
+
+
+@socketio.on("trail_unsubscribe")
+def on_trail_unsubscribe(data):
+    """Client iz aboneliğini bitirdi
+
+    data: {"hex": "abc123"} veya null (tüm abonelikler)
+    """
+    hex_id = (data or {}).get("hex")
+    get_trail_subscriptions().unsubscribe(request.sid, hex_id.lower() if isinstance(hex_id, str) else None)
+
+
+@socketio.on("wire_format")
+def on_wire_format(data):
+    """Client mesaj formatını seçti
+
+    data: {"format": "binary"} veya {"format": "json"}
+    """
+    client_id = request.sid
+    fmt = (data or {}).get("format")
+    if fmt not in ("json", "binary"):
+        debug_log(f"⚠️ Bilinmeyen wire formatı: {fmt!r}")
+        return
+
+    router = get_viewport_router()
+    if client_id not in router:
+        leave_room(full_fleet_room(client_id))
+
+    if fmt == "binary":
+        config._binary_clients.add(client_id)
+    else:
+        config._binary_clients.discard(client_id)
+    debug_log(f"📦 Client {client_id} formatı: {fmt}")
+
+    # Yeni formatta keyframe ile başla
+    payload = router.keyframe(client_id, config._stats)
+    if payload is not None:
+        socketio.emit("update", payload, room=client_id)
+    else:
+        join_room(full_fleet_room(client_id))
+        if config.UPDATE_STREAM['delta']:
+            emit_full_fleet_keyframe(client_id)
+
+
+@socketio.on("viewport")
+def on_viewport(data):
+    """Client harita sınırlarını gönderdi: sadece görüş alanındaki uçakları al
+
+    data: {"south", "west", "north", "east", "zoom"} veya null (tüm filo)
+    """
+    client_id = request.sid
+    router = get_viewport_router()
+    settings = config.VIEWPORT_FILTER
+
+    viewport = None
+    if data and settings['enabled']:
+        try:
+            viewport = Viewport.from_message(data, settings['margin_ratio'])
+        except ValueError as e:
+            debug_log(f"⚠️ {e}")
+            return
+
+    # Geniş zoom'da filtre kazandırmaz: tüm filo akışına dön
+    if viewport is not None and viewport.zoom is not None and viewport.zoom <= settings['full_fleet_zoom']:
+        viewport = None
+
+    if viewport is None:
+        if client_id in router:
+            router.remove(client_id)
+            join_room(full_fleet_room(client_id))
+            if config.UPDATE_STREAM['delta']:
+                emit_full_fleet_keyframe(client_id)
+        return
+
+    if client_id not in router:
+        leave_room(full_fleet_room(client_id))
+    socketio.emit("update", router.set_viewport(client_id, viewport), room=client_id)
+
+
 @socketio.on("ping")
 def on_ping():
     """Ping-pong heartbeat"""
@@ -442,7 +449,11 @@ def on_ping():
 @app.route("/")
 def index():
     """Ana sayfa"""
-    return render_template("index.html")
+    return render_template("index.html", motion=config.MOTION_VECTORS)
+
+
+def _round_or_none(value, digits):
+    return round(value, digits) if value is not None else None
 
 
 @app.route("/api/stats")
@@ -459,21 +470,26 @@ def api_stats():
                 "outlier_rate": f"{(validator.outlier_count / validator.total_updates * 100):.1f}%"
                 if validator.total_updates > 0 else "0%",
                 "last_position": {
-                    "lat": round(latest['lat'], 6),
-                    "lon": round(latest['lon'], 6),
-                    "age_seconds": round(time.time() - latest['ts'], 1)
+                    "lat": round(latest.lat, 6),
+                    "lon": round(latest.lon, 6),
+                    "age_seconds": round(time.time() - latest.ts, 1)
                 },
                 "last_track": validator.last_valid_track,
                 "movement_heading": validator.get_movement_heading(),
                 "total_distance_km": round(validator.get_total_distance(), 2),
+                "avg_speed_kts": _round_or_none(validator.get_average_speed(), 1),
+                "altitude_range_ft": dict(zip(("min", "max"), validator.get_altitude_range())),
                 "flight_duration_seconds": int(validator.get_flight_duration())
             }
 
     # Progress bilgisi
     progress_info = None
+    fetcher_info = None
     if config.USE_JSON_FILES:
         json_reader = get_json_reader()
         progress_info = json_reader.get_progress()
+    else:
+        fetcher_info = get_dump1090_fetcher().get_statistics()
 
     # Database istatistikleri (aktifse)
     db_stats = None
@@ -488,14 +504,32 @@ def api_stats():
     return jsonify({
         "stats": config._stats,
         "aircraft": aircraft_debug,
+        "fleet_store": config._aircraft_state.get_statistics(),
         "connected_clients": len(config._connected_clients),
+        "viewport_clients": get_viewport_router().get_statistics(),
+        "binary_clients": len(config._binary_clients),
+        "trail_subscriptions": len(get_trail_subscriptions()),
+        "wire_format": wire_format_statistics(),
         "progress": progress_info,
+        "replay_checkpoints": get_replay_controller().get_statistics() if config.USE_JSON_FILES else None,
+        "sharded_validation": (
+            get_sharded_validator().get_statistics()
+            if not config.USE_JSON_FILES and config.SHARDED_VALIDATION['enabled'] else None
+        ),
+        "fetcher": fetcher_info,
         "database": db_stats,
+        "kalman_tracker": (
+            get_kalman_tracker().get_statistics()
+            if config.VALIDATION_ENGINE == 'kalman' and get_kalman_tracker() is not None else None
+        ),
+        "logging": event_log.get_statistics(),
         "config": {
             "data_source": config._stats['data_source'],
             "max_speed_kts": config.MAX_SPEED_KTS,
             "max_jump_km": config.MAX_JUMP_KM,
+            "validation_engine": config.VALIDATION_ENGINE,
             "use_movement_heading": config.USE_MOVEMENT_HEADING,
+            "motion_vectors": config.MOTION_VECTORS,
             "use_sqlite": config.USE_SQLITE,
             "max_displayed_aircraft": config.MAX_DISPLAYED_AIRCRAFT
         },
@@ -514,12 +548,16 @@ def api_reset():
 
     try:
         json_reader = get_json_reader()
-        json_reader.reset()
+        replay = get_replay_controller()
+        with replay.lock:
+            json_reader.reset()
+            # Uçak state'i korunuyor: checkpoint'ler artık bu state'ten alınamaz
+            replay.invalidate()
 
-        # İstatistikleri sıfırla
-        config._stats['position_corrections'] = 0
-        config._stats['heading_corrections'] = 0
-        config._stats['outliers_detected'] = 0
+            # İstatistikleri sıfırla (outliers_detected mevcut filonun toplamıdır;
+            # uçak state'i temizlenmediği için sıfırlanmaz)
+            config._stats['position_corrections'] = 0
+            config._stats['heading_corrections'] = 0
 
         return jsonify({
             "success": True,
@@ -532,6 +570,108 @@ def api_reset():
         })
 
 
+def seek_replay(index):
+    """Tekrar oynatmayı index numaralı snapshot'a taşı
+
+    En yakın önceki checkpoint geri yüklenir (mevcut konum hedefin gerisinde
+    ve daha yakınsa mevcut state'ten devam edilir), aradaki snapshot'lar
+    gönderim yapılmadan işlenir, hedef snapshot işlenip client'lara gönderilir.
+
+    Returns:
+        Seek özeti (dict)
+    """
+    json_reader = get_json_reader()
+    replay = get_replay_controller()
+    started = time.perf_counter()
+
+    with replay.lock:
+        total = json_reader.get_progress()['total']
+        if not total:
+            raise ValueError("Okunacak snapshot yok")
+        index = min(max(0, int(index)), total - 1)
+
+        current = json_reader.current_index
+        if replay.can_continue(current, index):
+            base = current
+        else:
+            base = replay.nearest(index)
+            replay.restore(base)
+            json_reader.seek_index(base)
+
+        # Aradaki snapshot'lar: sadece state güncellenir (checkpoint'ler de alınır)
+        replayed = 0
+        while json_reader.current_index < index:
+            raw_data = json_reader.read_next_data()
+            if raw_data is not None:
+                process_snapshot(raw_data)
+            replay.after_tick(json_reader.current_index)
+            replayed += 1
+
+        # Hedef snapshot (son dosyada okuyucu veri döndürmez, sadece zamanı raporlanır)
+        raw_data = json_reader.read_next_data()
+        if raw_data is None:
+            now_val = json_reader.timestamp(index)
+        else:
+            now_val, aircraft_clean = process_snapshot(raw_data)
+            replay.after_tick(json_reader.current_index)
+            emit_update(now_val, aircraft_clean, {
+                **config._stats,
+                "progress": json_reader.get_progress()
+            }, force=True)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    debug_log(f"⏩ Seek: #{index} (checkpoint #{base}, {replayed} snapshot ileri sarıldı, {elapsed_ms:.0f} ms)")
+    return {
+        "index": index,
+        "now": now_val,
+        "checkpoint": base,
+        "replayed": replayed,
+        "elapsed_ms": round(elapsed_ms, 1)
+    }
+
+
+@app.route("/api/control/seek", methods=['POST'])
+def api_seek():
+    """Tekrar oynatmada zamana atla
+
+    Body (JSON): {"now": <timestamp>} veya {"fraction": 0.0-1.0} veya {"index": <snapshot>}
+    """
+    if not config.USE_JSON_FILES:
+        return jsonify({
+            "success": False,
+            "message": "JSON modu aktif değil (canlı mod çalışıyor)"
+        })
+
+    data = request.get_json(silent=True) or {}
+    json_reader = get_json_reader()
+
+    try:
+        if data.get("now") is not None:
+            index = json_reader.find(float(data["now"]))
+        elif data.get("fraction") is not None:
+            fraction = min(max(float(data["fraction"]), 0.0), 1.0)
+            index = round(fraction * (json_reader.get_progress()['total'] - 1))
+        elif data.get("index") is not None:
+            index = int(data["index"])
+        else:
+            return jsonify({
+                "success": False,
+                "message": "'now', 'fraction' veya 'index' gerekli"
+            }), 400
+
+        result = seek_replay(index)
+        return jsonify({
+            "success": True,
+            "message": f"⏩ #{result['index']} snapshot'a atlandı",
+            **result
+        })
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": f"❌ Seek hatası: {str(e)}"
+        }), 400
+
+
 @app.route("/api/trail/<hex_id>")
 def api_get_trail(hex_id):
     """Bir uçağın izini database'den getir"""
@@ -568,16 +708,32 @@ def api_get_trail(hex_id):
 
 @app.route("/api/airports")
 def api_airports():
-    """Havaalanları listesi (GeoJSON)"""
+    """Havaalanları (GeoJSON, önbellekli ve sıkıştırılmış)
+
+    Query: bbox=west,south,east,north (dışa doğru yuvarlanır), type=large_airport,medium_airport
+    If-None-Match eşleşirse 304 döner.
+    """
+    from airport_geojson import get_airport_geojson
+
+    cache = get_airport_geojson()
     try:
-        from airports import get_airports_geojson
-        return jsonify(get_airports_geojson())
-    except ImportError:
-        return jsonify({
-            "error": "airports.py bulunamadı",
-            "type": "FeatureCollection",
-            "features": []
-        })
+        key = cache.key(request.args.get("bbox"), request.args.get("type"))
+    except ValueError as e:
+        return jsonify({"error": f"Geçersiz parametre: {e}"}), 400
+
+    etag = cache.etag(key)
+    if request.if_none_match.contains_weak(etag):
+        cache.not_modified()
+        response = Response(status=304)
+    else:
+        body, encoding = cache.body(key, request.accept_encodings.best_match(cache.encodings))
+        response = Response(body, content_type="application/json")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag, weak=True)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"  # Her yüklemede doğrula (değişmediyse 304)
+    return response
 
 
 @app.route("/api/nearest-airport/<hex_id>")
@@ -594,8 +750,8 @@ def api_nearest_airport(hex_id):
                 "error": "Uçak bulunamadı veya pozisyon bilgisi yok"
             })
 
-        lat = validator.last_valid_pos['lat']
-        lon = validator.last_valid_pos['lon']
+        lat = validator.last_valid_pos.lat
+        lon = validator.last_valid_pos.lon
 
         nearest = get_nearest_airport(lat, lon)
         return jsonify({
@@ -610,6 +766,186 @@ def api_nearest_airport(hex_id):
         })
 
 
+@app.route("/api/airports/nearest")
+def api_airports_nearest():
+    """Koordinata en yakın k havaalanı
+
+    Query: lat, lon, k (varsayılan 5, en fazla 100), radius_km (verilirse sadece bu yarıçaptakiler)
+    """
+    from airports import get_nearest_airports
+
+    try:
+        lat = float(request.args["lat"])
+        lon = float(request.args["lon"])
+        k = min(100, max(1, int(request.args.get("k", 5))))
+        radius_km = request.args.get("radius_km", type=float)
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Geçersiz parametre: {e}"}), 400
+
+    airports = get_nearest_airports(lat, lon, k, radius_km)
+    if airports is None:
+        return jsonify({"error": "Havaalanı indeksi kullanılamıyor (NumPy gerekli)"}), 503
+    return jsonify({"count": len(airports), "airports": airports})
+
+
+@app.route("/api/aircraft/nearest-airports")
+def api_aircraft_nearest_airports():
+    """Pozisyonu bilinen tüm uçaklar için en yakın havaalanı (tek vektörel sorgu)"""
+    from airports import annotate_nearest_airports
+
+    positions = {
+        hex_id: (validator.last_valid_pos.lat, validator.last_valid_pos.lon)
+        for hex_id, validator in list(config._aircraft_state.items())
+        if validator.last_valid_pos is not None
+    }
+    started = time.perf_counter()
+    annotated = annotate_nearest_airports(positions)
+    if annotated is None:
+        return jsonify({"error": "Havaalanı indeksi kullanılamıyor (NumPy gerekli)"}), 503
+    return jsonify({
+        "count": len(annotated),
+        "query_ms": round((time.perf_counter() - started) * 1000, 2),
+        "aircraft": annotated
+    })
+
+
+# Scrape anında okunan gauge'lar (kayıt maliyeti yok)
+def _client_counts():
+    return {
+        'total': len(config._connected_clients),
+        'viewport': len(get_viewport_router()),
+        'binary': len(config._binary_clients)
+    }
+
+
+def _queue_depths():
+    depths = {'event_log': event_log.get_statistics()['queue_depth']}
+    if config.USE_JSON_FILES:
+        reader = get_json_reader()
+        if hasattr(reader, 'queue_depth'):
+            depths['prefetch'] = reader.queue_depth()
+    else:
+        depths['fetcher'] = get_dump1090_fetcher().queue_depth()
+    if config.USE_SQLITE:
+        from trail_manager import get_trail_manager
+        depths['trail_writer'] = get_trail_manager().writer.queue.qsize()
+    return depths
+
+
+metrics.registry.gauge("adsb_clients", "Bağlı Socket.IO client sayısı", _client_counts, label="kind")
+metrics.registry.gauge("adsb_queue_depth", "Kuyrukta bekleyen öğe sayısı", _queue_depths, label="queue")
+metrics.registry.gauge("adsb_active_aircraft", "Filo state'indeki uçak sayısı",
+                       lambda: len(config._aircraft_state))
+metrics.registry.gauge("adsb_trail_subscriptions", "Aktif iz aboneliği sayısı",
+                       lambda: len(get_trail_subscriptions()))
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Prometheus text exposition formatında metrikler"""
+    if not config.METRICS_ENABLED:
+        return not_found(None)
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/logs")
+def api_logs():
+    """Son log olayları (halka tampon)
+
+    Query: limit (varsayılan 200), level (ör. WARNING), category, since (Unix zamanı)
+    """
+    level = request.args.get("level")
+    if level and level.upper() not in event_log.LEVELS:
+        return jsonify({"error": f"Geçersiz seviye: {level} ({', '.join(event_log.LEVELS)})"}), 400
+    try:
+        limit = int(request.args.get("limit", 200))
+    except ValueError as e:
+        return jsonify({"error": f"Geçersiz parametre: {e}"}), 400
+    since = request.args.get("since", type=float)
+    events = event_log.recent_events(limit, level, request.args.get("category"), since)
+    return jsonify({"events": events, "stats": event_log.get_statistics()})
+
+
+# =========================
+# Profil (admin)
+# =========================
+def _admin_disabled():
+    return not config.PROFILING['admin_api']
+
+
+@app.route("/api/admin/profiler", methods=['GET'])
+def api_profiler_status():
+    """Profil oturumu ve yavaş tick watchdog'u durumu"""
+    if _admin_disabled():
+        return not_found(None)
+    return jsonify(get_profiler().get_status())
+
+
+@app.route("/api/admin/profiler/start", methods=['POST'])
+def api_profiler_start():
+    """Feed thread'i üzerinde profil oturumu başlat
+
+    Body: {"seconds": 10, "mode": "sampling" | "cprofile", "interval_ms": 5}
+    """
+    if _admin_disabled():
+        return not_found(None)
+    data = request.get_json(silent=True) or {}
+    try:
+        status = get_profiler().start(data.get("seconds"), data.get("mode", "sampling"), data.get("interval_ms"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, **status})
+
+
+@app.route("/api/admin/profiler/stop", methods=['POST'])
+def api_profiler_stop():
+    """Çalışan profil oturumunu bitir"""
+    if _admin_disabled():
+        return not_found(None)
+    try:
+        status = get_profiler().stop()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, **status})
+
+
+@app.route("/api/admin/profiler/result")
+def api_profiler_result():
+    """Son oturumun sonucunu indir (sampling: folded stack, cprofile: pstats; ?sort=tottime)"""
+    if _admin_disabled():
+        return not_found(None)
+    try:
+        result = get_profiler().result(request.args.get("sort"))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if result is None:
+        return jsonify({"error": "Tamamlanmış profil oturumu yok"}), 404
+    text, filename = result
+    return Response(text, content_type="text/plain; charset=utf-8",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+@app.route("/api/admin/slow-ticks")
+def api_slow_ticks():
+    """Bütçeyi aşan son tick'lerin özeti (en yeni önce)"""
+    if _admin_disabled():
+        return not_found(None)
+    return jsonify({"slow_ticks": get_profiler().get_slow_ticks()})
+
+
+@app.route("/api/admin/slow-ticks/<int:index>")
+def api_slow_tick_profile(index):
+    """index. yavaş tick'in tam profilini indir (folded stack, 0 = en yeni)"""
+    if _admin_disabled():
+        return not_found(None)
+    result = get_profiler().slow_tick_profile(index)
+    if result is None:
+        return jsonify({"error": "Yavaş tick bulunamadı"}), 404
+    text, filename = result
+    return Response(text, content_type="text/plain; charset=utf-8",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
 @app.route("/api/health")
 def api_health():
     """Sistem sağlık kontrolü"""
@@ -663,6 +999,10 @@ if __name__ == "__main__":
     feed_thread = threading.Thread(target=live_feed, daemon=True)
     feed_thread.start()
 
+    if config.AIRPORT_DATABASE['preload']:
+        from airport_geojson import get_airport_geojson
+        threading.Thread(target=get_airport_geojson, name="airport-index", daemon=True).start()
+
     # Flask'ı başlat
     try:
         socketio.run(
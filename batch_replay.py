@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Headless toplu tekrar oynatma (backfill)
+
+Kayıtlı snapshot'ları web uygulamasıyla aynı pipeline'dan (normalizasyon,
+bölge filtresi, sanitize_aircraft_positions) bekleme yapmadan ve Socket.IO
+olmadan geçirir, temizlenmiş pozisyonları SQLite veya sütunsal (.npz)
+dosyaya yazar.
+
+Birden fazla worker ile uçaklar hex ID'ye göre shard'lara bölünür: her
+süreç tüm snapshot'ları okur, bölge filtresini tüm filo üzerinde uygular
+ama sadece kendi shard'ındaki uçakları doğrular (validator state'i
+uçak başına olduğundan sonuç tek süreçle aynıdır). Shard çıktıları sonda
+birleştirilir.
+
+Kullanım:
+    python batch_replay.py json_files positions.db
+    python batch_replay.py replay.adsbarc positions.npz --workers 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import time
+from array import array
+from pathlib import Path
+
+import config
+from fleet_store import FleetStore
+from json_reader import JSONDataReader
+from pipeline import process_snapshot
+from utils import np
+
+COLUMNS = ('now', 'hex', 'flight', 'lat', 'lon', 'altitude', 'speed', 'track',
+           'movement_heading', 'corrected', 'reason')
+
+SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS positions (
+        now REAL NOT NULL,
+        hex TEXT NOT NULL,
+        flight TEXT,
+        lat REAL NOT NULL,
+        lon REAL NOT NULL,
+        altitude REAL,
+        speed REAL,
+        track REAL,
+        movement_heading REAL,
+        corrected INTEGER NOT NULL,
+        reason TEXT
+    )
+"""
+
+
+def _number(value):
+    """Sayısal alan ("ground" irtifası 0 kabul edilir, sayı değilse None)"""
+    if value == "ground":
+        return 0.0
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def open_reader(path: Path):
+    """Dizin ise JSONDataReader, dosya ise indeksli arşiv okuyucu"""
+    path = Path(path)
+    if path.is_dir():
+        return JSONDataReader(path)
+    from replay_archive import ArchiveDataReader
+    return ArchiveDataReader(path)
+
+
+def output_format(path: Path):
+    return 'npz' if Path(path).suffix == '.npz' else 'sqlite'
+
+
+# =========================
+# Çıktı yazıcıları
+# =========================
+class SQLiteSink:
+    """Temiz pozisyonları SQLite tablosuna yazar (snapshot başına executemany)"""
+
+    def __init__(self, path: Path, commit_every=200):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(SQLITE_SCHEMA)
+        self.commit_every = commit_every
+        self._pending = 0
+
+    def write(self, now_val, aircraft):
+        self.conn.executemany(
+            "INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (now_val, ac.get('hex'), ac.get('flight') or None, ac['lat'], ac['lon'],
+                 _number(ac.get('altitude')), _number(ac.get('speed')), _number(ac.get('track')),
+                 _number(ac.get('_movement_heading')), int(bool(ac.get('_corrected'))),
+                 ac.get('_correction_reason'))
+                for ac in aircraft
+            ]
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    @staticmethod
+    def merge(parts, output: Path):
+        """Shard veritabanlarını tek dosyada birleştir ve indeksle"""
+        conn = sqlite3.connect(str(output))
+        conn.execute(SQLITE_SCHEMA)
+        for i, part in enumerate(parts):
+            conn.execute(f"ATTACH DATABASE ? AS part{i}", (str(part),))
+            conn.execute(f"INSERT INTO positions SELECT * FROM part{i}.positions")
+            conn.commit()
+            conn.execute(f"DETACH DATABASE part{i}")
+        SQLiteSink.create_indexes(conn)
+        conn.close()
+
+    @staticmethod
+    def create_indexes(conn):
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_positions_now ON positions(now)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_positions_hex ON positions(hex, now)")
+        conn.commit()
+
+
+class ColumnarSink:
+    """Temiz pozisyonları sütun dizilerinde biriktirip .npz olarak yazar (NumPy gerekli)"""
+
+    FLOAT_COLUMNS = ('now', 'lat', 'lon', 'altitude', 'speed', 'track', 'movement_heading')
+
+    def __init__(self, path: Path):
+        if np is None:
+            raise RuntimeError("Sütunsal çıktı (.npz) için NumPy gerekli")
+        self.path = Path(path)
+        self.columns = {name: array('d') for name in self.FLOAT_COLUMNS}
+        self.hex = []
+        self.flight = []
+        self.reason = []
+        self.corrected = array('b')
+
+    def write(self, now_val, aircraft):
+        nan = float('nan')
+        columns = self.columns
+        for ac in aircraft:
+            columns['now'].append(now_val)
+            columns['lat'].append(ac['lat'])
+            columns['lon'].append(ac['lon'])
+            for name, key in (('altitude', 'altitude'), ('speed', 'speed'),
+                              ('track', 'track'), ('movement_heading', '_movement_heading')):
+                value = _number(ac.get(key))
+                columns[name].append(nan if value is None else value)
+            self.hex.append(ac.get('hex') or '')
+            self.flight.append(ac.get('flight') or '')
+            self.reason.append(ac.get('_correction_reason') or '')
+            self.corrected.append(1 if ac.get('_corrected') else 0)
+
+    def close(self):
+        arrays = {name: np.frombuffer(column, dtype=np.float64) for name, column in self.columns.items()}
+        # Genişlik en uzun değere göre (dtype=str boş listede de string dizisi verir)
+        arrays['hex'] = np.array(self.hex, dtype=str)
+        arrays['flight'] = np.array(self.flight, dtype=str)
+        arrays['reason'] = np.array(self.reason, dtype=str)
+        arrays['corrected'] = np.frombuffer(self.corrected, dtype=np.int8).astype(bool)
+        # savez_compressed uzantı ekler; hedef adı koru
+        with open(self.path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @staticmethod
+    def merge(parts, output: Path):
+        """Shard dosyalarını birleştir ve zamana göre (kararlı) sırala"""
+        loaded = [np.load(part) for part in parts]
+        merged = {name: np.concatenate([part[name] for part in loaded]) for name in COLUMNS}
+        order = np.argsort(merged['now'], kind='stable')
+        with open(output, 'wb') as f:
+            np.savez_compressed(f, **{name: values[order] for name, values in merged.items()})
+        for part in loaded:
+            part.close()
+
+
+SINKS = {'sqlite': SQLiteSink, 'npz': ColumnarSink}
+
+
+# =========================
+# Worker
+# =========================
+def run_shard(input_path, output_path, fmt='sqlite', shard=None, debug=False):
+    """Tek süreçte tüm snapshot'ları işle (shard verilirse sadece o shard'ın uçakları)
+
+    Returns:
+        İstatistik dict'i
+    """
+    config.DEBUG_MODE = debug
+    config.USE_SQLITE = False  # Sonuçlar trail DB'ye değil çıktı dosyasına yazılır
+    config._aircraft_state = FleetStore(config.POSITION_HISTORY_SIZE)
+    for name in ('total_updates', 'outliers_detected', 'position_corrections',
+                 'heading_corrections', 'active_aircraft'):
+        config._stats[name] = 0
+
+    reader = open_reader(input_path)
+    sink = SINKS[fmt](output_path)
+
+    snapshots = 0
+    updates = 0
+    started = time.perf_counter()
+    for raw in reader.iter_snapshots():
+        now_val, aircraft_clean = process_snapshot(raw, shard)
+        sink.write(now_val, aircraft_clean)
+        snapshots += 1
+        updates += len(aircraft_clean)
+    sink.close()
+
+    return {
+        'shard': shard[0] if shard else 0,
+        'snapshots': snapshots,
+        'updates': updates,
+        'position_corrections': config._stats['position_corrections'],
+        'heading_corrections': config._stats['heading_corrections'],
+        'seconds': time.perf_counter() - started
+    }
+
+
+def _run_shard_task(args):
+    return run_shard(*args)
+
+
+def run(input_path, output_path, workers=1, debug=False):
+    """Toplu tekrar oynatmayı çalıştır
+
+    Returns:
+        Özet dict'i (snapshots/s, updates/s dahil)
+    """
+    input_path, output_path = Path(input_path), Path(output_path)
+    fmt = output_format(output_path)
+    if output_path.exists():
+        output_path.unlink()
+
+    started = time.perf_counter()
+    if workers <= 1:
+        shards = [run_shard(input_path, output_path, fmt, None, debug)]
+    else:
+        parts = [output_path.with_name(f"{output_path.name}.part{i}") for i in range(workers)]
+        for part in parts:
+            if part.exists():
+                part.unlink()
+        tasks = [(input_path, part, fmt, (i, workers), debug) for i, part in enumerate(parts)]
+        try:
+            with multiprocessing.Pool(workers) as pool:
+                shards = pool.map(_run_shard_task, tasks)
+            SINKS[fmt].merge(parts, output_path)
+        finally:
+            for part in parts:
+                if part.exists():
+                    os.remove(part)
+
+    if workers <= 1 and fmt == 'sqlite':
+        conn = sqlite3.connect(str(output_path))
+        SQLiteSink.create_indexes(conn)
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    snapshots = shards[0]['snapshots']
+    updates = sum(s['updates'] for s in shards)
+    return {
+        'snapshots': snapshots,
+        'updates': updates,
+        'position_corrections': sum(s['position_corrections'] for s in shards),
+        'heading_corrections': sum(s['heading_corrections'] for s in shards),
+        'workers': max(1, workers),
+        'seconds': round(elapsed, 3),
+        'snapshots_per_sec': round(snapshots / elapsed, 1) if elapsed > 0 else 0,
+        'updates_per_sec': round(updates / elapsed, 1) if elapsed > 0 else 0,
+        'shards': shards
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless toplu tekrar oynatma")
+    parser.add_argument("input", type=Path, help="json_files dizini veya .adsbarc arşivi")
+    parser.add_argument("output", type=Path, help="Çıktı: .db/.sqlite (SQLite) veya .npz (sütunsal)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Süreç sayısı (uçaklar hex ID'ye göre bölünür)")
+    parser.add_argument("--debug", action="store_true", help="debug_log çıktısını aç")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"⏩ Toplu tekrar oynatma: {args.input} -> {args.output} ({args.workers} worker)")
+    print("=" * 50)
+
+    summary = run(args.input, args.output, args.workers, args.debug)
+
+    print(f"   Snapshot:        {summary['snapshots']}")
+    print(f"   Uçak güncellemesi: {summary['updates']}")
+    print(f"   Pozisyon düzeltmesi: {summary['position_corrections']}")
+    print(f"   Süre:            {summary['seconds']:.2f} s")
+    print(f"   Snapshot/s:      {summary['snapshots_per_sec']:.1f}")
+    print(f"   Güncelleme/s:    {summary['updates_per_sec']:.1f}")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pipeline benchmark paketi
+
+Her filo boyutu (varsayılan 100 / 1k / 10k uçak) için ölçer:
+    - add_position: dolu (POSITION_HISTORY_SIZE noktalı) geçmişte güncelleme başına
+    - Tam iz (polyline) oluşturma
+    - normalize_aircraft: dump1090 kayıtlarının normalizasyonu
+    - sanitize_aircraft_positions: tick başına tam doğrulama (sentetik trafik,
+      outlier / sıçrama / bayat veri enjeksiyonu ile); kural ve Kalman motoru
+    - Sharded doğrulama: ana süreçteki seri kısım ve en yavaş worker'ın CPU
+      süresi (--shard-workers ile; çekirdek sayısından bağımsız tahmin)
+    - Tick başına JSON / ikili keyframe serileştirme
+
+Trafik traffic_generator.TrafficGenerator ile sabit seed'den üretilir.
+Sonuçlar JSON olarak kaydedilip commit'ler arasında karşılaştırılabilir.
+
+Kullanım:
+    python benchmark.py
+    python benchmark.py --sizes 100,1000 --output bench/HEAD.json
+    python benchmark.py --output bench/new.json --compare bench/HEAD.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+import config
+from fleet_store import FleetStore
+from metrics import stage
+from pipeline import normalize_aircraft, sanitize_aircraft_positions
+from position_validator import PositionValidator
+from traffic_generator import TrafficGenerator
+from trail_stream import full_trail_message
+from update_stream import to_wire
+from utils import np
+from wire_format import encode_frame
+
+DEFAULT_SIZES = (100, 1000, 10000)
+
+# Benchmark trafiğindeki hata oranları (snapshot başına, uçak başına)
+INJECTION_RATES = {'outlier_rate': 0.002, 'jump_rate': 0.0005, 'stale_rate': 0.01}
+
+# Karşılaştırmada bu oranın üzerindeki yavaşlama regresyon sayılır
+REGRESSION_THRESHOLD = 0.10
+
+_VALIDATION_SECONDS = stage('validation')
+
+
+def _make_validators(aircraft_count):
+    """Geçmişi tamamen dolu validator'lar oluştur"""
+    validators = []
+    for i in range(aircraft_count):
+        validator = PositionValidator(f"{i:06x}")
+        lat, lon = 40.0 + (i % 50) * 0.05, 29.0 + (i // 50) * 0.05
+        for step in range(config.POSITION_HISTORY_SIZE):
+            validator.add_position(lat + step * 0.002, lon, 1000.0 + step, track=0.0, speed=450.0)
+        validators.append((validator, lat, lon))
+    return validators
+
+
+def bench_add_position(aircraft_count=300, updates=20, validators=None):
+    """Dolu geçmişte pozisyon başına add_position süresi (mikrosaniye)"""
+    if validators is None:
+        validators = _make_validators(aircraft_count)
+    ts0 = 1000.0 + config.POSITION_HISTORY_SIZE
+
+    start = time.perf_counter()
+    for step in range(updates):
+        ts = ts0 + step
+        offset = (config.POSITION_HISTORY_SIZE + step) * 0.002
+        for validator, lat, lon in validators:
+            validator.add_position(lat + offset, lon, ts, track=0.0, speed=450.0)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / (aircraft_count * updates) * 1e6
+
+
+def bench_trail_build(aircraft_count=300, repeats=20, validators=None):
+    """Uçak başına tam iz mesajı (polyline) süresi (mikrosaniye) - trail_subscribe ile aynı yol"""
+    if validators is None:
+        validators = _make_validators(aircraft_count)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for validator, _, _ in validators:
+            full_trail_message(validator.hex_id, validator)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / (aircraft_count * repeats) * 1e6
+
+
+def bench_serialization(aircraft_count=300, repeats=20, validators=None):
+    """Tick başına keyframe serileştirme: (json µs, json byte, ikili µs, ikili byte)"""
+    if validators is None:
+        validators = _make_validators(aircraft_count)
+    aircraft = []
+    for validator, _, _ in validators:
+        last = validator.last_valid_pos
+        aircraft.append(to_wire({
+            'hex': validator.hex_id, 'flight': f"THY{validator.hex_id[-3:]}",
+            'altitude': 35000, 'speed': last.speed, 'track': last.track,
+            'lat': last.lat, 'lon': last.lon, 'squawk': '7000', 'type': 'adsb_icao',
+            't': 'A320', '_corrected': False, '_correction_reason': None,
+            '_movement_heading': validator.get_movement_heading(),
+            'vert_rate': 0, '_pos_ts': round(last.ts, 1)
+        }))
+    message = {"type": "keyframe", "seq": 1, "now": time.time(), "aircraft": aircraft, "stats": {}}
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        text = json.dumps(message)
+    json_us = (time.perf_counter() - start) / repeats * 1e6
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        frame = encode_frame(message)
+    binary_us = (time.perf_counter() - start) / repeats * 1e6
+
+    return json_us, len(text.encode('utf-8')), binary_us, len(frame)
+
+
+def bench_normalize(aircraft_count=300, repeats=20, seed=0):
+    """Uçak başına normalize_aircraft süresi (mikrosaniye)"""
+    raw = TrafficGenerator(aircraft_count, seed=seed, **INJECTION_RATES).snapshot()['aircraft']
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        normalize_aircraft(raw)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / (aircraft_count * repeats) * 1e6
+
+
+def bench_sanitize(aircraft_count=300, ticks=20, seed=0, warmup=5, engine='rules', pool=None):
+    """Tick başına sanitize_aircraft_positions süresi
+
+    Tüm uçaklar doğrulanır (bölge filtresi ve gösterim limiti kapalı).
+    Snapshot'lar önceden üretilip normalize edilir; sadece doğrulama ölçülür.
+
+    Args:
+        engine: config.VALIDATION_ENGINE değeri ('rules' veya 'kalman')
+        pool: ShardedValidator (doğrulama worker süreçlerinde)
+
+    Returns:
+        (tick ms, bunun doğrulama aşaması ms - metrics 'validation' histogramından)
+    """
+    generator = TrafficGenerator(aircraft_count, seed=seed, **INJECTION_RATES)
+    snapshots = [
+        (snapshot['now'], normalize_aircraft(snapshot['aircraft']))
+        for snapshot in generator.snapshots(warmup + ticks)
+    ]
+
+    saved = (config.FOCUS_REGION['enabled'], config.MAX_DISPLAYED_AIRCRAFT,
+             config.USE_SQLITE, config._aircraft_state, config.VALIDATION_ENGINE)
+    config.VALIDATION_ENGINE = engine
+    config.FOCUS_REGION['enabled'] = False
+    config.MAX_DISPLAYED_AIRCRAFT = aircraft_count
+    config.USE_SQLITE = False
+    config._aircraft_state = FleetStore(config.POSITION_HISTORY_SIZE)
+    try:
+        for now_val, aircraft in snapshots[:warmup]:
+            sanitize_aircraft_positions(now_val, aircraft, pool=pool)
+
+        validation_before = _VALIDATION_SECONDS.total[0]
+        start = time.perf_counter()
+        for now_val, aircraft in snapshots[warmup:]:
+            sanitize_aircraft_positions(now_val, aircraft, pool=pool)
+        elapsed = time.perf_counter() - start
+        validation = _VALIDATION_SECONDS.total[0] - validation_before
+    finally:
+        (config.FOCUS_REGION['enabled'], config.MAX_DISPLAYED_AIRCRAFT,
+         config.USE_SQLITE, config._aircraft_state, config.VALIDATION_ENGINE) = saved
+
+    return elapsed / ticks * 1000, validation / ticks * 1000
+
+
+def bench_sharded(aircraft_count=300, ticks=20, seed=0, workers=4, warmup=5):
+    """Sharded doğrulamanın seri ve paralel kısımları (tick başına ms)
+
+    Worker süreleri CPU süresidir; makinede workers'tan az çekirdek olsa da
+    workers çekirdekte beklenen doğrulama süresi ana + worker olarak tahmin edilir.
+
+    Returns:
+        (doğrulama ms - bu makinede, ana süreç ms, en yavaş worker ms)
+    """
+    from sharded_validation import ShardedValidator
+
+    pool = ShardedValidator(workers)
+    try:
+        _, validation_ms = bench_sanitize(aircraft_count, ticks, seed, warmup, pool=pool)
+        stats = pool.get_statistics()  # Ortalamalar ısınma tick'lerini de içerir
+    finally:
+        pool.close()
+    return validation_ms, stats['avg_main_ms'], stats['avg_worker_ms']
+
+
+def run_suite(sizes=DEFAULT_SIZES, updates=20, seed=0, log=print, shard_workers=None):
+    """Tüm benchmark'ları her filo boyutu için çalıştır
+
+    Returns:
+        {boyut (str): {metrik: değer}}
+    """
+    results = {}
+    for size in sizes:
+        log(f"🛩️  {size} uçak")
+        validators = _make_validators(size)
+
+        add_us = bench_add_position(size, updates, validators)
+        log(f"   add_position:      {add_us:8.2f} µs / güncelleme")
+
+        trail_us = bench_trail_build(size, updates, validators)
+        log(f"   Tam iz (polyline): {trail_us:8.2f} µs / uçak")
+
+        normalize_us = bench_normalize(size, updates, seed)
+        log(f"   Normalizasyon:     {normalize_us:8.2f} µs / uçak")
+
+        sanitize_ms, validation_ms = bench_sanitize(size, updates, seed)
+        log(f"   sanitize (tick):   {sanitize_ms:8.2f} ms ({sanitize_ms * 1000 / size:.2f} µs / uçak, "
+            f"doğrulama {validation_ms:.2f} ms)")
+
+        kalman_ms = kalman_validation_ms = None
+        if np is not None:
+            kalman_ms, kalman_validation_ms = bench_sanitize(size, updates, seed, engine='kalman')
+            log(f"   sanitize (Kalman): {kalman_ms:8.2f} ms ({kalman_ms * 1000 / size:.2f} µs / uçak, "
+                f"doğrulama {kalman_validation_ms:.2f} ms)")
+
+        shard_main_ms = shard_worker_ms = None
+        if shard_workers:
+            _, shard_main_ms, shard_worker_ms = bench_sharded(size, updates, seed, shard_workers)
+            projected = shard_main_ms + shard_worker_ms
+            log(f"   Sharded ({shard_workers} worker): ana {shard_main_ms:.2f} ms + worker {shard_worker_ms:.2f} ms "
+                f"= ~{projected:.2f} ms ({shard_workers} çekirdekte, doğrulamaya göre "
+                f"~{validation_ms / projected:.1f}x)")
+
+        json_us, json_bytes, binary_us, binary_bytes = bench_serialization(size, updates, validators)
+        log(f"   JSON keyframe:     {json_us / 1000:8.2f} ms / tick ({json_bytes / 1024:.1f} KB)")
+        log(f"   İkili keyframe:    {binary_us / 1000:8.2f} ms / tick ({binary_bytes / 1024:.1f} KB)")
+
+        results[str(size)] = {
+            'add_position_us': round(add_us, 3),
+            'trail_build_us': round(trail_us, 3),
+            'normalize_us': round(normalize_us, 3),
+            'sanitize_tick_ms': round(sanitize_ms, 3),
+            'sanitize_per_aircraft_us': round(sanitize_ms * 1000 / size, 3),
+            'validation_tick_ms': round(validation_ms, 3),
+            'sanitize_kalman_tick_ms': round(kalman_ms, 3) if kalman_ms is not None else None,
+            'validation_kalman_tick_ms': round(kalman_validation_ms, 3) if kalman_ms is not None else None,
+            'sharded_main_tick_ms': round(shard_main_ms, 3) if shard_main_ms is not None else None,
+            'sharded_worker_tick_ms': round(shard_worker_ms, 3) if shard_worker_ms is not None else None,
+            'json_keyframe_ms': round(json_us / 1000, 3),
+            'json_keyframe_bytes': json_bytes,
+            'binary_keyframe_ms': round(binary_us / 1000, 3),
+            'binary_keyframe_bytes': binary_bytes
+        }
+    return results
+
+
+def environment_info(seed, updates):
+    """Sonuç dosyasına yazılan ortam bilgisi (commit, Python, NumPy)"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__ if np is not None else None,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'updates': updates,
+        'history_size': config.POSITION_HISTORY_SIZE,
+        'injection_rates': INJECTION_RATES
+    }
+
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """İki sonuç dosyasını karşılaştır
+
+    Returns:
+        [(boyut, metrik, eski, yeni, değişim oranı, regresyon mu)]
+    """
+    rows = []
+    for size, metrics in current['results'].items():
+        old_metrics = baseline['results'].get(size)
+        if not old_metrics:
+            continue
+        for name, value in metrics.items():
+            old = old_metrics.get(name)
+            if not old or value is None:
+                continue
+            change = (value - old) / old
+            rows.append((size, name, old, value, change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline benchmark paketi")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Virgülle ayrılmış filo boyutları")
+    parser.add_argument("--aircraft", type=int, help="Tek filo boyutu (--sizes yerine)")
+    parser.add_argument("--updates", type=int, default=20, help="Tekrar / tick sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Sonuçları JSON olarak kaydet")
+    parser.add_argument("--compare", type=Path, help="Önceki sonuç dosyasıyla karşılaştır")
+    parser.add_argument("--shard-workers", type=int, default=0,
+                        help="Sharded doğrulamayı bu kadar worker ile ölç (0 = ölçme)")
+    args = parser.parse_args()
+
+    config.DEBUG_MODE = False
+    sizes = [args.aircraft] if args.aircraft else [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    print("=" * 50)
+    print(f"⏱️  Pipeline benchmark ({', '.join(map(str, sizes))} uçak, "
+          f"{config.POSITION_HISTORY_SIZE} nokta geçmiş, seed={args.seed})")
+    print("=" * 50)
+
+    report = {
+        'meta': environment_info(args.seed, args.updates),
+        'results': run_suite(sizes, args.updates, args.seed, shard_workers=args.shard_workers)
+    }
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Sonuçlar kaydedildi: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("=" * 50)
+        print(f"📊 Karşılaştırma: {baseline['meta'].get('commit')} -> {report['meta'].get('commit')}")
+        regressions = 0
+        for size, name, old, new, change, regressed in compare_results(baseline, report):
+            marker = "⚠️ " if regressed else "   "
+            regressions += regressed
+            print(f"{marker}{size:>6} {name:<26} {old:>10} -> {new:<10} ({change:+.1%})")
+        print(f"   {regressions} regresyon (eşik %{REGRESSION_THRESHOLD * 100:.0f})")
+
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,13 @@
 # config.py
 from pathlib import Path
+from fleet_store import FleetStore
 
 # =========================
 # Proje Yolları
 # =========================
 PROJECT_ROOT = Path(__file__).resolve().parent
 JSON_FILES_DIR = PROJECT_ROOT / "json_files"
+REPLAY_ARCHIVE_PATH = PROJECT_ROOT / "replay.adsbarc"  # replay_archive.py convert ile oluşturulur
 DB_PATH = PROJECT_ROOT / "flight_history.db"
 
 # =========================
@@ -14,12 +16,35 @@ DB_PATH = PROJECT_ROOT / "flight_history.db"
 USE_SQLITE = False
 DEBUG_MODE = True
 USE_JSON_FILES = True  # JSON dosyalarından mı yoksa canlı dump1090'dan mı?
+USE_REPLAY_ARCHIVE = False  # JSON modunda json_files/ yerine indeksli arşivden oku
+METRICS_ENABLED = True  # /metrics (Prometheus) endpoint'i
+
+# Log hattı (bkz. event_log.py) - DEBUG_MODE konsol çıktısını açar/kapatır
+LOGGING = {
+    'level': 'INFO',  # DEBUG_MODE açıkken minimum seviye ('DEBUG' = uçak başına mesajlar)
+    'quiet_level': 'WARNING',  # DEBUG_MODE kapalıyken halka tampona yazılan minimum seviye
+    'queue_size': 10000,  # Yazıcı kuyruğu (doluysa mesaj atılır)
+    'ring_size': 1000,  # /api/logs için saklanan son olay sayısı
+    'rate_limits': {  # Kategori başına saniyede en fazla mesaj
+        'default': 50,
+        'outlier': 10,
+        'correction': 10,
+        'heading': 10,
+        'evict': 10
+    }
+}
 
 # =========================
 # Dump1090 Ayarları (Canlı mod için)
 # =========================
 DUMP1090_URL = "http://localhost:8080/data/aircraft.json"
 POLL_INTERVAL = 1.0  # Saniye
+SHARDED_VALIDATION = {
+    'enabled': False,  # Doğrulamayı hex ID'ye göre worker süreçlerine böl
+    'workers': 4,  # Worker süreç sayısı
+    'start_method': 'spawn',  # multiprocessing başlatma yöntemi
+    'reply_timeout': 5.0  # Worker yanıtı bu kadar saniyede gelmezse tek sürece dönülür
+}
 
 # =========================
 # JSON Dosya Okuma Ayarları
@@ -27,11 +52,22 @@ POLL_INTERVAL = 1.0  # Saniye
 JSON_PLAYBACK_SPEED = 1.0  # 1.0 = gerçek zamanlı, 2.0 = 2x hızlı
 JSON_LOOP = False  # ❌ DÖNGÜ KAPALI - Bitince dursun!
 JSON_AUTO_EXIT = True  # ✅ JSON bitince programı kapat
+JSON_DECODER = 'auto'  # 'auto' (orjson > simdjson > json), 'orjson', 'simdjson', 'json'
+JSON_PREFETCH = {
+    'enabled': True,  # Sıradaki dosyaları arka planda oku ve decode et
+    'queue_size': 8  # Ön okuma kuyruğu (dosya sayısı)
+}
+REPLAY_CHECKPOINTS = {
+    'enabled': True,  # Seek için filo state checkpoint'leri
+    'interval': 60,  # Kaç snapshot'ta bir checkpoint alınır
+    'max_checkpoints': 100  # Aşılırsa aralık iki katına çıkar
+}
 
 # =========================
 # Görüntüleme Filtreleri (GITHUB SUNUMU İÇİN OPTİMİZE!)
 # =========================
 MAX_DISPLAYED_AIRCRAFT = 300  # ✅ Aynı anda gösterilecek maksimum uçak
+USE_VECTORIZED_FILTER = True  # NumPy kuruluysa bölge filtresi vektörel çalışır
 
 # Bölge Filtresi (Türkiye merkez - İstanbul/Ankara arası)
 FOCUS_REGION = {
@@ -41,6 +77,31 @@ FOCUS_REGION = {
     'radius_km': 400  # ✅ 400km yarıçap (daha optimize - önceden 500km'di)
 }
 
+# Güncelleme akışı (Socket.IO 'update' olayı)
+UPDATE_STREAM = {
+    'delta': True,  # Keyframe + sadece değişen alanlar (False = her tick tam liste)
+    'keyframe_interval': 30  # Kaç tick'te bir tam keyframe gönderilsin
+}
+
+# Hareket vektörleri: kayıtlar yer hızı / yön / dikey hız ve pozisyonun referans
+# zamanını taşır, client ara kareleri kendisi hesaplar (dead reckoning).
+# Açılınca 'update' akışı emit_interval'e seyreltilir; ara kare hesaplamayan
+# client'lar / tüketiciler için kapalı gelir, isteyen açar.
+MOTION_VECTORS = {
+    'enabled': False,
+    'emit_interval': 3.0,  # Açıkken 'update' gönderim aralığı (saniye, duvar saati; 0 = her tick)
+    'frame_rate': 30,  # Client'ta ara kare hızı (fps)
+    'max_extrapolation': 15.0  # Referans zamanından en fazla bu kadar saniye ileri tahmin
+}
+
+# Client başına görüş alanı filtresi (harita sınırlarını gönderen client'lar)
+VIEWPORT_FILTER = {
+    'enabled': True,
+    'margin_ratio': 0.25,  # Görünür alanın her kenarına eklenen pay (kenar uzunluğuna oran)
+    'grid_cell_deg': 0.5,  # Mekansal grid hücre boyutu (derece)
+    'full_fleet_zoom': 5  # Bu zoom ve altında filtre uygulanmaz, tüm filo gönderilir
+}
+
 # Uçak İzleri (TIKLAMA İLE AÇILIR!)
 AIRCRAFT_TRAIL = {
     'enabled': True,  # İzleri göster
@@ -50,6 +111,48 @@ AIRCRAFT_TRAIL = {
     'opacity': 0.7  # İz şeffaflığı
 }
 
+# İz noktaları bu süreye göre ayrı tablolara bölünür; eski izler tablo
+# düşürülerek silinir (saniye, varsayılan: saatlik)
+TRAIL_PARTITION_SECONDS = 3600
+
+# Database yazıcısı (USE_SQLITE aktifse)
+TRAIL_WRITER = {
+    'queue_size': 20000,  # Bekleyen maksimum nokta (dolunca yeni noktalar düşürülür)
+    'batch_size': 5000,  # Tek transaction'da yazılacak maksimum nokta
+    'max_retries': 3,  # Geçici hatada (database is locked vb.) batch kaç kez tekrar denenir
+    'retry_backoff': 0.1  # İlk tekrar beklemesi (saniye), her denemede iki katına çıkar
+}
+
+# Profil yüzeyi (admin API + yavaş tick watchdog'u, bkz. profiler.py)
+PROFILING = {
+    'admin_api': False,  # /api/admin/profiler/* endpoint'leri (kimlik doğrulama yok; sadece güvenilir ağda açın)
+    'default_seconds': 10,  # Süre verilmezse oturum süresi
+    'max_seconds': 300,
+    'sample_interval_ms': 5,  # Oturum örnekleme aralığı
+    'watchdog': True,  # Bütçeyi aşan tick'lerin profilini sakla
+    'watchdog_interval_ms': 10,  # Tick içi örnekleme aralığı
+    'slow_tick_ms': 1000,  # Tick bütçesi
+    'slow_tick_keep': 10  # Saklanan son yavaş tick sayısı
+}
+
+# Havaalanı veritabanı (OurAirports airports.csv, bkz. airport_index.py)
+AIRPORT_DATABASE = {
+    'csv_path': PROJECT_ROOT / "airports.csv",  # Yoksa airports.MAJOR_AIRPORTS kullanılır
+    'cache_path': PROJECT_ROOT / "airports_index.npz",  # Kurulan indeksin önbelleği (None = kapalı)
+    'types': ('large_airport', 'medium_airport', 'small_airport'),  # None = 'closed' dışındaki hepsi
+    'cell_deg': 1.0,  # Grid hücre boyutu (derece, 180'i tam bölmeli)
+    'preload': True  # Başlangıçta indeksi ve GeoJSON önbelleğini arka planda kur
+}
+
+# /api/airports yanıt önbelleği (bkz. airport_geojson.py)
+AIRPORT_GEOJSON = {
+    'bbox_snap_deg': 1.0,  # bbox dışa doğru bu katlara yuvarlanır (önbellek isabeti için)
+    'cache_entries': 128,  # Saklanan filtreli yanıt sayısı (LRU)
+    'gzip_level': 6,
+    'brotli_quality': 5,  # brotli kuruluysa 'br' de sunulur
+    'min_compress_bytes': 1024  # Daha küçük yanıtlar sıkıştırılmaz
+}
+
 # =========================
 # Pozisyon Filtreleme Parametreleri
 # =========================
@@ -58,6 +161,24 @@ MAX_JUMP_KM = 15.0  # Maksimum tek seferde sıçrama mesafesi
 MIN_TIME_DIFF = 0.3  # Minimum zaman farkı (saniye)
 POSITION_HISTORY_SIZE = 200  # ÇÖZÜM: Sınırlı ama yeterli! (eskiden 5'ti)
 
+# Doğrulama motoru: 'rules' (PositionValidator eşikleri) veya 'kalman'
+# (kalman_tracker.py - tüm filo için toplu NumPy Kalman filtresi)
+VALIDATION_ENGINE = 'rules'
+KALMAN_TRACKER = {
+    'process_noise': 1e-4,  # Beyaz gürültü ivme spektral yoğunluğu (km²/s³, ~10 m/s² manevra)
+    'measurement_sigma_km': 0.1,  # Pozisyon ölçüm hatası (1 sigma)
+    'gate': 13.82,  # Mahalanobis d² eşiği (ki-kare, 2 serbestlik derecesi, %99.9)
+    'init_speed_sigma_kts': 30.0,  # Hız/yön biliniyorsa başlangıç hız belirsizliği
+    'unknown_speed_sigma_kts': 300.0,  # Bilinmiyorsa
+    'max_misses': 5,  # Üst üste bu kadar red sonrası iz ölçümden yeniden başlar
+    'reset_seconds': 60.0  # Bu süreden uzun boşluktan sonra iz yeniden başlar
+}
+
+# Kalman motoru tüm filoyu ana süreçte toplu işler; worker'lara bölünmüş
+# doğrulamayla (SHARDED_VALIDATION) birlikte açılamaz
+if VALIDATION_ENGINE == 'kalman' and SHARDED_VALIDATION['enabled']:
+    raise ValueError("SHARDED_VALIDATION['enabled'] ve VALIDATION_ENGINE='kalman' birlikte kullanılamaz")
+
 # Outlier detection (Anomali tespiti)
 OUTLIER_DISTANCE_KM = 8.0  # Ortalamadan maksimum uzaklık
 OUTLIER_SPEED_MULTIPLIER = 2.5  # Hız çarpanı (beklenen hızın 2.5 katı)
@@ -83,5 +204,6 @@ _stats = {
     'data_source': 'json_files' if USE_JSON_FILES else 'dump1090'
 }
 
-_aircraft_state = {}  # Uçak state'leri (hex_id -> PositionValidator)
-_connected_clients = set()  # WebSocket bağlı clientler
\ No newline at end of file
+_aircraft_state = FleetStore(POSITION_HISTORY_SIZE)  # Uçak state'leri (hex_id -> PositionValidator)
+_connected_clients = set()  # WebSocket bağlı clientler
+_binary_clients = set()  # İkili çerçeve formatını seçen clientler
\ No newline at end of file
@@ -0,0 +1,206 @@
+# dump1090_fetcher.py
+"""
+dump1090 aircraft.json için arka plan fetcher'ı
+
+- Kalıcı requests.Session (keep-alive, bağlantı havuzu, gzip)
+- ETag / Last-Modified ile koşullu istek (304 = değişmemiş snapshot)
+- Gövde değişse bile 'now' alanı aynıysa snapshot atlanır
+- Fetch kendi thread'inde sabit aralıkla çalışır; işleme tarafı sadece en
+  yeni snapshot'ı alır, yavaş bir tick sonraki fetch'i geciktirmez
+"""
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from metrics import stage
+from utils import debug_log
+
+_FETCH_SECONDS = stage('fetch')
+_DECODE_SECONDS = stage('decode')
+
+
+class Dump1090Fetcher(threading.Thread):
+    """aircraft.json'u periyodik çeken thread (en yeni snapshot'ı saklar)"""
+
+    def __init__(self, url=None, interval=None, timeout=8, max_errors=5, error_backoff=30.0):
+        super().__init__(name="dump1090-fetcher", daemon=True)
+        self.url = url or config.DUMP1090_URL
+        self.interval = interval if interval is not None else config.POLL_INTERVAL
+        self.timeout = timeout
+        self.max_errors = max_errors
+        self.error_backoff = error_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        })
+
+        self._etag = None
+        self._last_modified = None
+        self._last_now = None
+        self._latest = queue.Queue(maxsize=1)  # Sadece en yeni snapshot
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'snapshots': 0,
+            'not_modified': 0,  # 304
+            'unchanged_now': 0,  # Aynı 'now' alanı
+            'dropped': 0,  # İşlenmeden yenisi gelen snapshot'lar
+            'errors': 0,
+            'bytes': 0,
+            'last_fetch_ms': None
+        }
+
+    # -------------------------
+    # Fetch thread'i
+    # -------------------------
+    def run(self):
+        consecutive_errors = 0
+        next_fetch = time.monotonic()
+
+        while not self._stop_event.is_set():
+            try:
+                self.fetch_once()
+                consecutive_errors = 0
+            except Exception as e:
+                # Thread ölürse feed_from_dump1090 sonsuza kadar bekler: her hata sayılır, döngü sürer
+                consecutive_errors += 1
+                self._count('errors')
+                kind = ("bağlantı hatası" if isinstance(e, (requests.exceptions.RequestException, ValueError))
+                        else "beklenmeyen hata")
+                debug_log(f"⚠️ Dump1090 {kind} ({consecutive_errors}/{self.max_errors}): {e}", "ERROR")
+
+                if consecutive_errors >= self.max_errors:
+                    debug_log(f"❌ Çok fazla hata, {self.error_backoff:.0f} saniye bekleniyor...", "ERROR")
+                    self._stop_event.wait(self.error_backoff)
+                    consecutive_errors = 0
+                    next_fetch = time.monotonic()
+                    continue
+
+            # Sabit aralık: fetch süresi bir sonraki fetch'i kaydırmaz
+            next_fetch += self.interval
+            delay = next_fetch - time.monotonic()
+            if delay < 0:
+                next_fetch = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+        self.session.close()
+
+    def fetch_once(self):
+        """Tek istek yap; yeni snapshot varsa kuyruğa koy
+
+        Returns:
+            Yeni snapshot (dict) veya değişmemişse None
+
+        Raises:
+            requests.exceptions.RequestException: Bağlantı/HTTP hatası
+            ValueError: Geçersiz JSON veya nesne olmayan gövde (null, liste...)
+        """
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        started = time.perf_counter()
+        response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        fetched = time.perf_counter()
+        _FETCH_SECONDS.observe(fetched - started)
+        self._count('requests')
+
+        if response.status_code == 304:
+            self._count('not_modified')
+            return None
+
+        response.raise_for_status()
+        snapshot = response.json()
+        if not isinstance(snapshot, dict) or not isinstance(snapshot.get("aircraft", []), list):
+            # Proxy / captive portal gibi kaynaklardan gelen geçerli ama yanlış şekilli JSON
+            raise ValueError(f"Beklenmeyen aircraft.json gövdesi: {type(snapshot).__name__}")
+        finished = time.perf_counter()
+        _DECODE_SECONDS.observe(finished - fetched)
+        elapsed_ms = (finished - started) * 1000
+
+        self._etag = response.headers.get("ETag")
+        self._last_modified = response.headers.get("Last-Modified")
+
+        with self._stats_lock:
+            self._stats['bytes'] += len(response.content)
+            self._stats['last_fetch_ms'] = round(elapsed_ms, 2)
+
+        now_val = snapshot.get("now")
+        if now_val is not None and now_val == self._last_now:
+            self._count('unchanged_now')
+            return None
+        self._last_now = now_val
+
+        self._publish(snapshot)
+        return snapshot
+
+    def _publish(self, snapshot):
+        """Snapshot'ı kuyruğa koy; işlenmemiş eski snapshot varsa at"""
+        while True:
+            try:
+                self._latest.put_nowait(snapshot)
+                break
+            except queue.Full:
+                try:
+                    self._latest.get_nowait()
+                    self._count('dropped')
+                except queue.Empty:
+                    pass
+        self._count('snapshots')
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    # -------------------------
+    # İşleme tarafı
+    # -------------------------
+    def get(self, timeout=None):
+        """Sıradaki (en yeni) snapshot'ı bekle; zaman aşımında None"""
+        try:
+            return self._latest.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def queue_depth(self):
+        """İşlenmeyi bekleyen snapshot sayısı (0 veya 1)"""
+        return self._latest.qsize()
+
+    def stop(self, timeout=5.0):
+        """Thread'i durdur"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def get_statistics(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['url'] = self.url
+        stats['interval'] = self.interval
+        return stats
+
+
+# Singleton instance
+_fetcher = None
+
+
+def get_dump1090_fetcher() -> Dump1090Fetcher:
+    """Global fetcher instance'ını döndür (ilk çağrıda thread başlar)"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = Dump1090Fetcher()
+        _fetcher.start()
+    return _fetcher
@@ -0,0 +1,251 @@
+# event_log.py
+"""
+Seviyeli, düşük maliyetli log hattı (debug_log'un altındaki katman)
+
+- Seviye kontrolü ilk iş: kapalı seviyeler bir karşılaştırma maliyetindedir
+- Mesaj biçimlendirme tembeldir: log.debug("🚫 %s: %s", hex_id, reason)
+  çağrısında '%' işlemi yazıcı thread'inde yapılır
+- Kategori başına hız sınırı (token bucket); bastırılan mesaj sayısı, sınır
+  kalkınca tek satırla raporlanır
+- Yazma sınırlı bir kuyruk üzerinden arka plan thread'inde yapılır (toplu
+  stdout yazımı); kuyruk doluysa mesaj atılır ve sayılır, feed bloklanmaz
+- Son olaylar halka tamponda tutulur (/api/logs)
+
+DEBUG_MODE açıkken LOGGING['level'] ve üstü konsola ve tampona yazılır;
+kapalıyken konsol susar, LOGGING['quiet_level'] ve üstü sadece tampona gider.
+"""
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import config
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+_FLUSH = object()
+
+# (DEBUG_MODE kapalı, açık) -> minimum seviye; config.DEBUG_MODE ile indekslenir
+_thresholds = (LEVELS[config.LOGGING['quiet_level']], LEVELS[config.LOGGING['level']])
+
+
+class _RateLimiter:
+    """Token bucket (saniyede rate mesaj, rate kadar patlama)"""
+
+    __slots__ = ('rate', 'tokens', 'updated', 'suppressed')
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self.suppressed = 0
+
+    def allow(self):
+        now = time.monotonic()
+        tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if tokens < 1.0:
+            self.tokens = tokens
+            self.suppressed += 1
+            return False
+        self.tokens = tokens - 1.0
+        return True
+
+
+class CategoryLogger:
+    """Tek kategorinin logger'ı (modül seviyesinde get_logger ile alınır)"""
+
+    __slots__ = ('category', '_limiter')
+
+    def __init__(self, category, rate):
+        self.category = category
+        self._limiter = _RateLimiter(rate) if rate else None
+
+    def enabled(self, level):
+        return level >= _thresholds[config.DEBUG_MODE]
+
+    def log(self, level, msg, *args):
+        if level < _thresholds[config.DEBUG_MODE]:
+            return
+        limiter = self._limiter
+        if limiter is not None:
+            pending = limiter.suppressed
+            if not limiter.allow():
+                return
+            if pending:
+                limiter.suppressed = 0
+                _writer.put((time.time(), WARNING, self.category,
+                             "⏸️ [%s] %d mesaj bastırıldı (hız sınırı)", (self.category, pending)))
+        _writer.put((time.time(), level, self.category, msg, args))
+
+    def debug(self, msg, *args):
+        if DEBUG >= _thresholds[config.DEBUG_MODE]:
+            self.log(DEBUG, msg, *args)
+
+    def info(self, msg, *args):
+        if INFO >= _thresholds[config.DEBUG_MODE]:
+            self.log(INFO, msg, *args)
+
+    def warning(self, msg, *args):
+        self.log(WARNING, msg, *args)
+
+    def error(self, msg, *args):
+        self.log(ERROR, msg, *args)
+
+
+class _LogWriter:
+    """Kuyruktaki olayları biçimlendirip konsola ve halka tampona yazan thread"""
+
+    def __init__(self, queue_size, ring_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.ring = deque(maxlen=ring_size)
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'written': 0, 'dropped': 0}
+
+    def _ensure_thread(self):
+        # fork edilmiş süreçte (toplu tekrar oynatma worker'ları) thread yeniden başlatılır
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+            self._thread.start()
+
+    def put(self, event):
+        if self._pid != os.getpid():
+            self._ensure_thread()
+        try:
+            self.queue.put_nowait(event)
+            self.stats['enqueued'] += 1
+        except queue.Full:
+            self.stats['dropped'] += 1
+
+    def flush(self, timeout=2.0):
+        """Kuyruktaki olaylar yazılana kadar bekle"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        done = threading.Event()
+        try:
+            self.queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        lines = []
+        flushes = []
+        for event in batch:
+            if event[0] is _FLUSH:
+                flushes.append(event[1])
+                continue
+            ts, level, category, msg, args = event
+            if args:
+                try:
+                    msg = msg % args
+                except (TypeError, ValueError):
+                    msg = f"{msg} {args!r}"
+            self.ring.append((ts, level, category, msg))
+            if config.DEBUG_MODE:
+                stamp = datetime.fromtimestamp(ts).strftime("%H:%M:%S.%f")[:-3]
+                lines.append(f"[{stamp}] {LEVEL_NAMES[level]}: {msg}\n")
+
+        if lines:
+            try:
+                sys.stdout.write("".join(lines))
+                sys.stdout.flush()
+            except (OSError, ValueError):
+                pass  # Kapanmış stdout
+        self.stats['written'] += len(batch) - len(flushes)
+        for done in flushes:
+            done.set()
+
+
+_writer = _LogWriter(config.LOGGING['queue_size'], config.LOGGING['ring_size'])
+atexit.register(_writer.flush)
+
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+
+def get_logger(category) -> CategoryLogger:
+    """Kategori logger'ı (hız sınırı LOGGING['rate_limits'] içinden, yoksa 'default')"""
+    logger = _loggers.get(category)
+    if logger is None:
+        with _loggers_lock:
+            logger = _loggers.get(category)
+            if logger is None:
+                limits = config.LOGGING['rate_limits']
+                logger = CategoryLogger(category, limits.get(category, limits.get('default')))
+                _loggers[category] = logger
+    return logger
+
+
+def set_level(level, quiet_level=None):
+    """Minimum seviyeleri çalışma zamanında değiştir ('DEBUG', 'INFO', ...)"""
+    global _thresholds
+    quiet = LEVELS[quiet_level.upper()] if quiet_level else _thresholds[0]
+    _thresholds = (quiet, LEVELS[level.upper()])
+
+
+def flush(timeout=2.0):
+    _writer.flush(timeout)
+
+
+def recent_events(limit=200, level=None, category=None, since=None):
+    """Halka tampondaki son olaylar (en yeni sonda)
+
+    Args:
+        level: Bu seviye ve üstü ('WARNING' gibi)
+        category: Sadece bu kategori
+        since: Bu Unix zamanından sonrakiler
+    """
+    min_level = LEVELS[level.upper()] if level else 0
+    events = [
+        {
+            'time': datetime.fromtimestamp(ts).isoformat(timespec='milliseconds'),
+            'ts': ts,
+            'level': LEVEL_NAMES[lvl],
+            'category': cat,
+            'message': msg
+        }
+        for ts, lvl, cat, msg in list(_writer.ring)
+        if lvl >= min_level and (category is None or cat == category) and (since is None or ts > since)
+    ]
+    return events[-limit:] if limit else events
+
+
+def get_statistics():
+    return {
+        **_writer.stats,
+        'queue_depth': _writer.queue.qsize(),
+        'ring_size': len(_writer.ring),
+        'level': LEVEL_NAMES[_thresholds[1]],
+        'quiet_level': LEVEL_NAMES[_thresholds[0]],
+        'suppressed': {
+            category: logger._limiter.suppressed
+            for category, logger in list(_loggers.items())
+            if logger._limiter is not None and logger._limiter.suppressed
+        }
+    }
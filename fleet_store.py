@@ -0,0 +1,708 @@
+# fleet_store.py
+"""
+Filo state'i için sütunsal (columnar) depolama
+
+Her uçak tek bir satır (row) kullanır; pozisyon geçmişi lat/lon/ts/track/speed
+sütunlarında, satır başına sabit boyutlu ring buffer olarak tutulur. Hex ID'ler
+24-bit tamsayılara çevrilir. Böylece binlerce uçak için yüz binlerce küçük dict
+yerine birkaç önceden ayrılmış array kullanılır.
+
+Ring buffer penceresi için toplamlar (mesafe, hız ortalaması, irtifa min/max)
+append sırasında O(1) güncellenir; pencereden düşen nokta toplamlardan çıkarılır.
+
+Satırlar son nokta zamanına göre bir zaman çarkında (time wheel) tutulur;
+eski uçakları silmek tüm filoyu değil sadece süresi dolan kovaları tarar.
+"""
+import heapq
+import math
+import re
+from array import array
+from collections import deque
+from collections.abc import MutableMapping
+
+from utils import haversine_km
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opsiyonel - sütunlar her durumda array('d')
+    np = None
+
+NAN = float('nan')
+NON_ICAO_FLAG = 1 << 24  # '~' önekli (TIS-B / non-ICAO) adresler
+SYNTHETIC_KEY_BASE = 1 << 25  # Hex olmayan ID'ler için üretilen anahtarlar
+# Sadece tam 6 küçük hex hane paketlenir ('abc', '0x1', '-1' gibi ID'ler geri
+# çevrilince değişeceği veya çakışacağı için sentetik anahtar alır)
+_PACKED_HEX = re.compile(r'[0-9a-f]{6}')
+NO_BUCKET = -1  # Zaman çarkında olmayan satır
+
+HISTORY_COLUMNS = ('lat', 'lon', 'ts', 'track', 'speed', 'altitude', 'segment')
+
+
+def _zeros(kind, count):
+    """Sıfırla doldurulmuş array oluştur"""
+    return array(kind, bytes(array(kind).itemsize * count))
+
+
+class TrackPoint:
+    """Tek bir pozisyon kaydı (5 anahtarlı dict yerine kompakt kayıt)"""
+
+    __slots__ = ('lat', 'lon', 'ts', 'track', 'speed')
+
+    def __init__(self, lat, lon, ts, track=None, speed=None):
+        self.lat = lat
+        self.lon = lon
+        self.ts = ts
+        self.track = track
+        self.speed = speed
+
+    def replace(self, **changes):
+        """Bazı alanları değiştirilmiş kopya döndür"""
+        point = TrackPoint(self.lat, self.lon, self.ts, self.track, self.speed)
+        for name, value in changes.items():
+            setattr(point, name, value)
+        return point
+
+    def to_dict(self):
+        return {
+            'lat': self.lat, 'lon': self.lon, 'ts': self.ts,
+            'track': self.track, 'speed': self.speed
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, TrackPoint):
+            return NotImplemented
+        return (self.lat, self.lon, self.ts, self.track, self.speed) == \
+            (other.lat, other.lon, other.ts, other.track, other.speed)
+
+    def __repr__(self):
+        return (f"TrackPoint(lat={self.lat}, lon={self.lon}, ts={self.ts}, "
+                f"track={self.track}, speed={self.speed})")
+
+
+class HistoryView:
+    """Ring buffer'ın bir bölümüne kopyasız görünüm (dilim / son N nokta)
+
+    İndeksler en eski noktaya göre mantıksal indekstir ve `range` ile tutulur;
+    böylece dilimleme list dilimlemesiyle birebir aynı davranır. Görünüm
+    anlıktır: geçmişe yeni nokta eklendikten sonra kullanılmamalıdır.
+    """
+
+    __slots__ = ('store', 'row', 'indices')
+
+    def __init__(self, store, row, indices):
+        self.store = store
+        self.row = row
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __bool__(self):
+        return len(self.indices) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HistoryView(self.store, self.row, self.indices[index])
+        return self.store.get_point(self.row, self.indices[index])
+
+    def _slots(self):
+        """Görünümdeki fiziksel sütun indeksleri"""
+        store = self.store
+        size = store.history_size
+        base = self.row * size
+        offset = store.head[self.row] - store.count[self.row]
+        return [base + (offset + i) % size for i in self.indices]
+
+    def __iter__(self):
+        point = self.store.point_at
+        for slot in self._slots():
+            yield point(slot)
+
+    def coords(self):
+        """(lat, lon) çiftlerini nokta nesnesi oluşturmadan üret"""
+        lat, lon = self.store.lat, self.store.lon
+        return [(lat[slot], lon[slot]) for slot in self._slots()]
+
+    def sum(self, column):
+        """Bir sütunun görünümdeki toplamı (örn. sum('lat'))"""
+        values = getattr(self.store, column)
+        return sum([values[slot] for slot in self._slots()])
+
+    def centroid(self):
+        """Görünümdeki noktaların ortalama (lat, lon) değeri"""
+        lat, lon = self.store.lat, self.store.lon
+        sum_lat = sum_lon = 0.0
+        slots = self._slots()
+        for slot in slots:
+            sum_lat += lat[slot]
+            sum_lon += lon[slot]
+        return sum_lat / len(slots), sum_lon / len(slots)
+
+
+class PositionHistory:
+    """Bir uçağın ring buffer'ına (FleetStore satırı) deque benzeri görünüm
+
+    Son N noktaya O(1) indeksli erişim sağlar; dilimler kopya değil
+    HistoryView döndürür.
+    """
+
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __len__(self):
+        return self.store.count[self.row]
+
+    def __bool__(self):
+        return self.store.count[self.row] > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HistoryView(self.store, self.row, range(self.store.count[self.row])[index])
+        return self.store.get_point(self.row, index)
+
+    def __iter__(self):
+        store, row = self.store, self.row
+        for i in range(store.count[row]):
+            yield store.get_point(row, i)
+
+    def last(self, n):
+        """Son n noktaya kopyasız görünüm"""
+        count = self.store.count[self.row]
+        return HistoryView(self.store, self.row, range(max(0, count - n), count))
+
+    def view(self):
+        """Tüm geçmişe kopyasız görünüm"""
+        return HistoryView(self.store, self.row, range(self.store.count[self.row]))
+
+    def last_segment_km(self):
+        """Son iki nokta arası mesafe (km)"""
+        store, row = self.store, self.row
+        return store.segment[store.slot(row, -1)]
+
+    def distance_km(self):
+        """Geçmişteki ardışık noktalar arası toplam mesafe (km) - O(1)"""
+        return self.store.distance_km(self.row)
+
+    def average_speed(self):
+        """Geçmişteki noktaların ortalama hızı (kts), hız yoksa None - O(1)"""
+        return self.store.average_speed(self.row)
+
+    def altitude_range(self):
+        """Geçmişteki (min, max) irtifa, irtifa yoksa (None, None) - O(1)"""
+        return self.store.altitude_range(self.row)
+
+    @property
+    def appended(self):
+        """Satıra bugüne kadar eklenen nokta sayısı (ring taşsa da artmaya devam eder)"""
+        return self.store.appended[self.row]
+
+    def append(self, point, altitude=None, segment_km=None):
+        self.store.append(
+            self.row, point.lat, point.lon, point.ts, point.track, point.speed,
+            altitude, segment_km
+        )
+
+    def clear(self):
+        self.store.clear_row(self.row)
+
+
+class FleetStore(MutableMapping):
+    """Tüm uçakların pozisyon geçmişini tutan sütunsal depo (hex_id -> PositionValidator)"""
+
+    def __init__(self, history_size, capacity=256, wheel_seconds=10.0):
+        self.history_size = history_size
+        self.wheel_seconds = wheel_seconds
+        self.capacity = 0
+
+        # Geçmiş sütunları: satır r, [r * history_size, (r + 1) * history_size) aralığı
+        self.lat = array('d')
+        self.lon = array('d')
+        self.ts = array('d')
+        self.track = array('d')
+        self.speed = array('d')
+        self.altitude = array('d')
+        self.segment = array('d')  # Önceki noktadan mesafe (km); en eski noktada 0
+
+        # Satır başına alanlar
+        self.head = array('l')  # Sıradaki yazma pozisyonu
+        self.count = array('l')  # Buffer'daki nokta sayısı
+        self.appended = array('q')  # Toplam eklenen nokta sayısı (ring taşsa da artar)
+        self.keys = array('l')  # 24-bit hex anahtarı
+
+        # Satır başına pencere toplamları
+        self.distance_sum = array('d')
+        self.speed_sum = array('d')
+        self.speed_count = array('l')
+        self._altitude_min = []  # satır -> monoton deque [(sıra no, irtifa)]
+        self._altitude_max = []
+        self._altitude_stale = array('b')  # append_many sonrası deque'ler sütundan yeniden kurulacak
+
+        # Son nokta zamanına göre zaman çarkı: kova no -> satırlar
+        self.last_seen = array('d')  # Satırın en yeni noktasının zamanı
+        self._bucket_of = array('q')  # satır -> kova no (NO_BUCKET = çarkta değil)
+        self._wheel = {}
+        self._wheel_heap = []  # Çarktaki kova numaraları (en eskisi başta)
+
+        self._rows = {}  # anahtar -> satır
+        self._validators = []  # satır -> PositionValidator
+        self._free_rows = []
+        self._synthetic_keys = {}  # hex olmayan ID -> anahtar
+        self._synthetic_ids = {}  # anahtar -> hex olmayan ID
+
+        self._grow(max(1, capacity))
+
+    # -------------------------
+    # Hex ID <-> anahtar
+    # -------------------------
+    def intern(self, hex_id):
+        """Hex ID'yi 24-bit tamsayı anahtara çevir (hex_id(intern(x)) == x)"""
+        non_icao = hex_id.startswith('~')
+        text = hex_id[1:] if non_icao else hex_id
+        if _PACKED_HEX.fullmatch(text):
+            key = int(text, 16)
+            return key | NON_ICAO_FLAG if non_icao else key
+
+        key = self._synthetic_keys.get(hex_id)
+        if key is None:
+            key = SYNTHETIC_KEY_BASE + len(self._synthetic_keys)
+            self._synthetic_keys[hex_id] = key
+            self._synthetic_ids[key] = hex_id
+        return key
+
+    def hex_id(self, key):
+        """Anahtarı tekrar hex ID'ye çevir"""
+        if key >= SYNTHETIC_KEY_BASE:
+            return self._synthetic_ids[key]
+        if key & NON_ICAO_FLAG:
+            return f"~{key & 0xFFFFFF:06x}"
+        return f"{key:06x}"
+
+    # -------------------------
+    # Satır yönetimi
+    # -------------------------
+    def _grow(self, new_capacity):
+        """Kapasiteyi artır (mevcut veriler korunur)"""
+        extra = new_capacity - self.capacity
+        for name in HISTORY_COLUMNS:
+            getattr(self, name).extend(_zeros('d', extra * self.history_size))
+        self.head.extend(_zeros('l', extra))
+        self.count.extend(_zeros('l', extra))
+        self.appended.extend(_zeros('q', extra))
+        self.keys.extend(_zeros('l', extra))
+        self.distance_sum.extend(_zeros('d', extra))
+        self.speed_sum.extend(_zeros('d', extra))
+        self.speed_count.extend(_zeros('l', extra))
+        self._altitude_min.extend(deque() for _ in range(extra))
+        self._altitude_max.extend(deque() for _ in range(extra))
+        self._altitude_stale.extend(_zeros('b', extra))
+        self.last_seen.extend(_zeros('d', extra))
+        self._bucket_of.extend(array('q', [NO_BUCKET]) * extra)
+        self._validators.extend([None] * extra)
+        # Küçük satırlar önce kullanılsın
+        self._free_rows.extend(range(new_capacity - 1, self.capacity - 1, -1))
+        self.capacity = new_capacity
+
+    def allocate(self, hex_id):
+        """Yeni bir satır ayır (mapping'e kayıt __setitem__ ile yapılır)"""
+        if not self._free_rows:
+            self._grow(self.capacity * 2)
+
+        row = self._free_rows.pop()
+        self.clear_row(row)
+        self.keys[row] = self.intern(hex_id)
+        return row
+
+    def release(self, row):
+        """Satırı serbest bırak"""
+        validator = self._validators[row]
+        if validator is not None:
+            validator.store = None
+            validator.row = -1
+        self._validators[row] = None
+        if self._rows.get(self.keys[row]) == row:
+            del self._rows[self.keys[row]]
+        self.clear_row(row)
+        self._free_rows.append(row)
+
+    def clear_row(self, row):
+        self.head[row] = 0
+        self.count[row] = 0
+        self.appended[row] = 0
+        self.distance_sum[row] = 0.0
+        self.speed_sum[row] = 0.0
+        self.speed_count[row] = 0
+        self._altitude_min[row].clear()
+        self._altitude_max[row].clear()
+        self._altitude_stale[row] = 0
+        self._unschedule(row)
+
+    # -------------------------
+    # Ring buffer erişimi
+    # -------------------------
+    def append(self, row, lat, lon, ts, track=None, speed=None, altitude=None, segment_km=None):
+        """Satırın ring buffer'ına nokta ekle (doluysa en eski nokta düşer)
+
+        segment_km: Önceki noktaya mesafe (çağıran zaten hesapladıysa); None ise hesaplanır
+        """
+        size = self.history_size
+        head = self.head[row]
+        base = row * size
+        slot = base + head
+        count = self.count[row]
+
+        if count == size:
+            # En eski nokta düşüyor: toplamlardan çıkar
+            old_speed = self.speed[slot]
+            if old_speed == old_speed:
+                self.speed_sum[row] -= old_speed
+                self.speed_count[row] -= 1
+            # Yeni en eski noktanın segmenti artık pencerede değil
+            oldest = base + (head + 1) % size
+            self.distance_sum[row] -= self.segment[oldest]
+            self.segment[oldest] = 0.0
+            count -= 1
+
+        if count == 0:
+            segment_km = 0.0
+        elif segment_km is None:
+            prev = base + (head - 1) % size
+            segment_km = haversine_km(self.lat[prev], self.lon[prev], lat, lon)
+
+        self.lat[slot] = lat
+        self.lon[slot] = lon
+        self.ts[slot] = ts
+        self.track[slot] = NAN if track is None else track
+        self.speed[slot] = NAN if speed is None else speed
+        self.altitude[slot] = NAN if altitude is None else altitude
+        self.segment[slot] = segment_km
+        self.distance_sum[row] += segment_km
+        if speed is not None:
+            self.speed_sum[row] += speed
+            self.speed_count[row] += 1
+
+        self._schedule(row, ts)
+
+        index = self.appended[row]
+        self.head[row] = head + 1 if head + 1 < size else 0
+        self.count[row] = count + 1
+        self.appended[row] = index + 1
+
+        if self._altitude_stale[row]:
+            self._rebuild_altitude(row)
+        else:
+            if altitude is not None:
+                self._push_altitude(row, index, float(altitude))
+            self._expire_altitude(row, index + 1 - (count + 1))
+
+        # Kayan toplamlarda birikmiş yuvarlama hatasını her tam turda sıfırla
+        if (index + 1) % size == 0:
+            self._resum(row)
+
+    def append_many(self, rows, lats, lons, ts, tracks, speeds, altitudes, segments):
+        """Birçok satıra birer nokta ekle (append ile aynı sonuç, sütunlara toplu yazım)
+
+        Satır başına Python işi sadece nadir durumlarda yapılır: zaman çarkı
+        kovası değişen satırlar ve tam tur atan (toplamları yeniden hesaplanan)
+        satırlar. İrtifa deque'leri bayat işaretlenir, okunurken kurulur.
+
+        Args:
+            rows: Satırlar (tekrarsız, NumPy int dizisi)
+            lats, lons, ts: Nokta değerleri (float dizileri)
+            tracks, speeds, altitudes: Eksikler NaN
+            segments: Önceki noktaya mesafe km (satırın ilk noktası için yok sayılır)
+        """
+        if np is None:
+            raise RuntimeError("NumPy kurulu değil")
+        if len(rows) == 0:
+            return
+        size = self.history_size
+        # Görünümler sadece bu fonksiyon boyunca yaşar (depo büyüyebilsin)
+        view = {name: np.frombuffer(getattr(self, name), dtype=np.float64)
+                for name in ('lat', 'lon', 'ts', 'track', 'speed', 'altitude', 'segment',
+                             'distance_sum', 'speed_sum', 'last_seen')}
+        head_col = np.frombuffer(self.head, dtype=self.head.typecode)
+        count_col = np.frombuffer(self.count, dtype=self.count.typecode)
+        appended_col = np.frombuffer(self.appended, dtype=np.int64)
+        speed_count_col = np.frombuffer(self.speed_count, dtype=self.speed_count.typecode)
+        stale_col = np.frombuffer(self._altitude_stale, dtype=np.int8)
+
+        head = head_col[rows]
+        count = count_col[rows]
+        base = rows * size
+        slots = base + head
+
+        # Dolu satırlarda en eski nokta düşüyor: toplamlardan çıkar
+        full = count == size
+        if full.any():
+            full_rows, full_slots = rows[full], slots[full]
+            old_speed = view['speed'][full_slots]
+            had_speed = ~np.isnan(old_speed)
+            view['speed_sum'][full_rows[had_speed]] -= old_speed[had_speed]
+            speed_count_col[full_rows[had_speed]] -= 1
+            oldest = base[full] + (head[full] + 1) % size
+            view['distance_sum'][full_rows] -= view['segment'][oldest]
+            view['segment'][oldest] = 0.0
+            count = count - full
+
+        segments = np.where(count == 0, 0.0, segments)
+        view['lat'][slots] = lats
+        view['lon'][slots] = lons
+        view['ts'][slots] = ts
+        view['track'][slots] = tracks
+        view['speed'][slots] = speeds
+        view['altitude'][slots] = altitudes
+        view['segment'][slots] = segments
+        view['distance_sum'][rows] += segments
+        has_speed = ~np.isnan(speeds)
+        view['speed_sum'][rows[has_speed]] += speeds[has_speed]
+        speed_count_col[rows[has_speed]] += 1
+
+        index = appended_col[rows]
+        head_col[rows] = (head + 1) % size
+        count_col[rows] = count + 1
+        appended_col[rows] = index + 1
+        stale_col[rows] = 1
+
+        # Zaman çarkı: sadece kovası değişen satırlar
+        view['last_seen'][rows] = ts
+        buckets = np.floor(ts / self.wheel_seconds).astype(np.int64)
+        current = np.frombuffer(self._bucket_of, dtype=np.int64)[rows]
+        moved = np.flatnonzero(buckets != current)
+        wrapped = rows[(index + 1) % size == 0].tolist()
+        del view, head_col, count_col, appended_col, speed_count_col, stale_col
+
+        for i in moved.tolist():
+            self._schedule(int(rows[i]), float(ts[i]))
+        for row in wrapped:
+            self._resum(row)
+
+    def _rebuild_altitude(self, row):
+        """İrtifa deque'lerini satırın penceresinden yeniden kur"""
+        self._altitude_stale[row] = 0
+        self._altitude_min[row].clear()
+        self._altitude_max[row].clear()
+        count = self.count[row]
+        first = self.appended[row] - count
+        for i in range(count):
+            altitude = self.altitude[self.slot(row, i)]
+            if altitude == altitude:
+                self._push_altitude(row, first + i, altitude)
+
+    # -------------------------
+    # Zaman çarkı (eski uçak temizliği)
+    # -------------------------
+    def _schedule(self, row, ts):
+        """Satırın son görülme zamanını güncelle, gerekirse kovasını değiştir"""
+        self.last_seen[row] = ts
+        bucket = math.floor(ts / self.wheel_seconds)
+        current = self._bucket_of[row]
+        if bucket == current:
+            return
+
+        if current != NO_BUCKET:
+            self._wheel[current].discard(row)
+
+        rows = self._wheel.get(bucket)
+        if rows is None:
+            self._wheel[bucket] = rows = set()
+            heapq.heappush(self._wheel_heap, bucket)
+        rows.add(row)
+        self._bucket_of[row] = bucket
+
+    def _unschedule(self, row):
+        current = self._bucket_of[row]
+        if current != NO_BUCKET:
+            self._wheel[current].discard(row)
+            self._bucket_of[row] = NO_BUCKET
+
+    def evict_older_than(self, cutoff):
+        """En yeni noktası cutoff'tan eski olan uçakları sil
+
+        Sadece süresi tamamen dolan kovalar ve cutoff'u içeren kova taranır.
+
+        Returns:
+            Silinen validator listesi (depodan ayrılmış halde)
+        """
+        cutoff_bucket = math.floor(cutoff / self.wheel_seconds)
+        expired = []
+
+        heap = self._wheel_heap
+        while heap and heap[0] < cutoff_bucket:
+            rows = self._wheel.pop(heapq.heappop(heap), None)
+            if rows:
+                for row in rows:
+                    self._bucket_of[row] = NO_BUCKET
+                expired.extend(rows)
+
+        boundary = self._wheel.get(cutoff_bucket)
+        if boundary:
+            for row in [row for row in boundary if self.last_seen[row] < cutoff]:
+                self._unschedule(row)
+                expired.append(row)
+
+        evicted = []
+        for row in expired:
+            validator = self._validators[row]
+            if validator is not None:
+                evicted.append(validator)
+                self.release(row)
+        return evicted
+
+    def _push_altitude(self, row, index, altitude):
+        lows = self._altitude_min[row]
+        while lows and lows[-1][1] >= altitude:
+            lows.pop()
+        lows.append((index, altitude))
+
+        highs = self._altitude_max[row]
+        while highs and highs[-1][1] <= altitude:
+            highs.pop()
+        highs.append((index, altitude))
+
+    def _expire_altitude(self, row, first_index):
+        """Sıra numarası pencere başından (first_index) küçük irtifaları at"""
+        for queue in (self._altitude_min[row], self._altitude_max[row]):
+            while queue and queue[0][0] < first_index:
+                queue.popleft()
+
+    def _resum(self, row):
+        """Pencere toplamlarını sütunlardan tam olarak yeniden hesapla"""
+        count = self.count[row]
+        slots = [self.slot(row, i) for i in range(count)]
+        self.distance_sum[row] = math.fsum(self.segment[s] for s in slots)
+        speeds = [self.speed[s] for s in slots if self.speed[s] == self.speed[s]]
+        self.speed_sum[row] = math.fsum(speeds)
+        self.speed_count[row] = len(speeds)
+
+    def distance_km(self, row):
+        return self.distance_sum[row] if self.count[row] > 1 else 0.0
+
+    def average_speed(self, row):
+        n = self.speed_count[row]
+        return self.speed_sum[row] / n if n else None
+
+    def altitude_range(self, row):
+        if self._altitude_stale[row]:
+            self._rebuild_altitude(row)
+        lows, highs = self._altitude_min[row], self._altitude_max[row]
+        if not lows:
+            return None, None
+        return lows[0][1], highs[0][1]
+
+    def slot(self, row, index):
+        """Nokta indeksini (0 = en eski, -1 = en yeni) sütun indeksine çevir"""
+        count = self.count[row]
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("position history index out of range")
+        return row * self.history_size + (self.head[row] - count + index) % self.history_size
+
+    def get_point(self, row, index):
+        """Tek bir noktayı TrackPoint olarak döndür"""
+        return self.point_at(self.slot(row, index))
+
+    def point_at(self, slot):
+        """Fiziksel sütun indeksindeki noktayı TrackPoint olarak döndür"""
+        track = self.track[slot]
+        speed = self.speed[slot]
+        return TrackPoint(
+            self.lat[slot], self.lon[slot], self.ts[slot],
+            track if track == track else None,
+            speed if speed == speed else None
+        )
+
+    def column(self, name):
+        """Sütunu (capacity, history_size) şekilli NumPy görünümü olarak döndür (kopyasız)
+
+        Not: Görünüm tutulurken depo büyüyemez; sadece kısa süreli kullanın.
+        """
+        if np is None:
+            raise RuntimeError("NumPy kurulu değil")
+        return np.frombuffer(getattr(self, name), dtype=np.float64).reshape(
+            self.capacity, self.history_size
+        )
+
+    # -------------------------
+    # Mapping arayüzü (hex_id -> PositionValidator)
+    # -------------------------
+    def __getitem__(self, hex_id):
+        row = self._rows.get(self.intern(hex_id))
+        if row is None:
+            raise KeyError(hex_id)
+        return self._validators[row]
+
+    def __setitem__(self, hex_id, validator):
+        if validator.store is not self:
+            self._adopt(validator)
+        key = self.intern(hex_id)
+        row = validator.row
+        if self.keys[row] != key:
+            raise ValueError(f"Validator {validator.hex_id} farklı bir hex için kaydedilemez: {hex_id}")
+
+        old_row = self._rows.get(key)
+        if old_row is not None and old_row != row:
+            self.release(old_row)
+
+        self._rows[key] = row
+        self._validators[row] = validator
+
+    def __delitem__(self, hex_id):
+        row = self._rows.get(self.intern(hex_id))
+        if row is None:
+            raise KeyError(hex_id)
+        self.release(row)
+
+    def __iter__(self):
+        # Anlık kopya: başka bir thread silse bile iterasyon bozulmaz
+        for key in list(self._rows):
+            yield self.hex_id(key)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, hex_id):
+        return self.intern(hex_id) in self._rows
+
+    def _adopt(self, validator):
+        """Başka bir depoya ait validator'ı (geçmişiyle) bu depoya taşı"""
+        source, source_row = validator.store, validator.row
+        row = self.allocate(validator.hex_id)
+        if source is not None and source_row >= 0:
+            count = source.count[source_row]
+            # Sıra numaraları korunsun (iz abonelikleri ve irtifa kuyrukları için)
+            self.appended[row] = source.appended[source_row] - count
+            for i in range(count):
+                slot = source.slot(source_row, i)
+                track, speed, altitude = source.track[slot], source.speed[slot], source.altitude[slot]
+                self.append(
+                    row, source.lat[slot], source.lon[slot], source.ts[slot],
+                    track if track == track else None,
+                    speed if speed == speed else None,
+                    altitude if altitude == altitude else None,
+                    source.segment[slot] if i > 0 else None
+                )
+            source.release(source_row)
+        validator.store = self
+        validator.row = row
+        validator.position_history = PositionHistory(self, row)
+
+    def get_statistics(self):
+        """Depo doluluk ve bellek bilgisi"""
+        history_bytes = sum(
+            len(getattr(self, name)) * getattr(self, name).itemsize for name in HISTORY_COLUMNS
+        )
+        row_bytes = sum(
+            len(a) * a.itemsize
+            for a in (self.head, self.count, self.appended, self.keys,
+                      self.distance_sum, self.speed_sum, self.speed_count)
+        )
+        return {
+            'capacity': self.capacity,
+            'rows_used': len(self._rows),
+            'history_size': self.history_size,
+            'memory_mb': round((history_bytes + row_bytes) / (1024 * 1024), 2)
+        }
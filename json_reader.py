@@ -1,19 +1,144 @@
 # json_reader.py
+import gzip
 import json
+import queue
+import threading
 import time
 from pathlib import Path
 from typing import List, Dict, Optional
 import config
+from metrics import stage
 from utils import debug_log
 
+# Hızlı JSON decoder'lar (opsiyonel - yoksa stdlib json kullanılır)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import zstandard
+except ImportError:  # .json.zst dosyaları için gerekli
+    zstandard = None
+
+JSON_SUFFIXES = ('.json', '.json.gz', '.json.zst')
+
+_FETCH_SECONDS = stage('fetch')  # Dosya okuma (+ açma)
+_DECODE_SECONDS = stage('decode')
+
+
+def get_decoder(name: str = 'auto'):
+    """JSON decoder seç
+
+    Args:
+        name: 'auto' (orjson > simdjson > json), 'orjson', 'simdjson' veya 'json'
+
+    Returns:
+        (decoder adı, bytes -> obje fonksiyonu)
+    """
+    if name in ('auto', 'orjson') and orjson is not None:
+        return 'orjson', orjson.loads
+    if name in ('auto', 'simdjson') and simdjson is not None:
+        return 'simdjson', simdjson.loads
+    if name not in ('auto', 'json'):
+        debug_log(f"⚠️ JSON decoder '{name}' bulunamadı, stdlib json kullanılıyor", "WARNING")
+    return 'json', json.loads
+
+
+def read_snapshot_bytes(path: Path) -> bytes:
+    """Dosyayı oku, sıkıştırılmışsa aç (.json, .json.gz, .json.zst)"""
+    name = path.name
+    if name.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+    if name.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstandard paketi kurulu değil (.json.zst okunamaz)")
+        with open(path, 'rb') as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read()
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def snapshot_number(path: Path) -> int:
+    """Dosya adından sıra numarasını çıkar (adsb_data_105.json[.gz|.zst] -> 105)"""
+    name = path.name
+    for suffix in JSON_SUFFIXES[::-1]:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    try:
+        return int(name.split('_')[-1])
+    except (ValueError, IndexError):
+        return 0
+
+
+class _Prefetcher(threading.Thread):
+    """Sıradaki dosyaları arka planda okuyup decode eden thread (sınırlı ön okuma kuyruğu)"""
+
+    def __init__(self, reader, start_index, queue_size, loop=None):
+        super().__init__(name="json-prefetch", daemon=True)
+        self.reader = reader
+        self.next_index = start_index
+        self.loop = config.JSON_LOOP if loop is None else loop
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        files = self.reader.json_files
+        while not self._stop_event.is_set():
+            if self.next_index >= len(files):
+                if not self.loop:
+                    return
+                self.next_index = 0
+
+            index = self.next_index
+            item = self.reader._load(index)
+            self.next_index += 1
+
+            # Kuyruk doluysa bekle (durdurulursa çık)
+            while not self._stop_event.is_set():
+                try:
+                    self.queue.put(item, timeout=0.2)
+                    break
+                except queue.Full:
+                    continue
+
+    def get(self):
+        """Sıradaki öğe; thread bittiyse ve kuyruk boşsa None"""
+        while True:
+            try:
+                return self.queue.get(timeout=0.2)
+            except queue.Empty:
+                if not self.is_alive() and self.queue.empty():
+                    return None
+
+    def stop(self):
+        self._stop_event.set()
+
 
 class JSONDataReader:
-    """JSON dosyalarından ADS-B verilerini okur"""
+    """JSON dosyalarından ADS-B verilerini okur
 
-    def __init__(self, json_dir: Path):
+    Dosyalar (.json, .json.gz, .json.zst) arka planda ön okunur ve seçilen
+    decoder (orjson / simdjson / json) ile çözülür.
+    """
+
+    def __init__(self, json_dir: Path, decoder: str = None, prefetch: bool = None):
         self.json_dir = json_dir
         self.json_files = []
         self.current_index = 0
+        self.decoder_name, self._decode = get_decoder(decoder or config.JSON_DECODER)
+        self.prefetch = config.JSON_PREFETCH['enabled'] if prefetch is None else prefetch
+        self._prefetcher = None
+        self._stats_lock = threading.Lock()
+        self._decode_stats = {'files': 0, 'bytes': 0, 'seconds': 0.0}
+        self._timestamps = {}  # index -> 'now' (seek için)
         self.load_json_files()
 
     def load_json_files(self):
@@ -22,26 +147,22 @@ class JSONDataReader:
             debug_log(f"❌ JSON dizini bulunamadı: {self.json_dir}", "ERROR")
             return
 
-        # Tüm .json dosyalarını bul
-        files = list(self.json_dir.glob("adsb_data_*.json"))
+        # Tüm .json / .json.gz / .json.zst dosyalarını bul
+        files = []
+        for suffix in JSON_SUFFIXES:
+            files.extend(self.json_dir.glob(f"adsb_data_*{suffix}"))
+
+        if zstandard is None and any(f.name.endswith('.zst') for f in files):
+            debug_log("⚠️ zstandard kurulu değil, .json.zst dosyaları atlanıyor", "WARNING")
+            files = [f for f in files if not f.name.endswith('.zst')]
 
         if not files:
             debug_log("❌ JSON dosyası bulunamadı!", "ERROR")
             return
 
         # Dosyaları sayısal olarak sırala (adsb_data_X.json formatı için)
-        def extract_number(filepath):
-            """Dosya adından sayıyı çıkar"""
-            try:
-                # adsb_data_105.json -> 105
-                name = filepath.stem  # adsb_data_105
-                parts = name.split('_')  # ['adsb', 'data', '105']
-                return int(parts[-1])  # 105
-            except (ValueError, IndexError):
-                return 0
-
-        self.json_files = sorted(files, key=extract_number)
-        debug_log(f"✅ {len(self.json_files)} JSON dosyası bulundu")
+        self.json_files = sorted(files, key=snapshot_number)
+        debug_log(f"✅ {len(self.json_files)} JSON dosyası bulundu (decoder: {self.decoder_name})")
 
         # İlk 5 dosyayı göster
         for i, f in enumerate(self.json_files[:5]):
@@ -49,18 +170,65 @@ class JSONDataReader:
         if len(self.json_files) > 5:
             debug_log(f"   ... ve {len(self.json_files) - 5} dosya daha")
 
+    def _load(self, index):
+        """Dosyayı oku ve decode et
+
+        Returns:
+            (index, data, hata) - hata varsa data None
+        """
+        path = self.json_files[index]
+        try:
+            read_started = time.perf_counter()
+            raw = read_snapshot_bytes(path)
+            started = time.perf_counter()
+            data = self._decode(raw)
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            return index, None, e
+
+        _FETCH_SECONDS.observe(started - read_started)
+        _DECODE_SECONDS.observe(elapsed)
+
+        with self._stats_lock:
+            self._decode_stats['files'] += 1
+            self._decode_stats['bytes'] += len(raw)
+            self._decode_stats['seconds'] += elapsed
+        return index, data, None
+
+    def _next_item(self):
+        """Sıradaki (index, data, hata) - ön okuma açıksa kuyruktan"""
+        if not self.prefetch:
+            return self._load(self.current_index)
+
+        if self._prefetcher is None:
+            self._prefetcher = _Prefetcher(self, self.current_index, config.JSON_PREFETCH['queue_size'])
+            self._prefetcher.start()
+
+        item = self._prefetcher.get()
+        if item is None or item[0] != self.current_index:
+            # Ön okuma bitti veya sıra kaydı: eşzamanlı oku
+            self._stop_prefetch()
+            return self._load(self.current_index)
+        return item
+
+    def _stop_prefetch(self):
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
     def read_next_data(self) -> Optional[Dict]:
         """Sıradaki JSON dosyasını oku"""
         if not self.json_files:
             debug_log("❌ Okunacak dosya yok", "ERROR")
             return None
 
-        current_file = self.json_files[self.current_index]
+        if self.current_index >= len(self.json_files):
+            return None
 
-        try:
-            with open(current_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        _, data, error = self._next_item()
+        current_file = self.json_files[self.current_index]
 
+        if error is None:
             aircraft_count = len(data.get('aircraft', []))
             debug_log(f"📖 Dosya okundu: {current_file.name} ({aircraft_count} uçak)")
 
@@ -78,32 +246,126 @@ class JSONDataReader:
 
             return data
 
-        except json.JSONDecodeError as e:
-            debug_log(f"❌ JSON parse hatası ({current_file.name}): {e}", "ERROR")
+        if isinstance(error, ValueError):
+            # orjson / simdjson / json decode hataları ValueError türevidir
+            debug_log(f"❌ JSON parse hatası ({current_file.name}): {error}", "ERROR")
             self.current_index += 1
             # Bir sonraki dosyayı dene
             if self.current_index < len(self.json_files):
                 return self.read_next_data()
             return None
 
-        except Exception as e:
-            debug_log(f"❌ Dosya okuma hatası ({current_file.name}): {e}", "ERROR")
-            self.current_index += 1
-            return None
+        debug_log(f"❌ Dosya okuma hatası ({current_file.name}): {error}", "ERROR")
+        self.current_index += 1
+        return None
+
+    def iter_snapshots(self, start: int = 0):
+        """Tüm dosyaları sırayla decode ederek üret (toplu işleme için)
+
+        read_next_data'dan farkı: döngü yapmaz, son dosyayı da döndürür ve
+        okuma konumunu değiştirmez. Okunamayan dosyalar atlanır.
+        """
+        prefetcher = None
+        if self.prefetch:
+            prefetcher = _Prefetcher(self, start, config.JSON_PREFETCH['queue_size'], loop=False)
+            prefetcher.start()
+
+        try:
+            for index in range(start, len(self.json_files)):
+                item = prefetcher.get() if prefetcher is not None else self._load(index)
+                if item is None:
+                    return
+                _, data, error = item
+                if error is not None:
+                    debug_log(f"❌ Dosya okunamadı ({self.json_files[index].name}): {error}", "ERROR")
+                    continue
+                yield data
+        finally:
+            if prefetcher is not None:
+                prefetcher.stop()
+
+    def timestamp(self, index) -> Optional[float]:
+        """index numaralı dosyanın 'now' değeri (dosya okunur, sonuç önbellekte)"""
+        now = self._timestamps.get(index)
+        if now is None:
+            _, data, error = self._load(index)
+            if error is not None or not isinstance(data, dict):
+                return None
+            now = self._timestamps[index] = data.get('now')
+        return now
+
+    def find(self, now: float) -> int:
+        """'now' değeri verilen zamana eşit/büyük ilk dosyanın indeksi
+
+        Dosyalar zamana göre sıralı olduğundan ikili arama yapılır (O(log n)
+        dosya okuma); okunamayan dosya bir sonrakinin zamanını kullanır.
+        """
+        low, high = 0, len(self.json_files)
+        while low < high:
+            mid = (low + high) // 2
+            probe = mid
+            ts = self.timestamp(probe)
+            while ts is None and probe + 1 < high:
+                probe += 1
+                ts = self.timestamp(probe)
+            if ts is not None and ts < now:
+                low = probe + 1
+            else:
+                high = mid
+        return low
+
+    def seek_index(self, index: int) -> int:
+        """Okumayı index numaralı dosyadan sürdür
+
+        Returns:
+            Yeni konum (sınırlara sıkıştırılmış)
+        """
+        self._stop_prefetch()
+        self.current_index = min(max(0, index), max(0, len(self.json_files) - 1))
+        return self.current_index
+
+    def seek(self, now: float) -> int:
+        """Verilen zamandaki (veya sonraki ilk) dosyaya atla"""
+        index = self.seek_index(self.find(now))
+        debug_log(f"⏩ {now} zamanına atlandı (#{index})")
+        return index
+
+    def queue_depth(self) -> int:
+        """Ön okuma kuyruğunda bekleyen dosya sayısı"""
+        prefetcher = self._prefetcher
+        return prefetcher.queue.qsize() if prefetcher is not None else 0
+
+    def get_decode_throughput(self) -> Dict:
+        """Decoder verimi (sadece decode süresi üzerinden)"""
+        with self._stats_lock:
+            files = self._decode_stats['files']
+            size = self._decode_stats['bytes']
+            seconds = self._decode_stats['seconds']
+
+        return {
+            "decoder": self.decoder_name,
+            "files_decoded": files,
+            "files_per_sec": round(files / seconds, 1) if seconds > 0 else 0,
+            "mb_per_sec": round(size / (1024 * 1024) / seconds, 1) if seconds > 0 else 0
+        }
 
     def get_progress(self) -> Dict:
         """İlerleme bilgisi"""
         if not self.json_files:
             return {"current": 0, "total": 0, "percent": 0}
 
+        prefetcher = self._prefetcher
         return {
             "current": self.current_index,
             "total": len(self.json_files),
-            "percent": (self.current_index / len(self.json_files)) * 100 if self.json_files else 0
+            "percent": (self.current_index / len(self.json_files)) * 100 if self.json_files else 0,
+            "prefetched": prefetcher.queue.qsize() if prefetcher is not None else 0,
+            **self.get_decode_throughput()
         }
 
     def reset(self):
         """Başa sar"""
+        self._stop_prefetch()
         self.current_index = 0
         debug_log("🔄 JSON okuyucu sıfırlandı")
 
@@ -113,8 +375,12 @@ _json_reader = None
 
 
 def get_json_reader() -> JSONDataReader:
-    """Global JSON okuyucu instance'ını döndür"""
+    """Global JSON okuyucu instance'ını döndür (USE_REPLAY_ARCHIVE açıksa arşiv okuyucu)"""
     global _json_reader
     if _json_reader is None:
-        _json_reader = JSONDataReader(config.JSON_FILES_DIR)
-    return _json_reader
\ No newline at end of file
+        if config.USE_REPLAY_ARCHIVE:
+            from replay_archive import ArchiveDataReader
+            _json_reader = ArchiveDataReader(config.REPLAY_ARCHIVE_PATH)
+        else:
+            _json_reader = JSONDataReader(config.JSON_FILES_DIR)
+    return _json_reader
@@ -0,0 +1,347 @@
+# kalman_tracker.py
+"""
+Filo genelinde vektörel Kalman takipçisi (alternatif doğrulama motoru)
+
+config.VALIDATION_ENGINE = 'kalman' iken sanitize_aircraft_positions bu
+motoru kullanır. Her uçak için sabit hızlı (constant velocity) model:
+
+    durum x = [doğu km, kuzey km, doğu km/s, kuzey km/s]
+
+Durum uçağın son tahmini etrafındaki yerel teğet düzlemdedir; her adımdan
+sonra referans noktası yeni tahmine taşınır (düz dünya hatası bir tick'lik
+mesafeyle sınırlı kalır). Tahmin, kapı ve güncelleme tüm tick için
+FleetStore satırına göre indekslenen dizilerde toplu NumPy işlemleridir.
+
+Kapı: inovasyonun Mahalanobis mesafesi d² = yᵀ S⁻¹ y, 2 serbestlik
+dereceli ki-kare eşiğiyle karşılaştırılır. Reddedilen ölçümde durum
+tahminde kalır (belirsizlik büyür, kapı genişler); üst üste max_misses
+red veya reset_seconds'tan uzun boşluk sonrası iz ölçümden yeniden başlar.
+
+Validator'lar (geçmiş, izler, istatistikler) apply_result ile güncellenir;
+dönen sonuçlar kural motoruyla aynı şekildedir. NumPy gerektirir.
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opsiyonel - yoksa kural motoru kullanılır
+    np = None
+
+import config
+from event_log import get_logger
+from fleet_store import TrackPoint
+from position_validator import PositionValidator
+from utils import EARTH_RADIUS_KM
+
+KM_PER_DEG = EARTH_RADIUS_KM * math.pi / 180.0
+KTS_TO_KMS = 1.852 / 3600.0
+
+_outlier_log = get_logger('outlier')
+
+
+def _haversine_pairs(lats1, lons1, lats2, lons2):
+    """Eşleşen nokta çiftleri arası mesafe (utils.haversine_km ile aynı formül, vektörel)"""
+    dlat = np.radians(lats2 - lats1)
+    dlon = np.radians(lons2 - lons1)
+    a = (np.sin(dlat / 2) ** 2 +
+         np.cos(np.radians(lats1)) * np.cos(np.radians(lats2)) * np.sin(dlon / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+
+class FleetKalmanTracker:
+    """Tüm filonun Kalman durumunu satır dizilerinde tutan toplu doğrulayıcı"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.KALMAN_TRACKER
+        self.store = None
+        self.capacity = 0
+        self._stats = {'updates': 0, 'accepted': 0, 'rejected': 0, 'track_resets': 0, 'resyncs': 0}
+
+    # -------------------------
+    # Durum dizileri
+    # -------------------------
+    def _bind(self, store):
+        """Depo değiştiyse (seek, toplu tekrar oynatma) durumu sıfırla; kapasiteyi eşitle"""
+        if store is not self.store:
+            self.store = store
+            self.capacity = 0
+            self.x = np.zeros((0, 4))
+            self.P = np.zeros((0, 4, 4))
+            self.ref_lat = np.zeros(0)
+            self.ref_lon = np.zeros(0)
+            self.t_last = np.zeros(0)
+            self.misses = np.zeros(0, dtype=np.int32)
+            self.sync = np.zeros(0, dtype=np.int64)
+            self.owners = []
+        extra = store.capacity - self.capacity
+        if extra > 0:
+            self.x = np.concatenate((self.x, np.zeros((extra, 4))))
+            self.P = np.concatenate((self.P, np.zeros((extra, 4, 4))))
+            self.ref_lat = np.concatenate((self.ref_lat, np.zeros(extra)))
+            self.ref_lon = np.concatenate((self.ref_lon, np.zeros(extra)))
+            self.t_last = np.concatenate((self.t_last, np.zeros(extra)))
+            self.misses = np.concatenate((self.misses, np.zeros(extra, dtype=np.int32)))
+            self.sync = np.concatenate((self.sync, np.full(extra, -1, dtype=np.int64)))
+            self.owners.extend([None] * extra)
+            self.capacity = store.capacity
+
+    def _init(self, rows, lats, lons, ts, tracks, speeds):
+        """Satırların izini verilen konumdan başlat (hız/yön biliniyorsa hız da)"""
+        settings = self.settings
+        known = ~np.isnan(tracks) & ~np.isnan(speeds)
+        speed_kms = np.where(known, speeds, 0.0) * KTS_TO_KMS
+        track_rad = np.radians(np.where(known, tracks, 0.0))
+        sigma_v = np.where(known, settings['init_speed_sigma_kts'],
+                           settings['unknown_speed_sigma_kts']) * KTS_TO_KMS
+
+        self.ref_lat[rows] = lats
+        self.ref_lon[rows] = lons
+        self.t_last[rows] = ts
+        self.misses[rows] = 0
+        x = np.zeros((len(rows), 4))
+        x[:, 2] = speed_kms * np.sin(track_rad)
+        x[:, 3] = speed_kms * np.cos(track_rad)
+        self.x[rows] = x
+        P = np.zeros((len(rows), 4, 4))
+        P[:, 0, 0] = P[:, 1, 1] = settings['measurement_sigma_km'] ** 2
+        P[:, 2, 2] = P[:, 3, 3] = sigma_v ** 2
+        self.P[rows] = P
+
+    def _to_plane(self, rows, lats, lons):
+        """Enlem/boylam -> satırların referans düzleminde (doğu, kuzey) km"""
+        cos_ref = np.maximum(np.cos(np.radians(self.ref_lat[rows])), 1e-6)
+        dlon = (lons - self.ref_lon[rows] + 180.0) % 360.0 - 180.0
+        return np.stack((dlon * KM_PER_DEG * cos_ref, (lats - self.ref_lat[rows]) * KM_PER_DEG), axis=1)
+
+    def _to_latlon(self, rows, east, north):
+        """Referans düzlemindeki (doğu, kuzey) km -> enlem/boylam"""
+        cos_ref = np.maximum(np.cos(np.radians(self.ref_lat[rows])), 1e-6)
+        lats = np.clip(self.ref_lat[rows] + north / KM_PER_DEG, -90.0, 90.0)
+        lons = (self.ref_lon[rows] + east / (KM_PER_DEG * cos_ref) + 180.0) % 360.0 - 180.0
+        return lats, lons
+
+    def _reanchor(self, rows):
+        """Referansı güncel tahmine taşı (konum bileşenleri sıfırlanır)"""
+        lats, lons = self._to_latlon(rows, self.x[rows, 0], self.x[rows, 1])
+        self.ref_lat[rows] = lats
+        self.ref_lon[rows] = lons
+        self.x[rows, :2] = 0.0
+
+    # -------------------------
+    # Toplu doğrulama
+    # -------------------------
+    def validate(self, store, now_val, items):
+        """Tick'in tüm uçaklarını toplu doğrula
+
+        Args:
+            store: Validator'ların FleetStore'u (config._aircraft_state)
+            items: prepare_aircraft çıktıları
+
+        Returns:
+            [(validator, düzeltilmiş pozisyon, düzeltildi mi, sebep), ...] (items sırasıyla)
+        """
+        results = [None] * len(items)
+        pending = list(range(len(items)))
+        # Aynı hex bir snapshot'ta iki kez geçerse ikinci kayıt sonraki turda işlenir
+        while pending:
+            seen, batch, rest = set(), [], []
+            for j in pending:
+                hex_id = items[j][0]
+                (rest if hex_id in seen else batch).append(j)
+                seen.add(hex_id)
+            self._validate_batch(store, items, batch, results)
+            pending = rest
+        return results
+
+    def _validate_batch(self, store, items, batch, results):
+        settings = self.settings
+        validators = []
+        for j in batch:
+            hex_id = items[j][0]
+            validator = store.get(hex_id)
+            if validator is None:
+                validator = PositionValidator(hex_id, store=store)
+                store[hex_id] = validator
+            validators.append(validator)
+        self._bind(store)
+
+        n = len(batch)
+        rows = np.fromiter((v.row for v in validators), dtype=np.int64, count=n)
+        lats = np.fromiter((items[j][1] for j in batch), dtype=np.float64, count=n)
+        lons = np.fromiter((items[j][2] for j in batch), dtype=np.float64, count=n)
+        ts = np.fromiter((items[j][3] for j in batch), dtype=np.float64, count=n)
+        tracks = np.fromiter((np.nan if items[j][4] is None else items[j][4] for j in batch),
+                             dtype=np.float64, count=n)
+        speeds = np.fromiter((np.nan if items[j][5] is None else items[j][5] for j in batch),
+                             dtype=np.float64, count=n)
+
+        # İlk pozisyon / durumu bu takipçinin dışında değişmiş validator'lar
+        first = np.zeros(n, dtype=bool)
+        prev_lats = np.zeros(n)
+        prev_lons = np.zeros(n)
+        resync = []
+        owners, sync = self.owners, self.sync
+        for k, validator in enumerate(validators):
+            last = validator.last_valid_pos
+            if last is None or not validator.position_history:
+                first[k] = True
+                continue
+            prev_lats[k] = last.lat
+            prev_lons[k] = last.lon
+            if owners[validator.row] is not validator or sync[validator.row] != validator.total_updates:
+                resync.append(k)
+        if resync:
+            self._stats['resyncs'] += len(resync)
+            last = [validators[k].last_valid_pos for k in resync]
+            self._init(
+                rows[resync],
+                np.array([p.lat for p in last]), np.array([p.lon for p in last]),
+                np.array([p.ts for p in last]),
+                np.array([np.nan if validators[k].last_valid_track is None else validators[k].last_valid_track
+                          for k in resync]),
+                np.array([np.nan if validators[k].last_valid_speed is None else validators[k].last_valid_speed
+                          for k in resync])
+            )
+
+        dt = ts - self.t_last[rows]
+        backwards = ~first & (dt <= 0)
+        too_frequent = ~first & ~backwards & (dt < config.MIN_TIME_DIFF)
+        stale_track = ~first & (dt > settings['reset_seconds'])
+        active = ~first & ~backwards & ~too_frequent & ~stale_track
+
+        # Zaman testi reddedilenler: durum değişmez, gösterim için tahmin
+        held = np.flatnonzero(backwards | too_frequent)
+        held_lat, held_lon = self._predict_position(rows[held], np.maximum(dt[held], 0.0))
+
+        # Tahmin + Mahalanobis kapısı + güncelleme (aktif satırlar)
+        idx = np.flatnonzero(active)
+        accepted = np.zeros(n, dtype=bool)
+        d2 = np.zeros(n)
+        if idx.size:
+            accepted[idx], d2[idx] = self._step(rows[idx], dt[idx], lats[idx], lons[idx])
+
+        # Üst üste red sınırı: iz ölçümden yeniden başlar
+        rejected = active & ~accepted
+        self.misses[rows[rejected]] += 1
+        reset = stale_track | (rejected & (self.misses[rows] >= settings['max_misses']))
+        rejected &= ~reset
+        pred_lat, pred_lon = self._to_latlon(rows, self.x[rows, 0], self.x[rows, 1])
+
+        start = first | reset
+        if start.any():
+            self._init(rows[start], lats[start], lons[start], ts[start], tracks[start], speeds[start])
+        self._reanchor(rows[active & ~reset])
+
+        self._stats['updates'] += n
+        self._stats['accepted'] += int(accepted.sum())
+        self._stats['rejected'] += int(rejected.sum() + backwards.sum() + too_frequent.sum())
+        self._stats['track_resets'] += int(reset.sum())
+
+        # Validator'ları güncelle ve sonuçları kur (geçmiş segment mesafeleri toplu hesaplanır)
+        held_pos = dict(zip(held.tolist(), zip(held_lat.tolist(), held_lon.tolist())))
+        segments = np.where(first, np.nan, _haversine_pairs(prev_lats, prev_lons, lats, lons)).tolist()
+        d2 = d2.tolist()
+        for k, j in enumerate(batch):
+            validator = validators[k]
+            hex_id, lat, lon, ts_pos, track, speed, altitude = items[j]
+            if first[k]:
+                reason = "first_position"
+            elif reset[k]:
+                reason = "track_reset"
+            elif accepted[k]:
+                reason = "valid"
+            elif backwards[k]:
+                reason = "backwards_time"
+            elif too_frequent[k]:
+                reason = "too_frequent"
+            else:
+                reason = f"mahalanobis_{math.sqrt(d2[k]):.1f}"
+
+            if reason in ("first_position", "track_reset", "valid"):
+                segment = segments[k]
+                validator.apply_result(lat, lon, ts_pos, track, speed, altitude, True,
+                                       None if segment != segment else segment)
+                results[j] = (validator, validator.last_valid_pos, False, reason)
+            else:
+                validator.apply_result(lat, lon, ts_pos, track, speed, altitude, False)
+                _outlier_log.debug("🚫 %s: Outlier detected - %s", hex_id, reason)
+                corrected = held_pos.get(k) or (pred_lat[k], pred_lon[k])
+                results[j] = (validator, TrackPoint(float(corrected[0]), float(corrected[1]), ts_pos,
+                                                    validator.last_valid_track, validator.last_valid_speed),
+                              True, reason)
+            owners[validator.row] = validator
+            sync[validator.row] = validator.total_updates
+
+    def _predict_position(self, rows, dt):
+        """Durumu değiştirmeden dt sonraki konum tahmini"""
+        x = self.x[rows]
+        return self._to_latlon(rows, x[:, 0] + x[:, 2] * dt, x[:, 1] + x[:, 3] * dt)
+
+    def _step(self, rows, dt, lats, lons):
+        """Tahmin, kapı ve kabul edilenler için güncelleme
+
+        Returns:
+            (kabul maskesi, Mahalanobis d²)
+        """
+        settings = self.settings
+        q = settings['process_noise']
+        r = settings['measurement_sigma_km'] ** 2
+        m = len(rows)
+
+        # Tahmin: x = F x, P = F P Fᵀ + Q (beyaz gürültü ivme modeli)
+        F = np.broadcast_to(np.eye(4), (m, 4, 4)).copy()
+        F[:, 0, 2] = F[:, 1, 3] = dt
+        x = np.einsum('nij,nj->ni', F, self.x[rows])
+        P = F @ self.P[rows] @ F.transpose(0, 2, 1)
+        dt2, dt3 = dt * dt, dt * dt * dt
+        P[:, 0, 0] += q * dt3 / 3
+        P[:, 1, 1] += q * dt3 / 3
+        P[:, 0, 2] += q * dt2 / 2
+        P[:, 2, 0] += q * dt2 / 2
+        P[:, 1, 3] += q * dt2 / 2
+        P[:, 3, 1] += q * dt2 / 2
+        P[:, 2, 2] += q * dt
+        P[:, 3, 3] += q * dt
+
+        # İnovasyon ve kovaryansı (H = [I 0]); 2x2 tersi kapalı formda
+        y = self._to_plane(rows, lats, lons) - x[:, :2]
+        s00 = P[:, 0, 0] + r
+        s11 = P[:, 1, 1] + r
+        s01 = P[:, 0, 1]
+        det = s00 * s11 - s01 * s01
+        S_inv = np.empty((m, 2, 2))
+        S_inv[:, 0, 0] = s11 / det
+        S_inv[:, 1, 1] = s00 / det
+        S_inv[:, 0, 1] = S_inv[:, 1, 0] = -s01 / det
+        d2 = np.einsum('ni,nij,nj->n', y, S_inv, y)
+        accepted = d2 <= settings['gate']
+
+        # Güncelleme: K = P Hᵀ S⁻¹, x += K y, P -= K H P
+        K = P[:, :, :2] @ S_inv
+        update = np.flatnonzero(accepted)
+        x[update] += np.einsum('nij,nj->ni', K[update], y[update])
+        P[update] -= K[update] @ P[update, :2, :]
+        P = (P + P.transpose(0, 2, 1)) / 2
+
+        self.x[rows] = x
+        self.P[rows] = P
+        self.t_last[rows] = self.t_last[rows] + dt
+        self.misses[rows[update]] = 0
+        return accepted, d2
+
+    def get_statistics(self):
+        return {**self._stats, 'tracked_rows': self.capacity}
+
+
+# Singleton instance
+_kalman_tracker = None
+
+
+def get_kalman_tracker() -> FleetKalmanTracker:
+    """Global Kalman takipçisi; NumPy yoksa None"""
+    global _kalman_tracker
+    if np is None:
+        return None
+    if _kalman_tracker is None:
+        _kalman_tracker = FleetKalmanTracker()
+    return _kalman_tracker
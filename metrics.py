@@ -0,0 +1,198 @@
+# metrics.py
+"""
+Prometheus metin formatında çalışma zamanı metrikleri
+
+Tick hattının her aşaması için gecikme histogramı, sayaçlar ve scrape
+anında okunan gauge'lar. /metrics bu kayıt defterini text exposition
+formatında (0.0.4) döndürür.
+
+Kayıt maliyeti: kovalar oluşturulurken array olarak ayrılır; observe()
+sadece bisect + iki yerinde güncelleme yapar, örnek başına nesne
+saklanmaz. Çağıranlar histogram nesnesini modül seviyesinde bir kez alır
+(stage('validation')), sıcak yolda sözlük araması da yapılmaz. Her aşama
+tek bir thread'den kaydedildiği için kilit kullanılmaz.
+"""
+import json
+import threading
+from array import array
+from bisect import bisect_left
+
+# Aşama süreleri için kovalar (saniye): 0.1 ms .. 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tick hattı aşamaları (sırasıyla)
+STAGES = ('fetch', 'decode', 'normalize', 'region_filter', 'validation',
+          'trail_build', 'db_enqueue', 'serialize', 'emit')
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Sabit kovalı histogram (kovalar kümülatif değil saklanır, render'da toplanır)"""
+
+    __slots__ = ('bounds', 'counts', 'total')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = array('Q', [0] * (len(self.bounds) + 1))  # Son kova: +Inf
+        self.total = array('d', [0.0])
+
+    def observe(self, value):
+        # Prometheus 'le' (<=) semantiği: sınıra eşit değer o kovaya düşer
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total[0] += value
+
+    def samples(self):
+        """(kümülatif kova sayıları, toplam adet, toplam değer)"""
+        cumulative = []
+        running = 0
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, self.total[0]
+
+
+class Counter:
+    """Monoton artan sayaç"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = array('d', [0.0])
+
+    def inc(self, amount=1):
+        self.value[0] += amount
+
+    def get(self):
+        return self.value[0]
+
+
+class MeteredJSON:
+    """Socket.IO'ya json modülü olarak verilir: son kodlanan paketin boyutunu saklar
+
+    Socket.IO oda yayınında paketi bir kez kodlar; gönderen thread boyutu
+    emit'ten hemen sonra take_size() ile alır.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def dumps(self, obj, *args, **kwargs):
+        text = json.dumps(obj, *args, **kwargs)
+        self._local.size = len(text)
+        return text
+
+    def loads(self, *args, **kwargs):
+        return json.loads(*args, **kwargs)
+
+    def take_size(self):
+        """Bu thread'de son kodlanan paketin boyutu (okununca sıfırlanır)"""
+        size = getattr(self._local, 'size', 0)
+        self._local.size = 0
+        return size
+
+
+def _labels(label, value, extra=None):
+    parts = []
+    if label is not None:
+        parts.append(f'{label}="{value}"')
+    if extra is not None:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format(value):
+    if value == float('inf'):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Metrik aileleri ve Prometheus metin çıktısı"""
+
+    def __init__(self):
+        self._families = []  # (ad, açıklama, tip, etiket, {etiket değeri: metrik} veya fonksiyon)
+
+    def histogram(self, name, help_text, label=None, label_values=None, buckets=LATENCY_BUCKETS):
+        """Histogram ailesi oluştur
+
+        Returns:
+            Etiket yoksa Histogram, varsa {etiket değeri: Histogram} (önceden ayrılmış)
+        """
+        children = {value: Histogram(buckets) for value in (label_values if label else (None,))}
+        self._families.append((name, help_text, 'histogram', label, children))
+        return children if label else children[None]
+
+    def counter(self, name, help_text, label=None, label_values=None):
+        """Sayaç ailesi oluştur (dönüş histogram() ile aynı şekilde)"""
+        children = {value: Counter() for value in (label_values if label else (None,))}
+        self._families.append((name, help_text, 'counter', label, children))
+        return children if label else children[None]
+
+    def gauge(self, name, help_text, func, label=None):
+        """Scrape anında okunan gauge
+
+        Args:
+            func: Etiket yoksa sayı, varsa {etiket değeri: sayı} döndüren fonksiyon
+        """
+        self._families.append((name, help_text, 'gauge', label, func))
+
+    def render(self):
+        """Tüm metrikleri Prometheus text exposition formatında döndür"""
+        lines = []
+        for name, help_text, kind, label, children in self._families:
+            if kind == 'gauge':
+                try:
+                    value = children()
+                except Exception:
+                    continue  # Kaynak henüz hazır değil
+                if value is None:
+                    continue
+                children = value if label else {None: value}
+
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label_value, metric in children.items():
+                if kind == 'histogram':
+                    cumulative, count, total = metric.samples()
+                    for bound, running in zip(metric.bounds + (float('inf'),), cumulative):
+                        le = f'le="{_format(bound)}"'
+                        lines.append(f"{name}_bucket{_labels(label, label_value, le)} {running}")
+                    lines.append(f"{name}_sum{_labels(label, label_value)} {_format(total)}")
+                    lines.append(f"{name}_count{_labels(label, label_value)} {count}")
+                else:
+                    value = metric.get() if kind == 'counter' else metric
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_labels(label, label_value)} {_format(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+# Global kayıt defteri ve tick hattı metrikleri
+registry = MetricsRegistry()
+
+_stage_seconds = registry.histogram(
+    "adsb_stage_duration_seconds", "Tick hattı aşama süresi (saniye)", "stage", STAGES
+)
+tick_seconds = registry.histogram(
+    "adsb_tick_duration_seconds", "Snapshot başına toplam işleme + gönderim süresi (saniye)"
+)
+ticks_total = registry.counter("adsb_ticks_total", "İşlenen snapshot sayısı")
+emitted_bytes = registry.counter(
+    "adsb_emitted_bytes_total", "Client'lara gönderilen byte (alıcı sayısıyla çarpılmış)",
+    "format", ('json', 'binary')
+)
+emitted_messages = registry.counter(
+    "adsb_emitted_messages_total", "Client'lara gönderilen mesaj sayısı", "format", ('json', 'binary')
+)
+skipped_emits = registry.counter(
+    "adsb_skipped_emits_total", "Gönderim aralığı dolmadığı için client'a gönderilmeyen tick sayısı"
+)
+
+
+def stage(name):
+    """Aşama histogramı (modül seviyesinde bir kez alınıp tutulur)"""
+    return _stage_seconds[name]
@@ -0,0 +1,425 @@
+# pipeline.py
+"""
+Snapshot işleme hattı: normalizasyon, bölge filtresi ve pozisyon doğrulama
+
+Web uygulaması (app.py), toplu tekrar oynatma (batch_replay.py) ve seek
+aynı fonksiyonları kullanır; bu modül Flask / Socket.IO'ya bağımlı değildir.
+"""
+import time
+import zlib
+
+import config
+from event_log import get_logger
+from metrics import stage
+from utils import (debug_log, haversine_km, haversine_km_many, bounding_box_mask, np,
+                   smooth_angle, angle_difference)
+from position_validator import PositionValidator
+from kalman_tracker import get_kalman_tracker
+
+# Bu süreden uzun görülmeyen uçaklar state'ten atılır (saniye)
+STALE_AIRCRAFT_SECONDS = 600
+
+_NORMALIZE_SECONDS = stage('normalize')
+_REGION_FILTER_SECONDS = stage('region_filter')
+_VALIDATION_SECONDS = stage('validation')
+_DB_ENQUEUE_SECONDS = stage('db_enqueue')
+
+# Tembel biçimlendirmeli loglar (uçak başına mesajlar DEBUG seviyesinde)
+_log = get_logger('pipeline')
+_heading_log = get_logger('heading')
+_evict_log = get_logger('evict')
+
+# =========================
+# Bölge Filtresi
+# =========================
+def select_focus_aircraft(aircraft_list):
+    """
+    FOCUS_REGION içindeki uçakları seç ve en yakın MAX_DISPLAYED_AIRCRAFT
+    kadarını mesafeye göre sıralı döndür
+
+    NumPy varsa vektörel yol, yoksa saf Python yolu kullanılır; iki yolun
+    sonucu aynıdır (eşit mesafede orijinal sıra korunur).
+
+    Args:
+        aircraft_list: Ham uçak verisi listesi
+
+    Returns:
+        (seçilen uçaklar, bölge içindeki toplam uçak sayısı)
+    """
+    if np is not None and config.USE_VECTORIZED_FILTER:
+        return _select_focus_aircraft_numpy(aircraft_list)
+    return _select_focus_aircraft_python(aircraft_list)
+
+
+def _select_focus_aircraft_python(aircraft_list):
+    """Bölge filtresi - saf Python yolu (uçak başına Haversine + tam sıralama)"""
+    region = config.FOCUS_REGION
+
+    aircraft_with_distance = []
+    for ac in aircraft_list:
+        lat = ac.get("lat")
+        lon = ac.get("lon")
+        if lat is None or lon is None:
+            continue
+
+        distance = haversine_km(region['center_lat'], region['center_lon'], lat, lon)
+
+        if distance <= region['radius_km']:
+            aircraft_with_distance.append((distance, ac))
+
+    # Mesafeye göre sırala
+    aircraft_with_distance.sort(key=lambda x: x[0])
+    selected = [ac for _, ac in aircraft_with_distance[:config.MAX_DISPLAYED_AIRCRAFT]]
+    return selected, len(aircraft_with_distance)
+
+
+def _select_focus_aircraft_numpy(aircraft_list):
+    """Bölge filtresi - NumPy yolu (kutu ön filtresi + toplu Haversine + argpartition)"""
+    region = config.FOCUS_REGION
+    limit = config.MAX_DISPLAYED_AIRCRAFT
+
+    positioned = [
+        ac for ac in aircraft_list
+        if ac.get("lat") is not None and ac.get("lon") is not None
+    ]
+    if not positioned:
+        return [], 0
+
+    lats = np.fromiter((ac["lat"] for ac in positioned), dtype=np.float64, count=len(positioned))
+    lons = np.fromiter((ac["lon"] for ac in positioned), dtype=np.float64, count=len(positioned))
+
+    # Ucuz kutu ön filtresi, sonra sadece adaylar için Haversine
+    candidates = np.flatnonzero(bounding_box_mask(
+        region['center_lat'], region['center_lon'], lats, lons, region['radius_km']
+    ))
+    distances = haversine_km_many(
+        region['center_lat'], region['center_lon'], lats[candidates], lons[candidates]
+    )
+    inside = distances <= region['radius_km']
+    candidates = candidates[inside]
+    distances = distances[inside]
+    filtered_count = len(candidates)
+
+    if limit <= 0 or filtered_count == 0:
+        return [], filtered_count
+
+    if filtered_count > limit:
+        # Kısmi seçim: K. en küçük mesafeyi bul, eşitleri de dahil et ki
+        # kararlı sıralamayla aynı uçaklar seçilsin
+        kth = distances[np.argpartition(distances, limit - 1)[limit - 1]]
+        keep = np.flatnonzero(distances <= kth)
+        candidates = candidates[keep]
+        distances = distances[keep]
+
+    # Mesafeye göre, eşitlikte orijinal sıraya göre sırala
+    order = np.lexsort((candidates, distances))[:limit]
+    return [positioned[i] for i in candidates[order]], filtered_count
+
+
+# =========================
+# Normalizasyon
+# =========================
+def normalize_aircraft(planes):
+    """dump1090 / JSON uçak kayıtlarını ortak alan isimlerine çevir (pozisyonsuzlar atlanır)"""
+    aircraft = []
+    for a in planes:
+        if a.get("lat") is None or a.get("lon") is None:
+            continue
+
+        try:
+            # Alan isimlerini normalize et
+            altitude = a.get("altitude") or a.get("alt_baro") or a.get("alt_geom")
+            speed = a.get("speed") or a.get("gs")
+            vert_rate = a.get("baro_rate")
+            if vert_rate is None:
+                vert_rate = a.get("geom_rate")
+            if vert_rate is None:
+                vert_rate = a.get("vert_rate")
+
+            aircraft.append({
+                "hex": (a.get("hex") or "").lower(),
+                "flight": (a.get("flight") or "").strip(),
+                "altitude": altitude,
+                "speed": speed,
+                "track": a.get("track"),
+                "vert_rate": vert_rate,  # ft/dk
+                "lat": float(a.get("lat")),
+                "lon": float(a.get("lon")),
+                "seen": float(a.get("seen", 0.0)),
+                "seen_pos": a.get("seen_pos"),
+                "squawk": a.get("squawk"),
+                "type": a.get("type"),
+                "r": a.get("r"),  # Registration
+                "t": a.get("t")  # Aircraft type
+            })
+        except (ValueError, TypeError) as e:
+            debug_log(f"⚠️ Uçak verisi parse hatası: {e}", "WARNING")
+            continue
+
+    return aircraft
+
+
+def process_snapshot(raw, shard=None, pool=None):
+    """Ham snapshot'ı normalize et ve doğrula
+
+    Args:
+        raw: dump1090 formatında snapshot ({"now", "aircraft"})
+        shard: (shard no, shard sayısı) - sadece bu shard'ın uçakları doğrulanır
+        pool: ShardedValidator - doğrulama worker süreçlerinde yapılır
+
+    Returns:
+        (now, temizlenmiş uçak listesi)
+    """
+    now_val = raw.get("now", time.time())
+    started = time.perf_counter()
+    aircraft = normalize_aircraft(raw.get("aircraft", []))
+    _NORMALIZE_SECONDS.observe(time.perf_counter() - started)
+    return now_val, sanitize_aircraft_positions(now_val, aircraft, shard, pool)
+
+
+def shard_of(hex_id, shard_count):
+    """Hex ID'nin shard numarası (süreçler arasında kararlı; hash() değil)"""
+    return zlib.crc32(hex_id.encode('utf-8')) % shard_count
+
+
+# =========================
+# Ana Veri İşleme Fonksiyonu
+# =========================
+def prepare_aircraft(now_val, ac):
+    """Doğrulama girdisi: (hex, lat, lon, ts_pos, track, speed, altitude) veya eksikse None"""
+    hex_id = (ac.get("hex") or "").lower()
+    lat = ac.get("lat")
+    lon = ac.get("lon")
+
+    if not hex_id or lat is None or lon is None:
+        return None
+
+    seen = ac.get("seen", 0.0) or 0.0
+    seen_pos = ac.get("seen_pos")
+    ts_pos = (now_val - float(seen_pos)) if (seen_pos is not None) else (now_val - seen)
+    altitude = ac.get('altitude') or ac.get('alt_baro') or ac.get('alt_geom')
+    return hex_id, lat, lon, ts_pos, ac.get('track'), ac.get('speed'), altitude
+
+
+def validate_aircraft(store, hex_id, lat, lon, ts_pos, track, speed, altitude):
+    """Tek uçağın pozisyonunu doğrula ve gösterilecek heading'i belirle
+
+    Validator yoksa store içinde oluşturulur.
+
+    Returns:
+        (validator, düzeltilmiş pozisyon, düzeltildi mi, sebep, final track, heading düzeltildi mi)
+    """
+    validator = store.get(hex_id)
+    if validator is None:
+        validator = PositionValidator(hex_id, store=store)
+        store[hex_id] = validator
+
+    # Pozisyon doğrula
+    corrected_pos, was_corrected, reason = validator.add_position(
+        lat, lon, ts_pos,
+        track=track,
+        speed=speed,
+        altitude=altitude
+    )
+
+    final_track, heading_corrected = resolve_track(validator, hex_id, track)
+    return validator, corrected_pos, was_corrected, reason, final_track, heading_corrected
+
+
+def resolve_track(validator, hex_id, track):
+    """Doğrulanmış validator için gösterilecek heading'i belirle
+
+    Returns:
+        (final track, heading düzeltildi mi)
+    """
+    final_track = track
+    heading_corrected = False
+
+    if config.USE_MOVEMENT_HEADING:
+        movement_heading = validator.get_movement_heading()
+
+        if movement_heading is not None:
+            if final_track is not None:
+                heading_diff = abs(angle_difference(movement_heading, final_track))
+
+                if heading_diff > 45:
+                    _heading_log.debug("🧭 %s: Heading uyuşmazlığı %.1f°", hex_id, heading_diff)
+                    final_track = movement_heading
+                    heading_corrected = True
+                else:
+                    final_track = smooth_angle(movement_heading, final_track, 0.7)
+            else:
+                final_track = movement_heading
+
+    # Heading yumuşatma
+    if validator.last_valid_track is not None and final_track is not None:
+        final_track = smooth_angle(
+            validator.last_valid_track,
+            final_track,
+            config.TRACK_SMOOTH_ALPHA
+        )
+
+    return final_track, heading_corrected
+
+
+def validate_fleet_kalman(store, now_val, items):
+    """Tüm girdileri Kalman motoruyla toplu doğrula (validate_aircraft ile aynı sonuç şekli)"""
+    results = get_kalman_tracker().validate(store, now_val, items)
+    return [
+        (validator, corrected_pos, was_corrected, reason, *resolve_track(validator, item[0], item[4]))
+        for item, (validator, corrected_pos, was_corrected, reason) in zip(items, results)
+    ]
+
+
+def sanitize_aircraft_positions(now_val, aircraft_list, shard=None, pool=None):
+    """
+    Uçak pozisyonlarını temizle, filtrele ve doğrula
+
+    Args:
+        now_val: Şu anki timestamp
+        aircraft_list: Ham uçak verisi listesi
+        shard: (shard no, shard sayısı) verilirse bölge filtresi ve limit tüm
+            liste üzerinde uygulanır, sadece bu shard'a düşen uçaklar doğrulanır
+        pool: ShardedValidator verilirse doğrulama worker süreçlerinde yapılır
+            (VALIDATION_ENGINE='kalman' iken Kalman motoru önceliklidir, pool kullanılmaz)
+
+    Returns:
+        Temizlenmiş ve doğrulanmış uçak listesi
+    """
+    cleaned_aircraft = []
+    config._stats['total_updates'] = len(aircraft_list)
+    position_corrections = 0
+    heading_corrections = 0
+    started = time.perf_counter()
+
+    # Bölge filtresi aktifse
+    if config.FOCUS_REGION['enabled']:
+        aircraft_list, filtered_count = select_focus_aircraft(aircraft_list)
+
+        _log.info(
+            "🎯 Filtreleme: %d uçak (%d bölge içi, %d toplam)",
+            len(aircraft_list), filtered_count, config._stats['total_updates']
+        )
+    else:
+        # Sadece limit uygula
+        aircraft_list = aircraft_list[:config.MAX_DISPLAYED_AIRCRAFT]
+        _log.info("🎯 Limit uygulandı: %d uçak gösteriliyor", len(aircraft_list))
+
+    if shard is not None:
+        shard_index, shard_count = shard
+        aircraft_list = [
+            ac for ac in aircraft_list
+            if shard_of((ac.get("hex") or "").lower(), shard_count) == shard_index
+        ]
+    filtered = time.perf_counter()
+    _REGION_FILTER_SECONDS.observe(filtered - started)
+
+    # Database yazıcısı (aktifse)
+    trail_manager = None
+    if config.USE_SQLITE:
+        try:
+            from trail_manager import get_trail_manager
+            trail_manager = get_trail_manager()
+        except ImportError:
+            debug_log("⚠️ trail_manager.py bulunamadı, database desteği pasif", "WARNING")
+
+    # Doğrulama girdileri (hex / pozisyonu eksik olanlar atlanır)
+    prepared = []
+    items = []
+    for ac in aircraft_list:
+        item = prepare_aircraft(now_val, ac)
+        if item is not None:
+            prepared.append(ac)
+            items.append(item)
+
+    # Doğrulama: Kalman motoru, worker'lar veya bu süreçte kural motoru
+    # (ana süreçteki state her yolda güncel)
+    if config.VALIDATION_ENGINE == 'kalman' and get_kalman_tracker() is not None:
+        results = validate_fleet_kalman(config._aircraft_state, now_val, items)
+    elif pool is not None:
+        results = pool.validate(now_val, items)
+    else:
+        results = [validate_aircraft(config._aircraft_state, *item) for item in items]
+    _VALIDATION_SECONDS.observe(time.perf_counter() - filtered)
+    enqueue_seconds = 0.0
+
+    # Her uçak için
+    for ac, item, result in zip(prepared, items, results):
+        hex_id, _, _, ts_pos, _, _, altitude = item
+        validator, corrected_pos, was_corrected, reason, final_track, heading_corrected = result
+
+        if was_corrected:
+            position_corrections += 1
+            config._stats['position_corrections'] += 1
+            config._stats['outliers_detected'] += 1  # Düzeltme = outlier
+
+        if heading_corrected:
+            heading_corrections += 1
+            config._stats['heading_corrections'] += 1
+
+        # İzler 'update' mesajında gönderilmez; client trail_stream ile abone olur
+
+        # Database'e kaydet (aktifse) - bloklamaz, yazma arka planda yapılır
+        if (trail_manager is not None and config.AIRCRAFT_TRAIL['enabled']
+                and len(validator.position_history) > 1):
+            enqueue_started = time.perf_counter()
+            trail_manager.save_trail_point(
+                hex_id=hex_id,
+                lat=corrected_pos.lat,
+                lon=corrected_pos.lon,
+                timestamp=ts_pos,
+                altitude=altitude,
+                speed=ac.get('speed') or ac.get('gs'),
+                track=final_track,
+                flight_code=ac.get('flight'),
+                aircraft_type=ac.get('t'),
+                registration=ac.get('r')
+            )
+            enqueue_seconds += time.perf_counter() - enqueue_started
+
+        # Temiz uçak verisi
+        cleaned_aircraft.append({
+            **ac,
+            "lat": corrected_pos.lat,
+            "lon": corrected_pos.lon,
+            "track": final_track,
+            "_corrected": was_corrected,
+            "_correction_reason": reason,
+            "_movement_heading": validator.get_movement_heading(),
+            # Hareket vektörünün referans zamanı (client bu andan itibaren ileri tahmin eder)
+            "_pos_ts": round(corrected_pos.ts, 1)
+        })
+
+    # Bu tick'in noktaları tek transaction'da yazılsın
+    if trail_manager is not None:
+        enqueue_started = time.perf_counter()
+        trail_manager.end_tick()
+        _DB_ENQUEUE_SECONDS.observe(enqueue_seconds + time.perf_counter() - enqueue_started)
+
+    if position_corrections > 0 or heading_corrections > 0:
+        _log.info(
+            "📊 %d uçak işlendi, %d pozisyon, %d heading düzeltmesi",
+            len(cleaned_aircraft), position_corrections, heading_corrections
+        )
+
+    # Eski uçakları temizle (10 dakikadan eski) - sadece süresi dolan zaman kovaları taranır
+    cutoff_time = now_val - STALE_AIRCRAFT_SECONDS
+    evicted = config._aircraft_state.evict_older_than(cutoff_time)
+
+    if evicted:
+        evicted_hexes = set()
+        for validator in evicted:
+            _evict_log.debug("🗑️ Eski uçak silindi: %s", validator.hex_id)
+            config._stats['outliers_detected'] -= validator.outlier_count
+            evicted_hexes.add(validator.hex_id)
+
+        # Silinen uçaklar gönderilmez; client'lara delta'da 'removed' olarak gider
+        cleaned_aircraft = [
+            ac for ac in cleaned_aircraft
+            if (ac.get("hex") or "").lower() not in evicted_hexes
+        ]
+
+    # İstatistikler (artımlı: outliers_detected mevcut filonun toplamıdır)
+    config._stats['active_aircraft'] = len(config._aircraft_state)
+
+    return cleaned_aircraft
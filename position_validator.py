@@ -1,17 +1,33 @@
 # position_validator.py
 import math
-from collections import deque
-from utils import haversine_km, implied_speed_kts, calculate_bearing, debug_log
+from utils import haversine_km, calculate_bearing
+from fleet_store import FleetStore, PositionHistory, TrackPoint
+from event_log import get_logger
 import config
 
+_outlier_log = get_logger('outlier')
+_correction_log = get_logger('correction')
+
 
 class PositionValidator:
     """Gelişmiş pozisyon doğrulama sınıfı - KALICI İZ DESTEĞİ"""
 
-    def __init__(self, hex_id):
+    __slots__ = (
+        'hex_id', 'store', 'row', 'position_history',
+        'last_valid_pos', 'last_valid_track', 'last_valid_speed',
+        'outlier_count', 'total_updates', 'first_seen', 'last_seen',
+        '_bearing_cache'
+    )
+
+    def __init__(self, hex_id, store=None):
         self.hex_id = hex_id
-        # DENGELİ ÇÖZÜM: maxlen=200 (yeterli + performanslı)
-        self.position_history = deque(maxlen=config.POSITION_HISTORY_SIZE)
+        # Geçmiş FleetStore satırında ring buffer olarak tutulur (maxlen=POSITION_HISTORY_SIZE)
+        # store verilmezse validator'a özel tek satırlık bir depo kullanılır
+        if store is None:
+            store = FleetStore(config.POSITION_HISTORY_SIZE, capacity=1)
+        self.store = store
+        self.row = store.allocate(hex_id)
+        self.position_history = PositionHistory(store, self.row)
         self.last_valid_pos = None
         self.last_valid_track = None
         self.last_valid_speed = None
@@ -19,91 +35,112 @@ class PositionValidator:
         self.total_updates = 0
         self.first_seen = None  # İlk görülme zamanı
         self.last_seen = None  # Son görülme zamanı
+        self._bearing_cache = (0, None)  # (geçmiş sıra no, son iki noktadan bearing)
 
-    def add_position(self, lat, lon, ts, track=None, speed=None):
+    def add_position(self, lat, lon, ts, track=None, speed=None, altitude=None):
         """Pozisyon ekle ve doğrula - İZ HİÇ SİLİNMEZ!"""
         self.total_updates += 1
         self.last_seen = ts
 
-        pos = {
-            'lat': lat, 'lon': lon, 'ts': ts,
-            'track': track, 'speed': speed
-        }
+        pos = TrackPoint(lat, lon, ts, track, speed)
+        if isinstance(altitude, bool) or not isinstance(altitude, (int, float)):
+            altitude = None  # "ground" vb.
 
         if not self.position_history:
             # İlk pozisyon
             self.first_seen = ts
-            self.position_history.append(pos)
-            self.last_valid_pos = pos
-            if track is not None:
-                self.last_valid_track = track
-            if speed is not None:
-                self.last_valid_speed = speed
+            self._accept(pos, altitude)
             return pos, False, "first_position"
 
         # Outlier testi
-        is_outlier, reason = self._is_outlier(pos)
+        is_outlier, reason, distance = self._is_outlier(pos)
 
         if is_outlier:
             self.outlier_count += 1
-            debug_log(f"🚫 {self.hex_id}: Outlier detected - {reason}")
+            _outlier_log.debug("🚫 %s: Outlier detected - %s", self.hex_id, reason)
 
             # Düzeltilmiş pozisyon döndür (ama history'e ekleme!)
             corrected_pos = self._get_corrected_position(pos)
             return corrected_pos, True, reason
         else:
-            # Geçerli pozisyon - history'e ekle
-            self.position_history.append(pos)
-            self.last_valid_pos = pos
-            if track is not None:
-                self.last_valid_track = track
-            if speed is not None:
-                self.last_valid_speed = speed
+            # Geçerli pozisyon - history'e ekle (segment mesafesi tekrar hesaplanmaz)
+            self._accept(pos, altitude, distance)
             return pos, False, "valid"
 
+    def _accept(self, pos, altitude, segment_km=None):
+        """Geçerli pozisyonu geçmişe ekle ve son geçerli değerleri güncelle"""
+        self.position_history.append(pos, altitude, segment_km)
+        self.last_valid_pos = pos
+        if pos.track is not None:
+            self.last_valid_track = pos.track
+        if pos.speed is not None:
+            self.last_valid_speed = pos.speed
+
+    def apply_result(self, lat, lon, ts, track, speed, altitude, accepted, segment_km=None):
+        """Başka süreçte yapılmış add_position sonucunu uygula (outlier testi yapılmaz)
+
+        Sharded doğrulamada ana süreçteki kopya state'i worker'dakiyle aynı tutar.
+
+        Args:
+            accepted: Pozisyon geçmişe eklendi mi (False = outlier)
+            segment_km: Worker'ın hesapladığı önceki noktaya mesafe
+        """
+        self.total_updates += 1
+        self.last_seen = ts
+        if isinstance(altitude, bool) or not isinstance(altitude, (int, float)):
+            altitude = None
+
+        if not accepted:
+            self.outlier_count += 1
+            return
+        if not self.position_history:
+            self.first_seen = ts
+        self._accept(TrackPoint(lat, lon, ts, track, speed), altitude, segment_km)
+
     def _is_outlier(self, pos):
-        """Pozisyon outlier mı kontrol et"""
-        prev = self.position_history[-1]
+        """Pozisyon outlier mı kontrol et
+
+        Returns:
+            (outlier_mı, sebep, son geçerli pozisyona mesafe km veya None)
+        """
+        # Son geçerli pozisyon her zaman geçmişin son noktasıdır
+        prev = self.last_valid_pos
 
         # Zaman kontrolü
-        time_diff = pos['ts'] - prev['ts']
+        time_diff = pos.ts - prev.ts
         if time_diff <= 0:
-            return True, "backwards_time"
+            return True, "backwards_time", None
 
         if time_diff < config.MIN_TIME_DIFF:
-            return True, "too_frequent"
+            return True, "too_frequent", None
 
         # Mesafe kontrolü
-        distance = haversine_km(prev['lat'], prev['lon'], pos['lat'], pos['lon'])
+        distance = haversine_km(prev.lat, prev.lon, pos.lat, pos.lon)
 
         if distance > config.MAX_JUMP_KM:
-            return True, f"big_jump_{distance:.1f}km"
+            return True, f"big_jump_{distance:.1f}km", distance
 
-        # Hız kontrolü
-        speed_kts = implied_speed_kts(
-            prev['lat'], prev['lon'], prev['ts'],
-            pos['lat'], pos['lon'], pos['ts']
-        )
+        # Hız kontrolü (implied_speed_kts ile aynı hesap, mesafe tekrar hesaplanmaz)
+        speed_kts = (distance * 3600.0) / time_diff / 1.852
 
         if speed_kts > config.MAX_SPEED_KTS:
-            return True, f"overspeed_{speed_kts:.0f}kts"
+            return True, f"overspeed_{speed_kts:.0f}kts", distance
 
         # İleri seviye outlier detection (3+ pozisyon varsa)
         if len(self.position_history) >= 3:
-            recent_positions = list(self.position_history)[-3:]
-            avg_lat = sum(p['lat'] for p in recent_positions) / 3
-            avg_lon = sum(p['lon'] for p in recent_positions) / 3
+            # Son 3 nokta: kopyasız görünüm üzerinden ortalama
+            avg_lat, avg_lon = self.position_history.last(3).centroid()
 
-            outlier_dist = haversine_km(avg_lat, avg_lon, pos['lat'], pos['lon'])
+            outlier_dist = haversine_km(avg_lat, avg_lon, pos.lat, pos.lon)
 
             if self.last_valid_speed:
                 expected_max_dist = (self.last_valid_speed * 0.514444 * time_diff) / 1000
                 expected_max_dist *= config.OUTLIER_SPEED_MULTIPLIER
 
                 if outlier_dist > max(config.OUTLIER_DISTANCE_KM, expected_max_dist):
-                    return True, f"pattern_outlier_{outlier_dist:.1f}km"
+                    return True, f"pattern_outlier_{outlier_dist:.1f}km", distance
 
-        return False, "valid"
+        return False, "valid", distance
 
     def _get_corrected_position(self, outlier_pos):
         """Outlier pozisyon için düzeltme yap"""
@@ -113,80 +150,71 @@ class PositionValidator:
         # Velocity-based prediction
         if len(self.position_history) >= 2 and self.last_valid_speed:
             prev1 = self.position_history[-2]
-            prev2 = self.position_history[-1]
+            prev2 = self.last_valid_pos
 
-            dt = prev2['ts'] - prev1['ts']
+            dt = prev2.ts - prev1.ts
             if dt > 0:
-                bearing = calculate_bearing(prev1['lat'], prev1['lon'], prev2['lat'], prev2['lon'])
+                bearing = calculate_bearing(prev1.lat, prev1.lon, prev2.lat, prev2.lon)
 
                 if bearing is not None:
-                    time_since_last = outlier_pos['ts'] - prev2['ts']
+                    time_since_last = outlier_pos.ts - prev2.ts
                     distance_km = (self.last_valid_speed * 0.514444 * time_since_last) / 1000
 
-                    lat_rad = math.radians(prev2['lat'])
+                    lat_rad = math.radians(prev2.lat)
                     bearing_rad = math.radians(bearing)
 
                     # Yeni pozisyon hesapla
-                    new_lat = prev2['lat'] + (distance_km / 111.32) * math.cos(bearing_rad)
-                    new_lon = prev2['lon'] + (distance_km / (111.32 * math.cos(lat_rad))) * math.sin(bearing_rad)
+                    new_lat = prev2.lat + (distance_km / 111.32) * math.cos(bearing_rad)
+                    new_lon = prev2.lon + (distance_km / (111.32 * math.cos(lat_rad))) * math.sin(bearing_rad)
 
-                    debug_log(f"🔧 {self.hex_id}: Pozisyon velocity ile tahmin edildi")
+                    _correction_log.debug("🔧 %s: Pozisyon velocity ile tahmin edildi", self.hex_id)
 
-                    return {
-                        'lat': new_lat,
-                        'lon': new_lon,
-                        'ts': outlier_pos['ts'],
-                        'track': self.last_valid_track,
-                        'speed': self.last_valid_speed
-                    }
+                    return TrackPoint(
+                        new_lat, new_lon, outlier_pos.ts,
+                        self.last_valid_track, self.last_valid_speed
+                    )
 
         # Fallback: son geçerli pozisyonu döndür
-        return {
-            **self.last_valid_pos,
-            'ts': outlier_pos['ts']
-        }
+        return self.last_valid_pos.replace(ts=outlier_pos.ts)
 
     def get_movement_heading(self):
-        """Gerçek hareket yönünü hesapla"""
-        if len(self.position_history) < 2:
+        """Gerçek hareket yönü (son iki pozisyon) - O(1), yeni nokta gelene kadar önbellekte"""
+        history = self.position_history
+        if len(history) < 2:
             return self.last_valid_track
 
-        # Son iki pozisyondan bearing hesapla
-        p1 = self.position_history[-2]
-        p2 = self.position_history[-1]
-
-        distance = haversine_km(p1['lat'], p1['lon'], p2['lat'], p2['lon'])
+        appended = history.appended
+        cached_at, bearing = self._bearing_cache
+        if cached_at != appended:
+            # Son segment mesafesi append sırasında saklandı; tekrar hesaplanmaz
+            bearing = None
+            if history.last_segment_km() >= config.HEADING_CONFIDENCE_THRESHOLD:
+                p1 = history[-2]
+                p2 = self.last_valid_pos
+                bearing = calculate_bearing(p1.lat, p1.lon, p2.lat, p2.lon)
+            self._bearing_cache = (appended, bearing)
 
-        if distance >= config.HEADING_CONFIDENCE_THRESHOLD:
-            return calculate_bearing(p1['lat'], p1['lon'], p2['lat'], p2['lon'])
-
-        return self.last_valid_track
+        return bearing if bearing is not None else self.last_valid_track
 
     def get_trail_points(self, max_points=None):
         """İz noktalarını getir - TÜM NOKTALARI SAKLADIĞIMIZ İÇİN"""
         if max_points is None:
             max_points = config.AIRCRAFT_TRAIL['max_points']
 
-        # Son N noktayı döndür
-        all_points = list(self.position_history)
-        if len(all_points) <= max_points:
-            return all_points
-        else:
-            # En son max_points kadarını al
-            return all_points[-max_points:]
+        # Son N noktaya kopyasız görünüm (HistoryView)
+        return self.position_history.last(max_points)
 
     def get_total_distance(self):
-        """Toplam kat edilen mesafe (km)"""
-        if len(self.position_history) < 2:
-            return 0.0
+        """Geçmişteki toplam kat edilen mesafe (km) - O(1), ring buffer'dan düşen segmentler hariç"""
+        return self.position_history.distance_km()
 
-        total = 0.0
-        for i in range(1, len(self.position_history)):
-            p1 = self.position_history[i - 1]
-            p2 = self.position_history[i]
-            total += haversine_km(p1['lat'], p1['lon'], p2['lat'], p2['lon'])
+    def get_average_speed(self):
+        """Geçmişteki ortalama hız (kts) - O(1)"""
+        return self.position_history.average_speed()
 
-        return total
+    def get_altitude_range(self):
+        """Geçmişteki (min, max) irtifa (ft) - O(1)"""
+        return self.position_history.altitude_range()
 
     def get_flight_duration(self):
         """Uçuş süresi (saniye)"""
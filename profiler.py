@@ -0,0 +1,351 @@
+# profiler.py
+"""
+Feed thread'i için profil yüzeyi
+
+1) İsteğe bağlı profil oturumu (admin API ile başlatılır/durdurulur):
+   - 'sampling': ayrı bir thread feed thread'inin yığınını sabit aralıkla
+     örnekler (sys._current_frames); sonuç katlanmış yığın (folded stack)
+     metnidir, flamegraph.pl / speedscope ile açılır. Ek yük ~%1'in altında.
+   - 'cprofile': feed thread'i tick başında/sonunda cProfile'ı açıp kapatır
+     (cProfile sadece etkinleştiren thread'i izler); sonuç pstats metni.
+
+2) Yavaş tick watchdog'u: her tick boyunca feed thread'i düşük frekansta
+   örneklenir; tick bütçeyi aşarsa o tick'in tüm örnekleri uçak sayısıyla
+   birlikte saklanır (son K tick), aşmazsa atılır. Böylece yavaşlığın
+   olduğu tick'in tamamı görülür, sadece bütçe aşıldıktan sonraki kısmı değil.
+
+Feed döngüleri tick_started() / tick_finished(aircraft_count) çağırır.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+import config
+from utils import debug_log
+
+MODES = ('sampling', 'cprofile')
+# pstats sıralama anahtarları (SortKey değerleri + eski kısaltmalar)
+SORT_KEYS = frozenset(key.value for key in pstats.SortKey) | frozenset(pstats.Stats.sort_arg_dict_default)
+
+
+def _frame_label(code, cache):
+    label = cache.get(code)
+    if label is None:
+        label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        cache[code] = label
+    return label
+
+
+def folded_stack(frame, cache):
+    """Frame'den köke kadar yığını 'kök;...;yaprak' metnine çevir"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code, cache))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def format_folded(counts):
+    """{yığın: adet} -> katlanmış yığın metni (en sık önce)"""
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+class _Session:
+    """Tek profil oturumu"""
+
+    def __init__(self, mode, seconds, interval):
+        self.mode = mode
+        self.seconds = seconds
+        self.interval = interval
+        self.started = time.time()
+        self.ends_at = time.monotonic() + seconds
+        self.finished = None
+        self.samples = Counter()
+        self.sample_count = 0
+        self.profile = cProfile.Profile() if mode == 'cprofile' else None
+        self.profile_enabled = False
+        self.stop_requested = False
+        self.ticks = 0
+
+    def expired(self):
+        return self.stop_requested or time.monotonic() >= self.ends_at
+
+    def to_dict(self):
+        return {
+            'mode': self.mode,
+            'seconds': self.seconds,
+            'interval_ms': round(self.interval * 1000, 2),
+            'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'finished': (datetime.fromtimestamp(self.finished).isoformat(timespec='seconds')
+                         if self.finished else None),
+            'samples': self.sample_count,
+            'ticks': self.ticks
+        }
+
+
+class FeedProfiler:
+    """Feed thread'i profil oturumları ve yavaş tick watchdog'u"""
+
+    def __init__(self, settings=None):
+        settings = settings or config.PROFILING
+        self.settings = settings
+        self.budget = settings['slow_tick_ms'] / 1000.0
+        self.watchdog_interval = settings['watchdog_interval_ms'] / 1000.0
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._cache = {}
+        self._feed_thread = None
+        self._tick_started = None
+        self._tick_samples = Counter()
+        self._tick_sample_count = 0
+
+        self._session = None
+        self._last_result = None  # Biten son oturum
+        self.slow_ticks = deque(maxlen=settings['slow_tick_keep'])
+        self._stats = {'ticks': 0, 'slow_ticks': 0, 'max_tick_ms': 0.0}
+
+        self._sampler = threading.Thread(target=self._run_sampler, name="feed-profiler", daemon=True)
+        self._sampler.start()
+
+    # -------------------------
+    # Feed thread'i kancaları
+    # -------------------------
+    def tick_started(self):
+        """Tick başında feed thread'inden çağrılır"""
+        with self._lock:
+            self._feed_thread = threading.get_ident()
+            self._tick_samples = Counter()
+            self._tick_sample_count = 0
+            self._tick_started = time.perf_counter()
+
+            session = self._session
+            if session is not None and session.mode == 'cprofile':
+                if session.expired():
+                    self._finish_session()
+                else:
+                    session.profile.enable()
+                    session.profile_enabled = True
+        self._wake.set()
+
+    def tick_finished(self, aircraft_count=0):
+        """Tick sonunda feed thread'inden çağrılır; bütçeyi aşan tick'in profili saklanır"""
+        with self._lock:
+            started = self._tick_started
+            if started is None:
+                return
+            elapsed = time.perf_counter() - started
+            self._tick_started = None
+
+            session = self._session
+            if session is not None:
+                session.ticks += 1
+                if session.profile_enabled:
+                    session.profile.disable()
+                    session.profile_enabled = False
+                if session.expired():
+                    self._finish_session()
+
+            self._stats['ticks'] += 1
+            self._stats['max_tick_ms'] = max(self._stats['max_tick_ms'], elapsed * 1000)
+            if self.settings['watchdog'] and elapsed > self.budget:
+                self._stats['slow_ticks'] += 1
+                self.slow_ticks.append({
+                    'time': datetime.now().isoformat(timespec='seconds'),
+                    'duration_ms': round(elapsed * 1000, 2),
+                    'budget_ms': round(self.budget * 1000, 2),
+                    'aircraft': aircraft_count,
+                    'samples': self._tick_sample_count,
+                    'interval_ms': round(self.watchdog_interval * 1000, 2),
+                    'stacks': self._tick_samples
+                })
+                slow = True
+            else:
+                slow = False
+            self._tick_samples = Counter()
+
+        if slow:
+            debug_log(
+                f"🐢 Yavaş tick: {elapsed * 1000:.0f} ms (bütçe {self.budget * 1000:.0f} ms, "
+                f"{aircraft_count} uçak) - profil saklandı", "WARNING"
+            )
+
+    # -------------------------
+    # Örnekleyici thread
+    # -------------------------
+    def _run_sampler(self):
+        while True:
+            with self._lock:
+                session = self._session
+                sampling = session is not None and session.mode == 'sampling'
+                if sampling and session.expired():
+                    self._finish_session()
+                    sampling = False
+                elif (session is not None and session.mode == 'cprofile'
+                      and not session.profile_enabled and session.expired()):
+                    # Feed durmuşken süresi dolan cProfile oturumu (tick kancaları çalışmıyor)
+                    self._finish_session()
+                in_tick = self._tick_started is not None and self.settings['watchdog']
+                thread_id = self._feed_thread
+                interval = session.interval if sampling else self.watchdog_interval
+
+            if not sampling and not in_tick:
+                # Yapacak iş yok: tick veya oturum başlayana kadar uyu
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+
+            frame = sys._current_frames().get(thread_id) if thread_id is not None else None
+            if frame is not None:
+                stack = folded_stack(frame, self._cache)
+                del frame
+                with self._lock:
+                    if in_tick and self._tick_started is not None:
+                        self._tick_samples[stack] += 1
+                        self._tick_sample_count += 1
+                    session = self._session
+                    if sampling and session is not None and session.mode == 'sampling':
+                        session.samples[stack] += 1
+                        session.sample_count += 1
+
+            time.sleep(interval)
+
+    # -------------------------
+    # Oturum yönetimi (admin API)
+    # -------------------------
+    def start(self, seconds=None, mode='sampling', interval_ms=None):
+        """Profil oturumu başlat
+
+        Raises:
+            ValueError: Geçersiz parametre veya zaten çalışan oturum
+        """
+        if mode not in MODES:
+            raise ValueError(f"Geçersiz mod: {mode!r} ({', '.join(MODES)})")
+        seconds = float(seconds if seconds is not None else self.settings['default_seconds'])
+        if not 0 < seconds <= self.settings['max_seconds']:
+            raise ValueError(f"Süre 0-{self.settings['max_seconds']} saniye arasında olmalı")
+        interval_ms = float(interval_ms if interval_ms is not None else self.settings['sample_interval_ms'])
+        if interval_ms < 1:
+            raise ValueError("Örnekleme aralığı en az 1 ms olmalı")
+
+        with self._lock:
+            if self._session is not None:
+                raise ValueError("Profil oturumu zaten çalışıyor")
+            self._session = _Session(mode, seconds, interval_ms / 1000.0)
+        self._wake.set()
+        debug_log(f"🔬 Profil oturumu başladı ({mode}, {seconds:.0f} s)")
+        return self.get_status()
+
+    def stop(self):
+        """Çalışan oturumu bitir (cProfile tick ortasındaysa tick sonunda biter)"""
+        with self._lock:
+            session = self._session
+            if session is None:
+                raise ValueError("Çalışan profil oturumu yok")
+            session.stop_requested = True
+            if not session.profile_enabled:
+                self._finish_session()
+        return self.get_status()
+
+    def _finish_session(self):
+        """Oturumu sonuçlandır (kilit tutulurken çağrılır)"""
+        session = self._session
+        session.finished = time.time()
+        self._session = None
+        self._last_result = session
+        debug_log(f"🔬 Profil oturumu bitti ({session.mode}, {session.sample_count} örnek, {session.ticks} tick)")
+
+    def result(self, fmt=None):
+        """Son biten oturumun sonucu
+
+        Args:
+            fmt: cprofile sıralama anahtarı (varsayılan 'cumulative')
+
+        Returns:
+            (metin, dosya adı) veya oturum yoksa None
+
+        Raises:
+            ValueError: Geçersiz sıralama anahtarı
+        """
+        sort = fmt or 'cumulative'
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Geçersiz sıralama: {sort!r} ({', '.join(sorted(SORT_KEYS))})")
+
+        with self._lock:
+            session = self._last_result
+        if session is None:
+            return None
+
+        stamp = datetime.fromtimestamp(session.started).strftime('%Y%m%d_%H%M%S')
+        if session.mode == 'sampling':
+            return format_folded(session.samples), f"profile_{stamp}.folded"
+
+        out = io.StringIO()
+        try:
+            stats = pstats.Stats(session.profile, stream=out)
+        except TypeError:
+            # Oturum boyunca hiç tick işlenmedi: cProfile boş
+            return (f"Profil örneği yok (cprofile oturumu {session.ticks} tick gördü)\n",
+                    f"profile_{stamp}.txt")
+        stats.sort_stats(sort).print_stats(80)
+        return out.getvalue(), f"profile_{stamp}.txt"
+
+    def slow_tick_profile(self, index):
+        """index. yavaş tick'in katlanmış yığın metni (0 = en yeni)"""
+        with self._lock:
+            ticks = list(self.slow_ticks)
+        if not 0 <= index < len(ticks):
+            return None
+        tick = ticks[-1 - index]
+        return format_folded(tick['stacks']), f"slow_tick_{tick['time'].replace(':', '')}.folded"
+
+    def get_slow_ticks(self, top=5):
+        """Saklanan yavaş tick'lerin özeti (en yeni önce, en sık yığın yaprakları ile)"""
+        with self._lock:
+            ticks = list(self.slow_ticks)
+        summary = []
+        for index, tick in enumerate(reversed(ticks)):
+            summary.append({
+                'index': index,
+                **{k: v for k, v in tick.items() if k != 'stacks'},
+                'top_frames': [
+                    {'frame': stack.rsplit(';', 1)[-1], 'samples': count}
+                    for stack, count in tick['stacks'].most_common(top)
+                ]
+            })
+        return summary
+
+    def get_status(self):
+        with self._lock:
+            session = self._session
+            last = self._last_result
+            return {
+                'running': session.to_dict() if session is not None else None,
+                'last_result': last.to_dict() if last is not None else None,
+                'watchdog': {
+                    'enabled': self.settings['watchdog'],
+                    'budget_ms': round(self.budget * 1000, 2),
+                    'stored': len(self.slow_ticks),
+                    **self._stats,
+                    'max_tick_ms': round(self._stats['max_tick_ms'], 2)
+                }
+            }
+
+
+# Singleton instance
+_profiler = None
+
+
+def get_profiler() -> FeedProfiler:
+    """Global profiler'ı döndür (ilk çağrıda örnekleyici thread başlar)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = FeedProfiler()
+    return _profiler
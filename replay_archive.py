@@ -0,0 +1,545 @@
+# replay_archive.py
+"""
+Tek dosyalık, indeksli tekrar oynatma arşivi
+
+Binlerce adsb_data_N.json dosyasını açılışta glob'layıp sıralamak yerine
+kayıtlar tek bir eklenebilir dosyada tutulur:
+
+    <arşiv>        : header (magic "ADSBAR", version u8, codec u8)
+                     + art arda sıkıştırılmış snapshot kayıtları
+    <arşiv>.idx    : header (magic "ADSBIX", version u8, 0)
+                     + kayıt başına (now f64, offset u64, length u32)
+
+İndeks 'now' değerine göre sıralıdır (yazıcı bunu zorunlu kılar). Okuyucu
+iki dosyayı da mmap ile açar; açılış maliyeti kayıt sayısından bağımsızdır
+ve bir zamana atlamak indeks üzerinde ikili arama (O(log n)) ile yapılır.
+Önce veri, sonra indeks yazıldığı için yarım kalan son kayıt görünmez.
+İndeks silinmiş veya boşsa yazıcı veri dosyasını tarayıp yeniden oluşturur.
+
+Kullanım:
+    python replay_archive.py convert json_files replay.adsbarc
+    python replay_archive.py info replay.adsbarc
+"""
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import config
+from json_reader import JSONDataReader, get_decoder, read_snapshot_bytes
+from metrics import stage
+from utils import debug_log
+
+try:
+    import zstandard
+except ImportError:  # zstd codec'i için gerekli, yoksa zlib kullanılır
+    zstandard = None
+
+VERSION = 1
+
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+CODEC_NAMES = {'zlib': CODEC_ZLIB, 'zstd': CODEC_ZSTD}
+
+DATA_HEADER = struct.Struct('<6sBB')
+INDEX_HEADER = struct.Struct('<6sBB')
+INDEX_ENTRY = struct.Struct('<dQI')
+DATA_MAGIC = b"ADSBAR"
+INDEX_MAGIC = b"ADSBIX"
+SCAN_CHUNK = 64 * 1024  # İndeks yeniden oluşturulurken okuma parçası
+
+_FETCH_SECONDS = stage('fetch')  # Kaydı okuma + açma
+_DECODE_SECONDS = stage('decode')
+
+
+def index_path(path: Path) -> Path:
+    """Arşivin indeks dosyası (<arşiv>.idx)"""
+    return path.with_name(path.name + '.idx')
+
+
+def _compressor(codec, level):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard paketi kurulu değil (zstd codec'i kullanılamaz)")
+        return zstandard.ZstdCompressor(level=level).compress
+    return lambda raw: zlib.compress(raw, level)
+
+
+def _decompressor(codec):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard paketi kurulu değil (zstd arşivi okunamaz)")
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+def _decompressobj(codec):
+    """Akış açıcı (kayıt sınırını bulmak için: eof + unused_data)"""
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard paketi kurulu değil (zstd arşivi okunamaz)")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        if not hasattr(decompressor, 'unused_data'):
+            raise ValueError("Bu zstandard sürümü kayıt sınırlarını bildirmiyor (indeks yeniden oluşturulamaz)")
+        return decompressor
+    return zlib.decompressobj()
+
+
+def scan_records(path: Path, codec: int):
+    """Veri dosyasındaki tam kayıtları baştan tara (indeks kayıp/bozuksa)
+
+    Kayıtlar çerçevesiz art arda sıkıştırılmış bloklar olduğundan sınırlar
+    açıcının artakalan byte'larından bulunur. Yarım kalan son kayıtta durulur.
+
+    Yields:
+        (offset, length, açılmış byte'lar)
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= DATA_HEADER.size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = memoryview(data)
+            offset = DATA_HEADER.size
+            try:
+                while offset < size:
+                    decompressor = _decompressobj(codec)
+                    parts = []
+                    pos = offset
+                    try:
+                        # Parça parça besle: unused_data en fazla bir parça kadar kopyalanır
+                        while not decompressor.eof and pos < size:
+                            end = min(pos + SCAN_CHUNK, size)
+                            parts.append(decompressor.decompress(view[pos:end]))
+                            pos = end
+                    except (zlib.error, ValueError) as e:
+                        debug_log(f"⚠️ Arşiv taraması @{offset} konumunda durdu: {e}", "WARNING")
+                        break
+                    if not decompressor.eof:
+                        break  # Yarım yazılmış son kayıt
+                    length = pos - offset - len(decompressor.unused_data)
+                    yield offset, length, b''.join(parts)
+                    offset += length
+            finally:
+                view.release()
+
+
+class ArchiveWriter:
+    """Arşive snapshot ekler (yoksa oluşturur)
+
+    Örnek:
+        with ArchiveWriter(path) as writer:
+            writer.append(raw_json_bytes, now)
+    """
+
+    def __init__(self, path: Path, codec: str = 'zlib', level: int = 6):
+        self.path = Path(path)
+        self.index_path = index_path(self.path)
+
+        existing = self.path.exists() and self.path.stat().st_size >= DATA_HEADER.size
+        self._data = open(self.path, 'ab')
+        self._index = open(self.index_path, 'ab')
+
+        if existing:
+            try:
+                self._resume()
+            except Exception:
+                self.close()
+                raise
+        else:
+            self.codec = CODEC_NAMES[codec]
+            self._data.truncate(0)
+            self._index.truncate(0)
+            self._data.write(DATA_HEADER.pack(DATA_MAGIC, VERSION, self.codec))
+            self._index.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, 0))
+            self.count = 0
+            self.last_now = None
+
+        self._compress = _compressor(self.codec, level)
+
+    def _resume(self):
+        """Mevcut arşive devam: codec ve son 'now' değerini oku"""
+        with open(self.path, 'rb') as f:
+            magic, version, self.codec = DATA_HEADER.unpack(f.read(DATA_HEADER.size))
+        if magic != DATA_MAGIC or version != VERSION:
+            raise ValueError(f"Geçersiz arşiv: {self.path}")
+        if self._index.tell() < INDEX_HEADER.size:
+            self._rebuild_index()  # İndeks silinmiş / boş: veri dosyasından yeniden oluştur
+        self._check_index_header()
+        self._truncate_partial_index()
+        self.count = (self._index.tell() - INDEX_HEADER.size) // INDEX_ENTRY.size
+        self.last_now, end = self._read_last_entry()
+        if self._data.tell() > end:
+            # İndekse girmemiş (yarım yazılmış) veri: sonraki kayıtlar bitişik kalsın
+            self._data.truncate(end)
+            self._data.seek(0, os.SEEK_END)
+
+    def _check_index_header(self):
+        with open(self.index_path, 'rb') as f:
+            header = f.read(INDEX_HEADER.size)
+        magic, version, _ = INDEX_HEADER.unpack(header)
+        if magic != INDEX_MAGIC or version != VERSION:
+            raise ValueError(f"Geçersiz arşiv indeksi: {self.index_path}")
+
+    def _rebuild_index(self):
+        """Veri dosyasını tarayıp indeksi baştan yaz; yarım son kaydı veriden at"""
+        _, decode = get_decoder(config.JSON_DECODER)
+        entries = []
+        end = DATA_HEADER.size
+        for offset, length, raw in scan_records(self.path, self.codec):
+            try:
+                now = float(decode(raw)['now'])
+            except (ValueError, TypeError, KeyError) as e:
+                raise ValueError(f"İndeks yeniden oluşturulamadı ({self.path}, kayıt @{offset}): {e}") from e
+            if entries and now < entries[-1][0]:
+                raise ValueError(f"İndeks yeniden oluşturulamadı ({self.path}): zaman sırası bozuk @{offset}")
+            entries.append((now, offset, length))
+            end = offset + length
+
+        self._data.truncate(end)
+        self._data.seek(0, os.SEEK_END)
+        self._index.truncate(0)
+        self._index.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, 0))
+        for entry in entries:
+            self._index.write(INDEX_ENTRY.pack(*entry))
+        self._index.flush()
+        debug_log(f"🔧 Arşiv indeksi yeniden oluşturuldu: {self.index_path.name} ({len(entries)} kayıt)", "WARNING")
+
+    def _truncate_partial_index(self):
+        """Yarım yazılmış son indeks girdisini at"""
+        size = self._index.tell()
+        extra = (size - INDEX_HEADER.size) % INDEX_ENTRY.size
+        if extra:
+            self._index.truncate(size - extra)
+            self._index.seek(0, os.SEEK_END)
+
+    def _read_last_entry(self):
+        """(son 'now', son kaydın bittiği veri konumu)"""
+        if self.count == 0:
+            return None, DATA_HEADER.size
+        with open(self.index_path, 'rb') as f:
+            f.seek(INDEX_HEADER.size + (self.count - 1) * INDEX_ENTRY.size)
+            now, offset, length = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+        return now, offset + length
+
+    def append(self, raw: bytes, now: float):
+        """Ham JSON snapshot'ını ekle
+
+        Raises:
+            ValueError: 'now' bir önceki kayıttan küçükse (indeks sıralı kalmalı)
+        """
+        now = float(now)
+        if self.last_now is not None and now < self.last_now:
+            raise ValueError(f"Snapshot zamanı geriye gidiyor: {now} < {self.last_now}")
+
+        record = self._compress(raw)
+        offset = self._data.tell()
+        self._data.write(record)
+        self._data.flush()
+        self._index.write(INDEX_ENTRY.pack(now, offset, len(record)))
+        self._index.flush()
+
+        self.count += 1
+        self.last_now = now
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayArchive:
+    """mmap tabanlı arşiv okuyucu (rastgele erişim)"""
+
+    def __init__(self, path: Path, decoder: str = None):
+        self.path = Path(path)
+        self.index_path = index_path(self.path)
+        self.decoder_name, self._decode = get_decoder(decoder or config.JSON_DECODER)
+        self._data = None
+        self._index = None
+        self._count = 0
+
+        with open(self.path, 'rb') as f:
+            magic, version, codec = DATA_HEADER.unpack(f.read(DATA_HEADER.size))
+        if magic != DATA_MAGIC or version != VERSION:
+            raise ValueError(f"Geçersiz arşiv: {self.path}")
+        self.codec = codec
+        self._decompress = _decompressor(codec)
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Dosyaları yeniden eşle (arşive kayıt eklendiyse görünür olur)
+
+        Returns:
+            Kayıt sayısı
+        """
+        self.close()
+        with open(self.index_path, 'rb') as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _ = INDEX_HEADER.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC or version != VERSION:
+            raise ValueError(f"Geçersiz arşiv indeksi: {self.index_path}")
+
+        count = (len(self._index) - INDEX_HEADER.size) // INDEX_ENTRY.size
+        # Veri dosyasına henüz tam yazılmamış kayıtları sayma
+        while count and sum(self._entry(count - 1)[1:]) > len(self._data):
+            count -= 1
+        self._count = count
+        return count
+
+    def close(self):
+        for mapped in (self._index, self._data):
+            if mapped is not None:
+                mapped.close()
+        self._index = self._data = None
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, i):
+        return INDEX_ENTRY.unpack_from(self._index, INDEX_HEADER.size + i * INDEX_ENTRY.size)
+
+    def timestamp(self, i) -> float:
+        """i. kaydın 'now' değeri"""
+        return self._entry(i)[0]
+
+    def find(self, now: float) -> int:
+        """'now' değeri verilen zamana eşit/büyük ilk kaydın indeksi (ikili arama)"""
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._entry(mid)[0] < now:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def read_raw(self, i) -> bytes:
+        """i. kaydın açılmış JSON byte'ları"""
+        _, offset, length = self._entry(i)
+        return self._decompress(self._data[offset:offset + length])
+
+    def read(self, i) -> Dict:
+        """i. kaydı decode edilmiş olarak döndür"""
+        return self._decode(self.read_raw(i))
+
+    def get_info(self) -> Dict:
+        info = {
+            "path": str(self.path),
+            "snapshots": self._count,
+            "codec": 'zstd' if self.codec == CODEC_ZSTD else 'zlib',
+            "size_bytes": len(self._data) + len(self._index)
+        }
+        if self._count:
+            info["first_now"] = self.timestamp(0)
+            info["last_now"] = self.timestamp(self._count - 1)
+        return info
+
+
+class ArchiveDataReader:
+    """JSONDataReader ile aynı arayüzde arşiv okuyucu (feed_from_json için)"""
+
+    def __init__(self, path: Path, decoder: str = None):
+        self.path = Path(path)
+        self.archive = None
+        self.current_index = 0
+        self.decoder_name = None
+        self._stats_lock = threading.Lock()
+        self._decode_stats = {'files': 0, 'bytes': 0, 'seconds': 0.0}
+
+        try:
+            self.archive = ReplayArchive(self.path, decoder)
+            self.decoder_name = self.archive.decoder_name
+            debug_log(f"✅ Arşiv açıldı: {self.path.name} ({len(self.archive)} snapshot, "
+                      f"decoder: {self.decoder_name})")
+        except (OSError, ValueError, struct.error) as e:
+            debug_log(f"❌ Arşiv açılamadı ({self.path}): {e}", "ERROR")
+
+    @property
+    def total(self):
+        return len(self.archive) if self.archive is not None else 0
+
+    def read_next_data(self) -> Optional[Dict]:
+        """Sıradaki snapshot'ı oku"""
+        if not self.total:
+            debug_log("❌ Okunacak snapshot yok", "ERROR")
+            return None
+
+        if self.current_index >= self.total:
+            return None
+
+        try:
+            read_started = time.perf_counter()
+            raw = self.archive.read_raw(self.current_index)
+            started = time.perf_counter()
+            data = self.archive._decode(raw)
+            elapsed = time.perf_counter() - started
+            _FETCH_SECONDS.observe(started - read_started)
+            _DECODE_SECONDS.observe(elapsed)
+        except Exception as e:
+            # zlib.error, zstd hataları, decoder ValueError'ları (JSONDataReader._load gibi)
+            debug_log(f"❌ Arşiv kaydı okunamadı (#{self.current_index}): {e}", "ERROR")
+            self.current_index += 1
+            if self.current_index < self.total:
+                return self.read_next_data()
+            return None
+
+        with self._stats_lock:
+            self._decode_stats['files'] += 1
+            self._decode_stats['bytes'] += len(raw)
+            self._decode_stats['seconds'] += elapsed
+
+        self.current_index += 1
+
+        # Döngü kontrolü (JSONDataReader ile aynı davranış)
+        if self.current_index >= self.total and self.archive.refresh() <= self.current_index:
+            if config.JSON_LOOP:
+                debug_log("🔄 Arşiv başa sarıldı")
+                self.current_index = 0
+            else:
+                debug_log("⏹️ Arşivdeki tüm snapshot'lar okundu")
+                return None
+
+        return data
+
+    def iter_snapshots(self, start: int = 0):
+        """Tüm snapshot'ları sırayla decode ederek üret (toplu işleme için)"""
+        for index in range(start, self.total):
+            try:
+                yield self.archive.read(index)
+            except Exception as e:
+                debug_log(f"❌ Arşiv kaydı okunamadı (#{index}): {e}", "ERROR")
+
+    def timestamp(self, index) -> Optional[float]:
+        """index numaralı snapshot'ın 'now' değeri"""
+        return self.archive.timestamp(index) if 0 <= index < self.total else None
+
+    def find(self, now: float) -> int:
+        """'now' değeri verilen zamana eşit/büyük ilk snapshot'ın indeksi (O(log n))"""
+        return self.archive.find(now) if self.total else 0
+
+    def seek_index(self, index: int) -> int:
+        """Okumayı index numaralı snapshot'tan sürdür
+
+        Returns:
+            Yeni konum (sınırlara sıkıştırılmış)
+        """
+        self.current_index = min(max(0, index), max(0, self.total - 1))
+        return self.current_index
+
+    def seek(self, now: float) -> int:
+        """Verilen zamandaki (veya sonraki ilk) snapshot'a atla"""
+        index = self.seek_index(self.find(now))
+        debug_log(f"⏩ Arşivde {now} zamanına atlandı (#{index})")
+        return index
+
+    def get_decode_throughput(self) -> Dict:
+        """Decoder verimi (sadece decode süresi üzerinden)"""
+        with self._stats_lock:
+            files = self._decode_stats['files']
+            size = self._decode_stats['bytes']
+            seconds = self._decode_stats['seconds']
+
+        return {
+            "decoder": self.decoder_name,
+            "files_decoded": files,
+            "files_per_sec": round(files / seconds, 1) if seconds > 0 else 0,
+            "mb_per_sec": round(size / (1024 * 1024) / seconds, 1) if seconds > 0 else 0
+        }
+
+    def get_progress(self) -> Dict:
+        """İlerleme bilgisi"""
+        total = self.total
+        if not total:
+            return {"current": 0, "total": 0, "percent": 0}
+
+        return {
+            "current": self.current_index,
+            "total": total,
+            "percent": (self.current_index / total) * 100,
+            "archive": self.path.name,
+            **self.get_decode_throughput()
+        }
+
+    def reset(self):
+        """Başa sar"""
+        self.current_index = 0
+        debug_log("🔄 Arşiv okuyucu sıfırlandı")
+
+
+def convert_directory(json_dir: Path, archive_path: Path, codec: str = 'zlib', level: int = 6) -> int:
+    """adsb_data_N.json[.gz|.zst] dizinini arşive çevir
+
+    Parse edilemeyen veya 'now' alanı olmayan dosyalar atlanır.
+
+    Returns:
+        Yazılan snapshot sayısı
+    """
+    reader = JSONDataReader(Path(json_dir), prefetch=False)
+    _, decode = get_decoder(config.JSON_DECODER)
+    written = 0
+
+    with ArchiveWriter(Path(archive_path), codec=codec, level=level) as writer:
+        for path in reader.json_files:
+            try:
+                raw = read_snapshot_bytes(path)
+                now = decode(raw).get('now')
+            except (OSError, RuntimeError, ValueError) as e:
+                debug_log(f"⚠️ Atlandı ({path.name}): {e}", "WARNING")
+                continue
+            if now is None:
+                debug_log(f"⚠️ Atlandı ({path.name}): 'now' alanı eksik", "WARNING")
+                continue
+
+            try:
+                writer.append(raw, now)
+            except ValueError as e:
+                debug_log(f"⚠️ Atlandı ({path.name}): {e}", "WARNING")
+                continue
+            written += 1
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İndeksli tekrar oynatma arşivi")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="JSON dizinini arşive çevir (varsa sonuna ekler)")
+    convert.add_argument("json_dir", type=Path)
+    convert.add_argument("archive", type=Path)
+    convert.add_argument("--codec", choices=sorted(CODEC_NAMES), default='zlib')
+    convert.add_argument("--level", type=int, default=6)
+
+    info = sub.add_parser("info", help="Arşiv bilgisi")
+    info.add_argument("archive", type=Path)
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        started = time.perf_counter()
+        written = convert_directory(args.json_dir, args.archive, args.codec, args.level)
+        elapsed = time.perf_counter() - started
+        print(f"✅ {written} snapshot yazıldı: {args.archive} ({elapsed:.1f} s)")
+    else:
+        archive = ReplayArchive(args.archive)
+        for key, value in archive.get_info().items():
+            print(f"   {key}: {value}")
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
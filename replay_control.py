@@ -0,0 +1,137 @@
+# replay_control.py
+"""
+Tekrar oynatmada zamana atlama (seek) için filo state checkpoint'leri
+
+Oynatma sırasında her N snapshot'ta bir config._aircraft_state ve sayaçlar
+serileştirilip saklanır (anahtar: okuyucunun sıradaki snapshot indeksi).
+Seek hedefe en yakın önceki checkpoint'i geri yükler ve sadece aradaki
+snapshot'ları pipeline'dan geçirir; baştan tekrar oynatmaya gerek kalmaz.
+
+Checkpoint'ler sadece baştan kesintisiz oynatılmış state'ten alınır (başa
+sarma/döngü sonrası state geçmişi eksik olabilir). Sayı max_checkpoints'i
+aşınca her ikinci checkpoint atılır ve aralık iki katına çıkar.
+"""
+import bisect
+import pickle
+import threading
+import time
+import zlib
+
+import config
+from fleet_store import FleetStore
+from utils import debug_log
+
+# Checkpoint'e giren sayaçlar (data_source gibi sabitler hariç)
+CHECKPOINT_STATS = ('total_updates', 'outliers_detected', 'position_corrections',
+                    'heading_corrections', 'active_aircraft')
+
+
+class ReplayController:
+    """Checkpoint deposu ve oynatma kilidi (feed döngüsü ile seek aynı anda çalışmaz)"""
+
+    def __init__(self, interval=None, max_checkpoints=None):
+        settings = config.REPLAY_CHECKPOINTS
+        self.enabled = settings['enabled']
+        self.interval = max(1, interval or settings['interval'])
+        self.max_checkpoints = max(2, max_checkpoints or settings['max_checkpoints'])
+        self.lock = threading.RLock()
+
+        self._checkpoints = {}  # snapshot indeksi -> sıkıştırılmış pickle
+        self._indices = []  # sıralı anahtarlar
+        self._consistent = True  # State baştan kesintisiz oynatıldı mı?
+        self._last_index = 0
+        self._capture_seconds = 0.0
+        self._captures = 0
+
+    # -------------------------
+    # Checkpoint alma
+    # -------------------------
+    def after_tick(self, index):
+        """Snapshot işlendi; okuyucu artık 'index' numaralı snapshot'ta
+
+        Aralık dolduysa ve bu indeks için checkpoint yoksa state'i kaydet.
+        """
+        if index < self._last_index:
+            self._consistent = False  # Döngü başa sardı: state eski turu içeriyor
+        self._last_index = index
+
+        if (not self.enabled or not self._consistent or index == 0
+                or index % self.interval or index in self._checkpoints):
+            return
+        self.capture(index)
+
+    def capture(self, index):
+        """Mevcut filo state'ini 'index' anahtarıyla kaydet"""
+        started = time.perf_counter()
+        stats = {name: config._stats[name] for name in CHECKPOINT_STATS}
+        blob = zlib.compress(
+            pickle.dumps((config._aircraft_state, stats), pickle.HIGHEST_PROTOCOL), 1
+        )
+
+        self._checkpoints[index] = blob
+        bisect.insort(self._indices, index)
+        self._capture_seconds += time.perf_counter() - started
+        self._captures += 1
+
+        if len(self._indices) > self.max_checkpoints:
+            self._thin()
+
+    def _thin(self):
+        """Her ikinci checkpoint'i at, aralığı iki katına çıkar"""
+        self.interval *= 2
+        for index in [i for i in self._indices if i % self.interval]:
+            del self._checkpoints[index]
+        self._indices = [i for i in self._indices if i in self._checkpoints]
+        debug_log(f"🗜️ Checkpoint aralığı {self.interval} snapshot'a çıkarıldı")
+
+    def invalidate(self):
+        """State artık baştan kesintisiz oynatılmış değil (ör. başa sarıldı, state korundu)"""
+        self._consistent = False
+
+    # -------------------------
+    # Geri yükleme
+    # -------------------------
+    def nearest(self, index):
+        """index'ten küçük/eşit en yakın checkpoint indeksi (yoksa 0 = boş state)"""
+        pos = bisect.bisect_right(self._indices, index)
+        return self._indices[pos - 1] if pos else 0
+
+    def can_continue(self, current, target):
+        """Mevcut state'ten ileri sarmak checkpoint yüklemekten ucuz mu?"""
+        return self._consistent and self.nearest(target) <= current <= target
+
+    def restore(self, index):
+        """index'teki checkpoint'i (0 ise boş state'i) config'e yükle"""
+        blob = self._checkpoints.get(index)
+        if blob is None:
+            store = FleetStore(config.POSITION_HISTORY_SIZE)
+            stats = {name: 0 for name in CHECKPOINT_STATS}
+        else:
+            store, stats = pickle.loads(zlib.decompress(blob))
+
+        config._aircraft_state = store
+        config._stats.update(stats)
+        self._consistent = True
+        self._last_index = index
+
+    def get_statistics(self):
+        return {
+            'enabled': self.enabled,
+            'checkpoints': len(self._indices),
+            'interval': self.interval,
+            'size_mb': round(sum(len(b) for b in self._checkpoints.values()) / (1024 * 1024), 2),
+            'avg_capture_ms': round(self._capture_seconds * 1000 / self._captures, 2) if self._captures else 0,
+            'consistent': self._consistent
+        }
+
+
+# Singleton instance
+_replay_controller = None
+
+
+def get_replay_controller() -> ReplayController:
+    """Global replay controller instance'ını döndür"""
+    global _replay_controller
+    if _replay_controller is None:
+        _replay_controller = ReplayController()
+    return _replay_controller
@@ -0,0 +1,275 @@
+# sharded_validation.py
+"""
+Canlı mod için çok süreçli (sharded) pozisyon doğrulama
+
+Uçaklar hex ID'ye göre (crc32 % N) worker süreçlerine bölünür. Her worker
+kendi shard'ının PositionValidator state'ini tutar ve tick başına sadece
+kompakt tuple'lar alır/döndürür:
+
+    girdi : (hex, lat, lon, ts, track, speed, altitude)
+    çıktı : (lat, lon, düzeltildi mi, sebep, final track, heading düzeltildi mi, segment km)
+
+Ana süreç sonuçları birleştirir ve kendi filo state'ine (config._aircraft_state)
+outlier testi yapmadan uygular. Kabul edilen noktalar FleetStore.append_many
+ile sütunlara toplu yazılır; uçak başına sadece validator alanları güncellenir.
+Böylece iz abonelikleri, /api/stats ve en yakın havaalanı gibi okuyucular
+değişmeden çalışır; bir worker çökerse veya SHARDED_VALIDATION['reply_timeout']
+içinde yanıt vermezse doğrulama bu state ile tek sürece geri döner.
+
+Ölçeklenme sınırı: bölme, pickle ve bu ayna ana süreçte seri kalır
+(get_statistics: avg_main_ms vs avg_worker_ms). Kazanç yaklaşık
+tick / (ana süreç + en yavaş worker) ile sınırlıdır, çekirdek sayısıyla
+doğrusal değildir (bkz. PERFORMANCE.md).
+"""
+import multiprocessing
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy yoksa ayna uçak başına apply_result ile yapılır
+    np = None
+
+import config
+from fleet_store import FleetStore, TrackPoint
+from pipeline import STALE_AIRCRAFT_SECONDS, shard_of, validate_aircraft
+from position_validator import PositionValidator
+from utils import debug_log
+
+
+def _config_snapshot():
+    """Worker'lara aktarılacak ayarlar (spawn ile başlayan süreç config'i baştan yükler)"""
+    return {
+        name: value for name, value in vars(config).items()
+        if name.isupper() and isinstance(value, (bool, int, float, str, dict))
+    }
+
+
+def _worker_main(conn, settings):
+    """Worker süreci: kendi shard'ının state'i ile doğrulama döngüsü"""
+    for name, value in settings.items():
+        setattr(config, name, value)
+    store = FleetStore(config.POSITION_HISTORY_SIZE)
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        cutoff, items = message
+        started = time.process_time()  # CPU süresi: aynı çekirdeği paylaşan worker'lar şişirmesin
+        results = []
+        for item in items:
+            validator, pos, was_corrected, reason, final_track, heading_corrected = \
+                validate_aircraft(store, *item)
+            segment_km = None if was_corrected else validator.position_history.last_segment_km()
+            results.append((pos.lat, pos.lon, was_corrected, reason, final_track, heading_corrected, segment_km))
+
+        store.evict_older_than(cutoff)
+        conn.send((time.process_time() - started, results))
+
+    conn.close()
+
+
+class ShardedValidator:
+    """Worker süreç havuzu (sanitize_aircraft_positions'a pool olarak verilir)"""
+
+    def __init__(self, workers=None, start_method=None):
+        settings = config.SHARDED_VALIDATION
+        self.workers = max(1, workers or settings['workers'])
+        context = multiprocessing.get_context(start_method or settings['start_method'])
+
+        self._conns = []
+        self._processes = []
+        snapshot = _config_snapshot()
+        for i in range(self.workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main, args=(child_conn, snapshot),
+                name=f"validator-shard-{i}", daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+        self.reply_timeout = settings.get('reply_timeout', 5.0)
+        self.broken = False
+        self._validators = {}  # hex -> ana süreçteki validator (depodan atılınca geçersiz)
+        self._lock = threading.Lock()
+        self._stats = {'ticks': 0, 'aircraft': 0, 'seconds': 0.0, 'worker_seconds': 0.0,
+                       'main_seconds': 0.0, 'last_shard_sizes': []}
+        debug_log(f"🧩 Sharded doğrulama başlatıldı ({self.workers} worker)")
+
+    def validate(self, now_val, items):
+        """Tick'in uçaklarını worker'larda doğrula, sonuçları ana state'e uygula
+
+        Args:
+            items: prepare_aircraft çıktıları
+
+        Returns:
+            validate_aircraft ile aynı formatta sonuç listesi (girdi sırasıyla)
+        """
+        if self.broken:
+            return [validate_aircraft(config._aircraft_state, *item) for item in items]
+
+        started = time.perf_counter()
+        main_started = time.thread_time()  # Ana sürecin seri CPU süresi (bölme + pickle + ayna)
+        shards = [[] for _ in range(self.workers)]
+        positions = [[] for _ in range(self.workers)]
+        for i, item in enumerate(items):
+            shard = shard_of(item[0], self.workers)
+            shards[shard].append(item)
+            positions[shard].append(i)
+
+        cutoff = now_val - STALE_AIRCRAFT_SECONDS
+        try:
+            for conn, shard_items in zip(self._conns, shards):
+                conn.send((cutoff, shard_items))
+            main_seconds = time.thread_time() - main_started
+            replies = []
+            deadline = time.monotonic() + self.reply_timeout
+            for conn in self._conns:
+                # Takılan (ölmeyen) worker feed thread'ini sonsuza kadar bekletmesin
+                if not conn.poll(max(0.0, deadline - time.monotonic())):
+                    raise TimeoutError(f"{self.reply_timeout:.1f} sn içinde yanıt yok")
+                replies.append(conn.recv())
+        except (EOFError, OSError) as e:  # TimeoutError, OSError alt sınıfı
+            # Ana state son tick'e kadar güncel: tek süreçle devam et
+            debug_log(f"❌ Doğrulama worker'ı yanıt vermedi, tek sürece dönülüyor: {e}", "ERROR")
+            self.close()
+            self.broken = True
+            return [validate_aircraft(config._aircraft_state, *item) for item in items]
+        received = time.thread_time()
+
+        results = self._mirror(items, positions, [reply for _, reply in replies])
+
+        main_seconds += time.thread_time() - received
+        with self._lock:
+            self._stats['ticks'] += 1
+            self._stats['aircraft'] += len(items)
+            self._stats['seconds'] += time.perf_counter() - started
+            self._stats['worker_seconds'] += max((seconds for seconds, _ in replies), default=0.0)
+            self._stats['main_seconds'] += main_seconds
+            self._stats['last_shard_sizes'] = [len(shard) for shard in shards]
+        return results
+
+    def _mirror(self, items, positions, replies):
+        """Worker sonuçlarını ana süreçteki filo state'ine uygula
+
+        Kabul edilen noktalar satır başına tek seferde append_many ile yazılır;
+        aynı tick'te tekrar eden hex'lerin sonraki noktaları ve NumPy yoksa
+        tüm noktalar apply_result ile tek tek uygulanır.
+
+        Returns:
+            validate_aircraft ile aynı formatta sonuç listesi (girdi sırasıyla)
+        """
+        store = config._aircraft_state
+        cache = self._validators
+        results = [None] * len(items)
+        bulk = []  # (satır, lat, lon, ts, track, speed, altitude, segment) - None -> NaN
+        seen_rows = set()
+        deferred = []  # (validator, apply_result argümanları) - toplu yazımdan sonra sırayla
+
+        for shard_positions, reply in zip(positions, replies):
+            for i, (lat, lon, was_corrected, reason, final_track, heading_corrected, segment_km) \
+                    in zip(shard_positions, reply):
+                hex_id, in_lat, in_lon, ts, track, speed, altitude = items[i]
+                validator = cache.get(hex_id)
+                if validator is None or validator.store is not store:
+                    validator = store.get(hex_id)
+                    if validator is None:
+                        validator = PositionValidator(hex_id, store=store)
+                        store[hex_id] = validator
+                    cache[hex_id] = validator
+
+                # Toplu yazımda satır başına tek nokta; segmenti bilinmeyen nokta append'de hesaplanır
+                row = validator.row
+                if np is None or row in seen_rows or (segment_km is None and not was_corrected):
+                    seen_rows.add(row)
+                    deferred.append((validator, (in_lat, in_lon, ts, track, speed, altitude,
+                                                 not was_corrected, segment_km)))
+                    results[i] = (validator, TrackPoint(lat, lon, ts), was_corrected, reason,
+                                  final_track, heading_corrected)
+                    continue
+                seen_rows.add(row)
+
+                # apply_result'ın validator alanları (geçmiş sütunları aşağıda toplu)
+                validator.total_updates += 1
+                validator.last_seen = ts
+                if was_corrected:
+                    validator.outlier_count += 1
+                    results[i] = (validator, TrackPoint(lat, lon, ts), was_corrected, reason,
+                                  final_track, heading_corrected)
+                    continue
+                if isinstance(altitude, bool) or not isinstance(altitude, (int, float)):
+                    altitude = None
+                if not validator.position_history:
+                    validator.first_seen = ts
+                point = TrackPoint(in_lat, in_lon, ts, track, speed)
+                validator.last_valid_pos = point
+                if track is not None:
+                    validator.last_valid_track = track
+                if speed is not None:
+                    validator.last_valid_speed = speed
+                bulk.append((row, in_lat, in_lon, ts, track, speed, altitude, segment_km))
+                results[i] = (validator, point, was_corrected, reason, final_track, heading_corrected)
+
+        if bulk:
+            columns = np.array(bulk, dtype=np.float64).T
+            store.append_many(columns[0].astype(np.int64), *columns[1:])
+        for validator, args in deferred:
+            validator.apply_result(*args)
+
+        # Depodan atılmış uçakların önbellek girdileri
+        if len(cache) > 2 * len(store) + 1024:
+            self._validators = {hex_id: v for hex_id, v in cache.items() if v.store is store}
+        return results
+
+    def close(self, timeout=2.0):
+        """Worker'ları durdur"""
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                # Takılı (örn. durdurulmuş) süreçte SIGTERM beklemede kalabilir
+                process.kill()
+                process.join(timeout)
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._processes = []
+
+    def get_statistics(self):
+        with self._lock:
+            ticks = self._stats['ticks']
+            return {
+                'workers': self.workers,
+                'alive': sum(1 for p in self._processes if p.is_alive()),
+                'fallback': self.broken,
+                'ticks': ticks,
+                'avg_tick_ms': round(self._stats['seconds'] * 1000 / ticks, 2) if ticks else 0,
+                # Seri kısım (bölme + gönderme + ayna) ve en yavaş worker'ın doğrulama süresi
+                'avg_main_ms': round(self._stats['main_seconds'] * 1000 / ticks, 2) if ticks else 0,
+                'avg_worker_ms': round(self._stats['worker_seconds'] * 1000 / ticks, 2) if ticks else 0,
+                'last_shard_sizes': list(self._stats['last_shard_sizes'])
+            }
+
+
+# Singleton instance
+_sharded_validator = None
+
+
+def get_sharded_validator() -> ShardedValidator:
+    """Global worker havuzunu döndür (ilk çağrıda süreçler başlar)"""
+    global _sharded_validator
+    if _sharded_validator is None:
+        _sharded_validator = ShardedValidator()
+    return _sharded_validator
@@ -0,0 +1,106 @@
+# spatial_grid.py
+"""
+Uniform enlem/boylam grid'i ile basit mekansal indeks
+
+Her tick'te uçak listesinden yeniden kurulur; bounding box sorguları sadece
+kutuyla kesişen hücrelere bakar, tüm listeyi taramaz.
+"""
+import math
+
+
+def normalize_lon(lon):
+    """Boylamı [-180, 180) aralığına getir"""
+    return ((lon + 180.0) % 360.0) - 180.0
+
+
+class SpatialGrid:
+    """Sabit boyutlu hücrelerden oluşan enlem/boylam grid'i
+
+    Hücre anahtarı (floor(lat / cell_deg), floor(lon / cell_deg)) ikilisidir.
+    Sadece dolu hücreler saklanır.
+    """
+
+    __slots__ = ('cell_deg', 'cells', 'size')
+
+    def __init__(self, cell_deg=1.0):
+        self.cell_deg = float(cell_deg)
+        self.cells = {}  # (lat_idx, lon_idx) -> [(lat, lon, item), ...]
+        self.size = 0
+
+    @classmethod
+    def build(cls, items, cell_deg=1.0, coords=None):
+        """Liste üzerinden grid kur
+
+        Args:
+            items: Eklenecek nesneler
+            cell_deg: Hücre boyutu (derece)
+            coords: item -> (lat, lon) fonksiyonu (varsayılan: item['lat'], item['lon'])
+        """
+        grid = cls(cell_deg)
+        for item in items:
+            if coords is None:
+                lat, lon = item.get('lat'), item.get('lon')
+            else:
+                lat, lon = coords(item)
+            if lat is None or lon is None:
+                continue
+            grid.insert(lat, lon, item)
+        return grid
+
+    def insert(self, lat, lon, item):
+        """Tek nesne ekle"""
+        lon = normalize_lon(lon)
+        key = (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = bucket = []
+        bucket.append((lat, lon, item))
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def query_bbox(self, south, west, north, east):
+        """Kutunun içindeki nesneleri döndür
+
+        west > east ise kutu antimeridyeni geçiyor kabul edilir. Boylam
+        aralığı 360°'yi kapsıyorsa boylam filtresi uygulanmaz.
+        """
+        if east - west >= 360.0:
+            lon_ranges = [(-180.0, 180.0)]
+        else:
+            west, east = normalize_lon(west), normalize_lon(east)
+            if west <= east:
+                lon_ranges = [(west, east)]
+            else:
+                lon_ranges = [(west, 180.0), (-180.0, east)]
+
+        result = []
+        for lon_min, lon_max in lon_ranges:
+            self._collect(south, lon_min, north, lon_max, result)
+        return result
+
+    def _collect(self, south, west, north, east, result):
+        cell = self.cell_deg
+        lat_lo, lat_hi = math.floor(south / cell), math.floor(north / cell)
+        lon_lo, lon_hi = math.floor(west / cell), math.floor(east / cell)
+
+        # Kutu dolu hücre sayısından genişse dolu hücreleri taramak daha ucuz
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > len(self.cells):
+            buckets = [
+                bucket for (lat_idx, lon_idx), bucket in self.cells.items()
+                if lat_lo <= lat_idx <= lat_hi and lon_lo <= lon_idx <= lon_hi
+            ]
+        else:
+            cells = self.cells
+            buckets = []
+            for lat_idx in range(lat_lo, lat_hi + 1):
+                for lon_idx in range(lon_lo, lon_hi + 1):
+                    bucket = cells.get((lat_idx, lon_idx))
+                    if bucket is not None:
+                        buckets.append(bucket)
+
+        for bucket in buckets:
+            for lat, lon, item in bucket:
+                if south <= lat <= north and west <= lon <= east:
+                    result.append(item)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+AirportIndex Testi
+
+Grid sorguları (nearest, within_radius, nearest_many) rastgele havaalanları
+üzerinde kaba kuvvet haversine taramasıyla karşılaştırılır. Kutuplar,
+antimeridyen ve boş hücreler (açık deniz) özellikle denenir.
+"""
+
+import random
+
+import numpy as np
+
+from airport_index import AirportIndex
+from utils import haversine_km
+
+
+def _random_index(n=400, seed=7, cell_deg=1.0):
+    rng = random.Random(seed)
+    lats, lons, records = [], [], []
+    for i in range(n):
+        # Kümeler (Avrupa benzeri yoğun bölge) + dünya geneli + kutup/antimeridyen
+        if i % 3 == 0:
+            lat, lon = rng.uniform(36, 42), rng.uniform(26, 45)
+        elif i % 17 == 0:
+            lat, lon = rng.uniform(80, 90), rng.uniform(-180, 180)
+        elif i % 19 == 0:
+            lat, lon = rng.uniform(-60, 60), rng.choice((rng.uniform(175, 180), rng.uniform(-180, -175)))
+        else:
+            lat, lon = rng.uniform(-85, 85), rng.uniform(-180, 180)
+        lats.append(lat)
+        lons.append(lon)
+        records.append((f"T{i:03d}", f"Test {i}", "", "", "small_airport"))
+    return AirportIndex(lats, lons, [0] * n, records, cell_deg=cell_deg)
+
+
+def _brute_force(index, lat, lon):
+    """(mesafe, kayıt indeksi) listesi, yakından uzağa"""
+    return sorted(
+        (haversine_km(lat, lon, float(index.lats[i]), float(index.lons[i])), i)
+        for i in range(len(index))
+    )
+
+
+def _queries(seed=11, n=150):
+    rng = random.Random(seed)
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(n)]
+    points += [(89.9, 10.0), (-89.9, -120.0), (0.0, 179.99), (0.0, -179.99), (0.0, -30.0)]
+    return points
+
+
+def test_nearest_matches_brute_force():
+    index = _random_index()
+    for lat, lon in _queries():
+        expected = _brute_force(index, lat, lon)[:5]
+        result = index.nearest(lat, lon, k=5)
+        assert len(result) == 5
+        for (i, dist), (exp_dist, _) in zip(result, expected):
+            assert abs(dist - exp_dist) < 1e-6, (lat, lon, result, expected)
+            assert abs(haversine_km(lat, lon, float(index.lats[i]), float(index.lons[i])) - dist) < 1e-6
+
+
+def test_within_radius_matches_brute_force():
+    index = _random_index()
+    for lat, lon in _queries():
+        for radius_km in (0.0, 50.0, 300.0, 1500.0):
+            expected = [(d, i) for d, i in _brute_force(index, lat, lon) if d <= radius_km]
+            result = index.within_radius(lat, lon, radius_km)
+            assert sorted(i for i, _ in result) == sorted(i for _, i in expected), (lat, lon, radius_km)
+            assert [d for _, d in result] == sorted(d for _, d in result)
+
+
+def test_within_radius_empty_cells():
+    """Taranan tüm hücreler boşsa hata değil boş liste"""
+    index = AirportIndex([41.0], [29.0], [0], [("LTFM", "İstanbul", "", "IST", "large_airport")])
+    assert index.within_radius(0.0, -30.0, 50.0) == []
+    assert index.within_radius(0.0, -30.0, 50.0, limit=3) == []
+    assert index.nearest(0.0, -30.0, k=3, max_km=50.0) == []
+
+    import airports
+    assert airports.get_nearest_airports(0.0, -30.0, k=5, radius_km=50) == []
+
+
+def test_nearest_many_matches_brute_force():
+    index = _random_index()
+    points = _queries(seed=23, n=300)
+    result_idx, result_dist = index.nearest_many([p[0] for p in points], [p[1] for p in points])
+    for (lat, lon), i, dist in zip(points, result_idx, result_dist):
+        exp_dist, _ = _brute_force(index, lat, lon)[0]
+        assert i >= 0
+        assert abs(dist - exp_dist) < 1e-6, (lat, lon, dist, exp_dist)
+    assert np.all(np.isfinite(result_dist))
+
+
+if __name__ == '__main__':
+    for test in (
+        test_nearest_matches_brute_force,
+        test_within_radius_matches_brute_force,
+        test_within_radius_empty_cells,
+        test_nearest_many_matches_brute_force,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
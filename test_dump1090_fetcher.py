@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Dump1090Fetcher Testi
+
+Gerçek dump1090 yerine yerel bir HTTP sunucusu (aircraft.json, ETag,
+Last-Modified, gzip, keep-alive) kullanır.
+"""
+
+import gzip
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dump1090_fetcher import Dump1090Fetcher
+
+
+class FakeDump1090:
+    """aircraft.json sunan yerel test sunucusu"""
+
+    def __init__(self):
+        self.snapshot = {"now": 1000.0, "aircraft": []}
+        self.version = 1
+        self.modified = time.time()
+        self.requests = 0
+        self.connections = set()
+        self.gzip_responses = 0
+        self.not_modified = 0
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_GET(self):
+                fake.requests += 1
+                fake.connections.add(self.client_address)
+                etag = f'"v{fake.version}"'
+                last_modified = formatdate(fake.modified, usegmt=True)
+
+                if self.headers.get("If-None-Match") == etag:
+                    fake.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                body = json.dumps(fake.snapshot).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    body = gzip.compress(body)
+                    fake.gzip_responses += 1
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/data/aircraft.json"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def update(self, snapshot):
+        """Yeni snapshot yayınla (yeni ETag)"""
+        self.snapshot = snapshot
+        self.version += 1
+        self.modified = time.time()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _aircraft(now, n=3):
+    return {
+        "now": now,
+        "aircraft": [
+            {"hex": f"abc{i:03d}", "lat": 41.0 + i * 0.01, "lon": 29.0, "seen": 0.1}
+            for i in range(n)
+        ]
+    }
+
+
+def test_conditional_requests_and_keepalive():
+    """304 ve aynı 'now' alanı snapshot üretmez; bağlantı tekrar kullanılır"""
+    fake = FakeDump1090()
+    fetcher = Dump1090Fetcher(url=fake.url, interval=0.05, timeout=2)
+    try:
+        fake.update(_aircraft(1000.0))
+        first = fetcher.fetch_once()
+        assert first is not None and first["now"] == 1000.0
+        assert len(first["aircraft"]) == 3
+        assert fake.gzip_responses == 1
+
+        # Değişmemiş: sunucu 304 döner
+        assert fetcher.fetch_once() is None
+        assert fake.not_modified == 1
+
+        # Yeni ETag ama aynı 'now': atlanır
+        fake.update(_aircraft(1000.0))
+        assert fetcher.fetch_once() is None
+
+        fake.update(_aircraft(1001.0, n=5))
+        second = fetcher.fetch_once()
+        assert second is not None and len(second["aircraft"]) == 5
+
+        stats = fetcher.get_statistics()
+        assert stats["requests"] == 4
+        assert stats["not_modified"] == 1
+        assert stats["unchanged_now"] == 1
+        assert stats["snapshots"] == 2
+
+        # Keep-alive: tüm istekler tek TCP bağlantısından
+        assert len(fake.connections) == 1, fake.connections
+    finally:
+        fetcher.session.close()
+        fake.close()
+
+
+def test_background_thread_keeps_latest():
+    """Fetch thread'i işlemeden bağımsız çalışır; işleme en yeni snapshot'ı alır"""
+    fake = FakeDump1090()
+    fetcher = Dump1090Fetcher(url=fake.url, interval=0.02, timeout=2)
+    fake.update(_aircraft(1000.0))
+    fetcher.start()
+    try:
+        assert fetcher.get(timeout=2)["now"] == 1000.0
+
+        # İşleme yavaşken birden fazla snapshot gelir; sadece sonuncusu kalır
+        for now in (1001.0, 1002.0, 1003.0):
+            fake.update(_aircraft(now))
+            time.sleep(0.1)
+
+        latest = fetcher.get(timeout=2)
+        assert latest["now"] == 1003.0, latest["now"]
+        assert fetcher.get_statistics()["dropped"] >= 1
+    finally:
+        fetcher.stop()
+        fake.close()
+
+
+def test_connection_errors_are_counted():
+    """Erişilemeyen sunucu hata sayacını artırır, thread çalışmaya devam eder"""
+    fake = FakeDump1090()
+    url = fake.url
+    fake.close()
+
+    fetcher = Dump1090Fetcher(url=url, interval=0.01, timeout=0.5, max_errors=100)
+    fetcher.start()
+    try:
+        time.sleep(0.3)
+        assert fetcher.is_alive()
+        assert fetcher.get_statistics()["errors"] >= 1
+        assert fetcher.get(timeout=0.05) is None
+    finally:
+        fetcher.stop()
+
+
+def test_non_object_body_is_rejected():
+    """Geçerli ama nesne olmayan JSON (null, liste) ValueError olur; thread ölmez"""
+    fake = FakeDump1090()
+    fetcher = Dump1090Fetcher(url=fake.url, interval=0.02, timeout=2, max_errors=100)
+    try:
+        for body in (None, [], [{"hex": "abc001"}], {"now": 1.0, "aircraft": None}):
+            fake.update(body)
+            try:
+                fetcher.fetch_once()
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"ValueError bekleniyordu: {body!r}")
+
+        # Arka plan thread'i hatalı gövdelerden sonra da çalışır ve toparlanır
+        fake.update(None)
+        fetcher.start()
+        time.sleep(0.2)
+        assert fetcher.is_alive()
+        assert fetcher.get_statistics()["errors"] >= 1
+
+        fake.update(_aircraft(1005.0))
+        snapshot = fetcher.get(timeout=2)
+        assert snapshot is not None and snapshot["now"] == 1005.0
+    finally:
+        fetcher.stop()
+        fake.close()
+
+
+if __name__ == '__main__':
+    for test in (
+        test_conditional_requests_and_keepalive,
+        test_background_thread_keeps_latest,
+        test_connection_errors_are_counted,
+        test_non_object_body_is_rejected,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+event_log Testi
+
+Kategori hız sınırı ve bastırılan mesajların tek satırlık raporu, '%'
+biçimlendirmesinin yazıcı thread'inde yapılması, kapalı seviyenin kuyruğa
+hiç dokunmaması ve recent_events / /api/logs filtreleri.
+"""
+
+import threading
+import time
+
+import app
+import event_log
+from event_log import DEBUG, WARNING, CategoryLogger
+
+
+class _Levels:
+    """Seviyeleri geçici olarak değiştir"""
+
+    def __init__(self, level, quiet_level=None):
+        self.levels = (level, quiet_level or level)
+
+    def __enter__(self):
+        self._saved = event_log._thresholds
+        event_log.set_level(*self.levels)
+
+    def __exit__(self, *exc):
+        event_log._thresholds = self._saved
+
+
+class _Probe:
+    """Biçimlendirildiği thread'i kaydeden argüman"""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return "probe"
+
+
+def _messages(category, since=None):
+    event_log.flush()
+    return [event['message'] for event in event_log.recent_events(0, category=category, since=since)]
+
+
+def test_rate_limit_reports_suppressed_count():
+    logger = CategoryLogger('test-rate', rate=3)
+    with _Levels('DEBUG'):
+        for i in range(10):
+            logger.info("mesaj %d", i)
+        assert logger._limiter.suppressed == 7
+        assert _messages('test-rate') == ["mesaj 0", "mesaj 1", "mesaj 2"]
+
+        # Kova doldu: bastırılanlar tek satırla raporlanır, sonra mesajın kendisi
+        logger._limiter.updated -= 1.0
+        logger.warning("mesaj %d", 10)
+        assert logger._limiter.suppressed == 0
+        assert _messages('test-rate')[3:] == ["⏸️ [test-rate] 7 mesaj bastırıldı (hız sınırı)", "mesaj 10"]
+        assert [event['level'] for event in event_log.recent_events(2, category='test-rate')] == ['WARNING'] * 2
+
+    # Sınırsız kategori
+    unlimited = CategoryLogger('test-unlimited', rate=0)
+    with _Levels('DEBUG'):
+        for i in range(50):
+            unlimited.debug("mesaj %d", i)
+        assert len(_messages('test-unlimited')) == 50
+
+
+def test_lazy_formatting_on_writer_thread():
+    logger = CategoryLogger('test-lazy', rate=0)
+    probe = _Probe()
+    with _Levels('DEBUG'):
+        logger.info("uçak %s: %.1f km", probe, 12.34)
+        logger.info("eksik argüman %s %s", "tek")  # Biçimlendirme hatası mesajı düşürmez
+        assert _messages('test-lazy') == ["uçak probe: 12.3 km", "eksik argüman %s %s ('tek',)"]
+    assert probe.threads == ['event-log-writer']
+
+
+def test_disabled_level_fast_path():
+    logger = CategoryLogger('test-disabled', rate=1)
+    probe = _Probe()
+    with _Levels('WARNING'):
+        assert not logger.enabled(DEBUG) and logger.enabled(WARNING)
+        event_log.flush()
+        enqueued = event_log._writer.stats['enqueued']
+        for _ in range(100):
+            logger.debug("kapalı %s", probe)
+            logger.info("kapalı %s", probe)
+        # Kuyruğa hiçbir şey gitmez, hız sınırı tüketilmez, biçimlendirilmez
+        assert event_log._writer.stats['enqueued'] == enqueued
+        assert logger._limiter.suppressed == 0 and logger._limiter.tokens == 1.0
+        assert probe.threads == [] and _messages('test-disabled') == []
+
+        logger.warning("açık %s", probe)
+        assert _messages('test-disabled') == ["açık probe"]
+
+
+def test_recent_events_filters():
+    logger = CategoryLogger('test-filter', rate=0)
+    other = CategoryLogger('test-filter-other', rate=0)
+    started = time.time()
+    with _Levels('DEBUG'):
+        logger.debug("d")
+        logger.info("i")
+        other.warning("w")
+        logger.error("e")
+        event_log.flush()
+
+    def messages(**filters):
+        return [event['message'] for event in event_log.recent_events(since=started, **filters)]
+
+    assert messages(category='test-filter') == ["d", "i", "e"]
+    assert messages(level='warning', category='test-filter') == ["e"]
+    assert messages(level='WARNING')[-2:] == ["w", "e"]
+    assert messages(limit=1) == ["e"]
+    assert messages(category='test-filter-other') == ["w"]
+    assert event_log.recent_events(since=time.time() + 60) == []
+
+    client = app.app.test_client()
+    response = client.get(f'/api/logs?level=INFO&category=test-filter&since={started}')
+    assert response.status_code == 200
+    assert [event['message'] for event in response.get_json()['events']] == ["i", "e"]
+    response = client.get('/api/logs?level=VERBOSE')
+    assert response.status_code == 400 and 'VERBOSE' in response.get_json()['error']
+    assert client.get('/api/logs?limit=abc').status_code == 400
+
+
+if __name__ == '__main__':
+    for test in (
+        test_rate_limit_reports_suppressed_count,
+        test_lazy_formatting_on_writer_thread,
+        test_disabled_level_fast_path,
+        test_recent_events_filters,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+FleetStore Testi
+
+Hex ID <-> anahtar dönüşümü: sadece tam 6 küçük hex hane 24-bit anahtara
+paketlenir, diğer tüm ID'ler sentetik anahtar alır ve geri çevrilince
+değişmez. append_many, tek tek append ile aynı state'i üretmeli.
+
+Ring buffer görünümleri (PositionHistory / HistoryView) taşma sonrası aynı
+noktaları tutan bir listeyle birebir aynı davranmalı. Artımlı pencere
+toplamları (mesafe, ortalama hız, irtifa aralığı) her adımda pencereden baştan
+hesaplanan değerlerle aynı olmalı. Zaman çarkı (evict_older_than) tam olarak
+son noktası cutoff'tan eski satırları siler.
+"""
+
+import math
+import random
+
+import numpy as np
+
+from fleet_store import FleetStore, NO_BUCKET, NON_ICAO_FLAG, SYNTHETIC_KEY_BASE, TrackPoint
+from position_validator import PositionValidator
+from utils import haversine_km
+
+
+def test_intern_round_trip():
+    store = FleetStore(history_size=8)
+    ids = ['4b1805', '000abc', 'ffffff', '000000', '~4b1805', '~000001',
+           'abc', '0x1', '1', '-1', '+abcde', ' abcde', 'ABC123', '4b18051', 'xyz', '~abc', '~', '']
+    keys = [store.intern(hex_id) for hex_id in ids]
+
+    for hex_id, key in zip(ids, keys):
+        assert store.hex_id(key) == hex_id, (hex_id, key)
+        assert key >= 0
+    # Aynı ID her zaman aynı anahtar
+    assert keys == [store.intern(hex_id) for hex_id in ids]
+    assert len(set(keys)) == len(ids)
+
+
+def test_intern_packed_and_synthetic_space():
+    store = FleetStore(history_size=8)
+    assert store.intern('4b1805') == 0x4b1805
+    assert store.intern('~4b1805') == 0x4b1805 | NON_ICAO_FLAG
+    for hex_id in ('abc', '0x1', '1', '-1', 'ABC123', '~abc'):
+        assert store.intern(hex_id) >= SYNTHETIC_KEY_BASE, hex_id
+
+
+def test_intern_no_collisions():
+    """Eskiden çakışan çiftler ayrı anahtar (ve ayrı validator) alır"""
+    store = FleetStore(history_size=8)
+    for a, b in (('abc', '000abc'), ('0x1', '000001'), ('1', '000001'), ('0x1', '1'), ('~abc', '~000abc')):
+        assert store.intern(a) != store.intern(b), (a, b)
+
+    for hex_id in ('abc', '000abc'):
+        store[hex_id] = PositionValidator(hex_id, store=store)
+    assert len(store) == 2
+    assert store['abc'].hex_id == 'abc'
+    assert store['000abc'].hex_id == '000abc'
+    assert sorted(store) == ['000abc', 'abc']
+
+
+def _row_state(store, row):
+    points = [store.get_point(row, i).to_dict() for i in range(store.count[row])]
+    return (points, store.appended[row], round(store.distance_km(row), 9), store.average_speed(row),
+            store.altitude_range(row), store.last_seen[row], store._bucket_of[row])
+
+
+def test_append_many_matches_append():
+    """Ring taşması, eksik değerler ve zaman çarkı kova değişimleri dahil"""
+    rng = random.Random(3)
+    single = FleetStore(history_size=4, capacity=2, wheel_seconds=2.0)
+    bulk = FleetStore(history_size=4, capacity=2, wheel_seconds=2.0)
+    hexes = [f"{i:06x}" for i in range(12)]
+    rows = {hex_id: (single.allocate(hex_id), bulk.allocate(hex_id)) for hex_id in hexes}
+
+    ts = 1000.0
+    for tick in range(15):
+        ts += rng.uniform(0.5, 1.5)
+        batch = rng.sample(hexes, rng.randint(1, len(hexes)))
+        values = []
+        for hex_id in batch:
+            point = (rng.uniform(39, 41), rng.uniform(28, 30), ts,
+                     rng.choice((None, rng.uniform(0, 360))),
+                     rng.choice((None, rng.uniform(200, 480))),
+                     rng.choice((None, float(rng.randrange(1000, 40000, 100)))),
+                     rng.uniform(0, 10))
+            values.append(point)
+            single.append(rows[hex_id][0], *point)
+
+        columns = np.array(values, dtype=np.float64).T
+        bulk.append_many(np.array([rows[h][1] for h in batch], dtype=np.int64), *columns)
+
+        for hex_id in hexes:
+            assert _row_state(single, rows[hex_id][0]) == _row_state(bulk, rows[hex_id][1]), (tick, hex_id)
+
+    # Toplu yazımdan sonra tek append de aynı sonucu verir (bayat irtifa deque'leri)
+    for hex_id in hexes:
+        for store, row in zip((single, bulk), rows[hex_id]):
+            store.append(row, 40.0, 29.0, ts + 1.0, 90.0, 300.0, 12000.0)
+        assert _row_state(single, rows[hex_id][0]) == _row_state(bulk, rows[hex_id][1])
+    assert single.evict_older_than(ts + 0.5) == bulk.evict_older_than(ts + 0.5) == []
+
+
+def test_history_views_match_list_after_wraparound():
+    rng = random.Random(4)
+    store = FleetStore(history_size=6, capacity=1)
+    store['abc123'] = validator = PositionValidator('abc123', store=store)
+    history = validator.position_history
+    expected = []  # Aynı pencereyi tutan düz liste
+
+    for i in range(20):
+        point = TrackPoint(rng.uniform(39, 41), rng.uniform(28, 30), 1000.0 + i,
+                           rng.choice((None, rng.uniform(0, 360))), rng.choice((None, 400.0 + i)))
+        history.append(point)
+        expected = (expected + [point])[-6:]
+
+        assert len(history) == len(expected) and bool(history)
+        assert list(history) == expected and history.appended == i + 1
+        assert [history[j] for j in range(-len(expected), len(expected))] == expected + expected
+        assert history.view().coords() == [(p.lat, p.lon) for p in expected]
+        for n in (0, 1, 3, 6, 9):
+            assert list(history.last(n)) == (expected[-n:] if n else [])
+        for sl in (slice(None), slice(1, None), slice(None, -2), slice(-3, -1), slice(None, None, 2),
+                   slice(None, None, -1), slice(4, 1, -1), slice(10, 20)):
+            view = history[sl]
+            assert list(view) == expected[sl] and len(view) == len(expected[sl])
+            assert list(view[1:]) == expected[sl][1:]  # Görünümün görünümü
+            assert view.sum('ts') == sum(p.ts for p in expected[sl])
+            if view:
+                assert view.centroid() == (sum(p.lat for p in expected[sl]) / len(view),
+                                           sum(p.lon for p in expected[sl]) / len(view))
+                assert view[-1] == expected[sl][-1]
+        if len(expected) > 1:
+            assert history.last_segment_km() == haversine_km(expected[-2].lat, expected[-2].lon,
+                                                             expected[-1].lat, expected[-1].lon)
+
+    try:
+        history[6]
+        raise AssertionError("pencere dışı indeks kabul edildi")
+    except IndexError:
+        pass
+
+    history.clear()
+    assert len(history) == 0 and not history and list(history.view()) == []
+
+
+def test_aggregates_match_brute_force_after_wraparound():
+    """Çok tur taşma, eksik hız/irtifa ve dışarıdan verilen segment mesafeleri dahil"""
+    rng = random.Random(10)
+    for size in (1, 2, 5, 16):
+        store = FleetStore(history_size=size, capacity=3)
+        rows = [store.allocate(f"{i:06x}") for i in range(3)]
+        window = {row: [] for row in rows}  # (lat, lon, speed, altitude)
+
+        for step in range(size * 7 + 3):
+            row = rng.choice(rows)
+            lat, lon = rng.uniform(39, 41), rng.uniform(28, 30)
+            speed = rng.choice((None, rng.uniform(100, 500)))
+            altitude = rng.choice((None, None, float(rng.randrange(0, 40000, 25))))
+            given = None
+            if window[row] and rng.random() < 0.3:
+                prev = window[row][-1]
+                given = haversine_km(prev[0], prev[1], lat, lon)  # Worker'ın hesapladığı mesafe
+            store.append(row, lat, lon, 1000.0 + step, None, speed, altitude, given)
+            window[row] = (window[row] + [(lat, lon, speed, altitude)])[-size:]
+
+            for r in rows:
+                points = window[r]
+                distance = math.fsum(haversine_km(a[0], a[1], b[0], b[1]) for a, b in zip(points, points[1:]))
+                speeds = [p[2] for p in points if p[2] is not None]
+                altitudes = [p[3] for p in points if p[3] is not None]
+                assert math.isclose(store.distance_km(r), distance, rel_tol=1e-9, abs_tol=1e-9), (size, step)
+                if speeds:
+                    assert math.isclose(store.average_speed(r), sum(speeds) / len(speeds), rel_tol=1e-9)
+                else:
+                    assert store.average_speed(r) is None
+                assert store.altitude_range(r) == ((min(altitudes), max(altitudes)) if altitudes else (None, None))
+
+        # Satır temizlenince toplamlar da sıfırlanır
+        store.clear_row(rows[0])
+        assert store.distance_km(rows[0]) == 0.0 and store.average_speed(rows[0]) is None
+        assert store.altitude_range(rows[0]) == (None, None)
+
+
+def test_evict_older_than_removes_exactly_expired_rows():
+    rng = random.Random(11)
+    store = FleetStore(history_size=4, capacity=4, wheel_seconds=10.0)
+    last_seen = {}
+    now = 1000.0
+
+    for step in range(40):
+        now += rng.uniform(0, 8)
+        # Yeni uçaklar, güncellenen uçaklar ve (ring dolu) tekrar tekrar görülenler
+        for _ in range(rng.randint(1, 12)):
+            hex_id = f"{rng.randrange(60):06x}"
+            if hex_id not in store:
+                store[hex_id] = PositionValidator(hex_id, store=store)
+            ts = now - rng.uniform(0, 30)
+            ts = max(ts, last_seen.get(hex_id, ts))  # Zaman geri gitmez
+            store[hex_id].position_history.append(TrackPoint(40.0, 29.0, ts))
+            last_seen[hex_id] = ts
+
+        # Cutoff bazen tam kova sınırında, bazen tam bir uçağın zamanında
+        cutoff = rng.choice((now - rng.uniform(5, 60), math.floor((now - 25) / 10.0) * 10.0,
+                             rng.choice(list(last_seen.values()))))
+        expected = sorted(hex_id for hex_id, ts in last_seen.items() if ts < cutoff)
+        evicted = store.evict_older_than(cutoff)
+        assert sorted(v.hex_id for v in evicted) == expected, step
+        assert all(v.store is None and v.row == -1 for v in evicted)
+        for hex_id in expected:
+            del last_seen[hex_id]
+        assert sorted(store) == sorted(last_seen)
+        for hex_id, ts in last_seen.items():
+            assert store.last_seen[store[hex_id].row] == ts
+        assert store.evict_older_than(cutoff) == []  # İkinci çağrı bir şey bulmaz
+
+    # Serbest kalan satırlar yeniden kullanılır, çarkta eski satır kalmaz
+    assert store.evict_older_than(now + 1e6) and len(store) == 0
+    assert all(bucket == NO_BUCKET for bucket in store._bucket_of)
+    assert not any(store._wheel.values())
+
+
+if __name__ == '__main__':
+    for test in (
+        test_intern_round_trip,
+        test_intern_packed_and_synthetic_space,
+        test_intern_no_collisions,
+        test_append_many_matches_append,
+        test_history_views_match_list_after_wraparound,
+        test_aggregates_match_brute_force_after_wraparound,
+        test_evict_older_than_removes_exactly_expired_rows,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+FleetKalmanTracker Testi
+
+Düz uçan gürültülü izler kapıdan geçer; araya sokulan tek seferlik sıçrama
+ve outlier'lar Mahalanobis kapısında reddedilip tahminle düzeltilir, sonraki
+düzgün noktalar yine kabul edilir. Kalıcı yer değiştirme max_misses sonrası
+iz sıfırlamasıyla yakalanır, geriye giden zaman reddedilir.
+"""
+
+import math
+import random
+
+import config
+from fleet_store import FleetStore
+from kalman_tracker import KM_PER_DEG, KTS_TO_KMS, FleetKalmanTracker
+from utils import haversine_km
+
+AIRCRAFT = 40
+TICKS = 60
+SPEED_KTS = 450.0
+NOISE_KM = 0.03
+
+
+def _true_position(k, t):
+    """k. uçağın t anındaki gerçek konumu (sabit hız, k'ya göre yön)"""
+    lat0, lon0, track = 40.0 + k * 0.05, 29.0 + k * 0.05, (k * 37) % 360
+    distance = SPEED_KTS * KTS_TO_KMS * t
+    north = distance * math.cos(math.radians(track))
+    east = distance * math.sin(math.radians(track))
+    return lat0 + north / KM_PER_DEG, lon0 + east / (KM_PER_DEG * math.cos(math.radians(lat0))), track
+
+
+def _item(k, t, rng, offset_km=0.0):
+    lat, lon, track = _true_position(k, t)
+    north = rng.gauss(0, NOISE_KM) + offset_km
+    east = rng.gauss(0, NOISE_KM)
+    lat += north / KM_PER_DEG
+    lon += east / (KM_PER_DEG * math.cos(math.radians(lat)))
+    return f"{k:06x}", lat, lon, 1000.0 + t, track, SPEED_KTS, 30000
+
+
+def test_gate_rejects_jumps_and_passes_smooth_tracks():
+    rng = random.Random(5)
+    tracker = FleetKalmanTracker()
+    store = FleetStore(config.POSITION_HISTORY_SIZE)
+    # (tick, uçak) -> sıçrama (km); 7. uçak iki ardışık tick'te sıçrar
+    jumps = {(20, 3): 20.0, (35, 11): -8.0, (41, 7): 5.0, (42, 7): 5.0, (50, 25): 60.0}
+
+    for t in range(TICKS):
+        items = [_item(k, t, rng, jumps.get((t, k), 0.0)) for k in range(AIRCRAFT)]
+        results = tracker.validate(store, 1000.0 + t, items)
+        for k, (validator, position, corrected, reason) in enumerate(results):
+            if t == 0:
+                assert reason == 'first_position' and not corrected
+            elif (t, k) in jumps:
+                assert corrected and reason.startswith('mahalanobis_'), (t, k, reason)
+                # Düzeltilmiş konum gerçek konuma yakın, sıçramış ölçüme uzak
+                true_lat, true_lon, _ = _true_position(k, t)
+                assert haversine_km(position.lat, position.lon, true_lat, true_lon) < 0.5
+                assert validator.last_valid_pos.ts < 1000.0 + t
+            else:
+                assert reason == 'valid' and not corrected, (t, k, reason)
+                assert (position.lat, position.lon) == items[k][1:3]
+
+    stats = tracker.get_statistics()
+    assert stats['rejected'] == len(jumps) and stats['track_resets'] == 0
+    assert stats['accepted'] == AIRCRAFT * (TICKS - 1) - len(jumps)
+    assert store['000003'].outlier_count == 1 and store['000007'].outlier_count == 2
+    assert len(store['000000'].position_history) == TICKS
+
+
+def test_persistent_relocation_resets_track():
+    rng = random.Random(6)
+    tracker = FleetKalmanTracker()
+    store = FleetStore(config.POSITION_HISTORY_SIZE)
+    max_misses = tracker.settings['max_misses']
+
+    reasons = []
+    for t in range(10 + max_misses + 3):
+        offset = 30.0 if t >= 10 else 0.0  # 10. tick'ten sonra iz kalıcı olarak 30 km kaymış
+        (result,) = tracker.validate(store, 1000.0 + t, [_item(0, t, rng, offset)])
+        reasons.append(result[3])
+
+    assert all(reason.startswith('mahalanobis_') for reason in reasons[10:9 + max_misses])
+    assert reasons[9 + max_misses] == 'track_reset'
+    assert reasons[10 + max_misses:] == ['valid'] * 3
+    assert tracker.get_statistics()['track_resets'] == 1
+
+    # Geriye giden zaman: durum değişmez, tahmin gösterilir
+    hex_id, lat, lon, _, track, speed, altitude = _item(0, 5, rng)
+    (result,) = tracker.validate(store, 1000.0, [(hex_id, lat, lon, 1005.0, track, speed, altitude)])
+    assert result[2] and result[3] == 'backwards_time'
+
+
+if __name__ == '__main__':
+    for test in (
+        test_gate_rejects_jumps_and_passes_smooth_tracks,
+        test_persistent_relocation_resets_track,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
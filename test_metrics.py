@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+metrics Testi
+
+MetricsRegistry.render() Prometheus text exposition çıktısı: kümülatif 'le'
+kovaları (sınıra eşit değer o kovada), +Inf, _sum/_count, etiketler ve
+gauge'lar. /metrics uç noktası METRICS_ENABLED kapalıyken 404 döner.
+"""
+
+import app
+import config
+import metrics
+from metrics import MetricsRegistry
+
+
+def test_render_histogram_counter_gauge():
+    registry = MetricsRegistry()
+    latency = registry.histogram("x_seconds", "Gecikme", buckets=(1.0, 2.0, 5.0))
+    for value in (0.5, 1.0, 3.0, 10.0):
+        latency.observe(value)
+    stages = registry.histogram("x_stage_seconds", "Aşama", "stage", ('a', 'b'), buckets=(0.25,))
+    stages['a'].observe(0.25)
+    stages['b'].observe(0.3)
+    frames = registry.counter("x_frames_total", "Çerçeve", "format", ('json', 'binary'))
+    frames['json'].inc(3)
+    frames['binary'].inc(0.5)
+    registry.gauge("x_clients", "Client", lambda: 2)
+    registry.gauge("x_queue", "Kuyruk", lambda: {'db': 7, 'wire': 1.5}, label="queue")
+    registry.gauge("x_missing", "Henüz yok", lambda: None)
+    registry.gauge("x_broken", "Hata veren kaynak", lambda: 1 / 0)
+
+    assert registry.render() == "\n".join([
+        '# HELP x_seconds Gecikme',
+        '# TYPE x_seconds histogram',
+        'x_seconds_bucket{le="1"} 2',
+        'x_seconds_bucket{le="2"} 2',
+        'x_seconds_bucket{le="5"} 3',
+        'x_seconds_bucket{le="+Inf"} 4',
+        'x_seconds_sum 14.5',
+        'x_seconds_count 4',
+        '# HELP x_stage_seconds Aşama',
+        '# TYPE x_stage_seconds histogram',
+        'x_stage_seconds_bucket{stage="a",le="0.25"} 1',
+        'x_stage_seconds_bucket{stage="a",le="+Inf"} 1',
+        'x_stage_seconds_sum{stage="a"} 0.25',
+        'x_stage_seconds_count{stage="a"} 1',
+        'x_stage_seconds_bucket{stage="b",le="0.25"} 0',
+        'x_stage_seconds_bucket{stage="b",le="+Inf"} 1',
+        'x_stage_seconds_sum{stage="b"} 0.3',
+        'x_stage_seconds_count{stage="b"} 1',
+        '# HELP x_frames_total Çerçeve',
+        '# TYPE x_frames_total counter',
+        'x_frames_total{format="json"} 3',
+        'x_frames_total{format="binary"} 0.5',
+        '# HELP x_clients Client',
+        '# TYPE x_clients gauge',
+        'x_clients 2',
+        '# HELP x_queue Kuyruk',
+        '# TYPE x_queue gauge',
+        'x_queue{queue="db"} 7',
+        'x_queue{queue="wire"} 1.5',
+    ]) + "\n"
+
+
+def test_metrics_endpoint():
+    saved = config.METRICS_ENABLED
+    client = app.app.test_client()
+    try:
+        config.METRICS_ENABLED = True
+        response = client.get('/metrics')
+        assert response.status_code == 200 and response.content_type == metrics.CONTENT_TYPE
+        text = response.get_data(as_text=True)
+        assert '# TYPE adsb_ticks_total counter' in text
+        assert 'adsb_stage_duration_seconds_bucket{stage="validation",le="+Inf"}' in text
+
+        config.METRICS_ENABLED = False
+        response = client.get('/metrics')
+        assert response.status_code == 404 and response.get_json() == {"error": "Endpoint bulunamadı"}
+    finally:
+        config.METRICS_ENABLED = saved
+
+
+if __name__ == '__main__':
+    for test in (
+        test_render_histogram_counter_gauge,
+        test_metrics_endpoint,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
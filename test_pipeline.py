@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Bölge filtresi Testi
+
+select_focus_aircraft'ın NumPy yolu ile saf Python yolu rastgele filolarda
+birebir aynı uçakları aynı sırayla seçmeli: tekrar eden uçaklar, pozisyonsuz
+kayıtlar, eşit mesafeler ve tam yarıçap sınırındaki noktalar dahil.
+
+STALE_AIRCRAFT_SECONDS'tan uzun süredir yeni pozisyonu olmayan uçaklar
+(snapshot'ta hâlâ eski pozisyonla görünseler bile) state'ten silinir ve
+client'lara bir sonraki delta'da 'removed' olarak gider.
+"""
+
+import random
+
+import config
+from fleet_store import FleetStore
+from pipeline import (STALE_AIRCRAFT_SECONDS, _select_focus_aircraft_numpy, _select_focus_aircraft_python,
+                      process_snapshot)
+from update_stream import DeltaEncoder
+from utils import haversine_km
+
+FLEETS = 300
+MAX_FLEET = 3000
+
+# Merkezler: varsayılan bölge, antimeridyen ve kutup yakını
+CENTERS = ((40.0, 29.0), (10.0, 179.9), (-33.0, -179.95), (88.5, 0.0), (0.0, 0.0))
+
+
+def _fleet(rng, center_lat, center_lon, size):
+    fleet = []
+    for i in range(size):
+        roll = rng.random()
+        if fleet and roll < 0.05:
+            fleet.append(rng.choice(fleet))  # Aynı kayıt iki kez
+        elif fleet and roll < 0.10:
+            fleet.append(dict(rng.choice(fleet), hex=f"{i:06x}"))  # Aynı konum (eşit mesafe)
+        elif roll < 0.15:
+            missing = rng.choice(({}, {'lat': None}, {'lon': None}, {'lat': None, 'lon': None}))
+            fleet.append({'hex': f"{i:06x}", 'lat': 1.0, 'lon': 1.0, **missing})
+            if not missing:
+                del fleet[-1]['lat']
+        else:
+            lat = max(-90.0, min(90.0, center_lat + rng.uniform(-8, 8)))
+            lon = (center_lon + rng.uniform(-12, 12) + 180.0) % 360.0 - 180.0
+            if roll < 0.20:
+                lat, lon = round(lat, 1), round(lon, 1)  # Izgara: farklı kayıtlarda eşit mesafe
+            fleet.append({'hex': f"{i:06x}", 'lat': lat, 'lon': lon})
+    return fleet
+
+
+def test_numpy_and_python_paths_match():
+    rng = random.Random(2024)
+    saved = (dict(config.FOCUS_REGION), config.MAX_DISPLAYED_AIRCRAFT)
+    try:
+        for fleet_index in range(FLEETS):
+            center_lat, center_lon = rng.choice(CENTERS)
+            fleet = _fleet(rng, center_lat, center_lon, rng.randint(0, MAX_FLEET))
+            positioned = [ac for ac in fleet if ac.get('lat') is not None and ac.get('lon') is not None]
+
+            radius = rng.uniform(50, 900)
+            if positioned and fleet_index % 2 == 0:
+                # Yarıçap tam olarak bir uçağın mesafesi: sınırdaki nokta dahil edilmeli
+                edge = rng.choice(positioned)
+                radius = haversine_km(center_lat, center_lon, edge['lat'], edge['lon'])
+            config.FOCUS_REGION.update(center_lat=center_lat, center_lon=center_lon, radius_km=radius)
+            config.MAX_DISPLAYED_AIRCRAFT = rng.choice((0, 1, 7, 50, 300, MAX_FLEET))
+
+            expected, expected_count = _select_focus_aircraft_python(fleet)
+            selected, count = _select_focus_aircraft_numpy(fleet)
+            assert count == expected_count, f"filo #{fleet_index}: {count} != {expected_count}"
+            assert [id(ac) for ac in selected] == [id(ac) for ac in expected], f"filo #{fleet_index}"
+            if positioned and fleet_index % 2 == 0 and config.MAX_DISPLAYED_AIRCRAFT >= len(positioned):
+                assert any(ac is edge for ac in selected)
+    finally:
+        config.FOCUS_REGION.clear()
+        config.FOCUS_REGION.update(saved[0])
+        config.MAX_DISPLAYED_AIRCRAFT = saved[1]
+
+
+def _raw(hex_id, now, seen_pos=0.0):
+    """Doğuya 400 kts uçan uçağın dump1090 kaydı (konum ölçüm zamanına göre)"""
+    ts = now - seen_pos
+    return {'hex': hex_id, 'lat': 41.0, 'lon': 29.0 + (ts - 1000.0) * 0.0025, 'track': 90.0,
+            'gs': 400.0, 'alt_baro': 30000, 'seen_pos': seen_pos}
+
+
+def test_evicted_aircraft_reach_clients_as_removed():
+    saved = (config.FOCUS_REGION['enabled'], config.USE_SQLITE, config.VALIDATION_ENGINE,
+             config._aircraft_state, dict(config._stats))
+    config.FOCUS_REGION['enabled'] = False
+    config.USE_SQLITE = False
+    try:
+        for engine in ('rules', 'kalman'):
+            config.VALIDATION_ENGINE = engine
+            config._aircraft_state = FleetStore(config.POSITION_HISTORY_SIZE)
+            encoder = DeltaEncoder(keyframe_interval=100)
+
+            def tick(now, aircraft):
+                now_val, cleaned = process_snapshot({'now': now, 'aircraft': aircraft})
+                return encoder.encode(now_val, cleaned, {})
+
+            for now in (1000.0, 1001.0):
+                tick(now, [_raw('aaaaaa', now), _raw('bbbbbb', now)])
+
+            # 'bbbbbb' listede kalır ama pozisyonu 1001'de donmuş (seen_pos büyüyor)
+            removed_at = None
+            for now in range(1011, 1001 + STALE_AIRCRAFT_SECONDS + 30, 10):
+                delta = tick(float(now), [_raw('aaaaaa', now), _raw('bbbbbb', now, seen_pos=now - 1001.0)])
+                assert delta['type'] == 'delta' and delta['added'] == [], engine
+                if delta['removed']:
+                    assert delta['removed'] == ['bbbbbb'] and removed_at is None, engine
+                    removed_at = now
+            assert removed_at == 1001 + STALE_AIRCRAFT_SECONDS + 10, (engine, removed_at)
+            assert sorted(config._aircraft_state) == ['aaaaaa'] and config._stats['active_aircraft'] == 1
+
+            # Yeniden görünen uçak yeni uçak olarak eklenir
+            now += 10
+            delta = tick(float(now), [_raw('aaaaaa', now), _raw('bbbbbb', now)])
+            assert [ac['hex'] for ac in delta['added']] == ['bbbbbb'] and delta['removed'] == []
+            assert config._aircraft_state['bbbbbb'].total_updates == 1
+    finally:
+        (config.FOCUS_REGION['enabled'], config.USE_SQLITE, config.VALIDATION_ENGINE,
+         config._aircraft_state, stats) = saved
+        config._stats.clear()
+        config._stats.update(stats)
+
+
+if __name__ == '__main__':
+    for test in (
+        test_numpy_and_python_paths_match,
+        test_evicted_aircraft_reach_clients_as_removed,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+FeedProfiler Testi
+
+Profil oturumları (sampling / cprofile) başlat -> tick -> durdur -> sonuç,
+boş cProfile ve geçersiz sıralama, feed dururken süresi dolan oturum ve
+yavaş tick watchdog'u. Bu thread feed thread'i gibi tick kancalarını çağırır.
+"""
+
+import time
+
+import app
+import config
+from profiler import FeedProfiler
+
+
+def _profiler(**overrides):
+    return FeedProfiler({**config.PROFILING, 'watchdog_interval_ms': 1, 'slow_tick_ms': 30, **overrides})
+
+
+def _busy(seconds):
+    """Python seviyesinde meşgul bekleme (örnekleyici bu frame'i görmeli)"""
+    ends = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < ends:
+        total += sum(range(100))
+    return total
+
+
+def _tick(profiler, seconds, aircraft=0):
+    profiler.tick_started()
+    _busy(seconds)
+    profiler.tick_finished(aircraft)
+
+
+def _expect_value_error(func, *args):
+    try:
+        func(*args)
+    except ValueError:
+        return
+    raise AssertionError(f"{func.__name__}{args} ValueError vermedi")
+
+
+def test_sampling_session():
+    profiler = _profiler()
+    assert profiler.result() is None
+    _expect_value_error(profiler.stop)
+    _expect_value_error(profiler.start, 5, 'bogus')
+    _expect_value_error(profiler.start, 0, 'sampling')
+
+    status = profiler.start(seconds=10, mode='sampling', interval_ms=1)
+    assert status['running']['mode'] == 'sampling'
+    _expect_value_error(profiler.start, 5, 'sampling')  # Zaten çalışıyor
+
+    _tick(profiler, 0.05)
+    status = profiler.stop()
+    assert status['running'] is None and status['last_result']['ticks'] == 1
+
+    text, filename = profiler.result()
+    assert filename.endswith('.folded')
+    assert '_busy (test_profiler.py' in text
+    stack, count = text.splitlines()[0].rsplit(' ', 1)
+    assert int(count) >= 1 and ';' in stack
+
+
+def test_cprofile_session():
+    profiler = _profiler()
+    profiler.start(seconds=10, mode='cprofile')
+    _tick(profiler, 0.01)
+    profiler.stop()
+
+    text, filename = profiler.result()
+    assert filename.endswith('.txt') and '_busy' in text
+    assert '_busy' in profiler.result('tottime')[0]
+    _expect_value_error(profiler.result, 'bogus')
+
+
+def test_empty_cprofile_session():
+    """Hiç tick görmeyen cprofile oturumu hata değil 'örnek yok' sonucu verir"""
+    profiler = _profiler()
+    profiler.start(seconds=10, mode='cprofile')
+    profiler.stop()
+    text, _ = profiler.result()
+    assert 'Profil örneği yok' in text
+
+    saved = (config.PROFILING['admin_api'], app.get_profiler)
+    config.PROFILING['admin_api'] = True
+    app.get_profiler = lambda: profiler
+    try:
+        client = app.app.test_client()
+        response = client.get('/api/admin/profiler/result')
+        assert response.status_code == 200 and 'Profil örneği yok' in response.get_data(as_text=True)
+        assert client.get('/api/admin/profiler/result?sort=bogus').status_code == 400
+        assert client.get('/api/admin/profiler/result?sort=ncalls').status_code == 200
+        config.PROFILING['admin_api'] = False
+        assert client.get('/api/admin/profiler/result').status_code == 404
+    finally:
+        config.PROFILING['admin_api'], app.get_profiler = saved
+
+
+def test_expired_cprofile_session_finishes_without_ticks():
+    """Feed dururken süresi dolan cprofile oturumu örnekleyici tarafından bitirilir"""
+    profiler = _profiler()
+    profiler.start(seconds=0.1, mode='cprofile')
+    deadline = time.monotonic() + 3.0
+    while profiler.get_status()['running'] is not None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert profiler.get_status()['running'] is None
+    profiler.start(seconds=10, mode='sampling')  # Artık "zaten çalışıyor" değil
+    profiler.stop()
+
+
+def test_slow_tick_watchdog():
+    profiler = _profiler()
+    _tick(profiler, 0.001, aircraft=10)  # Bütçe içinde: saklanmaz
+    _tick(profiler, 0.08, aircraft=42)
+
+    status = profiler.get_status()['watchdog']
+    assert status['ticks'] == 2 and status['slow_ticks'] == 1 and status['stored'] == 1
+    assert status['max_tick_ms'] >= 80
+
+    (tick,) = profiler.get_slow_ticks()
+    assert tick['index'] == 0 and tick['aircraft'] == 42 and tick['samples'] > 0
+    assert tick['duration_ms'] >= 80 and tick['budget_ms'] == 30
+    assert any(frame['frame'].startswith('_busy') for frame in tick['top_frames'])
+
+    text, filename = profiler.slow_tick_profile(0)
+    assert '_busy' in text and filename.endswith('.folded')
+    assert profiler.slow_tick_profile(1) is None
+
+    # Watchdog kapalıyken yavaş tick sayılmaz
+    quiet = _profiler(watchdog=False)
+    _tick(quiet, 0.05)
+    assert quiet.get_status()['watchdog']['slow_ticks'] == 0 and quiet.get_slow_ticks() == []
+
+
+if __name__ == '__main__':
+    for test in (
+        test_sampling_session,
+        test_cprofile_session,
+        test_empty_cprofile_session,
+        test_expired_cprofile_session_finishes_without_ticks,
+        test_slow_tick_watchdog,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+replay_archive Testi
+
+Yaz -> sonuna eklemek için yeniden aç -> rastgele erişim / zamana atlama ve
+JSON dizininden dönüştürme gidiş-dönüşü. İndeks silinmiş, boş veya yarım
+kalmışsa yazıcı veri dosyasını tarayıp indeksi yeniden oluşturur; bozuk
+kayıtlar okuyucuda atlanır.
+"""
+
+import json
+import random
+import tempfile
+from pathlib import Path
+
+import config
+from replay_archive import (ArchiveDataReader, ArchiveWriter, INDEX_ENTRY, INDEX_HEADER,
+                            ReplayArchive, convert_directory, index_path)
+from traffic_generator import TrafficGenerator
+
+
+def _snapshot(now, size=3):
+    rng = random.Random(now)
+    # Rastgele hex'ler: sıkışmayan (tarama parçasından büyük) kayıtlar da denenir
+    aircraft = [{'hex': f"{rng.getrandbits(24):06x}", 'lat': rng.uniform(-90, 90)} for _ in range(size)]
+    return {'now': now, 'aircraft': aircraft}
+
+
+def _write(path, snapshots):
+    with ArchiveWriter(path) as writer:
+        for snapshot in snapshots:
+            writer.append(json.dumps(snapshot).encode('utf-8'), snapshot['now'])
+        return writer.count
+
+
+def test_round_trip_append_and_seek():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'x.adsbarc'
+        first = [_snapshot(100.0 + i) for i in range(5)]
+        second = [_snapshot(105.0 + i, size=4000 if i == 1 else 3) for i in range(5)]
+        assert _write(path, first) == 5
+        assert _write(path, second) == 10  # Yeniden açınca sonuna eklenir
+
+        archive = ReplayArchive(path)
+        assert len(archive) == 10
+        for i, snapshot in sorted(enumerate(first + second), key=lambda _: random.random()):
+            assert archive.read(i) == snapshot
+            assert archive.timestamp(i) == snapshot['now']
+        assert archive.find(106.5) == 7 and archive.find(0) == 0 and archive.find(1e9) == 10
+        archive.close()
+
+        reader = ArchiveDataReader(path)
+        assert reader.seek(107.0) == 7
+        assert reader.read_next_data() == second[2]
+        assert reader.current_index == 8
+        assert [s['now'] for s in reader.iter_snapshots(8)] == [108.0, 109.0]
+
+        # Zaman geriye giderse reddedilir
+        with ArchiveWriter(path) as writer:
+            try:
+                writer.append(b'{"now": 1}', 1.0)
+                raise AssertionError("geriye giden zaman kabul edildi")
+            except ValueError:
+                pass
+
+
+def test_convert_directory():
+    with tempfile.TemporaryDirectory() as tmp:
+        json_dir = Path(tmp) / 'json_files'
+        TrafficGenerator(20, seed=3).write_json_dir(json_dir, 12)
+        (json_dir / 'adsb_data_12.json').write_text('{bozuk', encoding='utf-8')
+        (json_dir / 'adsb_data_13.json').write_text('{"aircraft": []}', encoding='utf-8')
+
+        path = Path(tmp) / 'x.adsbarc'
+        assert convert_directory(json_dir, path) == 12  # Bozuk ve 'now'suz dosyalar atlanır
+
+        archive = ReplayArchive(path)
+        for i in range(12):
+            expected = json.loads((json_dir / f'adsb_data_{i}.json').read_text(encoding='utf-8'))
+            assert archive.read(i) == expected
+        archive.close()
+
+
+def test_missing_or_truncated_index_is_rebuilt():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'x.adsbarc'
+        snapshots = [_snapshot(200.0 + i, size=4000 if i == 2 else 3) for i in range(4)]
+        _write(path, snapshots)
+        idx = index_path(path)
+
+        for damage in ('delete', 'empty', 'short'):
+            if damage == 'delete':
+                idx.unlink()
+            elif damage == 'empty':
+                idx.write_bytes(b'')
+            else:
+                idx.write_bytes(idx.read_bytes()[:INDEX_HEADER.size - 2])
+
+            with ArchiveWriter(path) as writer:
+                assert writer.count == 4 and writer.last_now == 203.0
+            archive = ReplayArchive(path)
+            assert [archive.read(i) for i in range(len(archive))] == snapshots
+            archive.close()
+
+        # Yarım indeks girdisi + veriye yazılmış ama indekse girmemiş yarım kayıt
+        idx.write_bytes(idx.read_bytes() + b'\x00' * (INDEX_ENTRY.size - 3))
+        with open(path, 'ab') as f:
+            f.write(b'\x78\x9c\x01\x02')
+        with ArchiveWriter(path) as writer:
+            assert writer.count == 4
+            writer.append(json.dumps(_snapshot(210.0)).encode('utf-8'), 210.0)
+
+        idx.unlink()  # Yarım kayıt veriden atılır, yeni kayıt sonrasına yazılır
+        with ArchiveWriter(path) as writer:
+            assert writer.count == 5 and writer.last_now == 210.0
+
+        archive = ReplayArchive(path)
+        assert archive.read(4) == _snapshot(210.0)
+        archive.close()
+
+        # Geçersiz indeks başlığı açık hata verir
+        idx.write_bytes(b'XXXXXXXX')
+        try:
+            ArchiveWriter(path)
+            raise AssertionError("geçersiz indeks kabul edildi")
+        except ValueError:
+            pass
+
+
+def test_corrupt_record_is_skipped():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'x.adsbarc'
+        snapshots = [_snapshot(300.0 + i) for i in range(3)]
+        _write(path, snapshots)
+
+        # Ortadaki kaydın sıkıştırılmış byte'larını boz
+        archive = ReplayArchive(path)
+        _, offset, length = archive._entry(1)
+        archive.close()
+        data = bytearray(path.read_bytes())
+        data[offset:offset + length] = b'\xff' * length
+        path.write_bytes(bytes(data))
+
+        saved_loop = config.JSON_LOOP
+        config.JSON_LOOP = False
+        try:
+            reader = ArchiveDataReader(path)
+            assert reader.read_next_data() == snapshots[0]
+            assert reader.read_next_data() is None  # #1 atlanır, #2 son kayıt (döngü kapalı)
+            assert reader.current_index == 3
+            assert list(reader.iter_snapshots()) == [snapshots[0], snapshots[2]]
+        finally:
+            config.JSON_LOOP = saved_loop
+
+
+if __name__ == '__main__':
+    for test in (
+        test_round_trip_append_and_seek,
+        test_convert_directory,
+        test_missing_or_truncated_index_is_rebuilt,
+        test_corrupt_record_is_skipped,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
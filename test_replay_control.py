@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ReplayController / seek Testi
+
+Sentetik kayıt (traffic_generator, sabit seed) baştan sona oynatılırken
+checkpoint'ler alınır; ardından app.seek_replay ile N'e atlanır. Checkpoint
+üzerinden (veya mevcut konumdan ileri sararak) varılan temiz çıktı, sayaçlar
+ve filo state'i 0..N kesintisiz oynatmayla birebir aynı olmalı.
+"""
+
+import tempfile
+from pathlib import Path
+
+import app
+import config
+from fleet_store import FleetStore
+from json_reader import JSONDataReader
+from pipeline import process_snapshot
+from replay_control import CHECKPOINT_STATS, ReplayController
+from traffic_generator import TrafficGenerator
+
+AIRCRAFT = 80
+SNAPSHOTS = 60
+INTERVAL = 10
+
+
+def _fleet_state(store):
+    return {
+        hex_id: (
+            [point.to_dict() for point in validator.position_history],
+            validator.total_updates, validator.outlier_count,
+            validator.first_seen, validator.last_seen,
+            validator.last_valid_track, validator.last_valid_speed,
+            validator.position_history.distance_km(), validator.position_history.average_speed(),
+            validator.get_altitude_range(), validator.get_movement_heading()
+        )
+        for hex_id, validator in store.items()
+    }
+
+
+def _reset_state():
+    config._aircraft_state = FleetStore(config.POSITION_HISTORY_SIZE)
+    for name in CHECKPOINT_STATS:
+        config._stats[name] = 0
+
+
+def _snapshot_state():
+    return {name: config._stats[name] for name in CHECKPOINT_STATS}, _fleet_state(config._aircraft_state)
+
+
+class _Recording:
+    """Geçici kayıt dizini + izole config/app ortamı"""
+
+    def __enter__(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        json_dir = Path(self._tmp.name)
+        TrafficGenerator(AIRCRAFT, seed=7, outlier_rate=0.05, jump_rate=0.01,
+                         stale_rate=0.05).write_json_dir(json_dir, SNAPSHOTS)
+
+        self._saved_config = (config.FOCUS_REGION['enabled'], config.MAX_DISPLAYED_AIRCRAFT,
+                              config.USE_SQLITE, config.VALIDATION_ENGINE, config.JSON_LOOP,
+                              config._aircraft_state, dict(config._stats))
+        self._saved_app = (app.get_json_reader, app.get_replay_controller, app.emit_update)
+        config.FOCUS_REGION['enabled'] = False
+        config.MAX_DISPLAYED_AIRCRAFT = AIRCRAFT
+        config.USE_SQLITE = False
+        config.VALIDATION_ENGINE = 'rules'
+        config.JSON_LOOP = False
+
+        self.reader = JSONDataReader(json_dir)
+        self.replay = ReplayController(interval=INTERVAL, max_checkpoints=50)
+        self.replay.enabled = True
+        self.emitted = []
+        app.get_json_reader = lambda: self.reader
+        app.get_replay_controller = lambda: self.replay
+        app.emit_update = lambda now_val, aircraft, stats, force=False: self.emitted.append((now_val, aircraft))
+        return self
+
+    def __exit__(self, *exc):
+        self.reader.reset()
+        app.get_json_reader, app.get_replay_controller, app.emit_update = self._saved_app
+        (config.FOCUS_REGION['enabled'], config.MAX_DISPLAYED_AIRCRAFT, config.USE_SQLITE,
+         config.VALIDATION_ENGINE, config.JSON_LOOP, config._aircraft_state, stats) = self._saved_config
+        config._stats.clear()
+        config._stats.update(stats)
+        self._tmp.cleanup()
+
+    def play(self, count):
+        """feed_from_json gibi oynat (checkpoint'ler alınır); son temiz çıktı"""
+        for _ in range(count):
+            output = process_snapshot(self.reader.read_next_data())
+            self.replay.after_tick(self.reader.current_index)
+        return output
+
+    def linear(self, index):
+        """Boş state'ten 0..index kesintisiz oynatma: (temiz çıktı, sayaçlar, filo state'i)"""
+        reader = JSONDataReader(self.reader.json_dir, prefetch=False)
+        _reset_state()
+        for _ in range(index + 1):
+            now_val, aircraft_clean = process_snapshot(reader.read_next_data())
+        return ((now_val, aircraft_clean),) + _snapshot_state()
+
+
+def _assert_seek_matches(recording, index, expected):
+    """seek_replay(index) sonucu kesintisiz oynatmayla aynı mı; seek özetini döndür"""
+    recording.emitted.clear()
+    result = app.seek_replay(index)
+    assert result['index'] == index
+    assert recording.reader.current_index == index + 1
+    assert recording.emitted == [expected[0]], f"#{index} çıktısı farklı"
+    assert _snapshot_state() == expected[1:]
+    return result
+
+
+def test_seek_through_checkpoint_matches_linear():
+    with _Recording() as recording:
+        targets = (27, 5, 29, 44, 47)
+        expected = {index: recording.linear(index) for index in targets}
+        assert expected[27][1]['position_corrections'] > 0  # Outlier yolları gerçekten denendi
+
+        _reset_state()
+        recording.play(50)
+        assert recording.replay.nearest(27) == 20
+
+        # Geri: #20 checkpoint'i + 7 snapshot ileri sarma
+        result = _assert_seek_matches(recording, 27, expected[27])
+        assert result['checkpoint'] == 20 and result['replayed'] == 7
+
+        # İlk checkpoint'ten önce: boş state'ten
+        result = _assert_seek_matches(recording, 5, expected[5])
+        assert result['checkpoint'] == 0 and result['replayed'] == 5
+
+        # Yakın ileri: mevcut konumdan devam
+        _assert_seek_matches(recording, 27, expected[27])
+        result = _assert_seek_matches(recording, 29, expected[29])
+        assert result['checkpoint'] == 28 and result['replayed'] == 1
+
+        # Uzak ileri: mevcut konum yerine daha yakın #40 checkpoint'i
+        result = _assert_seek_matches(recording, 44, expected[44])
+        assert result['checkpoint'] == 40
+
+        # Seek'ten sonra normal oynatma kesintisiz oynatmayla aynı yerden devam eder
+        assert recording.play(3) == expected[47][0]
+        assert _snapshot_state() == expected[47][1:]
+
+
+if __name__ == '__main__':
+    for test in (
+        test_seek_through_checkpoint_matches_linear,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ShardedValidator Testi
+
+Sentetik trafik (traffic_generator, sabit seed) worker süreçleriyle ve tek
+süreçte doğrulanır; temiz çıktı, sayaçlar ve ana süreçteki filo state'i
+birebir aynı olmalı. Ölen ve takılan (yanıt vermeyen) worker durumunda tek
+sürece dönülür, sonuç yine aynıdır.
+"""
+
+import os
+import signal
+from pathlib import Path
+
+import config
+from fleet_store import FleetStore
+from pipeline import normalize_aircraft, sanitize_aircraft_positions
+from sharded_validation import ShardedValidator
+from traffic_generator import TrafficGenerator
+
+AIRCRAFT = 150
+TICKS = 30
+
+
+def _snapshots():
+    generator = TrafficGenerator(AIRCRAFT, seed=42, outlier_rate=0.05, jump_rate=0.01, stale_rate=0.05)
+    return [(s['now'], normalize_aircraft(s['aircraft'])) for s in generator.snapshots(TICKS)]
+
+
+def _fleet_state(store):
+    return {
+        hex_id: (
+            [point.to_dict() for point in validator.position_history],
+            validator.total_updates, validator.outlier_count,
+            validator.first_seen, validator.last_seen,
+            validator.last_valid_track, validator.last_valid_speed,
+            validator.position_history.distance_km(), validator.position_history.average_speed(),
+            validator.get_altitude_range(), validator.get_movement_heading()
+        )
+        for hex_id, validator in store.items()
+    }
+
+
+def _replay(pool=None, on_tick=None):
+    """Snapshot'ları doğrula; (tick çıktıları, sayaçlar, filo state'i)"""
+    saved = (config.FOCUS_REGION['enabled'], config.MAX_DISPLAYED_AIRCRAFT, config.USE_SQLITE,
+             config.VALIDATION_ENGINE, config._aircraft_state, dict(config._stats))
+    config.FOCUS_REGION['enabled'] = False
+    config.MAX_DISPLAYED_AIRCRAFT = AIRCRAFT
+    config.USE_SQLITE = False
+    config.VALIDATION_ENGINE = 'rules'
+    config._aircraft_state = FleetStore(config.POSITION_HISTORY_SIZE)
+    for name in ('position_corrections', 'outliers_detected', 'heading_corrections'):
+        config._stats[name] = 0
+    try:
+        outputs = []
+        for tick, (now_val, aircraft) in enumerate(_snapshots()):
+            if on_tick is not None:
+                on_tick(tick)
+            outputs.append(sanitize_aircraft_positions(now_val, aircraft, pool=pool))
+        counters = {name: config._stats[name]
+                    for name in ('position_corrections', 'outliers_detected', 'heading_corrections')}
+        return outputs, counters, _fleet_state(config._aircraft_state)
+    finally:
+        (config.FOCUS_REGION['enabled'], config.MAX_DISPLAYED_AIRCRAFT, config.USE_SQLITE,
+         config.VALIDATION_ENGINE, config._aircraft_state, stats) = saved
+        config._stats.clear()
+        config._stats.update(stats)
+
+
+def _assert_same(expected, actual):
+    outputs, counters, state = actual
+    assert len(outputs) == len(expected[0])
+    for tick, (want, got) in enumerate(zip(expected[0], outputs)):
+        assert want == got, f"tick {tick} çıktısı farklı"
+    assert counters == expected[1]
+    assert state == expected[2]
+
+
+def test_sharded_matches_single_process():
+    expected = _replay()
+    assert expected[1]['position_corrections'] > 0  # Outlier yolları gerçekten denendi
+
+    pool = ShardedValidator(2, start_method='fork')
+    try:
+        _assert_same(expected, _replay(pool))
+        assert not pool.broken
+        stats = pool.get_statistics()
+        assert stats['ticks'] == TICKS and stats['fallback'] is False
+    finally:
+        pool.close()
+
+
+def test_killed_worker_falls_back():
+    expected = _replay()
+    pool = ShardedValidator(2, start_method='fork')
+
+    def kill(tick):
+        if tick == TICKS // 2:
+            pool._processes[0].kill()
+            pool._processes[0].join(2)
+
+    try:
+        _assert_same(expected, _replay(pool, on_tick=kill))
+        assert pool.broken
+    finally:
+        pool.close()
+
+
+def test_hung_worker_times_out():
+    expected = _replay()
+    pool = ShardedValidator(2, start_method='fork')
+    pool.reply_timeout = 0.5
+
+    def freeze(tick):
+        if tick == TICKS // 2:
+            os.kill(pool._processes[1].pid, signal.SIGSTOP)
+
+    try:
+        _assert_same(expected, _replay(pool, on_tick=freeze))
+        assert pool.broken
+    finally:
+        for process in pool._processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGCONT)
+        pool.close()
+
+
+def test_kalman_engine_excludes_sharding():
+    """config yüklenirken Kalman motoru + SHARDED_VALIDATION birlikte reddedilir"""
+    source = Path(config.__file__).read_text(encoding='utf-8')
+    assert "VALIDATION_ENGINE = 'rules'" in source and "'enabled': False,  # Doğrulamayı" in source
+    source = source.replace("VALIDATION_ENGINE = 'rules'", "VALIDATION_ENGINE = 'kalman'")
+    for enabled, fails in (("False", False), ("True", True)):
+        variant = source.replace("'enabled': False,  # Doğrulamayı", f"'enabled': {enabled},  # Doğrulamayı")
+        try:
+            exec(compile(variant, config.__file__, 'exec'), {'__name__': 'config_variant', '__file__': config.__file__})
+        except ValueError:
+            assert fails
+        else:
+            assert not fails
+
+
+if __name__ == '__main__':
+    for test in (
+        test_sharded_matches_single_process,
+        test_killed_worker_falls_back,
+        test_hung_worker_times_out,
+        test_kalman_engine_excludes_sharding,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
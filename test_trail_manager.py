@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+TrailManager / TrailWriter Testi
+
+stop() öncesi kuyruğa giren noktaların yazılması, kuyruk dolu (backpressure)
+ve flush sayaçları, geçici yazma hatalarında tekrar deneme ve denemeler
+bitince düşürülen noktaların sayılması.
+
+Partition'lar: eski tek tablolu şemanın taşınması, saat sınırında yeni
+partition, sadece tamamen süresi dolan partition'ların düşürülmesi ve
+get_trail'in UNION ALL view üzerinden okuması.
+"""
+
+import calendar
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import config
+import trail_manager
+from trail_manager import (TrailManager, TrailWriter, create_partition, drop_expired_partitions,
+                           partition_for, rebuild_catalog_view)
+
+
+def _point(i, hex_id='4b1805'):
+    return dict(hex_id=hex_id, lat=41.0 + i * 0.01, lon=29.0, timestamp=1000.0 + i,
+                altitude=30000 + i, speed=400.0, track=90.0, flight_code='THY1')
+
+
+def _count(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM trail_points").fetchone()[0]
+
+
+def test_stop_flushes_pending_points():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'trails.db'
+        manager = TrailManager(db_path)
+        for i in range(250):
+            assert manager.save_trail_point(**_point(i, hex_id=f"{i % 7:06x}"))
+        manager.close()  # end_tick / flush çağrılmadı
+
+        assert not manager.writer.is_alive()
+        assert _count(db_path) == 250
+        stats = manager.writer.get_statistics()
+        assert stats['enqueued'] == stats['written'] == 250
+        assert stats['dropped'] == stats['errors'] == 0 and stats['queue_depth'] == 0
+        assert manager.get_statistics()['total_points'] == 250
+        assert manager.get_trail_metadata('000003')['point_count'] == 36
+
+
+def test_backpressure_and_flush_counters():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'trails.db'
+        TrailManager(db_path).close()  # Şemayı oluştur
+
+        writer = TrailWriter(db_path, queue_size=5, batch_size=2)
+        row = (('4b1805', 41.0, 29.0, None, None, None, 1000.0), ('4b1805', None, None, None, 0, 0))
+        accepted = [writer.enqueue(*row) for _ in range(8)]
+        assert accepted == [True] * 5 + [False] * 3
+
+        stats = writer.get_statistics()
+        assert stats['enqueued'] == 5 and stats['dropped'] == stats['dropped_queue_full'] == 3
+        assert stats['max_queue_depth'] == 5 and stats['queue_depth'] == 5
+        assert writer.flush(timeout=0.1) is False  # Thread çalışmıyor
+
+        writer.start()
+        assert writer.flush(timeout=5.0) is True
+        stats = writer.get_statistics()
+        assert stats['written'] == 5 and stats['queue_depth'] == 0
+        assert stats['batches'] == 3 and stats['last_batch_size'] == 1  # 2 + 2 + 1 (flush)
+        assert stats['control_timeouts'] == 0
+        writer.stop()
+        assert _count(db_path) == 5
+
+
+def _flaky(writer, failures, error=sqlite3.OperationalError("database is locked")):
+    """İlk 'failures' commit denemesi hata versin"""
+    commit = writer._commit_batch
+    calls = []
+
+    def commit_batch(conn, batch):
+        calls.append(len(batch))
+        if len(calls) <= failures:
+            raise error
+        commit(conn, batch)
+
+    writer._commit_batch = commit_batch
+    return calls
+
+
+def test_write_retries_transient_errors():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'trails.db'
+        manager = TrailManager(db_path)
+        writer = manager.writer
+        writer.retry_backoff = 0.001
+        calls = _flaky(writer, failures=2)
+
+        for i in range(10):
+            manager.save_trail_point(**_point(i))
+        assert manager.flush()
+        stats = writer.get_statistics()
+        assert calls == [10, 10, 10]
+        assert stats['written'] == 10 and stats['retries'] == 2
+        assert stats['errors'] == 0 and stats['dropped'] == 0
+        manager.close()
+        assert _count(db_path) == 10
+
+
+def test_write_failure_counts_dropped_points():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'trails.db'
+        manager = TrailManager(db_path)
+        writer = manager.writer
+        writer.retry_backoff = 0.001
+        calls = _flaky(writer, failures=writer.max_retries + 1)
+
+        for i in range(10):
+            manager.save_trail_point(**_point(i))
+        assert manager.flush()
+        stats = writer.get_statistics()
+        assert len(calls) == writer.max_retries + 1
+        assert stats['written'] == 0 and stats['errors'] == 1 and stats['retries'] == writer.max_retries
+        assert stats['dropped'] == stats['dropped_write_failed'] == 10
+
+        # Kalıcı hata (OperationalError değil) tekrar denenmez
+        calls = _flaky(writer, failures=1, error=sqlite3.IntegrityError("constraint"))
+        manager.save_trail_point(**_point(20))
+        assert manager.flush()
+        assert calls == [1] and writer.get_statistics()['dropped'] == 11
+
+        # Sonraki batch normal yazılır
+        manager.save_trail_point(**_point(21))
+        manager.close()
+        assert _count(db_path) == 1 and writer.written == 1
+
+
+# Baseline şeması (satır içi INDEX sözdizimi SQLite'ta geçersiz olduğundan ayrı indeks)
+LEGACY_SCHEMA = """
+    CREATE TABLE trail_points (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        hex_id TEXT NOT NULL,
+        lat REAL NOT NULL,
+        lon REAL NOT NULL,
+        altitude REAL,
+        speed REAL,
+        track REAL,
+        timestamp REAL NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_hex_timestamp ON trail_points (hex_id, timestamp);
+    CREATE TABLE trail_metadata (
+        hex_id TEXT PRIMARY KEY,
+        flight_code TEXT,
+        aircraft_type TEXT,
+        registration TEXT,
+        point_count INTEGER DEFAULT 0,
+        first_seen DATETIME,
+        last_seen DATETIME,
+        max_altitude REAL,
+        avg_speed REAL
+    );
+"""
+
+
+def _partitions(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT name, start_ts, end_ts, point_count FROM trail_partitions ORDER BY start_ts"
+        ).fetchall()
+
+
+def _object_type(db_path, name):
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def test_migrates_legacy_table():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'trails.db'
+        conn = sqlite3.connect(db_path)
+        conn.executescript(LEGACY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO trail_points (hex_id, lat, lon, altitude, speed, track, timestamp, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [('4b1805', 41.0, 29.0, 30000, 400, 90, 1000.0, '2026-01-01 10:00:00'),
+             ('4b1805', 41.1, 29.1, 30100, 401, 91, 1001.0, '2026-01-01 10:20:00'),
+             ('abcdef', 40.0, 28.0, None, None, None, 1002.0, '2026-01-01 10:30:00')]
+        )
+        conn.execute("INSERT INTO trail_metadata (hex_id, flight_code, point_count) VALUES ('4b1805', 'THY1', 2)")
+        conn.commit()
+        conn.close()
+
+        manager = TrailManager(db_path)
+        assert _object_type(db_path, 'trail_points') == 'view'
+        assert _object_type(db_path, 'trail_points_legacy') == 'table'
+        legacy_start = calendar.timegm((2026, 1, 1, 10, 0, 0))
+        assert _partitions(db_path) == [('trail_points_legacy', legacy_start, legacy_start + 30 * 60 + 1, 3)]
+
+        # Eski noktalar ve metadata okunur; yeni noktalar yeni partition'a yazılır
+        assert [p['timestamp'] for p in manager.get_trail('4b1805')] == [1000.0, 1001.0]
+        assert manager.get_trail_metadata('4b1805')['flight_code'] == 'THY1'
+        manager.save_trail_point(**_point(5))
+        manager.close()
+        assert [p['timestamp'] for p in manager.get_trail('4b1805')] == [1000.0, 1001.0, 1005.0]
+        assert [name for name, *_ in _partitions(db_path)] == ['trail_points_legacy', partition_for(time.time())[0]]
+
+        # Yeniden açmak tekrar taşımaz
+        TrailManager(db_path).close()
+        assert len(_partitions(db_path)) == 2 and _partitions(db_path)[0][3] == 3
+        assert manager.get_statistics()['total_points'] == 4
+
+
+def test_partitions_across_hour_boundary():
+    span = config.TRAIL_PARTITION_SECONDS
+    boundary = (int(time.time()) // span) * span
+    assert partition_for(boundary - 0.001) == (partition_for(boundary - span)[0], boundary - span)
+    assert partition_for(boundary)[1] == boundary
+    assert partition_for(boundary)[0] != partition_for(boundary - 0.001)[0]
+
+    original = trail_manager.partition_for
+    clock = [boundary - 0.5]
+    trail_manager.partition_for = lambda epoch: original(clock[0])
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / 'trails.db'
+            manager = TrailManager(db_path)
+            for i in range(3):
+                manager.save_trail_point(**_point(i))
+            assert manager.flush()
+            clock[0] = boundary + 0.5  # Saat değişti
+            for i in range(3, 5):
+                manager.save_trail_point(**_point(i))
+            manager.close()
+
+            first, second = _partitions(db_path)
+            assert first == (original(boundary - 1)[0], boundary - span, boundary, 3)
+            assert second == (original(boundary)[0], boundary, boundary + span, 2)
+            # View iki partition'ı birleştirir; limit en yeni noktaları alır, sıra eskiden yeniye
+            assert [p['timestamp'] for p in manager.get_trail('4b1805')] == [1000.0 + i for i in range(5)]
+            assert [p['timestamp'] for p in manager.get_trail('4b1805', limit=3)] == [1002.0, 1003.0, 1004.0]
+            assert manager.get_statistics()['partitions'] == 2
+    finally:
+        trail_manager.partition_for = original
+
+
+def test_retention_drops_only_fully_expired_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'trails.db'
+        manager = TrailManager(db_path)
+        now = time.time()
+        hour = 3600
+        partitions = {
+            'trail_points_old': (now - 5 * hour, now - 4 * hour),  # Tamamen eski
+            'trail_points_edge': (now - 3 * hour, now - 2 * hour + 60),  # Bitişi sınırdan sonra
+            'trail_points_new': (now - hour, now + hour)
+        }
+        with sqlite3.connect(db_path) as conn:
+            for name, (start_ts, end_ts) in partitions.items():
+                create_partition(conn, name, start_ts, end_ts)
+                conn.execute(f"INSERT INTO {name} (hex_id, lat, lon, timestamp) VALUES ('4b1805', 41, 29, ?)",
+                             (start_ts,))
+                conn.execute("UPDATE trail_partitions SET point_count = 1 WHERE name = ?", (name,))
+            rebuild_catalog_view(conn)
+            conn.execute("INSERT INTO trail_metadata (hex_id, last_seen) VALUES ('old', datetime('now', '-3 hours'))")
+            conn.execute("INSERT INTO trail_metadata (hex_id, last_seen) VALUES ('4b1805', datetime('now'))")
+
+        # Writer thread'i üzerinden (cleanup_old_trails -> apply_retention)
+        assert manager.writer.apply_retention(2) == (1, 1, 1)
+        assert [name for name, *_ in _partitions(db_path)] == ['trail_points_edge', 'trail_points_new']
+        assert _object_type(db_path, 'trail_points_old') is None
+        assert len(manager.get_trail('4b1805')) == 2
+        assert manager.get_trail_metadata('old') is None
+
+        manager.close()
+        # Writer kapalıyken doğrudan
+        with sqlite3.connect(db_path) as conn:
+            assert drop_expired_partitions(conn, 1.5) == (1, 1, 0)
+        assert [name for name, *_ in _partitions(db_path)] == ['trail_points_new']
+        with sqlite3.connect(db_path) as conn:
+            assert drop_expired_partitions(conn, 0)[:2] == (0, 0)  # 'new' henüz bitmedi
+        assert [p['timestamp'] for p in manager.get_trail('4b1805')] == [partitions['trail_points_new'][0]]
+
+
+if __name__ == '__main__':
+    for test in (
+        test_stop_flushes_pending_points,
+        test_backpressure_and_flush_counters,
+        test_write_retries_transient_errors,
+        test_write_failure_counts_dropped_points,
+        test_migrates_legacy_table,
+        test_partitions_across_hour_boundary,
+        test_retention_drops_only_fully_expired_partitions,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
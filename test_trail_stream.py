@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+İz aboneliği Testi
+
+encode_polyline / decode_polyline gidiş-dönüşü ve TrailSubscriptions'ın
+artımlı yolu: abone olunca son max_points nokta, sonra sadece yeni noktalar
+gelir; ring buffer client'ı geçerse veya validator değişirse tam iz yeniden
+gönderilir. Client tarafı mesajları uygulayınca iz sunucudakiyle aynı olmalı.
+"""
+
+import random
+
+import config
+from fleet_store import FleetStore
+from position_validator import PositionValidator
+from trail_stream import TrailSubscriptions
+from utils import decode_polyline, encode_polyline
+
+HISTORY_SIZE = 8
+MAX_POINTS = 5
+
+
+def test_polyline_round_trip():
+    # Google'ın belgelediği örnek
+    coords = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+    assert encode_polyline(coords) == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+    assert decode_polyline('_p~iF~ps|U_ulLnnqC_mqNvxq`@') == coords
+    assert encode_polyline([]) == '' and decode_polyline('') == []
+
+    rng = random.Random(9)
+    for precision in (5, 6):
+        factor = 10 ** precision
+        for _ in range(200):
+            coords = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(rng.randint(1, 30))]
+            coords += [coords[-1]] * rng.randint(0, 2)  # Sıfır farklar
+            decoded = decode_polyline(encode_polyline(coords, precision), precision)
+            assert decoded == [(round(lat * factor) / factor, round(lon * factor) / factor)
+                               for lat, lon in coords]
+
+
+class _Fleet:
+    """Küçük geçmişli izole FleetStore + iz ayarları"""
+
+    def __enter__(self):
+        self._saved = (config._aircraft_state, config.AIRCRAFT_TRAIL['max_points'])
+        config._aircraft_state = FleetStore(HISTORY_SIZE)
+        config.AIRCRAFT_TRAIL['max_points'] = MAX_POINTS
+        self.ts = 1000.0
+        return self
+
+    def __exit__(self, *exc):
+        config._aircraft_state, config.AIRCRAFT_TRAIL['max_points'] = self._saved
+
+    def add(self, hex_id, count):
+        store = config._aircraft_state
+        validator = store.get(hex_id)
+        if validator is None:
+            validator = PositionValidator(hex_id, store=store)
+            store[hex_id] = validator
+        for _ in range(count):
+            self.ts += 1.0
+            # 1e-5 ızgarasında: polyline kodlaması kayıpsız
+            validator.apply_result(40.0 + self.ts / 1e5, 29.0 - self.ts / 1e5, self.ts, 90.0, 400.0, 30000, True)
+        return validator
+
+
+class _Client:
+    """Tarayıcıdaki 'trail' işleyicisinin karşılığı"""
+
+    def __init__(self):
+        self.trails = {}
+        self.max_points = {}
+
+    def apply(self, payload):
+        modes = []
+        for update in payload['updates']:
+            points = decode_polyline(update['polyline'])
+            if update['mode'] == 'full':
+                self.trails[update['hex']] = points
+                self.max_points[update['hex']] = update['max_points']
+            else:
+                self.trails[update['hex']] = (self.trails[update['hex']] + points)[-self.max_points[update['hex']]:]
+            modes.append(update['mode'])
+        return modes
+
+
+def _server_trail(hex_id):
+    return config._aircraft_state[hex_id].position_history.last(MAX_POINTS).coords()
+
+
+def test_subscribe_then_incremental_appends():
+    with _Fleet() as fleet:
+        subscriptions = TrailSubscriptions()
+        client = _Client()
+        assert subscriptions.subscribe('sid-1', 'abc123') is None  # Uçak yok
+
+        fleet.add('abc123', 7)
+        message = subscriptions.subscribe('sid-1', 'abc123')
+        assert message['mode'] == 'full' and message['max_points'] == MAX_POINTS
+        client.apply({'updates': [message]})
+        assert client.trails['abc123'] == _server_trail('abc123') and len(client.trails['abc123']) == MAX_POINTS
+        assert subscriptions.collect() == []  # Yeni nokta yok
+
+        # Sadece yeni noktalar; max_points'ten fazlası gönderilmez
+        for count, expected_points in ((2, 2), (HISTORY_SIZE - 1, MAX_POINTS)):
+            fleet.add('abc123', count)
+            ((sid, payload),) = subscriptions.collect()
+            assert sid == 'sid-1' and client.apply(payload) == ['append']
+            assert len(decode_polyline(payload['updates'][0]['polyline'])) == expected_points
+            assert client.trails['abc123'] == _server_trail('abc123')
+
+        # Ring buffer client'ın son gördüğü noktayı geçti: tam iz
+        fleet.add('abc123', HISTORY_SIZE + 1)
+        ((_, payload),) = subscriptions.collect()
+        assert client.apply(payload) == ['full'] and client.trails['abc123'] == _server_trail('abc123')
+
+        # Validator değişti (uçak silinip yeniden geldi): tam iz
+        del config._aircraft_state['abc123']
+        fleet.add('abc123', 2)
+        ((_, payload),) = subscriptions.collect()
+        assert client.apply(payload) == ['full'] and client.trails['abc123'] == _server_trail('abc123')
+
+
+def test_unsubscribe_and_removed_aircraft():
+    with _Fleet() as fleet:
+        subscriptions = TrailSubscriptions()
+        for hex_id in ('aaaaaa', 'bbbbbb', 'cccccc'):
+            fleet.add(hex_id, 3)
+        subscriptions.subscribe('sid-1', 'aaaaaa')
+        subscriptions.subscribe('sid-1', 'bbbbbb')
+        subscriptions.subscribe('sid-2', 'aaaaaa')
+        subscriptions.subscribe('sid-2', 'cccccc')
+        assert len(subscriptions) == 4
+
+        subscriptions.unsubscribe('sid-1', 'bbbbbb')
+        subscriptions.unsubscribe('sid-3')  # Bilinmeyen client sorun değil
+        for hex_id in ('aaaaaa', 'bbbbbb', 'cccccc'):
+            fleet.add(hex_id, 1)
+        collected = {sid: sorted(u['hex'] for u in payload['updates']) for sid, payload in subscriptions.collect()}
+        assert collected == {'sid-1': ['aaaaaa'], 'sid-2': ['aaaaaa', 'cccccc']}
+
+        # Silinen uçağın aboneliği sessizce kalkar; boşalan client da kalkar
+        del config._aircraft_state['aaaaaa']
+        fleet.add('cccccc', 1)
+        assert [sid for sid, _ in subscriptions.collect()] == ['sid-2']
+        assert len(subscriptions) == 1
+
+        subscriptions.unsubscribe('sid-2')
+        assert len(subscriptions) == 0 and subscriptions.collect() == []
+
+
+if __name__ == '__main__':
+    for test in (
+        test_polyline_round_trip,
+        test_subscribe_then_incremental_appends,
+        test_unsubscribe_and_removed_aircraft,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
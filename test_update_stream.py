@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Güncelleme akışı Testi
+
+DeltaEncoder protokolü: ilk mesaj ve her keyframe_interval tick'te keyframe,
+arada seq/base_seq zincirli delta'lar (eklenen, sadece değişen alanlar,
+kaldırılan); sırayı kaçıran client keyframe() ile yeniden eşitlenir. Client
+yokken de encoder güncel kalır, yeni client güncel filoyu alır.
+
+app.emit_update gönderim seyreltmesi (MOTION_VECTORS): aralık dolmadan gelen
+tick'ler atlanır ve sayılır, force=True aralığı beklemez, atlanan tick'lerin
+değişiklikleri sonraki delta'da gelir.
+"""
+
+import time
+
+import app
+import config
+import metrics
+from update_stream import DeltaEncoder, ViewportRouter, to_wire
+
+
+def _aircraft(hex_id, lat=41.0, **fields):
+    return {'hex': hex_id, 'lat': lat, 'lon': 29.0, 'altitude': 30000, 'speed': 400.0,
+            'track': 90.0, '_corrected': False, **fields}
+
+
+class _Clients:
+    """Bağlı tek JSON client'ı; socketio.emit yerine mesajlar toplanır"""
+
+    def __init__(self, motion=None, connected=True):
+        self.motion = motion or {}
+        self.connected = connected
+        self.sent = []
+
+    def __enter__(self):
+        self._saved = (set(config._connected_clients), set(config._binary_clients),
+                       dict(config.MOTION_VECTORS), dict(config.UPDATE_STREAM),
+                       app.socketio.emit, app.get_update_stream, app.get_viewport_router, app._last_emit)
+        config._connected_clients.clear()
+        if self.connected:
+            config._connected_clients.add('sid-1')
+        config._binary_clients.clear()
+        config.MOTION_VECTORS.update(self.motion)
+        config.UPDATE_STREAM['delta'] = True
+        self.encoder = DeltaEncoder(keyframe_interval=100)
+        router = ViewportRouter()
+        app.get_update_stream = lambda: self.encoder
+        app.get_viewport_router = lambda: router
+        app.socketio.emit = lambda event, message, room=None: self.sent.append((event, message, room))
+        app._last_emit = 0.0
+        return self
+
+    def __exit__(self, *exc):
+        (connected, binary, motion, stream, app.socketio.emit, app.get_update_stream,
+         app.get_viewport_router, app._last_emit) = self._saved
+        config._connected_clients.clear()
+        config._connected_clients.update(connected)
+        config._binary_clients.clear()
+        config._binary_clients.update(binary)
+        config.MOTION_VECTORS.update(motion)
+        config.UPDATE_STREAM.update(stream)
+
+    def updates(self):
+        messages = [message for event, message, _ in self.sent if event == 'update']
+        self.sent.clear()
+        return messages
+
+
+class _Client:
+    """Tarayıcıdaki delta uygulamasının karşılığı"""
+
+    def __init__(self):
+        self.seq = None
+        self.aircraft = {}
+
+    def apply(self, message):
+        """Mesajı uygula; sıra kopmuşsa False (client 'resync' ister)"""
+        if message['type'] == 'keyframe':
+            self.aircraft = {ac['hex']: dict(ac) for ac in message['aircraft']}
+        else:
+            if message['base_seq'] != self.seq:
+                return False
+            for hex_id in message['removed']:
+                del self.aircraft[hex_id]
+            for ac in message['added']:
+                self.aircraft[ac['hex']] = dict(ac)
+            for diff in message['changed']:
+                self.aircraft[diff['hex']].update(diff)
+        self.seq = message['seq']
+        return True
+
+
+def _expected(aircraft):
+    return {ac['hex']: to_wire(ac) for ac in aircraft}
+
+
+def test_keyframe_delta_sequence():
+    encoder = DeltaEncoder(keyframe_interval=3)
+    ticks = [
+        [_aircraft('aaaaaa'), _aircraft('bbbbbb')],
+        [_aircraft('aaaaaa', lat=41.1), _aircraft('bbbbbb'), _aircraft('cccccc')],
+        [_aircraft('aaaaaa', lat=41.1, squawk='7700'), _aircraft('cccccc')],
+        [_aircraft('cccccc', lat=40.0)],
+        [_aircraft('cccccc', lat=40.1), _aircraft('dddddd')],
+    ]
+    messages = [encoder.encode(100.0 + i, aircraft, {'tick': i}) for i, aircraft in enumerate(ticks)]
+
+    assert [m['type'] for m in messages] == ['keyframe', 'delta', 'delta', 'keyframe', 'delta']
+    assert [m['seq'] for m in messages] == [1, 2, 3, 4, 5]
+    assert [m.get('base_seq') for m in messages] == [None, 1, 2, None, 4]
+
+    _, delta, delta2, _, _ = messages
+    assert [ac['hex'] for ac in delta['added']] == ['cccccc'] and delta['removed'] == []
+    assert delta['changed'] == [{'lat': 41.1, 'hex': 'aaaaaa'}]  # Sadece değişen alan
+    assert delta2['changed'] == [{'squawk': '7700', 'hex': 'aaaaaa'}]
+    assert delta2['removed'] == ['bbbbbb'] and delta2['added'] == []
+    assert delta2['now'] == 102.0 and delta2['stats'] == {'tick': 2}
+
+    # Her mesajı alan client her tick'te gerçek durumla aynı
+    client = _Client()
+    for message, aircraft in zip(messages, ticks):
+        assert client.apply(message)
+        assert client.aircraft == _expected(aircraft)
+
+
+def test_resync_after_missed_delta():
+    encoder = DeltaEncoder(keyframe_interval=100)
+    ticks = [[_aircraft('aaaaaa', lat=41.0 + i / 10)] + [_aircraft('bbbbbb')] * (i % 2) for i in range(5)]
+    client = _Client()
+    assert client.apply(encoder.encode(100.0, ticks[0], {}))
+    encoder.encode(101.0, ticks[1], {})  # Client bu delta'yı kaçırdı
+    message = encoder.encode(102.0, ticks[2], {})
+    assert not client.apply(message)  # base_seq 2 != 1
+
+    resync = encoder.keyframe({'resync': True})
+    assert resync['type'] == 'keyframe' and resync['seq'] == 3 and resync['now'] == 102.0
+    assert client.apply(resync) and client.aircraft == _expected(ticks[2])
+    assert client.apply(encoder.encode(103.0, ticks[3], {}))
+    assert client.aircraft == _expected(ticks[3])
+
+    # reset(): sonraki mesaj keyframe, seq devam eder
+    encoder.reset()
+    message = encoder.encode(104.0, ticks[4], {})
+    assert message['type'] == 'keyframe' and message['seq'] == 5
+    assert client.apply(message) and client.aircraft == _expected(ticks[4])
+
+
+def test_new_client_gets_current_fleet():
+    """Client yokken geçen tick'ler encoder'ı ilerletir; bağlanan client bayat filo görmez"""
+    with _Clients({'enabled': False}, connected=False) as clients:
+        app.emit_update(100.0, [_aircraft('aaaaaa'), _aircraft('bbbbbb')], {})
+        app.emit_update(101.0, [_aircraft('aaaaaa', lat=41.2)], {})
+        assert clients.updates() == []
+
+        config._connected_clients.add('sid-1')
+        app.emit_full_fleet_keyframe('sid-1')
+        (keyframe,) = clients.updates()
+        assert keyframe['seq'] == 2 and keyframe['now'] == 101.0
+        client = _Client()
+        assert client.apply(keyframe) and client.aircraft == _expected([_aircraft('aaaaaa', lat=41.2)])
+
+        app.emit_update(102.0, [_aircraft('aaaaaa', lat=41.3)], {})
+        (delta,) = clients.updates()
+        assert client.apply(delta) and client.aircraft['aaaaaa']['lat'] == 41.3
+
+
+def test_motion_vectors_disabled_by_default():
+    assert config.MOTION_VECTORS['enabled'] is False
+
+
+def test_emit_throttle():
+    with _Clients({'enabled': True, 'emit_interval': 3.0}) as clients:
+        skipped = metrics.skipped_emits.get()
+
+        app.emit_update(100.0, [_aircraft('aaaaaa'), _aircraft('bbbbbb')], {})
+        (keyframe,) = clients.updates()
+        assert keyframe['type'] == 'keyframe' and keyframe['seq'] == 1
+
+        # Aralık dolmadı: atlanır ve sayılır, encoder state'i değişmez
+        app.emit_update(101.0, [_aircraft('aaaaaa', lat=41.5)], {})
+        app.emit_update(102.0, [_aircraft('aaaaaa', lat=41.6), _aircraft('cccccc')], {})
+        assert clients.updates() == []
+        assert metrics.skipped_emits.get() == skipped + 2
+        assert clients.encoder.seq == 1
+
+        # Aralık doldu: delta, atlanan tick'lerin değişikliklerini taşır
+        app._last_emit = time.monotonic() - 3.0
+        app.emit_update(103.0, [_aircraft('aaaaaa', lat=41.7), _aircraft('cccccc')], {})
+        (delta,) = clients.updates()
+        assert delta['type'] == 'delta' and delta['seq'] == 2 and delta['base_seq'] == 1
+        assert [ac['hex'] for ac in delta['added']] == ['cccccc']
+        assert delta['changed'] == [{'lat': 41.7, 'hex': 'aaaaaa'}]
+        assert delta['removed'] == ['bbbbbb']
+
+        # force=True aralığı beklemez (ör. seek)
+        app.emit_update(104.0, [_aircraft('aaaaaa', lat=41.8)], {}, force=True)
+        (forced,) = clients.updates()
+        assert forced['base_seq'] == 2 and forced['removed'] == ['cccccc']
+        assert metrics.skipped_emits.get() == skipped + 2
+
+
+def test_no_throttle_when_disabled_or_zero_interval():
+    for motion in ({'enabled': False, 'emit_interval': 3.0}, {'enabled': True, 'emit_interval': 0}):
+        with _Clients(motion) as clients:
+            skipped = metrics.skipped_emits.get()
+            for tick in range(4):
+                app.emit_update(100.0 + tick, [_aircraft('aaaaaa', lat=41.0 + tick / 10)], {})
+            assert [message['seq'] for message in clients.updates()] == [1, 2, 3, 4]
+            assert metrics.skipped_emits.get() == skipped
+
+
+if __name__ == '__main__':
+    for test in (
+        test_keyframe_delta_sequence,
+        test_resync_after_missed_delta,
+        test_new_client_gets_current_fleet,
+        test_motion_vectors_disabled_by_default,
+        test_emit_throttle,
+        test_no_throttle_when_disabled_or_zero_interval,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+wire_format Testi
+
+encode_frame -> decode_frame gidiş-dönüşü: null alanlar, "ground" irtifa,
+nicemleme sınırları (sıkıştırma), delta'da kaldırılan uçaklar ve v3 alanları
+(vert_rate, _pos_ts). 255 byte'ı aşan UTF-8 stringler karakter sınırında
+kırpılmalı.
+"""
+
+from update_stream import DeltaEncoder, WIRE_FIELDS, to_wire
+from wire_format import decode_frame, encode_frame
+
+NOW = 1700000000.0
+
+
+def _aircraft(hex_id, **fields):
+    ac = {field: None for field in WIRE_FIELDS}
+    ac.update({
+        'hex': hex_id, 'flight': 'THY1', 'lat': 41.27531, 'lon': 28.75204,
+        'altitude': 35000, 'speed': 452.3, 'track': 123.4, 'squawk': '2201',
+        'type': 'adsb_icao', 'r': 'TC-JJA', 't': 'B77W',
+        '_corrected': False, '_correction_reason': None,
+        '_movement_heading': 123.5, 'vert_rate': -640, '_pos_ts': NOW - 2.3
+    })
+    ac.update(fields)
+    return ac
+
+
+def _approx(expected, actual):
+    """Nicemleme hassasiyeti içinde eşitlik"""
+    for field in WIRE_FIELDS:
+        want, got = expected[field], actual[field]
+        if isinstance(want, float):
+            tolerance = {'lat': 1e-5, 'lon': 1e-5, '_pos_ts': 0.1}.get(field, 0.1)
+            assert got is not None and abs(want - got) <= tolerance, (field, want, got)
+        else:
+            assert want == got, (field, want, got)
+
+
+def test_keyframe_round_trip():
+    aircraft = [
+        _aircraft('4b1805'),
+        _aircraft('~000001', _corrected=True, _correction_reason='outlier'),
+        # Tüm sayısal/string alanlar boş
+        {field: None for field in WIRE_FIELDS} | {'hex': '4b1806', '_corrected': False},
+        _aircraft('4b1807', altitude='ground', speed=0.0, vert_rate=0, track=0.0),
+        _aircraft('4b1808', lat=-33.94609, lon=-179.99999, track=359.9, vert_rate=64)
+    ]
+    message = {'type': 'keyframe', 'seq': 7, 'now': NOW, 'aircraft': aircraft, 'stats': {'total': 5}}
+    decoded = decode_frame(encode_frame(message))
+
+    assert decoded['type'] == 'keyframe' and decoded['seq'] == 7 and decoded['now'] == NOW
+    assert decoded['stats'] == {'total': 5}
+    assert len(decoded['aircraft']) == len(aircraft)
+    for expected, actual in zip(aircraft, decoded['aircraft']):
+        _approx(expected, actual)
+    assert decoded['aircraft'][1]['_corrected'] is True
+    assert decoded['aircraft'][3]['altitude'] == 'ground'
+    assert decoded['aircraft'][2]['altitude'] is None and decoded['aircraft'][2]['_pos_ts'] is None
+
+
+def test_quantization_limits():
+    """Aralık dışı değerler sınıra sıkıştırılır, sentinel'lerle karışmaz"""
+    message = {'now': NOW, 'stats': {}, 'aircraft': [
+        _aircraft('aaaaaa', speed=9999.0, track=-5000.0, vert_rate=99999,
+                  _movement_heading=5000.0, _pos_ts=NOW - 99999.0, altitude=-(2 ** 40)),
+        _aircraft('bbbbbb', speed=-10.0, vert_rate=-99999, _pos_ts=NOW + 5.0, altitude=2 ** 40,
+                  lat='nan?', lon=True),
+    ]}
+    first, second = decode_frame(encode_frame(message))['aircraft']
+
+    assert first['speed'] == 6553.4
+    assert first['track'] == -3276.7
+    assert first['_movement_heading'] == 3276.7
+    assert first['vert_rate'] == 32767
+    assert first['_pos_ts'] == round(NOW - 6553.4, 1)
+    assert first['altitude'] == -2 ** 31 + 2  # "ground" sentinel'inin bir üstü
+
+    assert second['speed'] == 0.0
+    assert second['vert_rate'] == -32767
+    assert second['_pos_ts'] == NOW  # Gelecekteki pozisyon yaşı 0'a sıkışır
+    assert second['altitude'] == 2 ** 31 - 1
+    assert second['lat'] is None and second['lon'] is None  # Sayı olmayan değer null
+
+
+def test_delta_round_trip():
+    encoder = DeltaEncoder(keyframe_interval=100)
+    first = [_aircraft('4b1805'), _aircraft('4b1806'), _aircraft('4b1807')]
+    message, frame = encoder.encode_frames(NOW, first, {}, binary=True)
+    assert decode_frame(frame)['type'] == 'keyframe'
+
+    second = [
+        _aircraft('4b1805', lat=41.3, vert_rate=None, _pos_ts=NOW + 0.5),  # Değişen
+        _aircraft('4b1806'),  # Aynı
+        _aircraft('4b1809', altitude='ground')  # Yeni
+    ]
+    message, frame = encoder.encode_frames(NOW + 1.0, second, {'n': 3}, binary=True)
+    decoded = decode_frame(frame)
+
+    assert decoded['type'] == 'delta'
+    assert decoded['seq'] == message['seq'] and decoded['base_seq'] == message['base_seq']
+    assert decoded['removed'] == ['4b1807']
+    assert [ac['hex'] for ac in decoded['added']] == ['4b1809']
+    assert [ac['hex'] for ac in decoded['changed']] == ['4b1805']
+    _approx(to_wire(second[2]), decoded['added'][0])
+    # Değişen uçak fark değil tam kayıt olarak gelir
+    _approx(to_wire(second[0]), decoded['changed'][0])
+    assert decoded['changed'][0]['vert_rate'] is None
+    assert decoded['stats'] == {'n': 3}
+
+
+def test_long_utf8_string_truncated_at_char_boundary():
+    reason = 'ğ' * 200  # 400 byte; 255. byte bir karakterin ortasına düşer
+    message = {'now': None, 'stats': {}, 'aircraft': [_aircraft('4b1805', _correction_reason=reason)]}
+    decoded = decode_frame(encode_frame(message))
+
+    assert decoded['now'] is None
+    assert decoded['aircraft'][0]['_correction_reason'] == 'ğ' * 127
+    assert decoded['aircraft'][0]['_pos_ts'] is None  # now yoksa yaş gönderilmez
+
+
+if __name__ == '__main__':
+    for test in (
+        test_keyframe_round_trip,
+        test_quantization_limits,
+        test_delta_round_trip,
+        test_long_utf8_string_truncated_at_char_boundary,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
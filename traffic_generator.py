@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Deterministik sentetik trafik üreteci
+
+Sabit seed ile N uçağı büyük daire rotalarında hareket ettirir ve dump1090
+formatında ({"now", "messages", "aircraft"}) snapshot'lar üretir. Aynı seed
+ve parametreler her zaman aynı snapshot dizisini verir; benchmark'lar ve
+tekrar oynatma testleri için kullanılır.
+
+Enjekte edilen hatalar (oranlar snapshot başına, uçak başına olasılıktır):
+    outlier_rate: Tek snapshot'lık sapma (gerçek konumdan 20-100 km)
+    jump_rate:    Kalıcı sıçrama (bildirilen konum 16-40 km kayar, uçak oradan devam eder)
+    stale_rate:   Konum güncellenmez (önceki konum tekrar gönderilir, seen_pos artar)
+
+Kullanım:
+    python traffic_generator.py json_files --aircraft 1000 --snapshots 600
+"""
+
+import argparse
+import json
+import math
+import random
+from pathlib import Path
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def destination_point(lat, lon, bearing, distance_km):
+    """Başlangıç noktasından bearing yönünde distance_km ilerideki nokta (büyük daire)
+
+    Returns:
+        (lat, lon, varış noktasındaki bearing)
+    """
+    phi1 = math.radians(lat)
+    lambda1 = math.radians(lon)
+    theta = math.radians(bearing)
+    delta = distance_km / EARTH_RADIUS_KM
+
+    sin_phi2 = math.sin(phi1) * math.cos(delta) + math.cos(phi1) * math.sin(delta) * math.cos(theta)
+    phi2 = math.asin(max(-1.0, min(1.0, sin_phi2)))
+    lambda2 = lambda1 + math.atan2(
+        math.sin(theta) * math.sin(delta) * math.cos(phi1),
+        math.cos(delta) - math.sin(phi1) * sin_phi2
+    )
+
+    # Büyük dairede yön sürekli değişir: varıştaki yön = ters yönün tersi
+    y = math.sin(lambda1 - lambda2) * math.cos(phi1)
+    x = math.cos(phi2) * math.sin(phi1) - math.sin(phi2) * math.cos(phi1) * math.cos(lambda1 - lambda2)
+    final_bearing = (math.degrees(math.atan2(y, x)) + 180.0) % 360.0
+
+    return math.degrees(phi2), (math.degrees(lambda2) + 540.0) % 360.0 - 180.0, final_bearing
+
+
+class _Flight:
+    """Tek uçağın gerçek (hatasız) durumu"""
+
+    __slots__ = ('hex', 'flight', 'squawk', 'type', 'lat', 'lon', 'track', 'speed',
+                 'altitude', 'vertical_rate', 'offset', 'reported', 'seen_pos', 'messages')
+
+    def __init__(self, hex_id, flight, squawk, aircraft_type, lat, lon, track, speed, altitude):
+        self.hex = hex_id
+        self.flight = flight
+        self.squawk = squawk
+        self.type = aircraft_type
+        self.lat = lat
+        self.lon = lon
+        self.track = track
+        self.speed = speed
+        self.altitude = altitude
+        self.vertical_rate = 0
+        self.offset = (0.0, 0.0)  # Kalıcı sıçramadan gelen (dlat, dlon)
+        self.reported = None  # Son gönderilen (lat, lon)
+        self.seen_pos = 0.0
+        self.messages = 0
+
+
+class TrafficGenerator:
+    """Seed'li dump1090 snapshot üreteci"""
+
+    AIRLINES = ('THY', 'PGT', 'SXS', 'AJA', 'DLH', 'BAW', 'AFR', 'UAE', 'QTR', 'KLM')
+    TYPES = ('A320', 'A321', 'B738', 'B38M', 'A333', 'B77W', 'A20N', 'E190')
+
+    def __init__(self, aircraft=300, seed=0, center_lat=40.0, center_lon=29.0, radius_km=400.0,
+                 interval=1.0, start_time=1700000000.0,
+                 outlier_rate=0.0, jump_rate=0.0, stale_rate=0.0):
+        self.rng = random.Random(seed)
+        self.center_lat = center_lat
+        self.center_lon = center_lon
+        self.radius_km = radius_km
+        self.interval = interval
+        self.now = start_time
+        self.outlier_rate = outlier_rate
+        self.jump_rate = jump_rate
+        self.stale_rate = stale_rate
+        self.messages = 0
+        self.injected = {'outliers': 0, 'jumps': 0, 'stale': 0}
+
+        hexes = set()
+        self.flights = []
+        while len(self.flights) < aircraft:
+            hex_id = f"{self.rng.getrandbits(24):06x}"
+            if hex_id in hexes:
+                continue
+            hexes.add(hex_id)
+            self.flights.append(self._spawn(hex_id))
+
+    def _spawn(self, hex_id):
+        """Bölge içinde rastgele konum, yön, hız ve irtifa"""
+        rng = self.rng
+        distance = self.radius_km * math.sqrt(rng.random())  # Alan üzerinde düzgün dağılım
+        lat, lon, _ = destination_point(self.center_lat, self.center_lon, rng.uniform(0, 360), distance)
+        return _Flight(
+            hex_id,
+            f"{rng.choice(self.AIRLINES)}{rng.randint(1, 9999)}",
+            f"{rng.randint(0, 7777):04d}",
+            rng.choice(self.TYPES),
+            lat, lon,
+            rng.uniform(0, 360),
+            rng.uniform(250, 480),
+            rng.randrange(3000, 41000, 100)
+        )
+
+    def _advance(self, flight, dt):
+        """Uçağı dt saniye büyük daire üzerinde ilerlet"""
+        rng = self.rng
+        distance_km = flight.speed * 1.852 * dt / 3600.0
+        flight.lat, flight.lon, flight.track = destination_point(flight.lat, flight.lon, flight.track, distance_km)
+
+        # Bölgeden çıkınca merkeze doğru yeni rota
+        dlat = math.radians(flight.lat - self.center_lat)
+        dlon = math.radians(flight.lon - self.center_lon)
+        if math.hypot(dlat, dlon * math.cos(math.radians(self.center_lat))) * EARTH_RADIUS_KM > self.radius_km:
+            y = math.sin(-dlon) * math.cos(math.radians(self.center_lat))
+            x = (math.cos(math.radians(flight.lat)) * math.sin(math.radians(self.center_lat)) -
+                 math.sin(math.radians(flight.lat)) * math.cos(math.radians(self.center_lat)) * math.cos(-dlon))
+            flight.track = (math.degrees(math.atan2(y, x)) + rng.uniform(-30, 30)) % 360.0
+
+        # Yavaş irtifa değişimi
+        if rng.random() < 0.01:
+            flight.vertical_rate = rng.choice((-1500, -800, 0, 0, 800, 1500))
+        flight.altitude = int(min(43000, max(1000, flight.altitude + flight.vertical_rate * dt / 60.0)))
+
+    def snapshot(self):
+        """Bir sonraki snapshot (zaman interval kadar ilerler)"""
+        rng = self.rng
+        aircraft = []
+        for flight in self.flights:
+            self._advance(flight, self.interval)
+            count = rng.randint(2, 12)
+            flight.messages += count
+            self.messages += count
+
+            if flight.reported is not None and rng.random() < self.stale_rate:
+                # Konum güncellenmedi: aynı koordinat, artan seen_pos
+                self.injected['stale'] += 1
+                flight.seen_pos += self.interval
+                lat, lon = flight.reported
+            else:
+                if rng.random() < self.jump_rate:
+                    self.injected['jumps'] += 1
+                    shift = rng.uniform(16, 40)
+                    jlat, jlon, _ = destination_point(0.0, 0.0, rng.uniform(0, 360), shift)
+                    flight.offset = (flight.offset[0] + jlat, flight.offset[1] + jlon)
+                # Konum now - seen_pos anındaki gerçek konumdur (tutarlı zaman damgası)
+                flight.seen_pos = round(rng.uniform(0, 0.4 * self.interval), 1)
+                lat, lon, _ = destination_point(
+                    flight.lat, flight.lon, (flight.track + 180.0) % 360.0,
+                    flight.speed * 1.852 * flight.seen_pos / 3600.0
+                )
+                lat += flight.offset[0]
+                lon += flight.offset[1]
+                if rng.random() < self.outlier_rate:
+                    self.injected['outliers'] += 1
+                    lat, lon, _ = destination_point(lat, lon, rng.uniform(0, 360), rng.uniform(20, 100))
+                lat, lon = round(lat, 6), round(lon, 6)
+                flight.reported = (lat, lon)
+
+            aircraft.append({
+                "hex": flight.hex,
+                "flight": f"{flight.flight:<8}",
+                "alt_baro": flight.altitude,
+                "gs": round(flight.speed, 1),
+                "track": round(flight.track, 1),
+                "baro_rate": flight.vertical_rate,
+                "squawk": flight.squawk,
+                "lat": lat,
+                "lon": lon,
+                "seen_pos": round(flight.seen_pos, 1),
+                "seen": round(rng.uniform(0, 0.9), 1),
+                "messages": flight.messages,
+                "rssi": round(rng.uniform(-30.0, -3.0), 1),
+                "type": "adsb_icao",
+                "t": flight.type
+            })
+
+        snapshot = {"now": round(self.now, 1), "messages": self.messages, "aircraft": aircraft}
+        self.now += self.interval
+        return snapshot
+
+    def snapshots(self, count):
+        """count adet ardışık snapshot üret"""
+        for _ in range(count):
+            yield self.snapshot()
+
+    def write_json_dir(self, json_dir, count):
+        """Snapshot'ları JSONDataReader'ın okuyacağı adlarla dizine yaz"""
+        json_dir = Path(json_dir)
+        json_dir.mkdir(parents=True, exist_ok=True)
+        for i, snapshot in enumerate(self.snapshots(count)):
+            with open(json_dir / f"adsb_data_{i}.json", 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik dump1090 trafik üreteci")
+    parser.add_argument("output", type=Path, help="Çıktı dizini (adsb_data_N.json)")
+    parser.add_argument("--aircraft", type=int, default=300)
+    parser.add_argument("--snapshots", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interval", type=float, default=1.0, help="Snapshot aralığı (saniye)")
+    parser.add_argument("--outlier-rate", type=float, default=0.002)
+    parser.add_argument("--jump-rate", type=float, default=0.0005)
+    parser.add_argument("--stale-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    generator = TrafficGenerator(
+        args.aircraft, seed=args.seed, interval=args.interval,
+        outlier_rate=args.outlier_rate, jump_rate=args.jump_rate, stale_rate=args.stale_rate
+    )
+    generator.write_json_dir(args.output, args.snapshots)
+
+    print(f"✅ {args.snapshots} snapshot yazıldı ({args.aircraft} uçak, seed={args.seed}) -> {args.output}")
+    print(f"   Enjekte edilen: {generator.injected}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,11 @@
 """
 Uçak izlerini SQLite database'de saklama ve yönetme
 """
+import atexit
+import queue
 import sqlite3
+import threading
+import time
 import json
 from datetime import datetime
 from pathlib import Path
@@ -10,34 +14,376 @@ import config
 from utils import debug_log
 
 
+_TICK = object()  # Tick sonu işareti: bekleyen noktalar tek transaction'da yazılır
+_STOP = object()  # Kapanış işareti
+
+
+class _FlushRequest:
+    """Writer thread'in o ana kadarki her şeyi yazdığını bildiren işaret"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _RetentionRequest(_FlushRequest):
+    """Writer thread'de çalıştırılacak eski partition temizliği"""
+
+    def __init__(self, hours):
+        super().__init__()
+        self.hours = hours
+        self.result = None
+
+
+# Noktalar saatlik (TRAIL_PARTITION_SECONDS) partition tablolarında tutulur:
+# trail_points_YYYYMMDD_HHMMSS. trail_partitions kataloğu bu tabloları listeler,
+# trail_points ise hepsini birleştiren (UNION ALL) bir view'dır.
+PARTITION_PREFIX = "trail_points_"
+
+INSERT_POINT_SQL = """
+    INSERT INTO {table}
+    (hex_id, lat, lon, altitude, speed, track, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_METADATA_SQL = """
+    INSERT INTO trail_metadata
+    (hex_id, flight_code, aircraft_type, registration,
+     point_count, first_seen, last_seen, max_altitude, avg_speed)
+    VALUES (?, ?, ?, ?, 1, datetime('now'), datetime('now'), ?, ?)
+    ON CONFLICT(hex_id) DO UPDATE SET
+        point_count = point_count + 1,
+        last_seen = datetime('now'),
+        max_altitude = MAX(max_altitude, excluded.max_altitude),
+        avg_speed = (avg_speed * point_count + excluded.avg_speed) / (point_count + 1)
+"""
+
+
+def partition_for(epoch):
+    """Kayıt zamanına (wall clock) göre partition adı ve başlangıç zamanı"""
+    span = config.TRAIL_PARTITION_SECONDS
+    start = int(epoch // span) * span
+    return PARTITION_PREFIX + time.strftime("%Y%m%d_%H%M%S", time.gmtime(start)), start
+
+
+def create_partition(conn, name, start_ts, end_ts):
+    """Partition tablosunu, indeksini ve katalog kaydını oluştur"""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            hex_id TEXT NOT NULL,
+            lat REAL NOT NULL,
+            lon REAL NOT NULL,
+            altitude REAL,
+            speed REAL,
+            track REAL,
+            timestamp REAL NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_hex_ts ON {name} (hex_id, timestamp)")
+    conn.execute("""
+        INSERT OR IGNORE INTO trail_partitions (name, start_ts, end_ts, point_count)
+        VALUES (?, ?, ?, 0)
+    """, (name, start_ts, end_ts))
+
+
+def rebuild_catalog_view(conn):
+    """trail_points view'ını mevcut partition'lardan yeniden oluştur"""
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM trail_partitions ORDER BY start_ts"
+    )]
+    columns = "hex_id, lat, lon, altitude, speed, track, timestamp, created_at"
+
+    if names:
+        body = "\nUNION ALL\n".join(f"SELECT {columns} FROM {name}" for name in names)
+    else:
+        # Boş view (kolon isimleri korunur)
+        body = ("SELECT NULL AS hex_id, NULL AS lat, NULL AS lon, NULL AS altitude, "
+                "NULL AS speed, NULL AS track, NULL AS timestamp, NULL AS created_at LIMIT 0")
+
+    conn.execute("DROP VIEW IF EXISTS trail_points")
+    conn.execute(f"CREATE VIEW trail_points AS {body}")
+
+
+def drop_expired_partitions(conn, hours):
+    """Tamamı saklama süresinden eski partition'ları DROP TABLE ile sil
+
+    Satır satır DELETE yerine tablo düşürülür; süre partition sayısıyla
+    orantılıdır, nokta sayısıyla değil.
+
+    Returns:
+        (silinen partition, silinen nokta, silinen metadata) sayıları
+    """
+    cutoff = time.time() - hours * 3600
+    expired = conn.execute(
+        "SELECT name, point_count FROM trail_partitions WHERE end_ts <= ?", (cutoff,)
+    ).fetchall()
+
+    with conn:
+        for name, _ in expired:
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute("DELETE FROM trail_partitions WHERE name = ?", (name,))
+        if expired:
+            rebuild_catalog_view(conn)
+
+        # Uzun süredir görülmeyen uçakların metadata'sı (last_seen indeksli)
+        cursor = conn.execute("""
+            DELETE FROM trail_metadata
+            WHERE last_seen < datetime('now', '-' || ? || ' hours')
+        """, (hours,))
+
+    return len(expired), sum(count for _, count in expired), cursor.rowcount
+
+
+class TrailWriter(threading.Thread):
+    """Trail noktalarını arka planda, tek kalıcı bağlantıyla toplu yazan thread
+
+    Noktalar sınırlı bir kuyruktan okunur; her tick sonunda (veya batch
+    dolunca) executemany ile tek transaction'da yazılır. Kuyruk doluysa
+    nokta düşürülür ve sayılır (feed döngüsü asla beklemez). Yazılamayan
+    batch artan beklemeyle tekrar denenir; denemeler biterse noktaları da
+    düşürülmüş sayılır.
+    """
+
+    def __init__(self, db_path, queue_size=None, batch_size=None):
+        super().__init__(name="TrailWriter", daemon=True)
+        settings = config.TRAIL_WRITER
+        self.db_path = db_path
+        self.batch_size = batch_size or settings['batch_size']
+        self.max_retries = settings['max_retries']
+        self.retry_backoff = settings['retry_backoff']
+        self.queue = queue.Queue(maxsize=queue_size or settings['queue_size'])
+
+        # Backpressure metrikleri
+        self.enqueued = 0
+        self.dropped = 0  # Kuyruk dolu (feed thread'i sayar)
+        self.failed = 0  # Tekrar denemelere rağmen yazılamayan noktalar (writer thread'i sayar)
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.retries = 0
+        self.control_timeouts = 0  # Kuyruk dolu / writer takılı: flush, temizlik, durdurma zaman aşımı
+        self.max_queue_depth = 0
+        self.last_batch_size = 0
+        self.last_commit_ms = 0.0
+
+        self.partitions = set()  # Bu bağlantının bildiği partition'lar
+
+    def enqueue(self, point_row, metadata_row):
+        """Noktayı kuyruğa ekle (bloklamaz). Kuyruk doluysa False döner."""
+        try:
+            self.queue.put_nowait((point_row, metadata_row))
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        return True
+
+    def end_tick(self):
+        """Tick bitti: bekleyen noktaları yazdır"""
+        try:
+            self.queue.put_nowait(_TICK)
+        except queue.Full:
+            pass  # Writer batch dolunca zaten yazacak
+
+    def _put_control(self, item, deadline, action):
+        """Kontrol mesajını kuyruğa koy; kuyruk süre içinde boşalmazsa False
+
+        Writer takılıysa (kilitli DB vb.) ve kuyruk doluysa çağıran sonsuza
+        kadar beklemez; zaman aşımı sayılır ve raporlanır.
+        """
+        try:
+            self.queue.put(item, timeout=max(0.0, deadline - time.monotonic()))
+            return True
+        except queue.Full:
+            self._control_timeout(action)
+            return False
+
+    def _control_timeout(self, action):
+        self.control_timeouts += 1
+        debug_log(
+            f"⚠️ TrailWriter {action} zaman aşımı (kuyruk {self.queue.qsize()}/{self.queue.maxsize})",
+            "WARNING"
+        )
+
+    def flush(self, timeout=5.0):
+        """Kuyruktaki her şey yazılana kadar bekle (timeout kuyruğa koyma dahil toplam süre)"""
+        if not self.is_alive():
+            return False
+        deadline = time.monotonic() + timeout
+        request = _FlushRequest()
+        if not self._put_control(request, deadline, "flush"):
+            return False
+        if not request.done.wait(max(0.0, deadline - time.monotonic())):
+            self._control_timeout("flush")
+            return False
+        return True
+
+    def apply_retention(self, hours, timeout=60.0):
+        """Eski partition'ları writer thread'de düşür (sonucu bekler; zaman aşımında None)"""
+        deadline = time.monotonic() + timeout
+        request = _RetentionRequest(hours)
+        if not self._put_control(request, deadline, "temizlik"):
+            return None
+        if not request.done.wait(max(0.0, deadline - time.monotonic())):
+            self._control_timeout("temizlik")
+        return request.result
+
+    def stop(self, timeout=10.0):
+        """Kalan noktaları yaz ve thread'i durdur (en fazla timeout saniye)"""
+        if self.is_alive():
+            deadline = time.monotonic() + timeout
+            if not self._put_control(_STOP, deadline, "durdurma"):
+                return
+            self.join(max(0.0, deadline - time.monotonic()))
+            if self.is_alive():
+                self._control_timeout("durdurma")
+
+    def run(self):
+        # WAL kalıcıdır ve TrailManager._init_database'de açılır; burada açmaya
+        # çalışmak başka bir bağlantı transaction tutarken 'database is locked' verir
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self.partitions = {row[0] for row in conn.execute("SELECT name FROM trail_partitions")}
+
+        pending = []
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=1.0)
+                except queue.Empty:
+                    # Tick işareti gelmediyse bile bekleyenleri yaz
+                    if pending:
+                        self._write_batch(conn, pending)
+                        pending = []
+                    continue
+
+                if item is _TICK or item is _STOP or isinstance(item, _FlushRequest):
+                    if pending:
+                        self._write_batch(conn, pending)
+                        pending = []
+                    if isinstance(item, _RetentionRequest):
+                        item.result = self._run_retention(conn, item.hours)
+                    if isinstance(item, _FlushRequest):
+                        item.done.set()
+                    elif item is _STOP:
+                        break
+                    continue
+
+                pending.append(item)
+                if len(pending) >= self.batch_size:
+                    self._write_batch(conn, pending)
+                    pending = []
+        finally:
+            conn.close()
+
+    def _run_retention(self, conn, hours):
+        try:
+            result = drop_expired_partitions(conn, hours)
+        except Exception as e:
+            debug_log(f"❌ Temizlik hatası: {e}", "ERROR")
+            return None
+        self.partitions = {row[0] for row in conn.execute("SELECT name FROM trail_partitions")}
+        return result
+
+    def _write_batch(self, conn, batch):
+        """Batch'i tek transaction'da yaz; geçici hatada (OperationalError) tekrar dene"""
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                self._commit_batch(conn, batch)
+                break
+            except Exception as e:
+                # Transaction geri alındı; kilitli/meşgul DB geçici olabilir
+                if isinstance(e, sqlite3.OperationalError) and attempt < self.max_retries:
+                    delay = self.retry_backoff * 2 ** attempt
+                    attempt += 1
+                    self.retries += 1
+                    debug_log(
+                        f"⚠️ Trail batch yazılamadı ({len(batch)} nokta), {delay * 1000:.0f} ms sonra "
+                        f"tekrar denenecek ({attempt}/{self.max_retries}): {e}", "WARNING"
+                    )
+                    time.sleep(delay)
+                    continue
+                self.errors += 1
+                self.failed += len(batch)
+                debug_log(f"❌ Trail batch yazma hatası, {len(batch)} nokta düşürüldü: {e}", "ERROR")
+                return
+
+        self.written += len(batch)
+        self.batches += 1
+        self.last_batch_size = len(batch)
+        self.last_commit_ms = (time.perf_counter() - start) * 1000
+
+    def _commit_batch(self, conn, batch):
+        """Batch'i aktif partition'a tek transaction'da yaz"""
+        name, start_ts = partition_for(time.time())
+        with conn:
+            if name not in self.partitions:
+                create_partition(conn, name, start_ts, start_ts + config.TRAIL_PARTITION_SECONDS)
+                rebuild_catalog_view(conn)
+            conn.executemany(INSERT_POINT_SQL.format(table=name), [item[0] for item in batch])
+            conn.execute(
+                "UPDATE trail_partitions SET point_count = point_count + ? WHERE name = ?",
+                (len(batch), name)
+            )
+            conn.executemany(UPSERT_METADATA_SQL, [item[1] for item in batch])
+        self.partitions.add(name)
+
+    def get_statistics(self):
+        """Writer kuyruk ve backpressure metrikleri"""
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'max_queue_depth': self.max_queue_depth,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped + self.failed,
+            'dropped_queue_full': self.dropped,
+            'dropped_write_failed': self.failed,
+            'batches': self.batches,
+            'errors': self.errors,
+            'retries': self.retries,
+            'control_timeouts': self.control_timeouts,
+            'last_batch_size': self.last_batch_size,
+            'last_commit_ms': round(self.last_commit_ms, 2)
+        }
+
+
 class TrailManager:
     """Uçak izlerini database'de yönetir"""
 
     def __init__(self, db_path=None):
         self.db_path = db_path or config.DB_PATH
         self._init_database()
+        self.writer = TrailWriter(self.db_path)
+        self.writer.start()
 
     def _init_database(self):
         """Database ve tabloları oluştur"""
         try:
             conn = sqlite3.connect(self.db_path)
+            # Okuyucular writer thread'ini beklemesin (dosyada kalıcı, writer başlamadan)
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
 
-            # Trail points tablosu
+            # Partition kataloğu
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS trail_points (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    hex_id TEXT NOT NULL,
-                    lat REAL NOT NULL,
-                    lon REAL NOT NULL,
-                    altitude REAL,
-                    speed REAL,
-                    track REAL,
-                    timestamp REAL NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    INDEX idx_hex_timestamp (hex_id, timestamp)
+                CREATE TABLE IF NOT EXISTS trail_partitions (
+                    name TEXT PRIMARY KEY,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    point_count INTEGER DEFAULT 0
                 )
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_partitions_end
+                ON trail_partitions (end_ts)
+            """)
 
             # Trail metadata tablosu (özet bilgiler)
             cursor.execute("""
@@ -54,6 +400,20 @@ class TrailManager:
                 )
             """)
 
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_metadata_last_seen
+                ON trail_metadata (last_seen)
+            """)
+
+            # Eski tek tablolu şema varsa partition olarak kataloğa al
+            row = cursor.execute(
+                "SELECT type FROM sqlite_master WHERE name = 'trail_points'"
+            ).fetchone()
+            if row and row[0] == 'table':
+                self._migrate_legacy_table(cursor)
+
+            rebuild_catalog_view(conn)
+
             conn.commit()
             conn.close()
             debug_log(f"✅ Database hazır: {self.db_path}")
@@ -61,40 +421,44 @@ class TrailManager:
         except Exception as e:
             debug_log(f"❌ Database init hatası: {e}", "ERROR")
 
+    def _migrate_legacy_table(self, cursor):
+        """Tek tablolu eski trail_points'i trail_points_legacy partition'ı yap"""
+        name = PARTITION_PREFIX + "legacy"
+        cursor.execute(f"ALTER TABLE trail_points RENAME TO {name}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_hex_ts ON {name} (hex_id, timestamp)")
+        start_ts, end_ts, count = cursor.execute(f"""
+            SELECT CAST(strftime('%s', MIN(created_at)) AS REAL),
+                   CAST(strftime('%s', MAX(created_at)) AS REAL) + 1,
+                   COUNT(*)
+            FROM {name}
+        """).fetchone()
+        now = time.time()
+        cursor.execute("""
+            INSERT OR REPLACE INTO trail_partitions (name, start_ts, end_ts, point_count)
+            VALUES (?, ?, ?, ?)
+        """, (name, start_ts or now, end_ts or now, count))
+        debug_log(f"🔀 Eski trail_points tablosu partition'a taşındı ({count} nokta)")
+
     def save_trail_point(self, hex_id, lat, lon, timestamp, altitude=None,
                          speed=None, track=None, flight_code=None,
                          aircraft_type=None, registration=None):
-        """Tek bir trail noktası kaydet"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Trail point ekle
-            cursor.execute("""
-                INSERT INTO trail_points 
-                (hex_id, lat, lon, altitude, speed, track, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (hex_id, lat, lon, altitude, speed, track, timestamp))
+        """Tek bir trail noktasını yazma kuyruğuna ekle (bloklamaz)"""
+        return self.writer.enqueue(
+            (hex_id, lat, lon, altitude, speed, track, timestamp),
+            (hex_id, flight_code, aircraft_type, registration, altitude or 0, speed or 0)
+        )
 
-            # Metadata güncelle
-            cursor.execute("""
-                INSERT INTO trail_metadata 
-                (hex_id, flight_code, aircraft_type, registration, 
-                 point_count, first_seen, last_seen, max_altitude, avg_speed)
-                VALUES (?, ?, ?, ?, 1, datetime('now'), datetime('now'), ?, ?)
-                ON CONFLICT(hex_id) DO UPDATE SET
-                    point_count = point_count + 1,
-                    last_seen = datetime('now'),
-                    max_altitude = MAX(max_altitude, excluded.max_altitude),
-                    avg_speed = (avg_speed * point_count + excluded.avg_speed) / (point_count + 1)
-            """, (hex_id, flight_code, aircraft_type, registration,
-                  altitude or 0, speed or 0))
+    def end_tick(self):
+        """Bu tick'in noktalarını tek transaction'da yazdır"""
+        self.writer.end_tick()
 
-            conn.commit()
-            conn.close()
+    def flush(self, timeout=5.0):
+        """Kuyruktaki tüm noktalar yazılana kadar bekle"""
+        return self.writer.flush(timeout)
 
-        except Exception as e:
-            debug_log(f"❌ Trail kayıt hatası ({hex_id}): {e}", "ERROR")
+    def close(self):
+        """Kalan noktaları yaz ve writer thread'i durdur"""
+        self.writer.stop()
 
     def get_trail(self, hex_id, limit=50):
         """Bir uçağın izini database'den getir"""
@@ -165,31 +529,23 @@ class TrailManager:
             return None
 
     def cleanup_old_trails(self, hours=24):
-        """Eski izleri temizle (varsayılan: 24 saat)"""
+        """Eski izleri temizle (varsayılan: 24 saat) - süresi dolan partition'lar düşürülür"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Eski noktaları sil
-            cursor.execute("""
-                DELETE FROM trail_points
-                WHERE created_at < datetime('now', '-' || ? || ' hours')
-            """, (hours,))
-
-            deleted_points = cursor.rowcount
-
-            # Orphan metadata'ları temizle
-            cursor.execute("""
-                DELETE FROM trail_metadata
-                WHERE hex_id NOT IN (SELECT DISTINCT hex_id FROM trail_points)
-            """)
-
-            deleted_metadata = cursor.rowcount
-
-            conn.commit()
-            conn.close()
-
-            debug_log(f"🗑️ Temizlik: {deleted_points} nokta, {deleted_metadata} uçak silindi")
+            if self.writer.is_alive():
+                result = self.writer.apply_retention(hours)
+            else:
+                conn = sqlite3.connect(self.db_path)
+                result = drop_expired_partitions(conn, hours)
+                conn.close()
+
+            if result is None:
+                return
+
+            dropped_partitions, deleted_points, deleted_metadata = result
+            debug_log(
+                f"🗑️ Temizlik: {dropped_partitions} partition ({deleted_points} nokta), "
+                f"{deleted_metadata} uçak silindi"
+            )
 
         except Exception as e:
             debug_log(f"❌ Temizlik hatası: {e}", "ERROR")
@@ -200,13 +556,21 @@ class TrailManager:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
-            cursor.execute("""
-                SELECT DISTINCT hex_id
-                FROM trail_points
-                WHERE created_at > datetime('now', '-' || ? || ' hours')
-            """, (hours,))
-
-            hex_ids = [row[0] for row in cursor.fetchall()]
+            # Sadece zaman aralığıyla kesişen partition'lar taranır
+            cutoff = time.time() - hours * 3600
+            names = [row[0] for row in cursor.execute(
+                "SELECT name FROM trail_partitions WHERE end_ts > ?", (cutoff,)
+            )]
+
+            hex_ids = []
+            if names:
+                query = "\nUNION\n".join(
+                    f"SELECT hex_id FROM {name} "
+                    f"WHERE created_at > datetime('now', '-' || :hours || ' hours')"
+                    for name in names
+                )
+                cursor.execute(query, {'hours': hours})
+                hex_ids = [row[0] for row in cursor.fetchall()]
             conn.close()
 
             # Her uçak için izleri getir
@@ -226,9 +590,9 @@ class TrailManager:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
-            # Toplam nokta sayısı
-            cursor.execute("SELECT COUNT(*) FROM trail_points")
-            total_points = cursor.fetchone()[0]
+            # Toplam nokta sayısı (katalogdan - tablolar taranmaz)
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(point_count), 0) FROM trail_partitions")
+            partition_count, total_points = cursor.fetchone()
 
             # Toplam uçak sayısı
             cursor.execute("SELECT COUNT(*) FROM trail_metadata")
@@ -251,12 +615,14 @@ class TrailManager:
             return {
                 'total_points': total_points,
                 'total_aircraft': total_aircraft,
+                'partitions': partition_count,
                 'longest_trail': {
                     'hex_id': longest_trail[0] if longest_trail else None,
                     'point_count': longest_trail[1] if longest_trail else 0,
                     'flight_code': longest_trail[2] if longest_trail else None
                 },
-                'db_size_mb': round(db_size, 2)
+                'db_size_mb': round(db_size, 2),
+                'writer': self.writer.get_statistics()
             }
 
         except Exception as e:
@@ -273,4 +639,6 @@ def get_trail_manager():
     global _trail_manager
     if _trail_manager is None:
         _trail_manager = TrailManager()
+        # Kapanışta kuyrukta kalan noktaları yaz
+        atexit.register(_trail_manager.close)
     return _trail_manager
\ No newline at end of file
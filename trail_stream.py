@@ -0,0 +1,123 @@
+# trail_stream.py
+"""
+İsteğe bağlı iz (trail) aboneliği
+
+İzler artık her tick'teki 'update' mesajında gönderilmiyor. Client bir
+uçağın izini görmek istediğinde 'trail_subscribe' gönderir; sunucu önce
+son AIRCRAFT_TRAIL['max_points'] pozisyonu bir kez, sonra her tick'te sadece
+yeni noktaları Google Encoded Polyline olarak 'trail' olayıyla yollar:
+
+    {"updates": [
+        {"hex", "mode": "full", "polyline", "max_points"},
+        {"hex", "mode": "append", "polyline"}
+    ]}
+
+Client "full" gelince izi değiştirir, "append" gelince sonuna ekler ve
+max_points'ten eskileri atar.
+"""
+import threading
+
+import config
+from utils import encode_polyline
+
+
+def full_trail_message(hex_id, validator):
+    """Uçağın son AIRCRAFT_TRAIL['max_points'] pozisyonunu taşıyan mesaj"""
+    max_points = config.AIRCRAFT_TRAIL['max_points']
+    return {
+        "hex": hex_id,
+        "mode": "full",
+        "polyline": encode_polyline(validator.position_history.last(max_points).coords()),
+        "max_points": max_points
+    }
+
+
+class TrailSubscriptions:
+    """Client başına iz abonelikleri ve her abonelikte gönderilen son nokta"""
+
+    def __init__(self):
+        self._subscriptions = {}  # sid -> {hex: (validator, gönderilen nokta sayısı)}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._subscriptions.values())
+
+    def subscribe(self, sid, hex_id):
+        """Aboneliği başlat ve tam iz mesajını döndür (uçak yoksa None)"""
+        validator = config._aircraft_state.get(hex_id)
+        if validator is None:
+            return None
+
+        appended = validator.position_history.appended
+        message = full_trail_message(hex_id, validator)
+        with self._lock:
+            self._subscriptions.setdefault(sid, {})[hex_id] = (validator, appended)
+        return message
+
+    def unsubscribe(self, sid, hex_id=None):
+        """Tek aboneliği (veya hex_id verilmezse client'ın tümünü) bitir"""
+        with self._lock:
+            if hex_id is None:
+                self._subscriptions.pop(sid, None)
+                return
+            subs = self._subscriptions.get(sid)
+            if subs is not None:
+                subs.pop(hex_id, None)
+                if not subs:
+                    del self._subscriptions[sid]
+
+    def collect(self):
+        """Tick sonrası: yeni noktası olan abonelikler için (sid, updates) listesi
+
+        Uçak silinmişse abonelik sessizce kaldırılır (client uçağı 'update'
+        üzerinden zaten siler). Validator değişmişse veya ring buffer client'ın
+        son gördüğü noktayı geçmişse tam iz yeniden gönderilir.
+        """
+        aircraft_state = config._aircraft_state
+        result = []
+
+        with self._lock:
+            for sid, subs in list(self._subscriptions.items()):
+                updates = []
+                for hex_id, (validator, sent) in list(subs.items()):
+                    current = aircraft_state.get(hex_id)
+                    if current is None:
+                        del subs[hex_id]
+                        continue
+
+                    history = current.position_history
+                    appended = history.appended
+                    new_points = appended - sent
+
+                    if current is not validator or not 0 <= new_points <= len(history):
+                        updates.append(full_trail_message(hex_id, current))
+                    elif new_points > 0:
+                        updates.append({
+                            "hex": hex_id,
+                            "mode": "append",
+                            "polyline": encode_polyline(history.last(
+                                min(new_points, config.AIRCRAFT_TRAIL['max_points'])).coords())
+                        })
+                    else:
+                        continue
+                    subs[hex_id] = (current, appended)
+
+                if not subs:
+                    del self._subscriptions[sid]
+                if updates:
+                    result.append((sid, {"updates": updates}))
+
+        return result
+
+
+# Singleton instance
+_trail_subscriptions = None
+
+
+def get_trail_subscriptions() -> TrailSubscriptions:
+    """Global iz abonelikleri instance'ını döndür"""
+    global _trail_subscriptions
+    if _trail_subscriptions is None:
+        _trail_subscriptions = TrailSubscriptions()
+    return _trail_subscriptions
@@ -0,0 +1,308 @@
+# update_stream.py
+"""
+Socket.IO 'update' olayı için delta protokolü
+
+Her tick'te tüm uçak listesini göndermek yerine periyodik keyframe'ler ve
+arada sadece değişen alanları taşıyan delta mesajları üretilir:
+
+    keyframe: {"type": "keyframe", "seq", "now", "aircraft": [...], "stats"}
+    delta:    {"type": "delta", "seq", "base_seq", "now",
+               "added": [...], "changed": [{"hex", <değişen alanlar>}],
+               "removed": [hex, ...], "stats"}
+
+Client, base_seq kendi son seq'ine eşit değilse 'resync' ister ve bir
+keyframe alır.
+
+İkili formatı seçen client'lar (config._binary_clients) aynı mesajları
+wire_format çerçevesi olarak alır.
+
+Harita sınırlarını gönderen client'lar (ViewportRouter) kendi encoder'larıyla
+sadece görüş alanlarındaki (+ pay) uçakları alır; diğerleri ortak akışı alır.
+"""
+import threading
+
+import config
+from spatial_grid import SpatialGrid
+from wire_format import encode_frame
+
+# Client'a gönderilen alanlar (seen/seen_pos her tick değiştiği ve arayüzde
+# kullanılmadığı için gönderilmez; izler trail_stream ile ayrıca gönderilir).
+# Hareket vektörü: speed (kt), _movement_heading (yoksa track), vert_rate
+# (ft/dk) ve referans zamanı _pos_ts - sadece yeni pozisyonla değişir
+WIRE_FIELDS = (
+    'hex', 'flight', 'altitude', 'speed', 'track', 'lat', 'lon',
+    'squawk', 'type', 'r', 't',
+    '_corrected', '_correction_reason', '_movement_heading',
+    'vert_rate', '_pos_ts'
+)
+
+
+def to_wire(ac):
+    """Temiz uçak verisinden client'a gidecek kaydı oluştur"""
+    return {field: ac.get(field) for field in WIRE_FIELDS}
+
+
+def is_binary_client(sid):
+    """Client ikili çerçeve formatını seçmiş mi"""
+    return sid in config._binary_clients
+
+
+class DeltaEncoder:
+    """Uçak listelerini keyframe/delta mesajlarına çevirir
+
+    Encoder'ın state'i client'lara en son gönderilen durumdur; delta'lar
+    gerçek duruma değil bu state'e göre hesaplanır.
+    """
+
+    def __init__(self, keyframe_interval=None):
+        self.keyframe_interval = keyframe_interval or config.UPDATE_STREAM['keyframe_interval']
+        self.seq = 0
+        self.state = {}  # hex -> son gönderilen wire kaydı
+        self.now = None
+        self._ticks_since_keyframe = self.keyframe_interval  # İlk mesaj keyframe olsun
+        self._lock = threading.Lock()
+
+    def encode(self, now, aircraft, stats):
+        """Yeni tick için keyframe veya delta mesajı üret
+
+        Args:
+            now: Tick zamanı
+            aircraft: Temiz uçak listesi (listede olmayanlar kaldırılmış sayılır)
+            stats: İstatistikler
+
+        Returns:
+            Mesaj (dict)
+        """
+        return self.encode_frames(now, aircraft, stats)[0]
+
+    def encode_frames(self, now, aircraft, stats, binary=False):
+        """encode() ile aynı; binary=True ise mesajın ikili çerçevesini de üret
+
+        Returns:
+            (mesaj, ikili çerçeve veya None)
+        """
+        with self._lock:
+            message = self._encode(now, aircraft, stats)
+            frame = encode_frame(message, self.state) if binary else None
+            return message, frame
+
+    def _encode(self, now, aircraft, stats):
+        """Keyframe/delta üret (kilit tutulurken çağrılır)"""
+        records = {}
+        for ac in aircraft:
+            record = to_wire(ac)
+            records[record['hex']] = record
+
+        self.seq += 1
+        self.now = now
+        self._ticks_since_keyframe += 1
+
+        if self._ticks_since_keyframe >= self.keyframe_interval:
+            self.state = records
+            self._ticks_since_keyframe = 0
+            return self._keyframe(stats)
+
+        added = []
+        changed = []
+        previous = self.state
+        for hex_id, record in records.items():
+            old = previous.get(hex_id)
+            if old is None:
+                added.append(record)
+                continue
+
+            diff = {
+                field: value for field, value in record.items()
+                if old.get(field) != value
+            }
+
+            if diff:
+                diff['hex'] = hex_id
+                changed.append(diff)
+
+        removed_hexes = [hex_id for hex_id in previous if hex_id not in records]
+        self.state = records
+
+        return {
+            "type": "delta",
+            "seq": self.seq,
+            "base_seq": self.seq - 1,
+            "now": now,
+            "added": added,
+            "changed": changed,
+            "removed": removed_hexes,
+            "stats": stats
+        }
+
+    def keyframe(self, stats):
+        """Mevcut state'in keyframe'i (resync ve yeni bağlanan client'lar için)"""
+        with self._lock:
+            return self._keyframe(stats)
+
+    def _keyframe(self, stats):
+        return {
+            "type": "keyframe",
+            "seq": self.seq,
+            "now": self.now,
+            "aircraft": list(self.state.values()),
+            "stats": stats
+        }
+
+    def reset(self):
+        """State'i sıfırla (sonraki mesaj keyframe olur)"""
+        with self._lock:
+            self.state = {}
+            self._ticks_since_keyframe = self.keyframe_interval
+
+
+class Viewport:
+    """Client'ın harita sınırları (pay eklenmiş) ve zoom seviyesi"""
+
+    __slots__ = ('south', 'west', 'north', 'east', 'zoom')
+
+    def __init__(self, south, west, north, east, zoom=None):
+        self.south = south
+        self.west = west
+        self.north = north
+        self.east = east
+        self.zoom = zoom
+
+    @classmethod
+    def from_message(cls, data, margin_ratio=0.0):
+        """Socket.IO 'viewport' mesajından oluştur
+
+        Args:
+            data: {"south", "west", "north", "east", "zoom"}
+            margin_ratio: Her kenara eklenecek pay (kenar uzunluğuna oran)
+
+        Raises:
+            ValueError: Eksik veya geçersiz sınırlar
+        """
+        try:
+            south, west = float(data['south']), float(data['west'])
+            north, east = float(data['north']), float(data['east'])
+            zoom = data.get('zoom')
+            zoom = float(zoom) if zoom is not None else None
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Geçersiz viewport: {data!r}") from e
+
+        if south > north:
+            raise ValueError(f"Geçersiz viewport: south > north ({south} > {north})")
+
+        lat_margin = (north - south) * margin_ratio
+        lon_margin = ((east - west) % 360.0 or 360.0) * margin_ratio
+        return cls(
+            max(-90.0, south - lat_margin),
+            west - lon_margin,
+            min(90.0, north + lat_margin),
+            east + lon_margin,
+            zoom
+        )
+
+    def to_dict(self):
+        return {
+            'south': self.south, 'west': self.west,
+            'north': self.north, 'east': self.east,
+            'zoom': self.zoom
+        }
+
+
+class ViewportRouter:
+    """Viewport gönderen client'lara özel, filtrelenmiş update akışı
+
+    Her tick'te uçaklar bir SpatialGrid'e konur ve her client için sadece
+    görüş alanıyla kesişen hücreler taranır. Her client'ın delta sırası
+    ayrıdır (kendi DeltaEncoder'ı).
+    """
+
+    def __init__(self, cell_deg=None):
+        self.cell_deg = cell_deg or config.VIEWPORT_FILTER['grid_cell_deg']
+        self._sessions = {}  # sid -> (Viewport, DeltaEncoder)
+        self._grid = SpatialGrid(self.cell_deg)
+        self._now = None
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, sid):
+        return sid in self._sessions
+
+    def set_viewport(self, sid, viewport):
+        """Client'ın görüş alanını güncelle ve ona gönderilecek keyframe'i döndür"""
+        with self._lock:
+            session = self._sessions.get(sid)
+            encoder = session[1] if session is not None else DeltaEncoder()
+            self._sessions[sid] = (viewport, encoder)
+            grid, now, stats = self._grid, self._now, self._stats
+
+        # Görüş alanı değişti: bir sonraki mesaj tam keyframe olsun
+        encoder.reset()
+        return self._payload(encoder, viewport, grid, now, stats, is_binary_client(sid))
+
+    def remove(self, sid):
+        """Client'ı filtrelenmiş akıştan çıkar (bağlantı koptu veya tüm filoya döndü)"""
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def keyframe(self, sid, stats):
+        """Client'ın mevcut keyframe'i (resync için); client kayıtlı değilse None"""
+        with self._lock:
+            session = self._sessions.get(sid)
+        if session is None:
+            return None
+        message = session[1].keyframe(stats)
+        return encode_frame(message) if is_binary_client(sid) else message
+
+    def publish(self, now, aircraft, stats):
+        """Tick'i işle: her viewport client'ı için (sid, payload) listesi döndür"""
+        grid = SpatialGrid.build(aircraft, self.cell_deg)
+        with self._lock:
+            self._grid, self._now, self._stats = grid, now, stats
+            sessions = list(self._sessions.items())
+
+        return [
+            (sid, self._payload(encoder, viewport, grid, now, stats, is_binary_client(sid)))
+            for sid, (viewport, encoder) in sessions
+        ]
+
+    @staticmethod
+    def _payload(encoder, viewport, grid, now, stats, binary):
+        visible = grid.query_bbox(viewport.south, viewport.west, viewport.north, viewport.east)
+        if config.UPDATE_STREAM['delta']:
+            message, frame = encoder.encode_frames(now, visible, stats, binary=binary)
+            return frame if binary else message
+
+        message = {"now": now, "aircraft": [to_wire(ac) for ac in visible], "stats": stats}
+        return encode_frame(message) if binary else message
+
+    def get_statistics(self):
+        with self._lock:
+            return {
+                'clients': len(self._sessions),
+                'grid_cells': len(self._grid.cells),
+                'grid_items': len(self._grid),
+                'cell_deg': self.cell_deg
+            }
+
+
+# Singleton instance
+_update_stream = None
+_viewport_router = None
+
+
+def get_update_stream() -> DeltaEncoder:
+    """Global delta encoder instance'ını döndür"""
+    global _update_stream
+    if _update_stream is None:
+        _update_stream = DeltaEncoder()
+    return _update_stream
+
+
+def get_viewport_router() -> ViewportRouter:
+    """Global viewport router instance'ını döndür"""
+    global _viewport_router
+    if _viewport_router is None:
+        _viewport_router = ViewportRouter()
+    return _viewport_router
@@ -1,6 +1,12 @@
 # utils.py
 import math
-from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opsiyonel - yoksa saf Python yolları kullanılır
+    np = None
+
+EARTH_RADIUS_KM = 6371.0
 
 
 def haversine_km(lat1, lon1, lat2, lon2):
@@ -8,7 +14,7 @@ def haversine_km(lat1, lon1, lat2, lon2):
     if lat1 == lat2 and lon1 == lon2:
         return 0.0
 
-    R = 6371.0  # Dünya yarıçapı (km)
+    R = EARTH_RADIUS_KM  # Dünya yarıçapı (km)
     dlat = math.radians(lat2 - lat1)
     dlon = math.radians(lon2 - lon1)
     lat1_r = math.radians(lat1)
@@ -20,6 +26,58 @@ def haversine_km(lat1, lon1, lat2, lon2):
     return 2 * R * math.asin(math.sqrt(min(1.0, a)))
 
 
+def haversine_km_many(lat1, lon1, lats, lons):
+    """Tek bir noktadan çok sayıda noktaya mesafe (vektörel Haversine)
+
+    haversine_km ile aynı formülü aynı sırayla uygular; NumPy gerektirir.
+
+    Args:
+        lat1, lon1: Referans nokta
+        lats, lons: Hedef enlem/boylam dizileri (NumPy array)
+
+    Returns:
+        Mesafe dizisi (km)
+    """
+    R = EARTH_RADIUS_KM
+    dlat = np.radians(lats - lat1)
+    dlon = np.radians(lons - lon1)
+    lat1_r = math.radians(lat1)
+    lat2_r = np.radians(lats)
+
+    a = (np.sin(dlat / 2) ** 2 +
+         math.cos(lat1_r) * np.cos(lat2_r) * np.sin(dlon / 2) ** 2)
+
+    return 2 * R * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+
+def bounding_box_mask(lat1, lon1, lats, lons, radius_km):
+    """Yarıçap dairesini kapsayan enlem/boylam kutusu maskesi (ucuz ön filtre)
+
+    Kutu daireyi her zaman tamamen kapsar; yani maske dışında kalan bir
+    nokta Haversine ile de kesinlikle yarıçap dışındadır.
+
+    Args:
+        lat1, lon1: Merkez nokta
+        lats, lons: Enlem/boylam dizileri (NumPy array)
+        radius_km: Yarıçap (km)
+
+    Returns:
+        Bool maske dizisi
+    """
+    # Küçük pay: kayan nokta yuvarlaması sınırdaki noktaları kesmesin
+    angular = radius_km / EARTH_RADIUS_KM * 1.0001
+    dlat_deg = math.degrees(angular)
+    mask = np.abs(lats - lat1) <= dlat_deg
+
+    # Daire bir kutbu kapsıyorsa boylam sınırı yok
+    if abs(lat1) + dlat_deg >= 90.0 or angular >= math.pi / 2:
+        return mask
+
+    dlon_deg = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat1)))))
+    dlon = (lons - lon1 + 180.0) % 360.0 - 180.0  # -180/180 sarması
+    return mask & (np.abs(dlon) <= dlon_deg)
+
+
 def calculate_bearing(lat1, lon1, lat2, lon2):
     """İki nokta arası bearing hesapla (0-360 derece, kuzey=0)"""
     if lat1 == lat2 and lon1 == lon2:
@@ -109,19 +167,21 @@ def implied_speed_kts(lat1, lon1, ts1, lat2, lon2, ts2):
     return kmh / 1.852  # knot'a çevir
 
 
-def debug_log(message, level="INFO"):
-    """Debug logging (config.DEBUG_MODE aktifse)
+def debug_log(message, level="INFO", category="app"):
+    """Log kaydı (event_log hattı; konsol çıktısı config.DEBUG_MODE aktifse)
+
+    Sıcak yollarda event_log.get_logger(kategori) ile tembel biçimlendirme
+    tercih edilmeli; buradaki mesaj çağrı anında zaten biçimlendirilmiştir.
 
     Args:
         message: Log mesajı
-        level: Log seviyesi (INFO, WARNING, ERROR)
+        level: Log seviyesi (DEBUG, INFO, WARNING, ERROR)
+        category: Hız sınırı kategorisi
     """
     # Circular import'u önlemek için burada import
-    import config
+    from event_log import LEVELS, get_logger
 
-    if config.DEBUG_MODE:
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"[{timestamp}] {level}: {message}")
+    get_logger(category).log(LEVELS.get(level, LEVELS['INFO']), message)
 
 
 def format_altitude(altitude):
@@ -276,4 +336,59 @@ def format_duration(hours):
         m = int((hours - h) * 60)
         return f"{h}h {m}m"
     except (ValueError, TypeError):
-        return "N/A"
\ No newline at end of file
+        return "N/A"
+
+
+def encode_polyline(coords, precision=5):
+    """Koordinatları Google Encoded Polyline formatına çevir
+
+    Args:
+        coords: (lat, lon) ikilileri
+        precision: Ondalık hassasiyet (5 = 1e-5°)
+
+    Returns:
+        Polyline string'i (ilk nokta mutlak, sonrakiler farklar)
+    """
+    factor = 10 ** precision
+    chunks = []
+    prev_lat = prev_lon = 0
+
+    for lat, lon in coords:
+        ilat = round(lat * factor)
+        ilon = round(lon * factor)
+        for delta in (ilat - prev_lat, ilon - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        prev_lat, prev_lon = ilat, ilon
+
+    return ''.join(chunks)
+
+
+def decode_polyline(text, precision=5):
+    """encode_polyline'ın tersi
+
+    Returns:
+        (lat, lon) listesi
+    """
+    factor = 10 ** precision
+    coords = []
+    values = [0, 0]
+    index = 0
+
+    while index < len(text):
+        for axis in (0, 1):
+            shift = result = 0
+            while True:
+                byte = ord(text[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            values[axis] += ~(result >> 1) if result & 1 else result >> 1
+        coords.append((values[0] / factor, values[1] / factor))
+
+    return coords
@@ -0,0 +1,271 @@
+# wire_format.py
+"""
+Socket.IO 'update' mesajları için kompakt ikili çerçeve formatı
+
+JSON mesajda her uçak için tüm alan adları tekrar eder ve koordinatlar tam
+hassasiyetle gider. İkili çerçeve (isteğe bağlı, client 'wire_format' ile
+seçer) sabit genişlikli kayıtlar ve çerçeve başına bir string tablosu
+kullanır. Tüm sayılar little-endian:
+
+    header   : magic "AB", version u8, type u8, seq u32, base_seq u32,
+               now f64, n_added u16, n_changed u16, n_removed u16
+    strings  : count u16, her biri için length u8 + UTF-8 byte'lar
+    removed  : n_removed x u16 (string tablosu indeksi)
+    records  : (n_added + n_changed) x kayıt
+    stats    : length u32 + UTF-8 JSON
+
+Kayıt: hex/flight/squawk/type/r/t/_correction_reason için u16 string
+indeksi, lat/lon i32 (1e-5°), altitude i32 (ft), speed u16 (0.1 kt),
+track i16 (0.1°), _movement_heading i16 (0.1°), vert_rate i16 (ft/dk),
+pozisyon yaşı u16 (0.1 s, now - _pos_ts), flags u8 (37 byte). İzler
+çerçevede taşınmaz (bkz. trail_stream).
+
+Delta çerçevelerinde değişen uçaklar alan farkı yerine tam kayıt olarak
+gönderilir (sabit genişlikte fark taşımak kayıttan pahalı).
+"""
+import json
+import math
+import struct
+import threading
+import time
+
+MAGIC = b"AB"
+VERSION = 3
+
+FRAME_KEYFRAME = 0
+FRAME_DELTA = 1
+FRAME_FULL = 2  # Delta protokolü kapalıyken tam liste (seq yok)
+
+COORD_SCALE = 1e5  # 1e-5° ≈ 1.1 m
+ANGLE_SCALE = 10.0
+SPEED_SCALE = 10.0
+AGE_SCALE = 10.0
+
+NULL_STRING = 0xFFFF
+NULL_INT32 = -2 ** 31
+GROUND_ALTITUDE = NULL_INT32 + 1  # dump1090 "ground" değeri
+NULL_INT16 = -2 ** 15
+NULL_UINT16 = 0xFFFF
+
+FLAG_CORRECTED = 0x01
+
+STRING_FIELDS = ('hex', 'flight', 'squawk', 'type', 'r', 't', '_correction_reason')
+
+HEADER = struct.Struct('<2sBBIIdHHH')
+RECORD = struct.Struct('<7H3iHhhhHB')
+U16 = struct.Struct('<H')
+U32 = struct.Struct('<I')
+
+_FRAME_TYPES = {'keyframe': FRAME_KEYFRAME, 'delta': FRAME_DELTA}
+
+# Çalışma zamanı istatistikleri (ikili çerçeve üretim maliyeti)
+_stats = {'frames': 0, 'bytes': 0, 'encode_seconds': 0.0}
+_stats_lock = threading.Lock()
+
+
+def _quantize(value, scale, low, high, null):
+    """Sayıyı ölçekle, aralığa sıkıştır; sayı değilse null sentinel döndür"""
+    if value is None or isinstance(value, bool):
+        return null
+    try:
+        scaled = round(float(value) * scale)
+    except (TypeError, ValueError, OverflowError):
+        return null
+    return min(max(scaled, low), high)
+
+
+def _quantize_altitude(value):
+    if value == "ground":
+        return GROUND_ALTITUDE
+    return _quantize(value, 1.0, GROUND_ALTITUDE + 1, 2 ** 31 - 1, NULL_INT32)
+
+
+class _StringTable:
+    """Çerçeve başına string tablosu (aynı string bir kez gönderilir)"""
+
+    __slots__ = ('index', 'strings')
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, value):
+        if value is None:
+            return NULL_STRING
+        value = str(value)
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.strings)
+            if idx >= NULL_STRING:
+                raise ValueError("String tablosu dolu (65535 string)")
+            self.index[value] = idx
+            # 255 byte'a kırp; yarım kalan çok byte'lı karakter atılır
+            self.strings.append(value.encode('utf-8')[:255].decode('utf-8', 'ignore').encode('utf-8'))
+        return idx
+
+
+def encode_frame(message, records=None):
+    """Keyframe/delta/tam liste mesajını ikili çerçeveye çevir
+
+    Args:
+        message: update_stream mesajı (dict)
+        records: Delta için hex -> tam wire kaydı (değişen uçakların tam hali)
+
+    Returns:
+        bytes
+    """
+    started = time.perf_counter()
+    frame_type = _FRAME_TYPES.get(message.get('type'), FRAME_FULL)
+
+    if frame_type == FRAME_DELTA:
+        added = message['added']
+        changed = [records[diff['hex']] for diff in message['changed']]
+        removed = message['removed']
+    else:
+        added = message.get('aircraft') or []
+        changed = []
+        removed = []
+
+    strings = _StringTable()
+    removed_idx = [strings.add(hex_id) for hex_id in removed]
+
+    now = message.get('now')
+    rows = [_pack_fields(ac, strings, now) for ac in added]
+    rows.extend(_pack_fields(ac, strings, now) for ac in changed)
+
+    stats_bytes = json.dumps(message.get('stats') or {}, separators=(',', ':')).encode('utf-8')
+    string_bytes = sum(len(s) for s in strings.strings) + len(strings.strings)
+
+    size = (
+        HEADER.size + U16.size + string_bytes + U16.size * len(removed_idx)
+        + RECORD.size * len(rows)
+        + U32.size + len(stats_bytes)
+    )
+    buffer = bytearray(size)
+
+    HEADER.pack_into(
+        buffer, 0, MAGIC, VERSION, frame_type,
+        message.get('seq') or 0, message.get('base_seq') or 0,
+        float(now) if now is not None else math.nan,
+        len(added), len(changed), len(removed_idx)
+    )
+    offset = HEADER.size
+
+    U16.pack_into(buffer, offset, len(strings.strings))
+    offset += U16.size
+    for raw in strings.strings:
+        buffer[offset] = len(raw)
+        buffer[offset + 1:offset + 1 + len(raw)] = raw
+        offset += 1 + len(raw)
+
+    for idx in removed_idx:
+        U16.pack_into(buffer, offset, idx)
+        offset += U16.size
+
+    for fields in rows:
+        RECORD.pack_into(buffer, offset, *fields)
+        offset += RECORD.size
+
+    U32.pack_into(buffer, offset, len(stats_bytes))
+    offset += U32.size
+    buffer[offset:] = stats_bytes
+
+    frame = bytes(buffer)
+    with _stats_lock:
+        _stats['frames'] += 1
+        _stats['bytes'] += len(frame)
+        _stats['encode_seconds'] += time.perf_counter() - started
+    return frame
+
+
+def _pack_fields(ac, strings, now):
+    """Kaydın sabit genişlikli alanları"""
+    fields = [strings.add(ac.get(field)) for field in STRING_FIELDS]
+    fields.append(_quantize(ac.get('lat'), COORD_SCALE, -2 ** 31 + 1, 2 ** 31 - 1, NULL_INT32))
+    fields.append(_quantize(ac.get('lon'), COORD_SCALE, -2 ** 31 + 1, 2 ** 31 - 1, NULL_INT32))
+    fields.append(_quantize_altitude(ac.get('altitude')))
+    fields.append(_quantize(ac.get('speed'), SPEED_SCALE, 0, NULL_UINT16 - 1, NULL_UINT16))
+    fields.append(_quantize(ac.get('track'), ANGLE_SCALE, NULL_INT16 + 1, 2 ** 15 - 1, NULL_INT16))
+    fields.append(_quantize(ac.get('_movement_heading'), ANGLE_SCALE, NULL_INT16 + 1, 2 ** 15 - 1, NULL_INT16))
+    fields.append(_quantize(ac.get('vert_rate'), 1.0, NULL_INT16 + 1, 2 ** 15 - 1, NULL_INT16))
+    pos_ts = ac.get('_pos_ts')
+    fields.append(NULL_UINT16 if pos_ts is None or now is None else
+                  _quantize(now - pos_ts, AGE_SCALE, 0, NULL_UINT16 - 1, NULL_UINT16))
+    fields.append(FLAG_CORRECTED if ac.get('_corrected') else 0)
+    return fields
+
+
+def decode_frame(frame):
+    """İkili çerçeveyi update_stream mesajına geri çevir (test/benchmark için;
+    tarayıcıdaki karşılığı templates/index.html içindeki decodeFrame)
+    """
+    magic, version, frame_type, seq, base_seq, now, n_added, n_changed, n_removed = \
+        HEADER.unpack_from(frame, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Bilinmeyen çerçeve: {magic!r} v{version}")
+    offset = HEADER.size
+
+    (n_strings,) = U16.unpack_from(frame, offset)
+    offset += U16.size
+    strings = []
+    for _ in range(n_strings):
+        length = frame[offset]
+        strings.append(bytes(frame[offset + 1:offset + 1 + length]).decode('utf-8'))
+        offset += 1 + length
+
+    def string_at(idx):
+        return None if idx == NULL_STRING else strings[idx]
+
+    removed = []
+    for _ in range(n_removed):
+        removed.append(string_at(U16.unpack_from(frame, offset)[0]))
+        offset += U16.size
+
+    records = []
+    for _ in range(n_added + n_changed):
+        values = RECORD.unpack_from(frame, offset)
+        offset += RECORD.size
+        lat, lon, altitude, speed, track, movement, vert_rate, age, flags = values[7:]
+
+        record = {field: string_at(idx) for field, idx in zip(STRING_FIELDS, values[:7])}
+        record.update({
+            'lat': None if lat == NULL_INT32 else lat / COORD_SCALE,
+            'lon': None if lon == NULL_INT32 else lon / COORD_SCALE,
+            'altitude': (None if altitude == NULL_INT32
+                         else "ground" if altitude == GROUND_ALTITUDE else altitude),
+            'speed': None if speed == NULL_UINT16 else speed / SPEED_SCALE,
+            'track': None if track == NULL_INT16 else track / ANGLE_SCALE,
+            '_movement_heading': None if movement == NULL_INT16 else movement / ANGLE_SCALE,
+            'vert_rate': None if vert_rate == NULL_INT16 else vert_rate,
+            '_pos_ts': (None if age == NULL_UINT16 or math.isnan(now)
+                        else round(now - age / AGE_SCALE, 1)),
+            '_corrected': bool(flags & FLAG_CORRECTED)
+        })
+        records.append(record)
+
+    (stats_len,) = U32.unpack_from(frame, offset)
+    offset += U32.size
+    stats = json.loads(bytes(frame[offset:offset + stats_len]).decode('utf-8'))
+
+    now = None if math.isnan(now) else now
+    if frame_type == FRAME_DELTA:
+        return {
+            'type': 'delta', 'seq': seq, 'base_seq': base_seq, 'now': now,
+            'added': records[:n_added], 'changed': records[n_added:],
+            'removed': removed, 'stats': stats
+        }
+    if frame_type == FRAME_KEYFRAME:
+        return {'type': 'keyframe', 'seq': seq, 'now': now, 'aircraft': records, 'stats': stats}
+    return {'now': now, 'aircraft': records, 'stats': stats}
+
+
+def get_statistics():
+    """İkili çerçeve üretim istatistikleri"""
+    with _stats_lock:
+        frames = _stats['frames']
+        return {
+            'frames': frames,
+            'bytes': _stats['bytes'],
+            'avg_frame_bytes': round(_stats['bytes'] / frames, 1) if frames else 0,
+            'avg_encode_ms': round(_stats['encode_seconds'] * 1000 / frames, 3) if frames else 0
+        }